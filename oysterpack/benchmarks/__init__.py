@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks
+
+Benchmarks are standalone scripts, e.g.:
+
+    python -m benchmarks.secure_message_handler
+"""
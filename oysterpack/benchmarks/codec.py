@@ -0,0 +1,190 @@
+"""
+Compares the :func:`codec` generated `pack` / `unpack` methods with the hand-written tuple based codecs that they
+replaced.
+
+    python -m benchmarks.codec
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Self
+
+import msgpack  # type: ignore
+
+from oysterpack.algorand.client.accounts.private_key import (
+    AlgoPrivateKey,
+    SigningAddress,
+)
+from oysterpack.algorand.client.model import Address, TxnId
+from oysterpack.apps.wallet_connect.messsages.authorize_transactions import (
+    AuthorizeTransactionsFailure,
+    AuthorizeTransactionsErrCode,
+    AuthorizeTransactionsSuccess,
+)
+from oysterpack.apps.wallet_connect.messsages.register_signer_client import (
+    RegisterSignerClient,
+)
+from oysterpack.core.message import SignedMessage, MessageType
+
+ITERATIONS = 100_000
+
+
+@dataclass(slots=True)
+class HandWrittenRegisterSignerClient:
+    account: Address
+    multisig_signer: SigningAddress
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        (account, multisig_signer) = msgpack.unpackb(packed)
+        return cls(
+            account=account,
+            multisig_signer=multisig_signer,
+        )
+
+    def pack(self) -> bytes:
+        return msgpack.packb(
+            (
+                self.account,
+                self.multisig_signer,
+            )
+        )
+
+
+@dataclass(slots=True)
+class HandWrittenAuthorizeTransactionsFailure:
+    code: AuthorizeTransactionsErrCode
+    message: str
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        (code, message) = msgpack.unpackb(packed)
+        return cls(code=code, message=message)
+
+    def pack(self) -> bytes:
+        return msgpack.packb(
+            (
+                self.code,
+                self.message,
+            )
+        )
+
+
+@dataclass(slots=True)
+class HandWrittenAuthorizeTransactionsSuccess:
+    transaction_ids: list[TxnId]
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        transaction_ids = msgpack.unpackb(packed)
+        return cls(transaction_ids)
+
+    def pack(self) -> bytes:
+        return msgpack.packb(self.transaction_ids)
+
+
+@dataclass(slots=True)
+class HandWrittenSignedMessage:
+    signer: SigningAddress
+    signature: bytes
+    data: bytes
+    msg_type: MessageType
+
+    @classmethod
+    def unpack(cls, msg: bytes) -> Self:
+        (
+            msg_type,
+            signer,
+            signature,
+            data,
+        ) = msgpack.unpackb(msg, use_list=False)
+
+        return cls(
+            signer=signer,
+            signature=signature,
+            data=data,
+            msg_type=MessageType.from_bytes(msg_type),
+        )
+
+    def pack(self) -> bytes:
+        return msgpack.packb(
+            (
+                self.msg_type.bytes,
+                self.signer,
+                self.signature,
+                self.data,
+            )
+        )
+
+
+def measure(name: str, msg, unpack: Callable):
+    packed = msg.pack()
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        msg.pack()
+    pack_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        unpack(packed)
+    unpack_elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<48} pack={ITERATIONS / pack_elapsed:>11,.0f}/sec "
+        f"unpack={ITERATIONS / unpack_elapsed:>11,.0f}/sec size={len(packed):>4} bytes"
+    )
+
+
+def main():
+    private_key = AlgoPrivateKey()
+    account = Address(AlgoPrivateKey().signing_address)
+    signed_msg = SignedMessage.sign(
+        private_key,
+        RegisterSignerClient(
+            account=account, multisig_signer=private_key.signing_address
+        ),
+    )
+    txn_ids = [TxnId(f"TXN{i:049}") for i in range(16)]
+
+    cases = (
+        (
+            RegisterSignerClient(account, private_key.signing_address),
+            HandWrittenRegisterSignerClient(account, private_key.signing_address),
+        ),
+        (
+            AuthorizeTransactionsFailure(
+                AuthorizeTransactionsErrCode.AppNotRegistered, "app is not registered"
+            ),
+            HandWrittenAuthorizeTransactionsFailure(
+                AuthorizeTransactionsErrCode.AppNotRegistered, "app is not registered"
+            ),
+        ),
+        (
+            AuthorizeTransactionsSuccess(txn_ids),
+            HandWrittenAuthorizeTransactionsSuccess(txn_ids),
+        ),
+        (
+            signed_msg,
+            HandWrittenSignedMessage(
+                signed_msg.signer,
+                signed_msg.signature,
+                signed_msg.data,
+                signed_msg.msg_type,
+            ),
+        ),
+    )
+    for generated, hand_written in cases:
+        measure(
+            f"{type(hand_written).__name__}",
+            hand_written,
+            type(hand_written).unpack,
+        )
+        measure(
+            f"{type(generated).__name__} (@codec)",
+            generated,
+            type(generated).unpack,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures bytes on the wire and CPU time per message with and without :type:`Message` payload compression.
+
+Payloads are :type:`AuthorizeTransactionsRequest` messages for transaction groups of increasing size, which are sealed
+as :type:`SecureMessageFrame`, i.e., compression is applied before encryption.
+
+    python -m benchmarks.compression
+"""
+import time
+from typing import Callable
+
+from algosdk.transaction import PaymentTxn, SuggestedParams, assign_group_id
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.client.model import AppId
+from oysterpack.algorand.messaging.secure_message import (
+    pack_secure_message_frame,
+    unpack_secure_message,
+)
+from oysterpack.apps.wallet_connect.messsages.authorize_transactions import (
+    AuthorizeTransactionsRequest,
+)
+from oysterpack.apps.wallet_connect.domain.activity import AppActivityId
+from oysterpack.core.compression import Compression, ZlibCompressor
+from oysterpack.core.message import Message
+
+GROUP_SIZES = (1, 4, 15)
+ITERATIONS = 500
+
+COMPRESSION = (
+    ("none", None),
+    ("zlib level=1", Compression(ZlibCompressor(level=1), threshold=0)),
+    ("zlib level=6", Compression(ZlibCompressor(level=6), threshold=0)),
+    ("zlib level=9", Compression(ZlibCompressor(level=9), threshold=0)),
+)
+
+
+def timeit(func: Callable[[], object]) -> float:
+    """
+    :return: microseconds per call
+    """
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 10**6
+
+
+def request(group_size: int) -> AuthorizeTransactionsRequest:
+    signer = AlgoPrivateKey().signing_address
+    params = SuggestedParams(
+        fee=1000,
+        first=30_000_000,
+        last=30_001_000,
+        gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+        gen="mainnet-v1.0",
+        flat_fee=True,
+    )
+    txns = assign_group_id(
+        [
+            PaymentTxn(
+                sender=signer,
+                sp=params,
+                receiver=AlgoPrivateKey().signing_address,
+                amt=1_000_000 + i,
+                note=b"oysterpack",
+            )
+            for i in range(group_size)
+        ]
+    )
+    return AuthorizeTransactionsRequest(
+        app_id=AppId(123456789),
+        authorizer=signer,
+        transactions=txns,
+        app_activity_id=AppActivityId(AppId(987654321)),
+    )
+
+
+def main():
+    sender = AlgoPrivateKey()
+    recipient = AlgoPrivateKey()
+
+    for group_size in GROUP_SIZES:
+        data = request(group_size)
+        msg = Message.create(data.message_type(), data.pack())
+        for name, compression in COMPRESSION:
+            frame = pack_secure_message_frame(
+                sender, msg, recipient.encryption_address, compression
+            )
+            compressed = msg.compress(compression) if compression else msg
+            compress_us = (
+                timeit(lambda: msg.compress(compression)) if compression else 0.0
+            )
+            decompress_us = timeit(compressed.decompress)
+            roundtrip_us = timeit(
+                lambda: unpack_secure_message(
+                    recipient,
+                    pack_secure_message_frame(
+                        sender, msg, recipient.encryption_address, compression
+                    ),
+                )
+            )
+            print(
+                f"txns={group_size:>2} {name:<13} payload={len(msg.data):>6,} wire={len(frame):>6,} bytes "
+                f"({len(frame) / len(msg.data) * 100:>5.1f}%) compress={compress_us:>7.1f}us "
+                f"decompress={decompress_us:>6.1f}us roundtrip={roundtrip_us:>8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
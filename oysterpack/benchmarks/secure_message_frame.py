@@ -0,0 +1,67 @@
+"""
+Compares the msgpack based :type:`SignedEncryptedMessage` format with the :type:`SecureMessageFrame` binary format.
+
+For each format, a message is packed by the sender and unpacked by the recipient. The benchmark reports throughput
+and the number of bytes allocated per message, which is measured via `tracemalloc`.
+
+    python -m benchmarks.secure_message_frame
+"""
+import time
+import tracemalloc
+from typing import Callable
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.secure_message import (
+    seal_message,
+    unpack_secure_message,
+    pack_secure_message_frame,
+)
+from oysterpack.core.message import Message, MessageType
+
+PAYLOAD_SIZES = (1024, 64 * 1024, 1024 * 1024)
+ITERATIONS = 200
+
+MSG_TYPE = MessageType.from_str("01GXQ8V0T5M3Z8JS4Q4R7B9Z1C")
+
+
+def measure(name: str, roundtrip: Callable[[], Message], payload_size: int):
+    # warm up the key caches
+    roundtrip()
+
+    tracemalloc.start()
+    roundtrip()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        roundtrip()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<24} payload={payload_size:>9,} msgs/sec={ITERATIONS / elapsed:>8,.0f} "
+        f"peak allocated={peak:>11,} bytes ({peak / payload_size:.1f}x payload)"
+    )
+
+
+def main():
+    sender = AlgoPrivateKey()
+    recipient = AlgoPrivateKey()
+
+    for payload_size in PAYLOAD_SIZES:
+        msg = Message.create(MSG_TYPE, b"x" * payload_size)
+
+        def signed_encrypted_message() -> Message:
+            packed = seal_message(sender, msg, recipient.encryption_address).pack()
+            return unpack_secure_message(recipient, packed)
+
+        def secure_message_frame() -> Message:
+            frame = pack_secure_message_frame(sender, msg, recipient.encryption_address)
+            return unpack_secure_message(recipient, frame)
+
+        measure("SignedEncryptedMessage", signed_encrypted_message, payload_size)
+        measure("SecureMessageFrame", secure_message_frame, payload_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Measures event loop latency while a burst of inbound secure messages is being handled.
+
+- before: messages are verified and decrypted on the event loop, i.e., `unpack_secure_message` is called inline
+- after: messages are verified and decrypted on the executor in batches, i.e., via :type:`SecureMessageHandler`
+
+Event loop latency is measured by a probe task that repeatedly sleeps for 1 ms and records how late it wakes up.
+
+    python -m benchmarks.secure_message_handler
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, Executor
+from dataclasses import dataclass
+from typing import Self, Awaitable, Callable
+
+import msgpack  # type: ignore
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.secure_message import (
+    SignedEncryptedMessage,
+    create_secure_message,
+    unpack_secure_message,
+)
+from oysterpack.algorand.messaging.secure_message_handler import (
+    SecureMessageHandler,
+    MessageHandler,
+    MessageContext,
+)
+from oysterpack.algorand.messaging.websocket import Websocket
+from oysterpack.core.message import Serializable, MessageType
+
+MSG_COUNT = 5000
+PAYLOAD_SIZE = 4096
+PROBE_INTERVAL = 0.001
+
+
+@dataclass(slots=True)
+class Payload(Serializable):
+    data: bytes
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return MessageType.from_str("01GXQ8V0T5M3Z8JS4Q4R7B9Z1C")
+
+    def pack(self) -> bytes:
+        return msgpack.packb(self.data)
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        return cls(msgpack.unpackb(packed))
+
+
+class NoopMessageHandler(MessageHandler):
+    async def __call__(self, ctx: MessageContext):
+        pass
+
+    def supported_msg_types(self) -> set[MessageType]:
+        return {Payload.message_type()}
+
+
+class NullWebsocket(Websocket):
+    async def recv(self):
+        raise NotImplementedError
+
+    async def send(self, message) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    elapsed: float
+    lags: list[float]
+
+    def __str__(self) -> str:
+        lags = sorted(self.lags)
+        p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+        return (
+            f"{self.name:<8} msgs/sec={MSG_COUNT / self.elapsed:>10,.0f} "
+            f"loop lag ms: p50={statistics.median(lags) * 1000:.2f} "
+            f"p99={p99 * 1000:.2f} max={lags[-1] * 1000:.2f} (samples={len(lags)})"
+        )
+
+
+async def measure(
+    name: str,
+    handle: Callable[[SignedEncryptedMessage], Awaitable[None]],
+    secure_msgs: list[SignedEncryptedMessage],
+) -> Result:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*[handle(secure_msg) for secure_msg in secure_msgs])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return Result(name, elapsed, lags)
+
+
+async def run(executor: Executor):
+    sender = AlgoPrivateKey()
+    recipient = AlgoPrivateKey()
+    secure_msgs = [
+        create_secure_message(
+            private_key=sender,
+            data=Payload(b"x" * PAYLOAD_SIZE),
+            recipient=recipient.encryption_address,
+        )
+        for _ in range(MSG_COUNT)
+    ]
+
+    websocket = NullWebsocket()
+    handler = NoopMessageHandler()
+
+    async def before(secure_msg: SignedEncryptedMessage):
+        # simulates the websocket handler creating a task per inbound message
+        await asyncio.sleep(0)
+        msg = unpack_secure_message(recipient, secure_msg)
+        await handler.__call__(
+            MessageContext(
+                server_private_key=recipient,
+                websocket=websocket,
+                executor=executor,
+                client_encryption_address=secure_msg.encrypted_msg.sender,
+                client_signing_address=secure_msg.sender,
+                msg=msg,
+            )
+        )
+
+    secure_message_handler = SecureMessageHandler(
+        private_key=recipient,
+        message_handlers=[handler],
+        executor=executor,
+    )
+
+    async def after(secure_msg: SignedEncryptedMessage):
+        await asyncio.sleep(0)
+        await secure_message_handler(secure_msg, websocket)
+
+    # warm up the process pool
+    await measure("warmup", after, secure_msgs[:100])
+
+    print(await measure("before", before, secure_msgs))
+    print(await measure("after", after, secure_msgs))
+
+
+def main():
+    with ProcessPoolExecutor() as executor:
+        asyncio.run(run(executor))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,22 @@ https://doc.libsodium.org/public-key_cryptography/authenticated_encryption
 """
 
 import base64
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import NewType
+from functools import cached_property
+from typing import NewType, Any, Sequence
 
-from algosdk import constants, mnemonic, transaction
+from algosdk import constants, mnemonic, transaction, encoding
 from algosdk.account import generate_account
 from algosdk.atomic_transaction_composer import TransactionSigner
 from algosdk.encoding import encode_address, decode_address
-from algosdk.transaction import GenericSignedTransaction
-from nacl.exceptions import BadSignatureError
+from algosdk.transaction import GenericSignedTransaction, SignedTransaction
+from nacl.exceptions import CryptoError
 from nacl.public import PrivateKey, Box, PublicKey
 from nacl.signing import SigningKey, SignedMessage, VerifyKey
 
 from oysterpack.algorand.client.model import Address, Mnemonic
+from oysterpack.core.cache import LRUCache, CacheStats
 
 # public box encryption key encoded as a base32 address
 EncryptionAddress = NewType("EncryptionAddress", Address)
@@ -30,7 +33,7 @@ EncryptionAddress = NewType("EncryptionAddress", Address)
 SigningAddress = NewType("SigningAddress", Address)
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class AlgoPublicKeys:
     signing_address: SigningAddress
     encryption_address: EncryptionAddress
@@ -47,15 +50,34 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
     NOTES
     -----
     - Self encrypted messages can be created, i.e., sender == recipient
+    - Box shared keys are cached per peer EncryptionAddress. Computing the shared key requires an X25519 scalar
+      multiplication, which is the most expensive part of box encryption. The cache is bounded (LRU) and thread safe.
+    - Key material derived from the private key (signing key, addresses) is computed once per instance.
+      Derived values are not pickled - they are recomputed on demand in the unpickling process.
     """
 
-    def __init__(self, algo_private_key: str | bytes | Mnemonic | None = None):
+    # derived values that are cached per instance via `cached_property`
+    __DERIVED_ATTRS = frozenset(
+        (
+            "signing_key",
+            "signing_address",
+            "encryption_address",
+            "public_keys",
+        )
+    )
+
+    def __init__(
+        self,
+        algo_private_key: str | bytes | Mnemonic | None = None,
+        box_cache_size: int = 256,
+    ):
         """
         :param algo_private_key: If not specified, then a new Algorand private key will be generated.
             The Algorand account private key can be specified in the following formats:
                 1. base64 encoded bytes
                 2. raw bytes
                 3. Mnemonic
+        :param box_cache_size: max number of peer Box shared keys to cache
         """
         if algo_private_key is None:
             algo_private_key = generate_account()[0]
@@ -75,6 +97,19 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
         else:
             raise ValueError("invalid private_key type - must be str | bytes")
 
+        self.__box_cache: LRUCache[EncryptionAddress, Box] = LRUCache(box_cache_size)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in self.__DERIVED_ATTRS
+        }
+
+    def __setstate__(self, state: dict[str, Any]):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     @property
     def mnemonic(self) -> Mnemonic:
         """
@@ -84,14 +119,14 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
             mnemonic.from_private_key(base64.b64encode(bytes(self)).decode())
         )
 
-    @property
+    @cached_property
     def public_keys(self) -> AlgoPublicKeys:
         return AlgoPublicKeys(
             signing_address=self.signing_address,
             encryption_address=self.encryption_address,
         )
 
-    @property
+    @cached_property
     def encryption_address(self) -> EncryptionAddress:
         """
         EncryptionAddress is derived from the Algorand account's private key.
@@ -100,7 +135,7 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
         """
         return EncryptionAddress(Address(encode_address(bytes(self.public_key))))
 
-    @property
+    @cached_property
     def signing_key(self) -> SigningKey:
         """
         NOTE: This is the same signing key used to sign Algorand transactions.
@@ -109,7 +144,7 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
         """
         return SigningKey(bytes(self))
 
-    @property
+    @cached_property
     def signing_address(self) -> SigningAddress:
         """
         Signing address is the same as the Algorand address, which corresponds to the Algorand account public key.
@@ -130,12 +165,9 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
 
         :param recipient: if None, then recipient is set to self
         """
-        return Box(
-            self,
-            encryption_address_to_public_key(
-                recipient if recipient else self.encryption_address
-            ),
-        ).encrypt(msg)
+        return self.box(recipient if recipient else self.encryption_address).encrypt(
+            msg
+        )
 
     def decrypt(
         self,
@@ -147,32 +179,77 @@ class AlgoPrivateKey(PrivateKey, TransactionSigner):
 
         :param sender: if None, then sender is set to self
         """
-        return Box(
-            self,
-            encryption_address_to_public_key(
-                sender if sender else self.encryption_address
-            ),
-        ).decrypt(
+        return self.box(sender if sender else self.encryption_address).decrypt(
             ciphertext=msg[Box.NONCE_SIZE :],
             nonce=msg[: Box.NONCE_SIZE],
         )
 
+    def box(self, peer: EncryptionAddress) -> Box:
+        """
+        Box encryption is used to encrypt messages between this key and the peer.
+
+        Notes
+        -----
+        - Boxes are cached per peer. A Box holds the precomputed shared key, which is what makes it expensive to create.
+
+        :param peer: the other party's EncryptionAddress
+        :return: Box
+        """
+        return self.__box_cache.get_or_create(
+            peer,
+            lambda address: Box(self, encryption_address_to_public_key(address)),
+        )
+
+    @property
+    def box_cache_stats(self) -> CacheStats:
+        """
+        :return: Box cache stats
+        """
+        return self.__box_cache.stats
+
     def sign(self, msg: bytes) -> SignedMessage:
         """
         Signs the message.
         """
         return self.signing_key.sign(msg)
 
+    def sign_transaction(self, txn: transaction.Transaction) -> SignedTransaction:
+        """
+        Signs the transaction using the cached signing key.
+
+        Notes
+        -----
+        - This is equivalent to `txn.sign(private_key)`, but avoids base64 encoding the private key and expanding
+          the Ed25519 seed into a new signing key for each transaction.
+        - If the transaction sender is not this account, then the signed transaction's authorizing address is set,
+          i.e., the sender account is assumed to be rekeyed to this account.
+        """
+        to_sign = constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn))
+        signature = base64.b64encode(self.signing_key.sign(to_sign).signature).decode()
+        return SignedTransaction(
+            transaction=txn,
+            signature=signature,
+            authorizing_address=None
+            if txn.sender == self.signing_address
+            else self.signing_address,
+        )
+
     def sign_transactions(
         self,
         txn_group: list[transaction.Transaction],
         indexes: list[int],
     ) -> list[GenericSignedTransaction]:
-        stxns = []
-        for i in indexes:
-            stxn = txn_group[i].sign(base64.b64encode(bytes(self)).decode())
-            stxns.append(stxn)
-        return stxns
+        return [self.sign_transaction(txn_group[i]) for i in indexes]
+
+
+# decoded VerifyKeys keyed by signing address or by raw public key bytes
+# - decoding the base32 address and constructing the VerifyKey is pure overhead when verifying messages from the same
+#   signers over and over, e.g., a websocket client
+# - str and bytes keys never compare equal, i.e., both key types share the same cache without colliding
+_verify_key_cache: LRUCache[SigningAddress | bytes, VerifyKey] = LRUCache(4096)
+
+# (message, signature, signer)
+SignedMessageTriple = tuple[bytes, bytes, SigningAddress]
 
 
 def encryption_address_to_public_key(address: EncryptionAddress) -> PublicKey:
@@ -185,17 +262,96 @@ def encryption_address_to_public_key(address: EncryptionAddress) -> PublicKey:
 def signing_address_to_verify_key(address: SigningAddress) -> VerifyKey:
     """
     SigningAddress -> VerifyKey
+
+    Notes
+    -----
+    - VerifyKeys are cached
+    """
+    return _verify_key_cache.get_or_create(
+        address, lambda signer: VerifyKey(decode_address(signer))
+    )
+
+
+def public_key_to_verify_key(public_key: bytes) -> VerifyKey:
+    """
+    Raw 32 byte public key -> VerifyKey
+
+    Notes
+    -----
+    - VerifyKeys are cached
+    - Skips the base32 address round trip, e.g., multisig subsigs carry raw public keys
     """
-    return VerifyKey(decode_address(address))
+    key = bytes(public_key)
+    return _verify_key_cache.get_or_create(key, lambda _: VerifyKey(key))
+
+
+def verify_key_cache_stats() -> CacheStats:
+    """
+    :return: VerifyKey cache stats
+    """
+    return _verify_key_cache.stats
 
 
 def verify_message(message: bytes, signature: bytes, signer: SigningAddress) -> bool:
     """
     :return: True if the message has a valid signature
     """
-    verify_key = VerifyKey(decode_address(signer))
+    verify_key = signing_address_to_verify_key(signer)
     try:
         verify_key.verify(message, signature)
         return True
-    except BadSignatureError:
+    except CryptoError:
+        # e.g., the signature is invalid or malformed
         return False
+
+
+def verify_signature(message: bytes, signature: bytes, public_key: bytes) -> bool:
+    """
+    :param public_key: raw 32 byte signer public key
+    :return: True if the message has a valid signature, i.e., a malformed public key or signature fails verification
+    """
+    try:
+        public_key_to_verify_key(public_key).verify(message, signature)
+        return True
+    except (CryptoError, ValueError):
+        return False
+
+
+def _verify_messages(batch: Sequence[SignedMessageTriple]) -> list[bool]:
+    return [
+        verify_message(message, signature, signer)
+        for (message, signature, signer) in batch
+    ]
+
+
+def verify_messages(
+    batch: Sequence[SignedMessageTriple],
+    executor: Executor | None = None,
+    chunk_size: int = 256,
+) -> list[bool]:
+    """
+    Verifies a batch of signed messages.
+
+    Notes
+    -----
+    - If an executor is specified and the batch is larger than `chunk_size`, then the batch is split into chunks,
+      which are verified in parallel on the executor. Use a :type:`ProcessPoolExecutor` to spread the work across
+      CPU cores.
+
+    :param batch: (message, signature, signer) triples
+    :param executor: used to verify large batches in parallel
+    :param chunk_size: max number of messages that are verified per executor task
+    :return: verification results in the same order as the batch
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    if executor is None or len(batch) <= chunk_size:
+        return _verify_messages(batch)
+
+    chunks = [batch[i : i + chunk_size] for i in range(0, len(batch), chunk_size)]
+    return [
+        result
+        for chunk_results in executor.map(_verify_messages, chunks)
+        for result in chunk_results
+    ]
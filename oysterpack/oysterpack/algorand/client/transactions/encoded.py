@@ -0,0 +1,119 @@
+"""
+Transactions that are carried in their canonical msgpack encoding
+"""
+from base64 import b64decode
+from typing import Any, Self, Sequence
+
+import msgpack  # type: ignore
+from algosdk import constants
+from algosdk.encoding import msgpack_encode, checksum
+from algosdk.error import TransactionGroupSizeError
+from algosdk.transaction import Transaction
+
+
+class EncodedTransaction:
+    """
+    Transaction in its canonical msgpack encoding, i.e., the encoding that is used to compute the transaction ID.
+
+    Notes
+    -----
+    - The encoding must be canonical, i.e., re-encoding the decoded fields must produce the same bytes. Otherwise,
+      the bytes that are carried would not match the transaction ID that is computed from the decoded transaction.
+    - The transaction is decoded lazily, i.e., only when :attr:`transaction` is accessed.
+    - Decoded values are cached. The encoded bytes are immutable, i.e., the cached values never go stale.
+    """
+
+    __slots__ = ("__encoded", "__fields", "__transaction")
+
+    def __init__(self, encoded: bytes):
+        """
+        :param encoded: canonical msgpack encoded transaction
+        :exception ValueError: if the encoding is not a canonical msgpack map
+        """
+        self.__encoded = bytes(encoded)
+        self.__fields: dict[str, Any] = self.__decode(self.__encoded)
+        self.__transaction: Transaction | None = None
+
+    @classmethod
+    def encode(cls, txn: Transaction) -> Self:
+        encoded = cls(b64decode(msgpack_encode(txn)))
+        encoded.__transaction = txn  # pylint: disable=unused-private-member
+        return encoded
+
+    @property
+    def encoded(self) -> bytes:
+        return self.__encoded
+
+    @property
+    def transaction(self) -> Transaction:
+        """
+        :return: decoded Transaction
+        """
+        if self.__transaction is None:
+            self.__transaction = Transaction.undictify(dict(self.__fields))
+        return self.__transaction
+
+    @property
+    def group(self) -> bytes | None:
+        """
+        :return: transaction group ID
+        """
+        return self.__fields.get("grp")
+
+    def txid_without_group(self) -> bytes:
+        """
+        :return: raw transaction ID computed with the group field omitted, which is what the group ID is computed from
+        """
+        if "grp" not in self.__fields:
+            return checksum(constants.txid_prefix + self.__encoded)
+        encoded = b64decode(
+            msgpack_encode(
+                {key: value for key, value in self.__fields.items() if key != "grp"}
+            )
+        )
+        return checksum(constants.txid_prefix + encoded)
+
+    @staticmethod
+    def __decode(encoded: bytes) -> dict[str, Any]:
+        try:
+            fields = msgpack.unpackb(encoded)
+        except Exception as err:
+            raise ValueError(f"invalid msgpack encoding: {err}") from err
+        if not isinstance(fields, dict):
+            raise ValueError("encoded transaction must be a msgpack map")
+        if b64decode(msgpack_encode(fields)) != encoded:
+            raise ValueError("encoded transaction is not canonical")
+        return fields
+
+    def pack(self) -> bytes:
+        return self.__encoded
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        return cls(packed)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EncodedTransaction):
+            return False
+        return self.__encoded == other.__encoded
+
+    def __hash__(self):
+        return hash(self.__encoded)
+
+    def __repr__(self):
+        return f"EncodedTransaction({self.__encoded.hex()})"
+
+
+def calculate_group_id(txns: Sequence[EncodedTransaction]) -> bytes:
+    """
+    Computes the group ID from the encoded transactions, i.e., without decoding or mutating Transaction objects.
+
+    Transactions may already be assigned a group ID, which is omitted when computing the group ID.
+
+    :exception TransactionGroupSizeError: if the group exceeds the max number of transactions
+    """
+    if len(txns) > constants.tx_group_limit:
+        raise TransactionGroupSizeError
+    txlist = [txn.txid_without_group() for txn in txns]
+    encoded = b64decode(msgpack_encode({"txlist": txlist}))
+    return checksum(constants.tgid_prefix + encoded)
@@ -0,0 +1,337 @@
+"""
+Chunked messages for payloads that are too large to be buffered, encrypted, and signed as a single message
+
+A chunked message is sent as a sequence of :type:`MessageChunk` messages that share the same :type:`MessageId`.
+Each chunk is packed into its own :type:`Message`, i.e., each chunk is encrypted and authenticated on its own.
+
+1. the payload is split into fixed size chunks, which are numbered by a sequence number starting at 0
+2. the final chunk carries an authentication tag over the message type and the entire payload, which is a BLAKE2b
+   digest keyed by the message ID, i.e., the receiver detects missing, reordered, or truncated chunks, and the tag
+   cannot be spliced into another chunked message
+
+The receiver processes the chunks incrementally as an async iterator (see :type:`ChunkedMessageReader`).
+"""
+import asyncio
+import hashlib
+import hmac
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import AsyncIterable, AsyncIterator, ClassVar
+
+from oysterpack.core.codec import codec
+from oysterpack.core.message import Message, MessageId, MessageType, Serializable
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_DIGEST_SIZE = 32
+
+
+class ChunkedMessageError(Exception):
+    """
+    Raised when a chunked message fails to be received, e.g., chunks are missing or the authentication tag does not
+    match.
+    """
+
+
+@codec
+@dataclass(slots=True)
+class MessageChunk(Serializable):
+    """
+    Chunk of a chunked message
+
+    Notes
+    -----
+    - The chunk's :type:`Message` ID is the chunked message ID.
+    - The chunk message type is reserved, i.e., chunks are routed by the chunked message type.
+    """
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M537T7JA4QFR85626HADKFMX"),
+        init=False,
+        repr=False,
+    )
+
+    # chunked message type
+    msg_type: MessageType
+    # chunk sequence number, starting at 0
+    seq: int
+    data: bytes
+    # authentication tag over the entire payload, which is only set on the final chunk
+    tag: bytes | None = None
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+    @property
+    def final(self) -> bool:
+        return self.tag is not None
+
+
+@dataclass(slots=True, frozen=True)
+class ChunkedMessageConfig:
+    """
+    Receiver side chunked message settings (see :type:`ChunkedMessageReader`)
+    """
+
+    # max number of chunks that are buffered per chunked message
+    max_buffered_chunks: int = 16
+    # max time to wait for the next chunk
+    timeout: timedelta | None = timedelta(seconds=30)
+
+
+def _tag_hash(msg_id: MessageId, msg_type: MessageType):
+    tag = hashlib.blake2b(key=msg_id.bytes, digest_size=_DIGEST_SIZE)
+    tag.update(msg_type.bytes)
+    return tag
+
+
+async def _fixed_size_chunks(
+    payload: bytes | memoryview | AsyncIterable[bytes],
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    if isinstance(payload, (bytes, memoryview)):
+        view = memoryview(payload)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset : offset + chunk_size])
+        return
+
+    buffer = bytearray()
+    async for data in payload:
+        buffer += data
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def chunk_message(
+    msg_id: MessageId,
+    msg_type: MessageType,
+    payload: bytes | memoryview | AsyncIterable[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[Message]:
+    """
+    Splits the payload into :type:`MessageChunk` messages.
+
+    Notes
+    -----
+    - If the payload is an async iterable, then it is consumed incrementally, i.e., the payload is never fully
+      buffered. One chunk is held back in order to know which chunk is the final chunk.
+    - An empty payload is sent as a single empty final chunk.
+
+    :param msg_id: chunked message ID, which is shared by all chunks
+    :param msg_type: chunked message type, which is used to route the chunks to the message handler
+    :param chunk_size: max chunk data size in bytes
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    tag = _tag_hash(msg_id, msg_type)
+    seq = 0
+    pending: bytes | None = None
+    async for data in _fixed_size_chunks(payload, chunk_size):
+        if pending is not None:
+            yield Message(
+                msg_id=msg_id,
+                msg_type=MessageChunk.MSG_TYPE,
+                data=MessageChunk(msg_type, seq, pending).pack(),
+            )
+            seq += 1
+        tag.update(data)
+        pending = data
+    yield Message(
+        msg_id=msg_id,
+        msg_type=MessageChunk.MSG_TYPE,
+        data=MessageChunk(
+            msg_type, seq, pending if pending is not None else b"", tag.digest()
+        ).pack(),
+    )
+
+
+class ChunkVerifier:
+    """
+    Verifies that chunks are received in sequence and that the final chunk's authentication tag matches.
+    """
+
+    def __init__(self, msg_id: MessageId, msg_type: MessageType):
+        self.__msg_type = msg_type
+        self.__tag = _tag_hash(msg_id, msg_type)
+        self.__next_seq = 0
+        self.__complete = False
+
+    @property
+    def next_seq(self) -> int:
+        return self.__next_seq
+
+    @property
+    def complete(self) -> bool:
+        """
+        :return: True if the final chunk was verified
+        """
+        return self.__complete
+
+    def verify(self, chunk: MessageChunk):
+        """
+        :exception ChunkedMessageError: if the chunk is out of sequence, the chunk message type does not match, or the
+            authentication tag does not match
+        """
+        if chunk.msg_type != self.__msg_type:
+            raise ChunkedMessageError("chunk message type does not match")
+        if self.__complete:
+            raise ChunkedMessageError("chunk received after the final chunk")
+        if chunk.seq != self.__next_seq:
+            raise ChunkedMessageError(
+                f"chunk is out of sequence: expected {self.__next_seq}, received {chunk.seq}"
+            )
+        self.__next_seq += 1
+        self.__tag.update(chunk.data)
+        if chunk.tag is not None:
+            if not hmac.compare_digest(self.__tag.digest(), chunk.tag):
+                raise ChunkedMessageError("authentication tag does not match")
+            self.__complete = True
+
+
+class ChunkedMessageReader:
+    """
+    Async iterator over the chunk data of a chunked message, which is fed chunks as they are received.
+
+    Notes
+    -----
+    - Chunks may be received out of order, e.g., when inbound messages are unpacked by parallel executor batches.
+      Chunks that arrive early are held until the gap is filled. The number of held chunks is bounded.
+    - When more than `max_buffered_chunks` chunks are buffered for the consumer, :meth:`put` waits until the consumer
+      catches up, i.e., peak memory is bounded by the buffer sizes and not by the payload size.
+    - Iteration ends after the final chunk's authentication tag is verified. If the chunked message fails, then
+      iterating raises :type:`ChunkedMessageError`.
+    """
+
+    def __init__(
+        self,
+        msg_id: MessageId,
+        msg_type: MessageType,
+        max_buffered_chunks: int = 16,
+        timeout: timedelta | None = timedelta(seconds=30),
+    ):
+        """
+        :param msg_id: chunked message ID
+        :param msg_type: chunked message type
+        :param max_buffered_chunks: max number of chunks that are buffered for the consumer, and max number of
+            chunks that are held because they arrived out of order
+        :param timeout: max time to wait for the next chunk
+        """
+        if max_buffered_chunks < 1:
+            raise ValueError("max_buffered_chunks must be >= 1")
+
+        self.__msg_id = msg_id
+        self.__msg_type = msg_type
+        self.__verifier = ChunkVerifier(msg_id, msg_type)
+        self.__max_buffered_chunks = max_buffered_chunks
+        self.__timeout = timeout.total_seconds() if timeout is not None else None
+        # verified chunk data, in sequence order
+        self.__ready: deque[bytes] = deque()
+        self.__readable = asyncio.Event()
+        self.__writable = asyncio.Event()
+        # chunks that arrived ahead of the next expected sequence number
+        self.__early: dict[int, MessageChunk] = {}
+        self.__error: ChunkedMessageError | None = None
+
+    @property
+    def msg_id(self) -> MessageId:
+        return self.__msg_id
+
+    @property
+    def msg_type(self) -> MessageType:
+        return self.__msg_type
+
+    @property
+    def complete(self) -> bool:
+        """
+        :return: True if all chunks were received and verified
+        """
+        return self.__verifier.complete
+
+    @property
+    def failed(self) -> bool:
+        return self.__error is not None
+
+    async def put(self, chunk: MessageChunk):
+        """
+        Feeds the chunk to the reader.
+
+        If the chunk is invalid, then the reader fails, i.e., the consumer is raised :type:`ChunkedMessageError`.
+        Chunks that are received after the final chunk was verified are ignored.
+        """
+        if self.__error is not None or self.__verifier.complete:
+            return
+        if chunk.seq < self.__verifier.next_seq or chunk.seq in self.__early:
+            self.fail(ChunkedMessageError(f"duplicate chunk: {chunk.seq}"))
+            return
+        if chunk.seq > self.__verifier.next_seq:
+            if len(self.__early) >= self.__max_buffered_chunks:
+                self.fail(ChunkedMessageError("too many chunks out of order"))
+                return
+            self.__early[chunk.seq] = chunk
+            return
+
+        # chunks are verified and buffered synchronously, i.e., concurrent puts cannot reorder the chunks
+        next_chunk: MessageChunk | None = chunk
+        while next_chunk is not None:
+            try:
+                self.__verifier.verify(next_chunk)
+            except ChunkedMessageError as err:
+                self.fail(err)
+                return
+            self.__ready.append(next_chunk.data)
+            next_chunk = (
+                None
+                if self.__verifier.complete
+                else self.__early.pop(self.__verifier.next_seq, None)
+            )
+        if self.__verifier.complete:
+            self.__early.clear()
+        self.__readable.set()
+
+        while len(self.__ready) > self.__max_buffered_chunks and self.__error is None:
+            self.__writable.clear()
+            await self.__writable.wait()
+
+    def fail(self, err: ChunkedMessageError):
+        """
+        Fails the reader, and discards buffered chunks, which unblocks pending :meth:`put` calls.
+        """
+        if self.__error is not None:
+            return
+        self.__error = err
+        self.__early.clear()
+        self.__ready.clear()
+        self.__readable.set()
+        self.__writable.set()
+
+    def close(self):
+        """
+        Releases the reader resources if the consumer stops iterating before the message is complete.
+        """
+        if not self.__verifier.complete or self.__ready:
+            self.fail(ChunkedMessageError("chunked message reader is closed"))
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+    async def __anext__(self) -> bytes:
+        while not self.__ready:
+            if self.__error is not None:
+                raise self.__error
+            if self.__verifier.complete:
+                raise StopAsyncIteration
+            self.__readable.clear()
+            try:
+                await asyncio.wait_for(self.__readable.wait(), self.__timeout)
+            except TimeoutError:
+                self.fail(ChunkedMessageError("timed out waiting for chunk"))
+        data = self.__ready.popleft()
+        if len(self.__ready) <= self.__max_buffered_chunks:
+            self.__writable.set()
+        return data
@@ -0,0 +1,358 @@
+"""
+Dedicated worker processes for the CPU intensive secure messaging work, i.e., signing, verifying, encrypting,
+and decrypting messages.
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Sequence
+
+from oysterpack.algorand.client.accounts.private_key import (
+    AlgoPrivateKey,
+    EncryptionAddress,
+    SigningAddress,
+)
+from oysterpack.algorand.messaging.secure_message import (
+    SignedEncryptedMessage,
+    EncryptedMessage,
+    InvalidSecureMessage,
+    MessageSignatureVerificationFailed,
+    DecryptionFailed,
+    SecureMessageFrame,
+    seal_message,
+    unpack_secure_messages_timed,
+    pack_secure_message_frame,
+    parse_secure_message,
+)
+from oysterpack.core.compression import Compression
+from oysterpack.core.message import Message, MessageId, MessageType
+
+# (sender, signature, encrypted message sender, encrypted message recipient, encrypted message)
+_SecureMessageFields = tuple[str, bytes, str, str, bytes]
+# (msg_id, msg_type, data, flags)
+_MessageFields = tuple[bytes, bytes, bytes, int]
+# (InvalidSecureMessage type name, msg_id)
+_ErrorFields = tuple[str, bytes | None]
+
+_ERRORS: dict[str, type[InvalidSecureMessage]] = {
+    error.__name__: error
+    for error in (
+        InvalidSecureMessage,
+        MessageSignatureVerificationFailed,
+        DecryptionFailed,
+    )
+}
+
+# worker process private key and compression, which are set once when the worker process is initialized
+_worker_private_key: AlgoPrivateKey | None = None
+_worker_compression: Compression | None = None
+
+
+def _init_worker(private_key: bytes, compression: Compression | None):
+    global _worker_private_key, _worker_compression  # pylint: disable=global-statement
+    _worker_private_key = AlgoPrivateKey(private_key)
+    _worker_compression = compression
+
+
+def _get_worker_private_key() -> AlgoPrivateKey:
+    if _worker_private_key is None:
+        raise AssertionError("crypto worker process is not initialized")
+    return _worker_private_key
+
+
+def _pack_secure_message(
+    msg_id: bytes,
+    msg_type: bytes,
+    data: bytes,
+    flags: int,
+    recipient: str,
+    binary_frame: bool,
+    compress: bool,
+) -> bytes:
+    compression = _worker_compression if compress else None
+    msg = Message(
+        msg_id=MessageId.from_bytes(msg_id),
+        msg_type=MessageType.from_bytes(msg_type),
+        data=data,
+        flags=flags,
+    )
+    if binary_frame:
+        return pack_secure_message_frame(
+            private_key=_get_worker_private_key(),
+            msg=msg,
+            recipient=EncryptionAddress(recipient),  # type: ignore
+            compression=compression,
+        )
+    return seal_message(
+        private_key=_get_worker_private_key(),
+        msg=msg,
+        recipient=EncryptionAddress(recipient),  # type: ignore
+        compression=compression,
+    ).pack()
+
+
+def _to_secure_message(
+    secure_msg: _SecureMessageFields | bytes,
+) -> SignedEncryptedMessage | SecureMessageFrame:
+    if isinstance(secure_msg, bytes):
+        return SecureMessageFrame(secure_msg)
+
+    (sender, signature, msg_sender, msg_recipient, encrypted_msg) = secure_msg
+    return SignedEncryptedMessage(
+        sender=SigningAddress(sender),  # type: ignore
+        signature=signature,
+        encrypted_msg=EncryptedMessage(
+            sender=EncryptionAddress(msg_sender),  # type: ignore
+            recipient=EncryptionAddress(msg_recipient),  # type: ignore
+            encrypted_msg=encrypted_msg,
+        ),
+    )
+
+
+def _unpack_secure_messages(
+    secure_msgs: list[_SecureMessageFields | bytes],
+) -> tuple[list[_MessageFields | _ErrorFields], float, float]:
+    results, verify_time, decrypt_time = unpack_secure_messages_timed(
+        _get_worker_private_key(),
+        [_to_secure_message(secure_msg) for secure_msg in secure_msgs],
+    )
+    return (
+        [
+            (
+                type(result).__name__,
+                result.msg_id.bytes if result.msg_id is not None else None,
+            )
+            if isinstance(result, InvalidSecureMessage)
+            else (
+                result.msg_id.bytes,
+                result.msg_type.bytes,
+                bytes(result.data),
+                result.flags,
+            )
+            for result in results
+        ],
+        verify_time,
+        decrypt_time,
+    )
+
+
+def _to_error(error: _ErrorFields) -> InvalidSecureMessage:
+    (name, msg_id) = error
+    return _ERRORS[name](
+        msg_id=MessageId.from_bytes(msg_id) if msg_id is not None else None
+    )
+
+
+def _from_secure_message(
+    secure_msg: SignedEncryptedMessage | SecureMessageFrame,
+) -> _SecureMessageFields | bytes:
+    if isinstance(secure_msg, SecureMessageFrame):
+        return secure_msg.tobytes()
+    return (
+        secure_msg.sender,
+        secure_msg.signature,
+        secure_msg.encrypted_msg.sender,
+        secure_msg.encrypted_msg.recipient,
+        secure_msg.encrypted_msg.encrypted_msg,
+    )
+
+
+@dataclass(slots=True)
+class CryptoWorkerPoolMetrics:
+    """
+    CryptoWorkerPool metrics
+
+    Notes
+    -----
+    - task latency is measured from task submission to task completion, i.e., it includes time spent queued
+    """
+
+    # number of tasks that have been submitted, but not yet completed
+    queue_depth: int = 0
+
+    task_count: int = 0
+    failure_count: int = 0
+
+    total_task_latency: float = 0.0
+    max_task_latency: float = 0.0
+    last_task_latency: float = 0.0
+
+    @property
+    def avg_task_latency(self) -> float:
+        """
+        :return: average task latency in seconds
+        """
+        return self.total_task_latency / self.task_count if self.task_count else 0.0
+
+
+class CryptoWorkerPool:
+    """
+    Process pool used to offload secure message packing and unpacking.
+
+    The private key and compression settings are sent to each worker process once, when the worker process is
+    initialized. Per task, only raw bytes and flags are sent to and returned from the workers, i.e., no objects are
+    pickled.
+    Workers retain their cached key material (Box shared keys, VerifyKeys) across tasks.
+    """
+
+    def __init__(
+        self,
+        private_key: AlgoPrivateKey,
+        max_workers: int | None = None,
+        compression: Compression | None = None,
+    ):
+        """
+        :param private_key: used to sign, verify, encrypt, and decrypt messages
+        :param max_workers: defaults to the number of CPUs
+        :param compression: used to compress messages that are packed with `compress=True`
+        """
+        self.__encryption_address = private_key.encryption_address
+        self.__signing_address = private_key.signing_address
+        self.__compression = compression
+        self.__executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(bytes(private_key), compression),
+        )
+        self.__metrics = CryptoWorkerPoolMetrics()
+
+    @property
+    def encryption_address(self) -> EncryptionAddress:
+        """
+        :return: EncryptionAddress for the worker private key
+        """
+        return self.__encryption_address
+
+    @property
+    def signing_address(self) -> SigningAddress:
+        """
+        :return: SigningAddress for the worker private key
+        """
+        return self.__signing_address
+
+    @property
+    def compression(self) -> Compression | None:
+        """
+        :return: compression settings that the workers were initialized with
+        """
+        return self.__compression
+
+    @property
+    def metrics(self) -> CryptoWorkerPoolMetrics:
+        """
+        :return: CryptoWorkerPoolMetrics
+        """
+        return self.__metrics
+
+    async def pack_secure_message(
+        self,
+        msg: Message,
+        recipient: EncryptionAddress,
+        binary_frame: bool = False,
+        compress: bool = False,
+    ) -> bytes:
+        """
+        Encrypts and signs the message
+
+        :param binary_frame: if True, then the message is packed as a :type:`SecureMessageFrame`
+        :param compress: if True, then the message is compressed by the worker before it is encrypted, using the
+            compression that the pool was initialized with
+        :return: serialized SignedEncryptedMessage or SecureMessageFrame
+        :exception ValueError: if compression is requested, but the pool was not initialized with compression
+        """
+        if compress and self.__compression is None:
+            raise ValueError("crypto workers were not initialized with compression")
+        return await self.__run(
+            _pack_secure_message,
+            msg.msg_id.bytes,
+            msg.msg_type.bytes,
+            bytes(msg.data),
+            msg.flags,
+            recipient,
+            binary_frame,
+            compress,
+        )
+
+    async def unpack_secure_messages(
+        self,
+        secure_msgs: Sequence[SignedEncryptedMessage | SecureMessageFrame],
+    ) -> list[Message | InvalidSecureMessage]:
+        """
+        Verifies and decrypts a batch of messages
+
+        :return: results in the same order as the secure messages. Each result is either the unpacked Message or the
+                 InvalidSecureMessage error.
+        """
+        return (await self.unpack_secure_messages_timed(secure_msgs))[0]
+
+    async def unpack_secure_messages_timed(
+        self,
+        secure_msgs: Sequence[SignedEncryptedMessage | SecureMessageFrame],
+    ) -> tuple[list[Message | InvalidSecureMessage], float, float]:
+        """
+        Same as :meth:`unpack_secure_messages`, but also returns how long the worker spent verifying signatures
+        and decrypting messages.
+
+        :return: (results, verify seconds, decrypt seconds)
+        """
+        results, verify_time, decrypt_time = await self.__run(
+            _unpack_secure_messages,
+            [_from_secure_message(secure_msg) for secure_msg in secure_msgs],
+        )
+        return (
+            [
+                _to_error(result)  # type: ignore
+                if isinstance(result[0], str)
+                else Message(
+                    msg_id=MessageId.from_bytes(result[0]),
+                    msg_type=MessageType.from_bytes(result[1]),
+                    data=result[2],
+                    flags=result[3],
+                )
+                for result in results
+            ],
+            verify_time,
+            decrypt_time,
+        )
+
+    async def unpack_secure_message(
+        self,
+        secure_msg: bytes | bytearray | SignedEncryptedMessage | SecureMessageFrame,
+    ) -> Message:
+        """
+        :exception InvalidSecureMessage: if the message fails verification or decryption
+        """
+        if isinstance(secure_msg, (bytes, bytearray)):
+            secure_msg = parse_secure_message(secure_msg)
+
+        result = (await self.unpack_secure_messages([secure_msg]))[0]
+        if isinstance(result, InvalidSecureMessage):
+            raise result
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the worker processes
+        """
+        self.__executor.shutdown(wait=wait)
+
+    async def __run(self, func, *args):
+        self.__metrics.queue_depth += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.__executor, func, *args
+            )
+        except Exception:
+            self.__metrics.failure_count += 1
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            self.__metrics.queue_depth -= 1
+            self.__metrics.task_count += 1
+            self.__metrics.total_task_latency += latency
+            self.__metrics.last_task_latency = latency
+            self.__metrics.max_task_latency = max(
+                self.__metrics.max_task_latency, latency
+            )
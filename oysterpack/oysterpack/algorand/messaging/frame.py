@@ -0,0 +1,80 @@
+"""
+Websocket binary frame kinds
+
+Serialized :type:`SignedEncryptedMessage` frames are msgpack arrays. Other frame kinds are prefixed with
+:data:`FRAME_MARKER`, which is a byte that msgpack never uses. Thus, the frame kind can be detected from the first
+2 bytes without breaking peers that only send :type:`SignedEncryptedMessage` frames.
+
+Frame layout: FRAME_MARKER (1 byte) | FrameKind (1 byte) | frame kind specific bytes
+"""
+from enum import IntEnum
+from typing import Sequence
+
+# 0xC1 is never used by msgpack
+FRAME_MARKER = 0xC1
+
+
+class FrameKind(IntEnum):
+    """
+    Binary frame kinds
+    """
+
+    # SignedEncryptedMessage serialized as msgpack, i.e., without the FRAME_MARKER prefix
+    SIGNED_ENCRYPTED_MESSAGE = 0
+    # Message encrypted with the connection's session key
+    SESSION = 1
+    # SignedEncryptedMessage using a fixed binary layout, i.e., without msgpack
+    SECURE_MESSAGE = 2
+    # multiple frames coalesced into a single websocket message
+    MULTI = 3
+
+
+def frame_kind(frame: bytes) -> FrameKind:
+    """
+    :exception ValueError: if the frame kind is not supported
+    """
+    if len(frame) == 0:
+        raise ValueError("empty frame")
+    if frame[0] != FRAME_MARKER:
+        return FrameKind.SIGNED_ENCRYPTED_MESSAGE
+    if len(frame) < 2:
+        raise ValueError("frame kind is missing")
+    return FrameKind(frame[1])
+
+
+def pack_multi_frame(frames: Sequence[bytes | bytearray | memoryview]) -> bytes:
+    """
+    Coalesces the frames into a single frame.
+
+    Layout: FRAME_MARKER | FrameKind.MULTI | (frame length (4 bytes) | frame)*
+    """
+    parts: list[bytes | bytearray | memoryview] = [
+        bytes((FRAME_MARKER, FrameKind.MULTI))
+    ]
+    for frame in frames:
+        parts.append(len(frame).to_bytes(4, "big"))
+        parts.append(frame)
+    return b"".join(parts)
+
+
+def unpack_multi_frame(multi_frame: bytes | bytearray | memoryview) -> list[memoryview]:
+    """
+    :return: views into the multi frame, i.e., the frames are not copied
+    :exception ValueError: if the multi frame is malformed
+    """
+    view = memoryview(multi_frame)
+    if len(view) < 2 or view[0] != FRAME_MARKER or view[1] != FrameKind.MULTI:
+        raise ValueError("invalid multi frame header")
+
+    frames = []
+    offset = 2
+    while offset < len(view):
+        if offset + 4 > len(view):
+            raise ValueError("multi frame is truncated")
+        length = int.from_bytes(view[offset : offset + 4], "big")
+        offset += 4
+        if offset + length > len(view):
+            raise ValueError("multi frame is truncated")
+        frames.append(view[offset : offset + length])
+        offset += length
+    return frames
@@ -0,0 +1,161 @@
+"""
+Secure message pipeline metrics
+"""
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Iterable, AsyncIterable
+
+from oysterpack.algorand.messaging.websocket import Websocket, Data
+from oysterpack.core.message import MessageType
+from oysterpack.core.metrics import (
+    LatencyHistogram,
+    HistogramSnapshot,
+    Gauge,
+    GaugeSnapshot,
+)
+
+
+class PipelineStage(StrEnum):
+    """
+    Secure message pipeline stages
+    """
+
+    # time from submitting the message for unpacking to the message being unpacked, i.e., includes batching and
+    # executor queueing
+    UNPACK = "unpack"
+    # signature verification - recorded per message as the average across the unpacked batch
+    VERIFY = "verify"
+    # decryption - recorded per message as the average across the unpacked batch
+    DECRYPT = "decrypt"
+    # message handler lookup
+    LOOKUP = "lookup"
+    # message handler execution
+    HANDLE = "handle"
+    # packing replies into secure messages
+    PACK = "pack"
+    # sending replies
+    SEND = "send"
+
+
+@dataclass(slots=True, frozen=True)
+class PipelineMetricsSnapshot:
+    stages: dict[PipelineStage, HistogramSnapshot]
+    # message handler execution latency per registered message type
+    handlers: dict[MessageType, HistogramSnapshot]
+    # message handler execution latency for message types that are not registered
+    unsupported: HistogramSnapshot
+    # number of messages that are being unpacked
+    unpacking: GaugeSnapshot
+    # number of messages that are being handled
+    handling: GaugeSnapshot
+
+
+class PipelineMetrics:
+    """
+    Latency histograms per :type:`PipelineStage` and per :type:`MessageType`, plus in-flight gauges.
+
+    Notes
+    -----
+    - Metrics are updated by :type:`SecureMessageHandler`, i.e., :type:`MessageHandler`s are metered automatically.
+    - Recording a latency is O(1) and does not allocate, once the message type has been seen.
+    - Latencies are only recorded per message type for registered message types. Unsupported message types are
+      recorded in a single histogram, i.e., clients cannot grow the metrics by sending random message types.
+    - Not thread safe, i.e., it is designed to be updated from the event loop.
+    """
+
+    def __init__(self, max_latency: float = 3600.0):
+        """
+        :param max_latency: in seconds - latencies above the max are recorded as the max
+        """
+        self.__max_latency = max_latency
+        self.__stages = {
+            stage: LatencyHistogram(max_latency) for stage in PipelineStage
+        }
+        self.__handlers: dict[MessageType, LatencyHistogram] = {}
+        self.__unsupported = LatencyHistogram(max_latency)
+        self.unpacking = Gauge()
+        self.handling = Gauge()
+
+    def record(self, stage: PipelineStage, latency: float):
+        """
+        :param latency: in seconds
+        """
+        self.__stages[stage].record(latency)
+
+    def record_handler(self, msg_type: MessageType | None, latency: float):
+        """
+        Records the message handler latency for the HANDLE stage and for the message type
+
+        :param msg_type: None if the message type is not registered
+        :param latency: in seconds
+        """
+        self.__stages[PipelineStage.HANDLE].record(latency)
+        if msg_type is None:
+            self.__unsupported.record(latency)
+            return
+        histogram = self.__handlers.get(msg_type)
+        if histogram is None:
+            histogram = LatencyHistogram(self.__max_latency)
+            self.__handlers[msg_type] = histogram
+        histogram.record(latency)
+
+    def snapshot(self) -> PipelineMetricsSnapshot:
+        return PipelineMetricsSnapshot(
+            stages={
+                stage: histogram.snapshot()
+                for stage, histogram in self.__stages.items()
+            },
+            handlers={
+                msg_type: histogram.snapshot()
+                for msg_type, histogram in self.__handlers.items()
+            },
+            unsupported=self.__unsupported.snapshot(),
+            unpacking=self.unpacking.snapshot(),
+            handling=self.handling.snapshot(),
+        )
+
+    def reset(self):
+        """
+        Clears the histograms and resets the gauge high watermarks
+        """
+        for histogram in self.__stages.values():
+            histogram.reset()
+        for histogram in self.__handlers.values():
+            histogram.reset()
+        self.__unsupported.reset()
+        self.unpacking.reset()
+        self.handling.reset()
+
+
+class MeteredWebsocket(Websocket):
+    """
+    Records the SEND stage latency for messages that are sent via the websocket.
+    """
+
+    def __init__(self, websocket: Websocket, metrics: PipelineMetrics):
+        self.__websocket = websocket
+        self.__metrics = metrics
+
+    @property
+    def websocket(self) -> Websocket:
+        """
+        :return: underlying websocket
+        """
+        return self.__websocket
+
+    async def recv(self) -> Data:
+        return await self.__websocket.recv()
+
+    async def send(
+        self,
+        message: Data | Iterable[Data] | AsyncIterable[Data],
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            await self.__websocket.send(message)
+        finally:
+            self.__metrics.record(PipelineStage.SEND, time.perf_counter() - start)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        await self.__websocket.close(code=code, reason=reason)
@@ -0,0 +1,178 @@
+"""
+Replay protection for inbound secure messages
+"""
+import time
+from collections import deque
+from datetime import timedelta
+
+from ulid import ULID
+
+
+class ReplayFilter:
+    """
+    Bounded, time windowed filter that detects replayed messages.
+
+    Two checks are provided:
+    1. :meth:`seen` and :meth:`check` - dedupe messages by (signer, signature prefix). :meth:`seen` is a lookup that
+       is cheap enough to run before the message signature is verified and the message is decrypted. :meth:`check`
+       records the key, and is run after the signature is verified, i.e., messages with invalid signatures never
+       occupy entries and cannot evict the keys of valid messages.
+    2. :meth:`is_stale` - rejects messages whose :type:`MessageId` (ULID) timestamp is outside the replay window,
+       which is run after the message is decrypted.
+
+    Together, they reject all replays: a replay within the window is a duplicate, and a replay outside the window
+    is stale.
+
+    Notes
+    -----
+    - Keys are tracked in a ring of time buckets. Each bucket records the keys that were first seen during its time
+      slice. When a bucket expires, its keys are removed, i.e., keys are remembered for at least
+      `window + max_clock_skew`.
+    - Keys are stored as 64-bit hashes, which bounds the memory per entry. A hash collision causes a distinct
+      message to be rejected as a duplicate, which has a negligible probability.
+    - Memory is bounded by `max_entries`. When the filter is full, the oldest bucket is evicted early, which is
+      counted as an overflow.
+    - Not thread safe, i.e., it is designed to be used from the event loop.
+    """
+
+    def __init__(
+        self,
+        window: timedelta = timedelta(minutes=5),
+        max_clock_skew: timedelta = timedelta(seconds=30),
+        bucket_count: int = 10,
+        max_entries: int = 1_000_000,
+        signature_prefix_size: int = 16,
+    ):
+        """
+        :param window: max message age
+        :param max_clock_skew: how far a message timestamp may be ahead of the server clock
+        :param bucket_count: number of time buckets that the window is divided into
+        :param max_entries: max number of keys that are tracked
+        :param signature_prefix_size: number of signature bytes that are used to key the message
+        """
+        if window <= timedelta(0):
+            raise ValueError("window must be > 0")
+        if max_clock_skew < timedelta(0):
+            raise ValueError("max_clock_skew must be >= 0")
+        if bucket_count < 1:
+            raise ValueError("bucket_count must be >= 1")
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if signature_prefix_size < 1:
+            raise ValueError("signature_prefix_size must be >= 1")
+
+        self.__window = window.total_seconds()
+        self.__max_clock_skew = max_clock_skew.total_seconds()
+        self.__bucket_width = (self.__window + self.__max_clock_skew) / bucket_count
+        self.__max_entries = max_entries
+        # the extra bucket ensures that keys are kept for the full window
+        self.__bucket_count = bucket_count + 1
+        self.__signature_prefix_size = signature_prefix_size
+
+        # key -> bucket number
+        self.__entries: dict[int, int] = {}
+        # ring of (bucket number, keys), ordered from oldest to newest
+        self.__buckets: deque[tuple[int, list[int]]] = deque()
+
+        self.__duplicate_count = 0
+        self.__stale_count = 0
+        self.__overflow_count = 0
+
+    @property
+    def size(self) -> int:
+        """
+        :return: number of keys that are currently tracked
+        """
+        return len(self.__entries)
+
+    @property
+    def duplicate_count(self) -> int:
+        """
+        :return: number of messages that were rejected as duplicates
+        """
+        return self.__duplicate_count
+
+    @property
+    def stale_count(self) -> int:
+        """
+        :return: number of messages that were rejected because they were outside the replay window
+        """
+        return self.__stale_count
+
+    @property
+    def overflow_count(self) -> int:
+        """
+        :return: number of times a bucket was evicted early because the filter was full
+        """
+        return self.__overflow_count
+
+    def seen(self, signer: str, signature: bytes | memoryview) -> bool:
+        """
+        Looks up the message key without recording it.
+
+        :return: True if the message is a duplicate
+        """
+        self.__expire(self.__bucket_number())
+        if self.__signature_key(signer, signature) in self.__entries:
+            self.__duplicate_count += 1
+            return True
+        return False
+
+    def check(self, signer: str, signature: bytes | memoryview) -> bool:
+        """
+        Records the message key. The message signature must be verified first.
+
+        :return: False if the message is a duplicate
+        """
+        return self.__check(self.__signature_key(signer, signature))
+
+    def check_message_id(self, signer: str, msg_id: ULID) -> bool:
+        """
+        Dedupes messages that are not signed, e.g., session frames, by message ID.
+
+        :return: False if the message is a duplicate
+        """
+        return self.__check(hash((signer, msg_id.bytes)))
+
+    def is_stale(self, msg_id: ULID) -> bool:
+        """
+        :return: True if the message ID timestamp is outside the replay window
+        """
+        age = time.time() - msg_id.timestamp
+        if age > self.__window or age < -self.__max_clock_skew:
+            self.__stale_count += 1
+            return True
+        return False
+
+    def __signature_key(self, signer: str, signature: bytes | memoryview) -> int:
+        return hash((signer, bytes(signature[: self.__signature_prefix_size])))
+
+    def __bucket_number(self) -> int:
+        return int(time.monotonic() / self.__bucket_width)
+
+    def __check(self, key: int) -> bool:
+        bucket_number = self.__bucket_number()
+        self.__expire(bucket_number)
+        if key in self.__entries:
+            self.__duplicate_count += 1
+            return False
+
+        if len(self.__entries) >= self.__max_entries:
+            self.__overflow_count += 1
+            self.__remove_oldest()
+        if not self.__buckets or self.__buckets[-1][0] != bucket_number:
+            self.__buckets.append((bucket_number, []))
+        self.__buckets[-1][1].append(key)
+        self.__entries[key] = bucket_number
+        return True
+
+    def __expire(self, bucket_number: int):
+        oldest = bucket_number - self.__bucket_count + 1
+        while self.__buckets and self.__buckets[0][0] < oldest:
+            self.__remove_oldest()
+
+    def __remove_oldest(self):
+        bucket_number, keys = self.__buckets.popleft()
+        for key in keys:
+            if self.__entries.get(key) == bucket_number:
+                del self.__entries[key]
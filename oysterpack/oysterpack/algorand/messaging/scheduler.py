@@ -0,0 +1,608 @@
+"""
+Request scheduling and rate limiting for secure message handling
+"""
+import asyncio
+import math
+import time
+from abc import ABC, abstractmethod
+from asyncio import Task
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import ClassVar, Self, Callable, Coroutine, Any, Hashable
+
+import msgpack  # type: ignore
+
+from oysterpack.algorand.client.accounts.private_key import SigningAddress
+from oysterpack.core.cache import LRUCache
+from oysterpack.core.message import Serializable, MessageType
+
+
+@dataclass(slots=True)
+class RequestThrottled(Serializable):
+    """
+    Reply that is sent in place of the handler reply when the request was rejected because the client exceeded its
+    rate limit, or because too many of the connection's requests are already queued.
+    """
+
+    # how long the client should wait before retrying - zero if unknown
+    retry_after: timedelta = timedelta(0)
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M535X06QKJ13PJ8HMQG6R3CJ"),
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        """
+        Unpacks the packed bytes into a new instance of Self
+        """
+        (retry_after_seconds,) = msgpack.unpackb(packed)
+        return cls(retry_after=timedelta(seconds=retry_after_seconds))
+
+    def pack(self) -> bytes:
+        """
+        Packs the object into bytes
+        """
+        return msgpack.packb((self.retry_after.total_seconds(),))
+
+
+@dataclass(slots=True)
+class RateLimit:
+    """
+    Token bucket rate limit
+    """
+
+    # number of requests per second
+    rate: float
+    # max number of requests that can be made in a burst
+    burst: int
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError("rate must be > 0")
+        if self.burst < 1:
+            raise ValueError("burst must be >= 1")
+
+
+class TokenBucket:
+    """
+    Token bucket, which is refilled continuously at the configured rate.
+    """
+
+    __slots__ = ("__rate", "__burst", "__tokens", "__updated")
+
+    def __init__(self, rate_limit: RateLimit):
+        self.__rate = rate_limit.rate
+        self.__burst = rate_limit.burst
+        self.__tokens = float(rate_limit.burst)
+        self.__updated = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        """
+        :return: number of tokens that are currently available
+        """
+        self.__refill()
+        return self.__tokens
+
+    def try_acquire(self) -> bool:
+        """
+        :return: True if a token was acquired
+        """
+        self.__refill()
+        if self.__tokens >= 1:
+            self.__tokens -= 1
+            return True
+        return False
+
+    def retry_after(self) -> timedelta:
+        """
+        :return: how long until the next token is available
+        """
+        self.__refill()
+        return timedelta(seconds=max(0.0, (1 - self.__tokens) / self.__rate))
+
+    def __refill(self):
+        now = time.monotonic()
+        self.__tokens = min(
+            self.__burst, self.__tokens + (now - self.__updated) * self.__rate
+        )
+        self.__updated = now
+
+
+class RateLimiter:
+    """
+    Token bucket rate limit per client signing address
+
+    Notes
+    -----
+    - Buckets are kept in an LRU cache. An evicted bucket is recreated full, i.e., `max_clients` should be sized well
+      above the number of concurrently active clients.
+    """
+
+    def __init__(self, rate_limit: RateLimit, max_clients: int = 10_000):
+        self.__rate_limit = rate_limit
+        self.__buckets: LRUCache[SigningAddress, TokenBucket] = LRUCache(max_clients)
+        self.__limited_count = 0
+
+    @property
+    def rate_limit(self) -> RateLimit:
+        return self.__rate_limit
+
+    @property
+    def limited_count(self) -> int:
+        """
+        :return: number of requests that have been rejected
+        """
+        return self.__limited_count
+
+    def retry_after(self, client: SigningAddress) -> timedelta | None:
+        """
+        Checks the rate limit without acquiring a token, e.g., before the client's signature is verified.
+
+        Notes
+        -----
+        - Requests that are rejected are counted as limited.
+
+        :return: None if a token is available, otherwise how long the client should wait before retrying
+        """
+        bucket = self.__buckets.get(client)
+        if bucket is None or bucket.tokens >= 1:
+            return None
+        self.__limited_count += 1
+        return bucket.retry_after()
+
+    def try_acquire(self, client: SigningAddress) -> timedelta | None:
+        """
+        :return: None if the request is allowed, otherwise how long the client should wait before retrying
+        """
+        bucket = self.__buckets.get_or_create(
+            client, lambda _client: TokenBucket(self.__rate_limit)
+        )
+        if bucket.try_acquire():
+            return None
+        self.__limited_count += 1
+        return bucket.retry_after()
+
+
+class ConcurrencyLimit(ABC):
+    """
+    Limits the number of requests that run concurrently.
+    """
+
+    @property
+    @abstractmethod
+    def limit(self) -> int:
+        """
+        :return: current concurrency limit
+        """
+        ...
+
+    @abstractmethod
+    def on_sample(self, latency: float, in_flight: int, failed: bool):
+        """
+        Invoked when a request completes
+
+        :param latency: request latency in seconds
+        :param in_flight: number of requests that were in flight when the request completed, including the request
+        :param failed: True if the request failed
+        """
+        ...
+
+
+class FixedLimit(ConcurrencyLimit):
+    """
+    Concurrency limit that never changes
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.__limit = limit
+
+    @property
+    def limit(self) -> int:
+        return self.__limit
+
+    def on_sample(self, latency: float, in_flight: int, failed: bool):
+        pass
+
+
+class GradientLimit(ConcurrencyLimit):
+    """
+    Adaptive concurrency limit, which is based on the gradient between the long term and the short term request
+    latency, i.e., the same approach as Netflix's concurrency-limits `Gradient2Limit`.
+
+    - When the short term latency rises above the long term latency, then requests are queueing up in the backend,
+      and the limit is decreased proportionally.
+    - When latency is stable, then the limit grows by the queue size allowance, i.e., the limit probes for more
+      capacity.
+    - When a request fails, then the limit is decreased multiplicatively.
+
+    Notes
+    -----
+    - The limit is only increased when the in-flight requests are using at least half of the limit. Otherwise, the
+      limit would grow without bound when the load is light.
+    - The long term latency slowly drifts towards the short term latency when the short term latency drops, i.e.,
+      the limit recovers once the backend recovers.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        smoothing: float = 0.2,
+        rtt_tolerance: float = 1.5,
+        short_window: int = 10,
+        long_window: int = 600,
+        backoff_ratio: float = 0.9,
+    ):
+        """
+        :param initial_limit: limit used until latency samples are collected
+        :param min_limit: the limit never drops below the min limit
+        :param max_limit: the limit never grows above the max limit
+        :param smoothing: how quickly the limit moves towards the new limit [0.0, 1.0]
+        :param rtt_tolerance: how much latency increase is tolerated before the limit is decreased
+        :param short_window: number of samples that the short term latency average is computed over
+        :param long_window: number of samples that the long term latency average is computed over
+        :param backoff_ratio: the limit is multiplied by the backoff ratio when a request fails
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("min_limit <= initial_limit <= max_limit is required")
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError("smoothing must be in the range (0.0, 1.0]")
+        if rtt_tolerance < 1.0:
+            raise ValueError("rtt_tolerance must be >= 1.0")
+        if not 0.0 < backoff_ratio < 1.0:
+            raise ValueError("backoff_ratio must be in the range (0.0, 1.0)")
+
+        self.__limit = float(initial_limit)
+        self.__min_limit = min_limit
+        self.__max_limit = max_limit
+        self.__smoothing = smoothing
+        self.__rtt_tolerance = rtt_tolerance
+        self.__backoff_ratio = backoff_ratio
+        self.__short_rtt = _ExponentialAverage(short_window)
+        self.__long_rtt = _ExponentialAverage(long_window)
+
+    @property
+    def limit(self) -> int:
+        return int(self.__limit)
+
+    @property
+    def short_rtt(self) -> float:
+        """
+        :return: short term average latency in seconds
+        """
+        return self.__short_rtt.value
+
+    @property
+    def long_rtt(self) -> float:
+        """
+        :return: long term average latency in seconds
+        """
+        return self.__long_rtt.value
+
+    def on_sample(self, latency: float, in_flight: int, failed: bool):
+        if failed:
+            self.__limit = max(self.__min_limit, self.__limit * self.__backoff_ratio)
+            return
+
+        short_rtt = self.__short_rtt.add(latency)
+        long_rtt = self.__long_rtt.add(latency)
+        if short_rtt <= 0:
+            return
+
+        # recover from a long term average that was inflated by a latency spike
+        if long_rtt / short_rtt > 2:
+            self.__long_rtt.value = long_rtt * 0.95
+
+        # the limit is not being used, i.e., there is no signal to grow the limit
+        if in_flight < self.__limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, self.__rtt_tolerance * long_rtt / short_rtt))
+        new_limit = self.__limit * gradient + math.sqrt(self.__limit)
+        new_limit = self.__limit * (1 - self.__smoothing) + new_limit * self.__smoothing
+        self.__limit = max(self.__min_limit, min(self.__max_limit, new_limit))
+
+
+class _ExponentialAverage:
+    """
+    Exponential moving average. The first `window` samples are averaged arithmetically, i.e., early samples are not
+    over weighted.
+    """
+
+    __slots__ = ("value", "__window", "__count")
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.value = 0.0
+        self.__window = window
+        self.__count = 0
+
+    def add(self, sample: float) -> float:
+        if self.__count < self.__window:
+            self.__count += 1
+            self.value += (sample - self.value) / self.__count
+        else:
+            self.value += (sample - self.value) * 2 / (self.__window + 1)
+        return self.value
+
+
+@dataclass(slots=True)
+class SchedulerMetrics:
+    """
+    RequestScheduler metrics
+
+    Notes
+    -----
+    - queueing delay is measured from when the request is submitted to when the request task is started
+    - request latency is measured from when the request task is started to when the request task is done
+    """
+
+    # current concurrency limit
+    concurrency_limit: int = 0
+    running: int = 0
+    queued: int = 0
+
+    scheduled_count: int = 0
+    total_queueing_delay: float = 0.0
+    max_queueing_delay: float = 0.0
+    last_queueing_delay: float = 0.0
+
+    completed_count: int = 0
+    total_request_latency: float = 0.0
+    max_request_latency: float = 0.0
+
+    @property
+    def avg_queueing_delay(self) -> float:
+        """
+        :return: average queueing delay in seconds
+        """
+        return (
+            self.total_queueing_delay / self.scheduled_count
+            if self.scheduled_count
+            else 0.0
+        )
+
+    @property
+    def avg_request_latency(self) -> float:
+        """
+        :return: average request latency in seconds
+        """
+        return (
+            self.total_request_latency / self.completed_count
+            if self.completed_count
+            else 0.0
+        )
+
+
+# (request, on_done, submitted timestamp)
+_Request = tuple[Coroutine[Any, Any, Any], Callable[[Task], None], float]
+
+
+class _Connection:
+    __slots__ = ("pending", "running", "ready", "closed")
+
+    def __init__(self):
+        self.pending: deque[_Request] = deque()
+        self.running = 0
+        # True if the connection is in the ready ring
+        self.ready = False
+        self.closed = False
+
+
+class RequestScheduler:
+    """
+    Schedules request tasks fairly across connections.
+
+    Each connection has its own queue. When a request slot is available, connections that have queued requests and
+    are below their concurrency cap are served round-robin, i.e., a connection that submits a burst of requests cannot
+    starve other connections.
+
+    Notes
+    -----
+    - :meth:`submit` never blocks. If the connection queue is full, then the request is rejected, and it is up to
+      the caller to reply cheaply.
+    - The scheduler is not thread safe, i.e., it is designed to be used from the event loop.
+    - The concurrency limit across all connections is provided by a :type:`ConcurrencyLimit`, which is sampled each
+      time a request completes. Thus, an adaptive limit moves with the observed request latency and failures.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_requests: int = 1000,
+        max_concurrent_requests_per_connection: int = 100,
+        max_queued_requests_per_connection: int = 1000,
+        concurrency_limit: ConcurrencyLimit | None = None,
+        metrics: SchedulerMetrics | None = None,
+    ):
+        """
+        :param max_concurrent_requests: max number of requests that run concurrently across all connections.
+            Ignored if `concurrency_limit` is specified.
+        :param max_concurrent_requests_per_connection: max number of requests that run concurrently per connection
+        :param max_queued_requests_per_connection: max number of requests that can wait per connection
+        :param concurrency_limit: defaults to :type:`FixedLimit` using `max_concurrent_requests`
+        :param metrics: SchedulerMetrics
+        """
+        if max_concurrent_requests_per_connection < 1:
+            raise ValueError("max_concurrent_requests_per_connection must be >= 1")
+        if max_queued_requests_per_connection < 0:
+            raise ValueError("max_queued_requests_per_connection must be >= 0")
+
+        self.__limit = (
+            concurrency_limit
+            if concurrency_limit is not None
+            else FixedLimit(max_concurrent_requests)
+        )
+        self.__metrics = metrics if metrics is not None else SchedulerMetrics()
+        self.__metrics.concurrency_limit = self.__limit.limit
+        self.__max_concurrent_requests_per_connection = (
+            max_concurrent_requests_per_connection
+        )
+        self.__max_queued_requests_per_connection = max_queued_requests_per_connection
+
+        self.__connections: dict[Hashable, _Connection] = {}
+        # connections that have queued requests and are below their concurrency cap
+        self.__ready: deque[_Connection] = deque()
+        self.__tasks: set[Task] = set()
+        self.__queued_count = 0
+
+    @property
+    def max_concurrent_requests(self) -> int:
+        """
+        :return: current concurrency limit across all connections
+        """
+        return self.__limit.limit
+
+    @property
+    def concurrency_limit(self) -> ConcurrencyLimit:
+        return self.__limit
+
+    @property
+    def metrics(self) -> SchedulerMetrics:
+        """
+        :return: SchedulerMetrics
+        """
+        return self.__metrics
+
+    @property
+    def running_count(self) -> int:
+        """
+        :return: number of requests that are running
+        """
+        return len(self.__tasks)
+
+    @property
+    def queued_count(self) -> int:
+        """
+        :return: number of requests that are waiting to run
+        """
+        return self.__queued_count
+
+    def submit(
+        self,
+        connection: Hashable,
+        request: Coroutine[Any, Any, Any],
+        on_done: Callable[[Task], None],
+    ) -> bool:
+        """
+        :param connection: requests are scheduled fairly across connections
+        :param request: coroutine that is run as a task once it is scheduled
+        :param on_done: task done callback
+        :return: False if the request was rejected because the connection queue is full
+        """
+        conn = self.__connections.get(connection)
+        if conn is None:
+            conn = _Connection()
+            self.__connections[connection] = conn
+
+        if len(
+            conn.pending
+        ) >= self.__max_queued_requests_per_connection and not self.__can_run(conn):
+            return False
+
+        conn.pending.append((request, on_done, time.perf_counter()))
+        self.__queued_count += 1
+        self.__metrics.queued = self.__queued_count
+        self.__mark_ready(conn)
+        self.__schedule()
+        return True
+
+    def close_connection(self, connection: Hashable):
+        """
+        Discards the connection's queued requests. Running requests are not cancelled.
+        """
+        conn = self.__connections.pop(connection, None)
+        if conn is None:
+            return
+        conn.closed = True
+        self.__queued_count -= len(conn.pending)
+        self.__metrics.queued = self.__queued_count
+        for request, _on_done, _submitted in conn.pending:
+            request.close()
+        conn.pending.clear()
+        if conn.ready:
+            self.__ready.remove(conn)
+            conn.ready = False
+
+    def __can_run(self, conn: _Connection) -> bool:
+        return (
+            len(conn.pending) == 0
+            and len(self.__tasks) < self.__limit.limit
+            and conn.running < self.__max_concurrent_requests_per_connection
+        )
+
+    def __mark_ready(self, conn: _Connection):
+        if (
+            not conn.ready
+            and not conn.closed
+            and conn.pending
+            and conn.running < self.__max_concurrent_requests_per_connection
+        ):
+            conn.ready = True
+            self.__ready.append(conn)
+
+    def __schedule(self):
+        metrics = self.__metrics
+        while self.__ready and len(self.__tasks) < self.__limit.limit:
+            conn = self.__ready.popleft()
+            conn.ready = False
+            request, on_done, submitted = conn.pending.popleft()
+            self.__queued_count -= 1
+            conn.running += 1
+
+            started = time.perf_counter()
+            queueing_delay = started - submitted
+            metrics.scheduled_count += 1
+            metrics.total_queueing_delay += queueing_delay
+            metrics.last_queueing_delay = queueing_delay
+            metrics.max_queueing_delay = max(metrics.max_queueing_delay, queueing_delay)
+
+            task = asyncio.create_task(request)
+            self.__tasks.add(task)
+            task.add_done_callback(
+                lambda task, conn=conn, on_done=on_done, started=started: self.__on_done(
+                    task, conn, on_done, started
+                )
+            )
+            # the connection goes to the back of the ring
+            self.__mark_ready(conn)
+
+        metrics.running = len(self.__tasks)
+        metrics.queued = self.__queued_count
+
+    def __on_done(
+        self,
+        task: Task,
+        conn: _Connection,
+        on_done: Callable[[Task], None],
+        started: float,
+    ):
+        latency = time.perf_counter() - started
+        in_flight = len(self.__tasks)
+        self.__tasks.discard(task)
+        conn.running -= 1
+
+        failed = task.cancelled() or task.exception() is not None
+        self.__limit.on_sample(latency, in_flight, failed)
+        metrics = self.__metrics
+        metrics.concurrency_limit = self.__limit.limit
+        metrics.completed_count += 1
+        metrics.total_request_latency += latency
+        metrics.max_request_latency = max(metrics.max_request_latency, latency)
+        try:
+            on_done(task)
+        finally:
+            self.__mark_ready(conn)
+            self.__schedule()
@@ -1,11 +1,16 @@
 """
 Provides support secure messaging
 """
+import time
 from dataclasses import dataclass
-from typing import Self, overload
+from typing import Self, overload, Sequence
 
 import msgpack  # type: ignore
+from algosdk import constants
+from nacl import utils
+from nacl.bindings import crypto_box_afternm, crypto_box_open_afternm
 from nacl.exceptions import CryptoError
+from nacl.public import Box
 
 from oysterpack.algorand.client.accounts.private_key import (
     SigningAddress,
@@ -13,6 +18,9 @@ from oysterpack.algorand.client.accounts.private_key import (
     AlgoPrivateKey,
     verify_message,
 )
+from oysterpack.algorand.client.model import Address
+from oysterpack.algorand.messaging.frame import FRAME_MARKER, FrameKind, frame_kind
+from oysterpack.core.compression import Compression
 from oysterpack.core.message import Serializable, Message, MessageId
 
 
@@ -123,15 +131,40 @@ def create_secure_message(
     data: Serializable,
     recipient: EncryptionAddress,
     msg_id: MessageId | None = None,
+    compression: Compression | None = None,
 ) -> SignedEncryptedMessage:
     """
     Constructs a SignedEncryptedMessage and serializes it
+
+    :param compression: if specified, then the message is compressed, and the recipient is told that replies may be
+        compressed using the same codec
     """
     msg = Message(
         msg_id=MessageId() if msg_id is None else msg_id,
         msg_type=data.message_type(),
         data=data.pack(),
     )
+    return seal_message(
+        private_key=private_key,
+        msg=msg if compression is None else msg.accept_compression(compression),
+        recipient=recipient,
+        compression=compression,
+    )
+
+
+def seal_message(
+    private_key: AlgoPrivateKey,
+    msg: Message,
+    recipient: EncryptionAddress,
+    compression: Compression | None = None,
+) -> SignedEncryptedMessage:
+    """
+    Encrypts and signs the message
+
+    :param compression: if specified, then the message is compressed before it is encrypted
+    """
+    if compression is not None:
+        msg = msg.compress(compression)
     secret_message = EncryptedMessage.encrypt(
         sender_private_key=private_key,
         recipient=recipient,
@@ -143,11 +176,29 @@ def create_secure_message(
     )
 
 
+def pack_sealed_message(
+    private_key: AlgoPrivateKey,
+    msg: Message,
+    recipient: EncryptionAddress,
+    compression: Compression | None = None,
+) -> bytes:
+    """
+    Encrypts and signs the message, and serializes it as a :type:`SignedEncryptedMessage`
+    """
+    return seal_message(
+        private_key=private_key,
+        msg=msg,
+        recipient=recipient,
+        compression=compression,
+    ).pack()
+
+
 def pack_secure_message(
     private_key: AlgoPrivateKey,
     data: Serializable,
     recipient: EncryptionAddress,
     msg_id: MessageId | None = None,
+    compression: Compression | None = None,
 ) -> bytes:
     """
     Constructs a SignedEncryptedMessage and serializes it
@@ -157,14 +208,189 @@ def pack_secure_message(
         data=data,
         recipient=recipient,
         msg_id=msg_id,
+        compression=compression,
     ).pack()
 
 
+# SecureMessageFrame binary layout
+# FRAME_MARKER (1) | FrameKind.SECURE_MESSAGE (1) | sender (58) | signature (64) | encryption sender (58) |
+# recipient (58) | nonce (24) | ciphertext
+_FRAME_SENDER = 2
+_FRAME_SIGNATURE = _FRAME_SENDER + constants.address_len
+_FRAME_ENCRYPTION_SENDER = _FRAME_SIGNATURE + 64
+_FRAME_RECIPIENT = _FRAME_ENCRYPTION_SENDER + constants.address_len
+_FRAME_NONCE = _FRAME_RECIPIENT + constants.address_len
+_FRAME_CIPHERTEXT = _FRAME_NONCE + Box.NONCE_SIZE
+# Poly1305 MAC that is prepended to the box ciphertext
+_BOX_MAC_SIZE = 16
+
+
+def pack_secure_message_frame(
+    private_key: AlgoPrivateKey,
+    msg: Message,
+    recipient: EncryptionAddress,
+    compression: Compression | None = None,
+) -> bytes:
+    """
+    Encrypts and signs the message, and writes it using the :type:`SecureMessageFrame` binary layout.
+
+    Notes
+    -----
+    - The message is written into a single preallocated plaintext buffer, and the frame is assembled with a single
+      join, i.e., there is no nested msgpack serialization and the ciphertext is copied once.
+    - The signature covers the ciphertext. The nonce is authenticated by the box MAC.
+
+    :param compression: if specified, then the message is compressed before it is encrypted
+    :return: frame that can be sent as is over the websocket
+    """
+    if compression is not None:
+        msg = msg.compress(compression)
+    plaintext = bytearray(msg.binary_size)
+    msg.pack_into(plaintext)
+    nonce = utils.random(Box.NONCE_SIZE)
+    ciphertext = crypto_box_afternm(
+        plaintext,  # type: ignore  # the libsodium binding accepts any buffer
+        nonce,
+        private_key.box(recipient).shared_key(),
+    )
+    signature = private_key.sign(ciphertext).signature
+
+    return b"".join(
+        (
+            bytes((FRAME_MARKER, FrameKind.SECURE_MESSAGE)),
+            private_key.signing_address.encode(),
+            signature,
+            private_key.encryption_address.encode(),
+            recipient.encode(),
+            nonce,
+            ciphertext,
+        )
+    )
+
+
+class SecureMessageFrame:
+    """
+    Read-only view over a frame that was written by :func:`pack_secure_message_frame`.
+
+    Notes
+    -----
+    - The ciphertext is a `memoryview` into the received frame, i.e., it is not copied.
+    - The decrypted :type:`Message` data is a `memoryview` into the decrypted plaintext.
+    - When pickled, the frame is copied into bytes.
+    """
+
+    __slots__ = ("__view", "__sender", "__encryption_sender", "__recipient")
+
+    def __init__(self, frame: bytes | bytearray | memoryview):
+        """
+        :exception InvalidSecureMessage: if the frame header is invalid
+        """
+        view = memoryview(frame)
+        if (
+            len(view) < _FRAME_CIPHERTEXT + _BOX_MAC_SIZE
+            or view[0] != FRAME_MARKER
+            or view[1] != FrameKind.SECURE_MESSAGE
+        ):
+            raise InvalidSecureMessage("invalid SecureMessageFrame header")
+        try:
+            self.__sender = SigningAddress(
+                Address(bytes(view[_FRAME_SENDER:_FRAME_SIGNATURE]).decode("ascii"))
+            )
+            self.__encryption_sender = EncryptionAddress(
+                Address(
+                    bytes(view[_FRAME_ENCRYPTION_SENDER:_FRAME_RECIPIENT]).decode(
+                        "ascii"
+                    )
+                )
+            )
+            self.__recipient = EncryptionAddress(
+                Address(bytes(view[_FRAME_RECIPIENT:_FRAME_NONCE]).decode("ascii"))
+            )
+        except UnicodeDecodeError as err:
+            raise InvalidSecureMessage("invalid SecureMessageFrame address") from err
+        self.__view = view
+
+    def __reduce__(self):
+        return self.__class__, (self.tobytes(),)
+
+    def tobytes(self) -> bytes:
+        """
+        :return: copy of the frame
+        """
+        return self.__view.tobytes()
+
+    @property
+    def sender(self) -> SigningAddress:
+        """
+        :return: who signed the message
+        """
+        return self.__sender
+
+    @property
+    def encryption_sender(self) -> EncryptionAddress:
+        """
+        :return: who encrypted the message
+        """
+        return self.__encryption_sender
+
+    @property
+    def recipient(self) -> EncryptionAddress:
+        """
+        :return: who the message was encrypted for
+        """
+        return self.__recipient
+
+    @property
+    def signature(self) -> bytes:
+        """
+        :return: signature over the ciphertext
+        """
+        return bytes(self.__view[_FRAME_SIGNATURE:_FRAME_ENCRYPTION_SENDER])
+
+    @property
+    def ciphertext(self) -> memoryview:
+        """
+        :return: view into the frame
+        """
+        return self.__view[_FRAME_CIPHERTEXT:]
+
+    def verify(self) -> bool:
+        """
+        :return: True if the message signature passed verification
+        """
+        return verify_message(
+            message=self.ciphertext,  # type: ignore
+            signature=self.signature,
+            signer=self.sender,
+        )
+
+    def decrypt(self, private_key: AlgoPrivateKey) -> Message:
+        """
+        :exception CryptoError: if decryption fails
+        :exception ValueError: if the decrypted message is invalid
+
+        :return: message, which may be compressed
+        """
+        plaintext = crypto_box_open_afternm(
+            self.ciphertext,  # type: ignore
+            bytes(self.__view[_FRAME_NONCE:_FRAME_CIPHERTEXT]),
+            private_key.box(self.__encryption_sender).shared_key(),
+        )
+        return Message.unpack_from(plaintext)
+
+
 class InvalidSecureMessage(Exception):
     """
     InvalidSecureMessage
+
+    :attr:`msg_id` is set if the message was decrypted, but is invalid, e.g., it fails to be decompressed.
+    Otherwise, the message ID is unknown.
     """
 
+    def __init__(self, *args, msg_id: MessageId | None = None):
+        super().__init__(*args)
+        self.msg_id = msg_id
+
 
 class MessageSignatureVerificationFailed(InvalidSecureMessage):
     """
@@ -188,44 +414,167 @@ def unpack_secure_message(
     """
 
 
+@overload
+def unpack_secure_message(
+    private_key: AlgoPrivateKey,
+    secure_msg: SecureMessageFrame | SignedEncryptedMessage,
+) -> Message:
+    """
+    overlaod for SecureMessageFrame instance, or a message that was parsed via :func:`parse_secure_message`
+    """
+
+
 @overload
 def unpack_secure_message(
     private_key: AlgoPrivateKey,
     secure_msg: bytes,
 ) -> Message:
     """
-    overlaod for SignedEncryptedMessage bytes
+    overlaod for SignedEncryptedMessage or SecureMessageFrame bytes
     """
 
 
 def unpack_secure_message(
     private_key: AlgoPrivateKey,
-    secure_msg: bytes | SignedEncryptedMessage,
+    secure_msg: bytes | bytearray | SignedEncryptedMessage | SecureMessageFrame,
 ) -> Message:
     """
-    1. If :param:`secure_msg` is bytes, then deserialize it into s SignedEncryptedMessage
+    1. If :param:`secure_msg` is bytes, then deserialize it into a SignedEncryptedMessage or SecureMessageFrame
     2. verifies the signature
     3. decrypts the message
     4. Deserializes the decrypted message into a Message
     """
 
-    if isinstance(secure_msg, bytes):
-        try:
-            secure_msg = SignedEncryptedMessage.unpack(secure_msg)
-        except Exception as err:
-            raise InvalidSecureMessage(
-                "failed to unpack SignedEncryptedMessage"
-            ) from err
+    if isinstance(secure_msg, (bytes, bytearray)):
+        secure_msg = parse_secure_message(secure_msg)
 
-    if not secure_msg.verify():
-        raise MessageSignatureVerificationFailed()
+    _verify_secure_message(secure_msg)
+    return _decrypt_secure_message(private_key, secure_msg)
+
+
+def parse_secure_message(
+    secure_msg: bytes | bytearray | memoryview,
+) -> SignedEncryptedMessage | SecureMessageFrame:
+    """
+    Parses the frame based on its frame kind
 
+    :exception InvalidSecureMessage: if the frame is not a secure message frame or fails to be parsed
+    """
     try:
-        decrypted_msg = secure_msg.encrypted_msg.decrypt(private_key)
-    except CryptoError as err:
-        raise DecryptionFailed() from err
+        kind = frame_kind(secure_msg)  # type: ignore
+    except ValueError as err:
+        raise InvalidSecureMessage("invalid frame") from err
+
+    if kind == FrameKind.SECURE_MESSAGE:
+        return SecureMessageFrame(secure_msg)
+    if kind != FrameKind.SIGNED_ENCRYPTED_MESSAGE:
+        raise InvalidSecureMessage(f"unexpected frame kind: {kind}")
+    try:
+        return SignedEncryptedMessage.unpack(secure_msg)  # type: ignore
+    except Exception as err:
+        raise InvalidSecureMessage("failed to unpack SignedEncryptedMessage") from err
 
+
+def _verify_secure_message(secure_msg: SignedEncryptedMessage | SecureMessageFrame):
+    """
+    :exception MessageSignatureVerificationFailed: if the signature does not match
+    :exception InvalidSecureMessage: if the signature or sender address is malformed, e.g., the signature is not
+        64 bytes or the address checksum does not match
+    """
     try:
-        return Message.unpack(decrypted_msg)
+        verified = secure_msg.verify()
     except Exception as err:
-        raise InvalidSecureMessage("failed to unpack Message") from err
+        raise InvalidSecureMessage("invalid signature or sender") from err
+    if not verified:
+        raise MessageSignatureVerificationFailed()
+
+
+def _decrypt_secure_message(
+    private_key: AlgoPrivateKey,
+    secure_msg: SignedEncryptedMessage | SecureMessageFrame,
+) -> Message:
+    """
+    :return: decompressed message
+    """
+    if isinstance(secure_msg, SecureMessageFrame):
+        try:
+            msg = secure_msg.decrypt(private_key)
+        except CryptoError as err:
+            raise DecryptionFailed() from err
+        except ValueError as err:
+            raise InvalidSecureMessage("failed to unpack Message") from err
+        except Exception as err:
+            # e.g., the sender encryption address is malformed
+            raise InvalidSecureMessage("failed to decrypt Message") from err
+    else:
+        try:
+            decrypted_msg = secure_msg.encrypted_msg.decrypt(private_key)
+        except CryptoError as err:
+            raise DecryptionFailed() from err
+        except Exception as err:
+            # e.g., the sender encryption address is malformed
+            raise InvalidSecureMessage("failed to decrypt Message") from err
+
+        try:
+            msg = Message.unpack(decrypted_msg)
+        except Exception as err:
+            raise InvalidSecureMessage("failed to unpack Message") from err
+
+    try:
+        return msg.decompress()
+    except ValueError as err:
+        raise InvalidSecureMessage(
+            "failed to decompress Message", msg_id=msg.msg_id
+        ) from err
+
+
+def unpack_secure_messages(
+    private_key: AlgoPrivateKey,
+    secure_msgs: Sequence[SignedEncryptedMessage | SecureMessageFrame],
+) -> list[Message | InvalidSecureMessage]:
+    """
+    Batch version of :func:`unpack_secure_message`, which is designed to be submitted as a single executor task.
+
+    Notes
+    -----
+    - Failures are returned, not raised, in order to not fail the whole batch, i.e., a malformed message only fails
+      its own result.
+
+    :return: results in the same order as the secure messages. Each result is either the unpacked Message or the
+             InvalidSecureMessage error.
+    """
+    return unpack_secure_messages_timed(private_key, secure_msgs)[0]
+
+
+def unpack_secure_messages_timed(
+    private_key: AlgoPrivateKey,
+    secure_msgs: Sequence[SignedEncryptedMessage | SecureMessageFrame],
+) -> tuple[list[Message | InvalidSecureMessage], float, float]:
+    """
+    Same as :func:`unpack_secure_messages`, but also measures how long the batch spent verifying signatures and
+    decrypting messages. Timings are returned, instead of recorded, because the batch may be unpacked in another
+    process.
+
+    :return: (results, verify seconds, decrypt seconds)
+    """
+    start = time.perf_counter()
+    verified: list[InvalidSecureMessage | None] = []
+    for secure_msg in secure_msgs:
+        try:
+            _verify_secure_message(secure_msg)
+            verified.append(None)
+        except InvalidSecureMessage as err:
+            verified.append(err)
+    verify_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results: list[Message | InvalidSecureMessage] = []
+    for secure_msg, verification_error in zip(secure_msgs, verified):
+        if verification_error is not None:
+            results.append(verification_error)
+            continue
+        try:
+            results.append(_decrypt_secure_message(private_key, secure_msg))
+        except InvalidSecureMessage as err:
+            results.append(err)
+    return results, verify_time, time.perf_counter() - start
@@ -2,21 +2,55 @@
 SecureMessage Client
 """
 import asyncio
+import weakref
+from asyncio import Task
+from collections import deque
 from concurrent.futures import Executor
 from contextlib import asynccontextmanager
-from typing import cast
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncIterable, AsyncIterator, cast, Callable
 
+from websockets.exceptions import ConnectionClosedOK
 from websockets.legacy.client import WebSocketClientProtocol
 
 from oysterpack.algorand.client.accounts.private_key import (
     AlgoPrivateKey,
     EncryptionAddress,
+    SigningAddress,
+)
+from oysterpack.algorand.messaging.chunked import (
+    ChunkedMessageError,
+    ChunkVerifier,
+    DEFAULT_CHUNK_SIZE,
+    MessageChunk,
+    chunk_message,
+)
+from oysterpack.algorand.messaging.crypto_worker_pool import CryptoWorkerPool
+from oysterpack.algorand.messaging.frame import (
+    FRAME_MARKER,
+    FrameKind,
+    frame_kind,
+    unpack_multi_frame,
 )
 from oysterpack.algorand.messaging.secure_message import (
-    pack_secure_message,
+    pack_sealed_message,
+    pack_secure_message_frame,
+    parse_secure_message,
     unpack_secure_message,
+    SecureMessageFrame,
+    InvalidSecureMessage,
 )
-from oysterpack.core.message import Serializable, Message
+from oysterpack.algorand.messaging.session import (
+    Session,
+    SessionKeyRequest,
+    SessionKeyAccepted,
+)
+from oysterpack.core.compression import Compression
+from oysterpack.core.logging import get_logger
+from oysterpack.core.message import Serializable, Message, MessageId, MessageType
+
+_MULTI_FRAME_HEADER = bytes((FRAME_MARKER, FrameKind.MULTI))
 
 
 class SecureMessageClientError(Exception):
@@ -31,17 +65,194 @@ class MessageSignatureVerificationFailed(SecureMessageClientError):
     """
 
 
+@dataclass(slots=True)
+class Reply:
+    """
+    Message received from the server
+    """
+
+    msg: Message
+    # who encrypted the message
+    sender: EncryptionAddress
+    # who signed the message
+    signer: SigningAddress
+
+
+class ResponseHandle:
+    """
+    Handle for the replies to a request that was sent via :meth:`SecureMessageClient.send`.
+
+    Replies are routed to the handle by the request :type:`MessageId`. A request may have more than 1 reply,
+    e.g., an intermediate `AuthorizeTransactionsRequestAccepted` followed by the final reply.
+
+    - `await handle` returns the next reply
+    - `async for msg in handle` iterates the replies until the connection is closed
+
+    Notes
+    -----
+    - Replies are only routed to the handle while the handle is referenced. If the handle is discarded, then replies
+      are returned by :meth:`SecureMessageClient.recv`.
+    - Only replies that were sent by the request recipient are routed to the handle.
+    - If a reply fails to be unpacked after it was decrypted, e.g., it fails to be decompressed, then the handle
+      receives the :type:`InvalidSecureMessage` error. Replies that fail to be verified or decrypted cannot be
+      correlated with the request. Their errors are returned by :meth:`SecureMessageClient.recv`, i.e., the handle
+      times out.
+    """
+
+    def __init__(
+        self,
+        msg_id: MessageId,
+        recipient: EncryptionAddress,
+        timeout: timedelta | None,
+        start_reader: Callable[[], None],
+        unregister: Callable[[MessageId], None],
+    ):
+        self.__msg_id = msg_id
+        self.__recipient = recipient
+        self.__timeout = timeout
+        self.__start_reader = start_reader
+        self.__unregister = unregister
+        self.__replies: asyncio.Queue[Reply | BaseException] = asyncio.Queue()
+
+    @property
+    def msg_id(self) -> MessageId:
+        """
+        :return: request message ID
+        """
+        return self.__msg_id
+
+    @property
+    def recipient(self) -> EncryptionAddress:
+        """
+        :return: who the request was sent to
+        """
+        return self.__recipient
+
+    def deliver(self, reply: Reply | BaseException):
+        """
+        Used by the client to route replies to the handle
+        """
+        self.__replies.put_nowait(reply)
+
+    async def recv_reply(self, timeout: timedelta | None = None) -> Reply:
+        """
+        :param timeout: overrides the handle's timeout
+        :exception TimeoutError: if no reply is received within the timeout
+        """
+        self.__start_reader()
+        timeout = timeout if timeout is not None else self.__timeout
+        reply = await asyncio.wait_for(
+            self.__replies.get(),
+            timeout.total_seconds() if timeout is not None else None,
+        )
+        if isinstance(reply, InvalidSecureMessage):
+            # the reply was decrypted, but is invalid
+            raise reply
+        if isinstance(reply, BaseException):
+            # the reader failed, e.g., the connection is closed, i.e., no more replies will be received
+            self.__replies.put_nowait(reply)
+            raise reply
+        return reply
+
+    async def recv(self, timeout: timedelta | None = None) -> Message:
+        """
+        :param timeout: overrides the handle's timeout
+        :exception TimeoutError: if no reply is received within the timeout
+        """
+        return (await self.recv_reply(timeout)).msg
+
+    async def recv_chunks(
+        self, timeout: timedelta | None = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Receives a chunked reply incrementally (see :module:`chunked`).
+
+        Notes
+        -----
+        - Each chunk is authenticated by the secure message transport. The final chunk's authentication tag, which
+          covers the entire payload, is verified before the iteration completes, i.e., the payload is only known to
+          be complete when the iteration completes without error.
+
+        :param timeout: max time to wait for each chunk - overrides the handle's timeout
+        :exception ChunkedMessageError: if a reply is not a chunk, or a chunk fails verification
+        :exception TimeoutError: if a chunk is not received within the timeout
+        """
+        verifier: ChunkVerifier | None = None
+        while verifier is None or not verifier.complete:
+            msg = await self.recv(timeout)
+            if msg.msg_type != MessageChunk.message_type():
+                raise ChunkedMessageError(f"reply is not a chunk: {msg.msg_type}")
+            try:
+                chunk = MessageChunk.unpack(bytes(msg.data))
+            except Exception as err:
+                raise ChunkedMessageError("invalid chunk") from err
+            if verifier is None:
+                verifier = ChunkVerifier(self.__msg_id, chunk.msg_type)
+            verifier.verify(chunk)
+            yield chunk.data
+
+    def __await__(self):
+        return self.recv().__await__()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Message:
+        try:
+            return await self.recv()
+        except ConnectionClosedOK as err:
+            raise StopAsyncIteration from err
+
+    def close(self):
+        """
+        Stops routing replies to the handle
+        """
+        self.__unregister(self.__msg_id)
+
+
 class SecureMessageClient:
+    """
+    Secure messaging client
+
+    Notes
+    -----
+    - Replies can be received in 2 ways:
+      1. :meth:`recv` returns whatever message is received next
+      2. the :type:`ResponseHandle` returned by :meth:`send` receives the replies for the request.
+         Once a handle is awaited, a background reader task is started that routes replies to handles by
+         :type:`MessageId`. This enables many concurrent requests to be in flight on the same websocket.
+         Messages that are not routed to a handle are returned by :meth:`recv`.
+    - Multi-message frames (see :attr:`FrameKind.MULTI`), which the server may use to coalesce replies, are split
+      into their frames.
+    """
+
     def __init__(
         self,
         websocket: WebSocketClientProtocol,
         private_key: AlgoPrivateKey,
         executor: Executor,
+        crypto_workers: CryptoWorkerPool | None = None,
+        binary_frames: bool = False,
+        max_pending_replies: int = 256,
+        max_unrouted_replies: int = 1000,
+        compression: Compression | None = None,
     ):
         """
         :param websocket:
         :param private_key:
         :param executor: used to run CPU intensive work outside the event loop
+        :param crypto_workers: if specified, then messages are packed and unpacked by the crypto workers instead of
+            the executor. The crypto workers must be initialized with the same private key. If compression is
+            specified, then the crypto workers must be initialized with compression, which messages are compressed with.
+        :param binary_frames: if True, then messages are sent as :type:`SecureMessageFrame`, which avoids nested
+            msgpack serialization. The server replies using the same frame format.
+        :param max_pending_replies: max number of received messages that are being unpacked concurrently by the
+            background reader. When the limit is reached, the reader stops reading from the websocket.
+        :param max_unrouted_replies: max number of messages that are buffered for :meth:`recv` when the background
+            reader is running. When the limit is reached, messages are dropped.
+        :param compression: if specified, then messages that exceed the compression threshold are compressed before
+            they are encrypted, and the server is told that replies may be compressed using the same codec.
+            Messages are then sent with flags, i.e., only specify compression if the server supports message flags.
 
         NOTES
         -----
@@ -50,34 +261,349 @@ class SecureMessageClient:
           :type:`ThreadPoolExecutor` can also be used for CPU-bound functions.
 
           Otherwise, use :type:`ProcessPoolExecutor`
+        - :type:`CryptoWorkerPool` avoids pickling the private key for each message
         """
+        if (
+            crypto_workers is not None
+            and crypto_workers.encryption_address != private_key.encryption_address
+        ):
+            raise ValueError("crypto workers private key does not match")
+        if (
+            crypto_workers is not None
+            and compression is not None
+            and crypto_workers.compression is None
+        ):
+            raise ValueError("crypto workers were not initialized with compression")
+
         self.__websocket = websocket
         self.__private_key = private_key
         self.__executor = executor
+        self.__crypto_workers = crypto_workers
+        self.__binary_frames = binary_frames
+        self.__compression = compression
+        self.__session: Session | None = None
+        # frames that were split from a multi-message frame, but not yet processed
+        self.__frames: deque[bytes] = deque()
+
+        self.__handles: weakref.WeakValueDictionary[
+            MessageId, ResponseHandle
+        ] = weakref.WeakValueDictionary()
+        self.__max_pending_replies = max_pending_replies
+        self.__max_unrouted_replies = max_unrouted_replies
+        self.__unrouted: asyncio.Queue[Message | BaseException] | None = None
+        # set when the background reader stops, e.g., because the connection is closed
+        self.__reader_error: BaseException | None = None
+        self.__tasks: set[Task] = set()
+
+        self.__logger = get_logger(self)
+
+    @property
+    def session(self) -> Session | None:
+        """
+        :return: session, if a session key has been negotiated with the server
+        """
+        return self.__session
+
+    @property
+    def pending_request_count(self) -> int:
+        """
+        :return: number of response handles that are waiting for replies
+        """
+        return len(self.__handles)
+
+    async def negotiate_session(
+        self,
+        server: EncryptionAddress,
+        timeout: timedelta = timedelta(seconds=30),
+    ) -> Session:
+        """
+        Negotiates a session key with the server. Once the session is established, messages sent to the server and
+        received from the server are encrypted using the session key, i.e., messages are no longer signed and box
+        encrypted per message.
+
+        Notes
+        -----
+        - The server must have session keys enabled.
+
+        :param server: server encryption address
+        :param timeout: how long to wait for the server to reply
+        :exception SecureMessageClientError: if the server did not accept the session key request
+        """
+        handle = await self.send(SessionKeyRequest(), server, timeout)
+        try:
+            reply = await handle.recv_reply()
+        finally:
+            handle.close()
+
+        if reply.msg.msg_type != SessionKeyAccepted.message_type():
+            raise SecureMessageClientError("session key request was not accepted")
+
+        self.__session = Session(
+            session_key=SessionKeyAccepted.unpack(bytes(reply.msg.data)),
+            is_server=False,
+            peer_encryption_address=server,
+            peer_signing_address=reply.signer,
+        )
+        return self.__session
+
+    async def send(
+        self,
+        data: Serializable,
+        recipient: EncryptionAddress,
+        timeout: timedelta | None = None,
+    ) -> ResponseHandle:
+        """
+        :param timeout: default timeout used by the response handle when waiting for a reply
+        :return: handle for the replies to the message that was sent
+        """
+        handle = self.__create_handle(recipient, timeout)
+        await self.__send_message(
+            Message(
+                msg_id=handle.msg_id, msg_type=data.message_type(), data=data.pack()
+            ),
+            recipient,
+        )
+        return handle
+
+    async def send_chunked(
+        self,
+        msg_type: MessageType,
+        payload: bytes | memoryview | AsyncIterable[bytes],
+        recipient: EncryptionAddress,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        timeout: timedelta | None = None,
+    ) -> ResponseHandle:
+        """
+        Sends the payload as a chunked message (see :module:`chunked`), which is used for payloads that are too
+        large to be sent as a single message.
+
+        Notes
+        -----
+        - Chunks are packed and sent one at a time. If the payload is an async iterable, then it is consumed
+          incrementally, i.e., the payload is never fully buffered.
+        - The server starts handling the message when the first chunk is received.
+
+        :param msg_type: chunked message type, which the server uses to route the chunks to the message handler
+        :param chunk_size: max chunk data size in bytes
+        :param timeout: default timeout used by the response handle when waiting for a reply
+        :return: handle for the replies to the message that was sent
+        """
+        handle = self.__create_handle(recipient, timeout)
+        async for msg in chunk_message(handle.msg_id, msg_type, payload, chunk_size):
+            await self.__send_message(msg, recipient)
+        return handle
+
+    def __create_handle(
+        self, recipient: EncryptionAddress, timeout: timedelta | None
+    ) -> ResponseHandle:
+        msg_id = MessageId()
+        handle = ResponseHandle(
+            msg_id=msg_id,
+            recipient=recipient,
+            timeout=timeout,
+            start_reader=self.__start_reader,
+            unregister=self.__unregister,
+        )
+        if self.__reader_error is not None:
+            # replies can no longer be received
+            handle.deliver(self.__reader_error)
+            return handle
+        # register the handle before sending the message because the reply may be received before `send` returns
+        self.__handles[msg_id] = handle
+        return handle
+
+    async def __send_message(self, msg: Message, recipient: EncryptionAddress):
+        if self.__compression is not None:
+            msg = msg.accept_compression(self.__compression)
+
+        if (
+            self.__session is not None
+            and recipient == self.__session.peer_encryption_address
+        ):
+            await self.__websocket.send(self.__session.seal(msg, self.__compression))
+            return
+
+        if self.__crypto_workers is not None:
+            secure_message = await self.__crypto_workers.pack_secure_message(
+                msg,
+                recipient,
+                binary_frame=self.__binary_frames,
+                compress=self.__compression is not None,
+            )
+            await self.__websocket.send(secure_message)
+            return
+
+        if self.__binary_frames:
+            frame = await asyncio.get_event_loop().run_in_executor(
+                self.__executor,
+                pack_secure_message_frame,
+                self.__private_key,
+                msg,
+                recipient,
+                self.__compression,
+            )
+            await self.__websocket.send(frame)
+            return
 
-    async def send(self, data: Serializable, recipient: EncryptionAddress):
         # run CPU intensive work via executor because we don't want to block the event loop
         secure_message = await asyncio.get_event_loop().run_in_executor(
             self.__executor,
-            pack_secure_message,
+            pack_sealed_message,
             self.__private_key,
-            data,
+            msg,
             recipient,
+            self.__compression,
         )
         await self.__websocket.send(secure_message)
 
     async def recv(self) -> Message:
-        secure_msg_bytes = cast(bytes, await self.__websocket.recv())
+        """
+        Returns the next message that was not routed to a :type:`ResponseHandle`.
+        """
+        if self.__unrouted is not None:
+            if self.__reader_error is not None and self.__unrouted.empty():
+                raise self.__reader_error
+            msg = await self.__unrouted.get()
+            if isinstance(msg, BaseException):
+                raise msg
+            return msg
 
-        # run CPU intensive work via executor because we don't want to block the event loop
-        return await asyncio.get_event_loop().run_in_executor(
-            self.__executor,
-            unpack_secure_message,
-            self.__private_key,
-            secure_msg_bytes,
+        frame = await self.__recv_frame()
+        return (await self.__unpack_reply(frame)).msg
+
+    async def __recv_frame(self) -> bytes:
+        if self.__frames:
+            return self.__frames.popleft()
+
+        frame = cast(bytes, await self.__websocket.recv())
+        if frame[:2] != _MULTI_FRAME_HEADER:
+            return frame
+        try:
+            frames = unpack_multi_frame(frame)
+        except ValueError as err:
+            raise InvalidSecureMessage("invalid multi frame") from err
+        if len(frames) == 0:
+            raise InvalidSecureMessage("empty multi frame")
+        self.__frames.extend(bytes(frame) for frame in frames)
+        return self.__frames.popleft()
+
+    async def __unpack_reply(self, frame: bytes) -> Reply:
+        try:
+            kind = frame_kind(frame)
+        except ValueError as err:
+            raise InvalidSecureMessage("invalid frame") from err
+        if kind == FrameKind.SESSION:
+            if self.__session is None:
+                raise InvalidSecureMessage(
+                    "session frame received, but no session exists"
+                )
+            return Reply(
+                msg=self.__session.open(frame),
+                sender=self.__session.peer_encryption_address,
+                signer=self.__session.peer_signing_address,
+            )
+
+        secure_msg = parse_secure_message(frame)
+        if isinstance(secure_msg, SecureMessageFrame):
+            sender = secure_msg.encryption_sender
+        else:
+            sender = secure_msg.encrypted_msg.sender
+
+        if self.__crypto_workers is not None:
+            msg = await self.__crypto_workers.unpack_secure_message(secure_msg)
+        else:
+            # run CPU intensive work via executor because we don't want to block the event loop
+            msg = await asyncio.get_event_loop().run_in_executor(
+                self.__executor,
+                unpack_secure_message,
+                self.__private_key,
+                secure_msg,
+            )
+        return Reply(msg=msg, sender=sender, signer=secure_msg.sender)
+
+    def __unregister(self, msg_id: MessageId):
+        self.__handles.pop(msg_id, None)
+
+    def __start_reader(self):
+        if self.__unrouted is not None:
+            return
+
+        self.__unrouted = asyncio.Queue()
+        pending: asyncio.Queue[Task[Reply] | BaseException] = asyncio.Queue(
+            maxsize=self.__max_pending_replies
         )
+        for coro in (self.__read(pending), self.__dispatch(pending)):
+            task = asyncio.create_task(coro)
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+
+    async def __read(self, pending: asyncio.Queue[Task[Reply] | BaseException]):
+        """
+        Reads frames from the websocket and unpacks them concurrently.
+        """
+        while True:
+            try:
+                frame = await self.__recv_frame()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                await pending.put(err)
+                return
+            # replies are unpacked concurrently, but are dispatched in the order they were received
+            await pending.put(asyncio.create_task(self.__unpack_reply(frame)))
+
+    async def __dispatch(self, pending: asyncio.Queue[Task[Reply] | BaseException]):
+        """
+        Routes replies to response handles in the order they were received
+        """
+        unrouted = cast(asyncio.Queue[Message | BaseException], self.__unrouted)
+        while True:
+            item = await pending.get()
+            if isinstance(item, BaseException):
+                # the connection is closed
+                self.__reader_error = item
+                for pending_handle in list(self.__handles.values()):
+                    pending_handle.deliver(item)
+                self.__handles.clear()
+                unrouted.put_nowait(item)
+                return
+
+            try:
+                reply = await item
+            except InvalidSecureMessage as err:
+                self.__logger.error("failed to unpack message: %s", err)
+                failed_handle = (
+                    self.__handles.get(err.msg_id) if err.msg_id is not None else None
+                )
+                if failed_handle is not None:
+                    failed_handle.deliver(err)
+                else:
+                    unrouted.put_nowait(err)
+                continue
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.__logger.error("failed to unpack message: %s", err)
+                unrouted.put_nowait(err)
+                continue
+
+            handle = self.__handles.get(reply.msg.msg_id)
+            if handle is not None and handle.recipient == reply.sender:
+                handle.deliver(reply)
+            elif unrouted.qsize() < self.__max_unrouted_replies:
+                unrouted.put_nowait(reply.msg)
+            else:
+                self.__logger.warning(
+                    "unrouted message queue is full - dropping message: %s",
+                    reply.msg.msg_id,
+                )
 
     async def close(self):
+        """
+        Closes the websocket.
+
+        Notes
+        -----
+        - The background reader stops once the websocket is closed, and pending response handles are failed
+          with the `ConnectionClosed` error. Response handles that are created afterwards fail immediately with
+          the same error.
+        """
         await self.__websocket.close()
 
     @asynccontextmanager
@@ -2,14 +2,16 @@
 SecureMessage handler
 """
 import asyncio
+import time
+import weakref
 from abc import ABC, abstractmethod
-from asyncio import Task
+from asyncio import Task, Future
 from concurrent.futures import Executor
-from dataclasses import dataclass
-from datetime import datetime, UTC
-from typing import ClassVar
+from dataclasses import dataclass, field
+from datetime import datetime, UTC, timedelta
+from enum import Enum, auto
+from typing import AsyncIterable, ClassVar, Final
 
-from ulid import ULID
 from websockets.legacy.server import WebSocketServerProtocol
 
 from oysterpack.algorand.client.accounts.private_key import (
@@ -17,13 +19,50 @@ from oysterpack.algorand.client.accounts.private_key import (
     EncryptionAddress,
     SigningAddress,
 )
+from oysterpack.algorand.messaging.chunked import (
+    ChunkedMessageConfig,
+    ChunkedMessageError,
+    ChunkedMessageReader,
+    DEFAULT_CHUNK_SIZE,
+    MessageChunk,
+    chunk_message,
+)
+from oysterpack.algorand.messaging.crypto_worker_pool import CryptoWorkerPool
+from oysterpack.algorand.messaging.frame import FrameKind, frame_kind
+from oysterpack.algorand.messaging.metrics import (
+    PipelineMetrics,
+    PipelineStage,
+    MeteredWebsocket,
+)
+from oysterpack.algorand.messaging.replay_filter import ReplayFilter
+from oysterpack.algorand.messaging.scheduler import (
+    ConcurrencyLimit,
+    RateLimit,
+    RateLimiter,
+    RequestScheduler,
+    RequestThrottled,
+    SchedulerMetrics,
+)
 from oysterpack.algorand.messaging.secure_message import (
     SignedEncryptedMessage,
-    pack_secure_message,
-    unpack_secure_message,
+    SecureMessageFrame,
+    pack_sealed_message,
+    pack_secure_message_frame,
+    parse_secure_message,
+    unpack_secure_messages_timed,
     InvalidSecureMessage,
 )
+from oysterpack.algorand.messaging.session import (
+    Session,
+    SessionConfig,
+    SessionKeyRequest,
+)
 from oysterpack.algorand.messaging.websocket import Websocket, CloseCode
+from oysterpack.algorand.messaging.websocket_writer import (
+    WebsocketWriter,
+    OutboundMetrics,
+)
+from oysterpack.core.compression import Compression
 from oysterpack.core.logging import get_logger
 from oysterpack.core.message import (
     Message,
@@ -61,6 +100,25 @@ class MessageContext:
     # decrypted message
     msg: Message
 
+    # if specified, then used to pack secure messages instead of the executor
+    crypto_workers: CryptoWorkerPool | None = None
+
+    # if the client negotiated a session key, then messages sent to the client are encrypted using the session key
+    session: Session | None = None
+
+    # if True, then messages are packed as SecureMessageFrame, i.e., the client sent the message as a SecureMessageFrame
+    binary_frames: bool = False
+
+    # if specified, then the PACK stage latency is recorded
+    metrics: PipelineMetrics | None = None
+
+    # if specified, then messages sent to the client are compressed, i.e., the client accepts the compression codec
+    compression: Compression | None = None
+
+    # if the client sent a chunked message, then the chunk data is read incrementally via the reader, and
+    # `msg.data` is empty
+    chunks: ChunkedMessageReader | None = None
+
     async def pack_secure_message(
         self,
         msg_id: MessageId,
@@ -73,16 +131,93 @@ class MessageContext:
         :param msg_id: unique message ID
         :param data: provides the message to be wrapped in a :type:`SecureMessage`
         :param recipient: if None, then the client is used as the recipient
-        :return: serialized :type:`SecureMessage` bytes
+        :return: serialized :type:`SecureMessage` bytes, or a session frame if the client negotiated a session key
+        """
+        return await self.pack_message(
+            Message(msg_id=msg_id, msg_type=data.message_type(), data=data.pack()),
+            recipient,
+        )
+
+    async def pack_message(
+        self,
+        msg: Message,
+        recipient: EncryptionAddress | None = None,
+    ) -> bytes:
+        """
+        Same as :meth:`pack_secure_message`, but for a message that is already packed
         """
+        if self.metrics is None:
+            return await self.__pack_message(msg, recipient)
+
+        start = time.perf_counter()
+        try:
+            return await self.__pack_message(msg, recipient)
+        finally:
+            self.metrics.record(PipelineStage.PACK, time.perf_counter() - start)
+
+    async def send_chunked(
+        self,
+        msg_id: MessageId,
+        msg_type: MessageType,
+        payload: bytes | memoryview | AsyncIterable[bytes],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Sends the payload to the client as a chunked message (see :module:`chunked`).
+
+        Notes
+        -----
+        - Chunks are packed and sent one at a time, i.e., at most 1 chunk is held in memory per pipeline stage.
+
+        :param msg_id: chunked message ID
+        :param msg_type: chunked message type
+        :param chunk_size: max chunk data size in bytes
+        """
+        async for msg in chunk_message(msg_id, msg_type, payload, chunk_size):
+            await self.websocket.send(await self.pack_message(msg))
+
+    async def __pack_message(
+        self,
+        msg: Message,
+        recipient: EncryptionAddress | None,
+    ) -> bytes:
+        # compression was only negotiated with the client
+        compression = (
+            self.compression
+            if recipient is None or recipient == self.client_encryption_address
+            else None
+        )
+
+        if self.session is not None and (
+            recipient is None or recipient == self.session.peer_encryption_address
+        ):
+            return self.session.seal(msg, compression)
+
+        if self.crypto_workers is not None:
+            return await self.crypto_workers.pack_secure_message(
+                msg,
+                recipient if recipient else self.client_encryption_address,
+                binary_frame=self.binary_frames,
+                compress=compression is not None,
+            )
+
+        if self.binary_frames:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor,
+                pack_secure_message_frame,
+                self.server_private_key,
+                msg,
+                recipient if recipient else self.client_encryption_address,
+                compression,
+            )
 
         return await asyncio.get_event_loop().run_in_executor(
             self.executor,
-            pack_secure_message,
+            pack_sealed_message,
             self.server_private_key,
-            data,
+            msg,
             recipient if recipient else self.client_encryption_address,
-            msg_id,
+            compression,
         )
 
     @property
@@ -100,8 +235,13 @@ class MessageContext:
     def msg_data(self) -> bytes:
         """
         :return: serialized msg data
+
+        Notes
+        -----
+        - Binary frames carry the data as a `memoryview` into the decrypted plaintext, which is copied into bytes
+          here, i.e., at the point where it is handed to the :type:`Serializable` decoder.
         """
-        return self.msg.data
+        return bytes(self.msg.data)
 
 
 # async message handler
@@ -118,6 +258,10 @@ class MessageHandler(ABC):
     @abstractmethod
     def supported_msg_types(self) -> set[MessageType]:
         """
+        Notes
+        -----
+        - Only called when the handler is registered, i.e., messages are dispatched via a lookup table.
+
         :return: MessageHandlerMapping
         """
         ...
@@ -137,6 +281,160 @@ class _UnsupportedMessageHandler(MessageHandler):
         return set()
 
 
+_UNSUPPORTED_MESSAGE_HANDLER = _UnsupportedMessageHandler()
+
+
+class _Replayed(Enum):
+    """
+    Returned instead of a :type:`MessageContext` when the message is dropped as a replay, i.e., it is distinct from
+    None, which means the message was invalid
+    """
+
+    REPLAYED = auto()
+
+
+_REPLAYED: Final = _Replayed.REPLAYED
+
+
+class SecureMessageUnpacker:
+    """
+    Inbound pipeline stage that verifies and decrypts :type:`SignedEncryptedMessage` on an executor, i.e., off the
+    event loop.
+
+    Messages that arrive close together are batched into a single executor submission, which amortizes the executor
+    overhead (task submission, pickling the private key for process pools) across the batch.
+    """
+
+    def __init__(
+        self,
+        private_key: AlgoPrivateKey,
+        executor: Executor,
+        max_batch_size: int = 64,
+        batch_window: timedelta = timedelta(0),
+        crypto_workers: CryptoWorkerPool | None = None,
+        metrics: PipelineMetrics | None = None,
+    ):
+        """
+        :param private_key: used to decrypt messages
+        :param executor: used to run the CPU intensive work
+        :param max_batch_size: when the batch is full, it is submitted immediately
+        :param batch_window: how long to wait for more messages before submitting the batch.
+            If zero, then messages that arrive within the same event loop iteration are batched together.
+        :param crypto_workers: if specified, then batches are unpacked by the crypto workers instead of the executor
+        :param metrics: if specified, then the UNPACK, VERIFY, and DECRYPT stage latencies are recorded
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.__private_key = private_key
+        self.__executor = executor
+        self.__crypto_workers = crypto_workers
+        self.__max_batch_size = max_batch_size
+        self.__batch_window = batch_window.total_seconds()
+        self.__metrics = metrics
+
+        self.__batch: list[
+            tuple[SignedEncryptedMessage | SecureMessageFrame, Future[Message]]
+        ] = []
+        self.__flush_handle: asyncio.Handle | None = None
+        self.__tasks: set[Task] = set()
+
+    async def __call__(
+        self, secure_msg: SignedEncryptedMessage | SecureMessageFrame
+    ) -> Message:
+        """
+        :exception InvalidSecureMessage: if the message fails verification or decryption
+        """
+        loop = asyncio.get_event_loop()
+        future: Future[Message] = loop.create_future()
+        self.__batch.append((secure_msg, future))
+
+        if len(self.__batch) >= self.__max_batch_size:
+            self.__flush()
+        elif self.__flush_handle is None:
+            if self.__batch_window > 0:
+                self.__flush_handle = loop.call_later(self.__batch_window, self.__flush)
+            else:
+                self.__flush_handle = loop.call_soon(self.__flush)
+
+        if self.__metrics is None:
+            return await future
+
+        self.__metrics.unpacking.inc()
+        start = time.perf_counter()
+        try:
+            return await future
+        finally:
+            self.__metrics.record(PipelineStage.UNPACK, time.perf_counter() - start)
+            self.__metrics.unpacking.dec()
+
+    def __flush(self):
+        if self.__flush_handle is not None:
+            self.__flush_handle.cancel()
+            self.__flush_handle = None
+
+        batch, self.__batch = self.__batch, []
+        if len(batch) == 0:
+            return
+
+        task = asyncio.create_task(self.__unpack(batch))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __unpack(
+        self,
+        batch: list[
+            tuple[SignedEncryptedMessage | SecureMessageFrame, Future[Message]]
+        ],
+    ):
+        secure_msgs = [secure_msg for secure_msg, _future in batch]
+        try:
+            if self.__crypto_workers is not None:
+                (
+                    results,
+                    verify_time,
+                    decrypt_time,
+                ) = await self.__crypto_workers.unpack_secure_messages_timed(
+                    secure_msgs
+                )
+            else:
+                (
+                    results,
+                    verify_time,
+                    decrypt_time,
+                ) = await asyncio.get_event_loop().run_in_executor(
+                    self.__executor,
+                    unpack_secure_messages_timed,
+                    self.__private_key,
+                    secure_msgs,
+                )
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            for _secure_msg, future in batch:
+                if not future.done():
+                    error = InvalidSecureMessage(
+                        "failed to unpack SignedEncryptedMessage"
+                    )
+                    error.__cause__ = err
+                    future.set_exception(error)
+            return
+
+        if self.__metrics is not None:
+            verify_time /= len(batch)
+            decrypt_time /= len(batch)
+            for _ in range(len(batch)):
+                self.__metrics.record(PipelineStage.VERIFY, verify_time)
+                self.__metrics.record(PipelineStage.DECRYPT, decrypt_time)
+
+        for (_secure_msg, future), result in zip(batch, results):
+            if future.done():
+                # the awaiting task was cancelled
+                continue
+            if isinstance(result, InvalidSecureMessage):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 # TODO: add logging
 class SecureMessageHandler:
     """
@@ -152,6 +450,14 @@ class SecureMessageHandler:
         private_key: AlgoPrivateKey,
         message_handlers: list[MessageHandler],
         executor: Executor,
+        max_unpack_batch_size: int = 64,
+        unpack_batch_window: timedelta = timedelta(0),
+        crypto_workers: CryptoWorkerPool | None = None,
+        session_config: SessionConfig | None = None,
+        rate_limit: RateLimit | None = None,
+        replay_filter: ReplayFilter | None = None,
+        compression: Compression | None = None,
+        chunked_message_config: ChunkedMessageConfig | None = None,
     ):
         """
         Notes
@@ -159,36 +465,173 @@ class SecureMessageHandler:
         - A MessageHandler may be mapped to 1 or more message types. However, the registered message types must
           be unique across all message handlers, i.e., the relationship is between MessageHandler and Message type
           is 1:N.
+        - Messages are dispatched via a lookup table that is keyed by the raw message type bytes, i.e., dispatch is
+          O(1) regardless of the number of registered message types. Handlers may be registered at runtime
+          (see :meth:`register_handler`).
+        - Inbound messages are verified and decrypted on the executor. Messages that arrive close together are
+          unpacked as a batch (see :type:`SecureMessageUnpacker`).
+        - If session keys are enabled, then :type:`SessionKeyRequest` messages are handled by the SecureMessageHandler,
+          i.e., the SessionKeyRequest message type cannot be registered by a MessageHandler.
+        - Latency is recorded per pipeline stage and per message type (see :type:`PipelineMetrics`), i.e.,
+          message handlers are metered automatically.
+        - Rate limits are applied per client signing address. The rate limit is checked using the cleartext sender
+          before the message is verified and decrypted, but tokens are only acquired after the message has been
+          verified, i.e., a client cannot spend another client's tokens. Requests that exceed the rate limit are
+          replied to with :type:`RequestThrottled` instead of being routed to the message handler. The throttled
+          reply is only sent if the message passes signature verification. Otherwise, the websocket is closed.
+        - If a replay filter is specified, then duplicate messages are dropped before they are verified and
+          decrypted, and messages whose ID timestamp is outside the replay window are dropped after they are
+          decrypted. Message keys are only recorded after the signature is verified. Dropped messages are counted
+          by the :type:`ReplayFilter`.
+        - Compressed messages are decompressed using the registered compressors (see :module:`compression`).
+          If compression is specified, then replies are compressed when the client accepts the compression codec.
+        - Chunked messages are routed to the message handler that is registered for the chunked message type when the
+          first chunk is received. The handler reads the chunks incrementally via :attr:`MessageContext.chunks`.
+          The :type:`MessageChunk` message type is reserved.
 
         :param private_key: used to verify and decrypt messages
         :param message_handlers: at least 1 message handler mapping needs to be defined.
         :param executor: executor used for non-blocking code
+        :param max_unpack_batch_size: max number of inbound messages that are unpacked per executor submission
+        :param unpack_batch_window: how long to wait to batch inbound messages before unpacking them
+        :param crypto_workers: if specified, then messages are packed and unpacked by the crypto workers.
+            The crypto workers must be initialized with the same private key. If compression is specified, then the
+            crypto workers must be initialized with compression, which replies are compressed with.
+        :param session_config: if specified, then clients may negotiate a session key (see :module:`session`)
+        :param rate_limit: if specified, then requests are rate limited per client signing address
+        :param replay_filter: if specified, then replayed messages are dropped
+        :param compression: if specified, then replies are compressed for clients that accept the compression codec
+        :param chunked_message_config: used to configure how chunked messages are buffered
         """
-        self.__validate_message_handlers(message_handlers)
+        if len(message_handlers) == 0:
+            raise ValueError("at least 1 MessageHandler must be defined")
+        self.__session_config = session_config
+        # copy-on-write, i.e., the dispatch table is never mutated in place
+        self.__dispatch_table: dict[bytes, MessageHandler] = {}
+        self.__dispatch_table = self.__create_dispatch_table(message_handlers)
+        if (
+            crypto_workers is not None
+            and crypto_workers.encryption_address != private_key.encryption_address
+        ):
+            raise ValueError("crypto workers private key does not match")
+        if (
+            crypto_workers is not None
+            and compression is not None
+            and crypto_workers.compression is None
+        ):
+            raise ValueError("crypto workers were not initialized with compression")
 
         self.__private_key = private_key
-        self.__message_handlers = message_handlers
         self.__executor = executor
+        self.__crypto_workers = crypto_workers
+        self.__metrics = PipelineMetrics()
+        self.__unpack = SecureMessageUnpacker(
+            private_key=private_key,
+            executor=executor,
+            max_batch_size=max_unpack_batch_size,
+            batch_window=unpack_batch_window,
+            crypto_workers=crypto_workers,
+            metrics=self.__metrics,
+        )
+        self.__rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.__replay_filter = replay_filter
+        self.__compression = compression
+        self.__chunked_message_config = (
+            chunked_message_config
+            if chunked_message_config is not None
+            else ChunkedMessageConfig()
+        )
+        # chunked messages that are being received
+        self.__chunked_messages: dict[
+            tuple[SigningAddress, MessageId], ChunkedMessageReader
+        ] = {}
+        # sessions are scoped to the websocket connection
+        self.__sessions: weakref.WeakKeyDictionary[
+            Websocket, Session
+        ] = weakref.WeakKeyDictionary()
         self.__logger = get_logger(self)
 
-    @staticmethod
-    def __validate_message_handlers(message_handlers: list[MessageHandler]):
+    @property
+    def metrics(self) -> PipelineMetrics:
         """
-        Message type IDs across all handlers must be unique
+        :return: PipelineMetrics
         """
-        if len(message_handlers) == 0:
-            raise ValueError("at least 1 MessageHandler must be defined")
+        return self.__metrics
+
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        """
+        :return: RateLimiter, if rate limiting is enabled
+        """
+        return self.__rate_limiter
+
+    @property
+    def replay_filter(self) -> ReplayFilter | None:
+        """
+        :return: ReplayFilter, if replay protection is enabled
+        """
+        return self.__replay_filter
+
+    @property
+    def supported_msg_types(self) -> set[MessageType]:
+        """
+        :return: message types that are currently registered
+        """
+        return {MessageType.from_bytes(msg_type) for msg_type in self.__dispatch_table}
+
+    def register_handler(self, handler: MessageHandler, replace: bool = False):
+        """
+        Registers the message handler at runtime.
 
-        ids: set[ULID] = set()
+        Notes
+        -----
+        - The dispatch table is copy-on-write, i.e., a new table is built and then swapped in. Messages that are
+          being dispatched are not affected, and lookups remain a single dict lookup.
+
+        :param handler: MessageHandler
+        :param replace: if True, then message types that are already registered are remapped to the handler
+        :exception ValueError: if a message type is already registered and `replace` is False
+        """
+        self.__dispatch_table = self.__create_dispatch_table([handler], replace)
+
+    def __create_dispatch_table(
+        self,
+        message_handlers: list[MessageHandler],
+        replace: bool = False,
+    ) -> dict[bytes, MessageHandler]:
+        """
+        Message type IDs across all handlers must be unique
+
+        :return: a copy of the current dispatch table with the message handlers registered
+        """
+        dispatch_table = dict(self.__dispatch_table)
+        registered: set[bytes] = set()
         for handler in message_handlers:
             for msg_type in handler.supported_msg_types():
-                if msg_type in ids:
+                if msg_type == MessageChunk.message_type():
+                    raise ValueError("MessageChunk message type is reserved")
+                if (
+                    self.__session_config is not None
+                    and msg_type == SessionKeyRequest.message_type()
+                ):
+                    raise ValueError(
+                        "SessionKeyRequest message type is reserved when session keys are enabled"
+                    )
+                if msg_type.bytes in registered or (
+                    not replace and msg_type.bytes in dispatch_table
+                ):
                     raise ValueError(
                         f"Message type IDs must be unique. Found duplicate: {msg_type}"
                     )
-                ids.add(msg_type)
+                registered.add(msg_type.bytes)
+                dispatch_table[msg_type.bytes] = handler
+        return dispatch_table
 
-    async def __call__(self, secure_msg: SignedEncryptedMessage, websocket: Websocket):
+    async def __call__(
+        self,
+        secure_msg: SignedEncryptedMessage | SecureMessageFrame,
+        websocket: Websocket,
+    ):
         """
         Workflow
         --------
@@ -196,25 +639,338 @@ class SecureMessageHandler:
         2. decrypt the message
         3. lookup message handler
         4. handle message
+
+        Notes
+        -----
+        - steps 1-2 are run on the executor
+        - the rate limit is checked before step 1 using the cleartext sender. If the client is throttled, then the
+          message is only unpacked to verify it and to correlate the :type:`RequestThrottled` reply.
+        """
+        retry_after = (
+            self.__rate_limiter.retry_after(secure_msg.sender)
+            if self.__rate_limiter is not None
+            else None
+        )
+        ctx = await self.__unpack_context(secure_msg, websocket)
+        if ctx is None or ctx is _REPLAYED:
+            return
+        if retry_after is not None and not self.__is_chunk_continuation(ctx):
+            await self.reply_throttled(ctx, retry_after)
+            return
+
+        if (
+            self.__session_config is not None
+            and ctx.msg_type == SessionKeyRequest.message_type()
+        ):
+            if await self.__check_rate_limit(ctx):
+                await self.__open_session(ctx, websocket)
+            return
+
+        await self.__dispatch(ctx)
+
+    async def __unpack_context(
+        self,
+        secure_msg: SignedEncryptedMessage | SecureMessageFrame,
+        websocket: Websocket,
+    ) -> MessageContext | _Replayed | None:
+        """
+        :return: None if the message is invalid, in which case the websocket is closed, or :data:`_REPLAYED` if the
+            message is a replay, in which case the message is dropped
         """
+        # replays are dropped before doing the expensive crypto work
+        if self.__replay_filter is not None and self.__replay_filter.seen(
+            secure_msg.sender, secure_msg.signature
+        ):
+            return _REPLAYED
+
         try:
-            msg = unpack_secure_message(self.__private_key, secure_msg)
+            msg = await self.__unpack(secure_msg)
         except InvalidSecureMessage as err:
             await websocket.close(code=CloseCode.GOING_AWAY, reason="invalid message")
             self.__logger.exception(err)
-            return
+            return None
+
+        # the message key is only recorded once the signature is verified, i.e., messages with invalid signatures
+        # cannot evict the keys of valid messages
+        if self.__replay_filter is not None and (
+            self.__replay_filter.is_stale(msg.msg_id)
+            or not self.__replay_filter.check(secure_msg.sender, secure_msg.signature)
+        ):
+            return _REPLAYED
 
-        ctx = MessageContext(
+        if isinstance(secure_msg, SecureMessageFrame):
+            client_encryption_address = secure_msg.encryption_sender
+        else:
+            client_encryption_address = secure_msg.encrypted_msg.sender
+
+        return MessageContext(
             server_private_key=self.__private_key,
-            websocket=websocket,
-            client_encryption_address=secure_msg.encrypted_msg.sender,
+            websocket=MeteredWebsocket(websocket, self.__metrics),
+            client_encryption_address=client_encryption_address,
             client_signing_address=secure_msg.sender,
             msg=msg,
             executor=self.__executor,
+            crypto_workers=self.__crypto_workers,
+            # reply using the same frame format that the client used
+            binary_frames=isinstance(secure_msg, SecureMessageFrame),
+            metrics=self.__metrics,
+            compression=self.__reply_compression(msg),
+        )
+
+    async def handle_session_frame(self, frame: bytes, websocket: Websocket):
+        """
+        Handles a message that was encrypted using the session key that was negotiated for the websocket connection.
+
+        Notes
+        -----
+        - Session frames are decrypted on the event loop because symmetric decryption is cheap.
+        - If no session has been negotiated for the websocket, then the websocket is closed.
+        """
+        ctx = self.__open_session_frame(frame, websocket)
+        if ctx is None:
+            await websocket.close(code=CloseCode.GOING_AWAY, reason="invalid message")
+            return
+        if self.__is_session_replay(ctx):
+            return
+
+        await self.__dispatch(ctx)
+
+    async def throttle(self, frame: bytes, websocket: Websocket):
+        """
+        Replies with :type:`RequestThrottled` instead of handling the message.
+
+        Notes
+        -----
+        - The message still needs to be unpacked because the reply is correlated to the request message ID and
+          is sent as a secure message, i.e., the throttled reply costs as much crypto work as a normal reply.
+          Callers should bound the number of throttled replies that are in flight.
+        - The reply is only sent if the message passes signature verification. Otherwise, the websocket is closed.
+        """
+        if frame_kind(frame) == FrameKind.SESSION:
+            ctx = self.__open_session_frame(frame, websocket)
+            if ctx is None:
+                await websocket.close(
+                    code=CloseCode.GOING_AWAY, reason="invalid message"
+                )
+                return
+            if self.__is_session_replay(ctx):
+                return
+        else:
+            unpacked = await self.__unpack_context(
+                parse_secure_message(frame), websocket
+            )
+            if unpacked is None or unpacked is _REPLAYED:
+                return
+            ctx = unpacked
+        if ctx.msg_type == MessageChunk.message_type():
+            # the chunked message cannot be completed
+            chunked_message = self.__chunked_messages.get(
+                (ctx.client_signing_address, ctx.msg_id)
+            )
+            if chunked_message is not None:
+                chunked_message.fail(ChunkedMessageError("chunk was throttled"))
+        await self.reply_throttled(ctx)
+
+    @staticmethod
+    async def reply_throttled(
+        ctx: MessageContext,
+        retry_after: timedelta = timedelta(0),
+    ):
+        """
+        Replies to the request with :type:`RequestThrottled`
+        """
+        await ctx.websocket.send(
+            await ctx.pack_secure_message(
+                ctx.msg_id, RequestThrottled(retry_after=retry_after)
+            )
+        )
+
+    def __open_session_frame(
+        self, frame: bytes, websocket: Websocket
+    ) -> MessageContext | None:
+        """
+        :return: None if no session exists for the websocket or if the frame is invalid
+        """
+        session = self.__sessions.get(websocket)
+        if session is None:
+            self.__logger.error("session frame received, but no session exists")
+            return None
+
+        start = time.perf_counter()
+        try:
+            msg = session.open(frame)
+        except InvalidSecureMessage as err:
+            self.__logger.exception(err)
+            return None
+        self.__metrics.record(PipelineStage.DECRYPT, time.perf_counter() - start)
+
+        return MessageContext(
+            server_private_key=self.__private_key,
+            websocket=MeteredWebsocket(websocket, self.__metrics),
+            client_encryption_address=session.peer_encryption_address,
+            client_signing_address=session.peer_signing_address,
+            msg=msg,
+            executor=self.__executor,
+            crypto_workers=self.__crypto_workers,
+            session=session,
+            metrics=self.__metrics,
+            compression=self.__reply_compression(msg),
+        )
+
+    def __reply_compression(self, msg: Message) -> Compression | None:
+        """
+        :return: compression that is used to reply to the message, if the client accepts the compression codec
+        """
+        if (
+            self.__compression is not None
+            and msg.accepted_compression_codec_id
+            == self.__compression.compressor.codec_id
+        ):
+            return self.__compression
+        return None
+
+    def __is_session_replay(self, ctx: MessageContext) -> bool:
+        """
+        Session frames are not signed, i.e., they are deduped by message ID after they are decrypted.
+        Symmetric decryption is cheap.
+
+        Chunks share the chunked message ID, i.e., chunked messages are deduped when the first chunk is received.
+        """
+        if self.__replay_filter is None:
+            return False
+        if ctx.msg_type == MessageChunk.message_type():
+            return self.__replay_filter.is_stale(ctx.msg_id)
+        return self.__replay_filter.is_stale(
+            ctx.msg_id
+        ) or not self.__replay_filter.check_message_id(
+            ctx.client_signing_address, ctx.msg_id
+        )
+
+    def __is_chunk_continuation(self, ctx: MessageContext) -> bool:
+        """
+        :return: True if the message is a chunk for a chunked message that is being received. Rate limits are
+            applied per chunked message, i.e., when the first chunk is received.
+        """
+        return (
+            ctx.msg_type == MessageChunk.message_type()
+            and (ctx.client_signing_address, ctx.msg_id) in self.__chunked_messages
         )
 
-        handler = self.get_handler(msg.msg_type)
-        await handler(ctx)
+    async def __check_rate_limit(self, ctx: MessageContext) -> bool:
+        """
+        :return: True if the request is allowed. Otherwise, the client is sent a :type:`RequestThrottled` reply.
+        """
+        if self.__rate_limiter is None:
+            return True
+        retry_after = self.__rate_limiter.try_acquire(ctx.client_signing_address)
+        if retry_after is None:
+            return True
+        await self.reply_throttled(ctx, retry_after)
+        return False
+
+    async def __dispatch(self, ctx: MessageContext):
+        if ctx.msg_type == MessageChunk.message_type():
+            await self.__dispatch_chunk(ctx)
+            return
+
+        if not await self.__check_rate_limit(ctx):
+            return
+
+        await self.__handle(ctx)
+
+    async def __dispatch_chunk(self, ctx: MessageContext):
+        """
+        Feeds the chunk to the chunked message reader. If this is the first chunk that is received for the chunked
+        message, then the chunked message is dispatched to the message handler, which runs until it has consumed
+        the chunks.
+
+        Notes
+        -----
+        - Chunks may be received out of order, i.e., the first chunk that is received may not be the chunk with
+          sequence number 0.
+        - Rate limits and replay protection are applied per chunked message.
+        """
+        try:
+            chunk = MessageChunk.unpack(ctx.msg_data)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.__logger.exception(err)
+            await ctx.websocket.close(
+                code=CloseCode.GOING_AWAY, reason="invalid message"
+            )
+            return
+
+        key = (ctx.client_signing_address, ctx.msg_id)
+        chunked_message = self.__chunked_messages.get(key)
+        if chunked_message is not None:
+            await chunked_message.put(chunk)
+            return
+
+        if (
+            self.__replay_filter is not None
+            and not self.__replay_filter.check_message_id(
+                ctx.client_signing_address, ctx.msg_id
+            )
+        ):
+            return
+        if not await self.__check_rate_limit(ctx):
+            return
+
+        chunked_message = ChunkedMessageReader(
+            msg_id=ctx.msg_id,
+            msg_type=chunk.msg_type,
+            max_buffered_chunks=self.__chunked_message_config.max_buffered_chunks,
+            timeout=self.__chunked_message_config.timeout,
+        )
+        self.__chunked_messages[key] = chunked_message
+        try:
+            await chunked_message.put(chunk)
+            ctx.msg = Message(
+                msg_id=ctx.msg_id,
+                msg_type=chunk.msg_type,
+                data=b"",
+                flags=ctx.msg.flags,
+            )
+            ctx.chunks = chunked_message
+            await self.__handle(ctx)
+        finally:
+            chunked_message.close()
+            del self.__chunked_messages[key]
+
+    async def __handle(self, ctx: MessageContext):
+        start = time.perf_counter()
+        handler = self.get_handler(ctx.msg_type)
+        handler_start = time.perf_counter()
+        self.__metrics.record(PipelineStage.LOOKUP, handler_start - start)
+
+        self.__metrics.handling.inc()
+        try:
+            await handler(ctx)
+        finally:
+            self.__metrics.handling.dec()
+            self.__metrics.record_handler(
+                ctx.msg_type if handler is not _UNSUPPORTED_MESSAGE_HANDLER else None,
+                time.perf_counter() - handler_start,
+            )
+
+    def close_session(self, websocket: Websocket):
+        """
+        Discards the session for the websocket connection, if one exists.
+        """
+        self.__sessions.pop(websocket, None)
+
+    async def __open_session(self, ctx: MessageContext, websocket: Websocket):
+        session_key = self.__session_config.create_session_key()  # type: ignore
+        # the reply is sent using the SignedEncryptedMessage format because the session is not yet registered
+        reply = await ctx.pack_secure_message(ctx.msg_id, session_key)
+        # register the session before sending the reply, i.e., the client may send session frames as soon as it
+        # receives the reply
+        self.__sessions[websocket] = Session(
+            session_key=session_key,
+            is_server=True,
+            peer_encryption_address=ctx.client_encryption_address,
+            peer_signing_address=ctx.client_signing_address,
+        )
+        await ctx.websocket.send(reply)
 
     def get_handler(self, msg_type: MessageType) -> MessageHandler:
         """
@@ -226,12 +982,11 @@ class SecureMessageHandler:
           - When there is no handler registered for the message type
           - SecureMessageHandlerError
         """
-        for handler in self.__message_handlers:
-            if msg_type in handler.supported_msg_types():
-                return handler
-
-        self.__logger.error("unsupported message type: %s", msg_type)
-        return _UnsupportedMessageHandler()
+        handler = self.__dispatch_table.get(msg_type.bytes)
+        if handler is None:
+            self.__logger.error("unsupported message type: %s", msg_type)
+            return _UNSUPPORTED_MESSAGE_HANDLER
+        return handler
 
 
 @dataclass(slots=True)
@@ -240,12 +995,20 @@ class SecureMessageWebsocketHandlerMetrics:
 
     success_count: int = 0
     failure_count: int = 0
+    # number of requests that were replied to with RequestThrottled because the connection queue was full
     throttle_count: int = 0
+    # number of requests that were dropped because too many throttled replies were already in flight
+    dropped_count: int = 0
 
     last_msg_recv_timestamp: datetime = datetime.fromtimestamp(0, UTC)
     last_msg_success_timestamp: datetime = datetime.fromtimestamp(0, UTC)
     last_msg_failure_timestamp: datetime = datetime.fromtimestamp(0, UTC)
 
+    # aggregated across all connections
+    outbound: OutboundMetrics = field(default_factory=OutboundMetrics)
+    # includes the current concurrency limit and request queueing delay
+    scheduler: SchedulerMetrics = field(default_factory=SchedulerMetrics)
+
 
 class SecureMessageWebsocketHandler:
     """
@@ -254,6 +1017,11 @@ class SecureMessageWebsocketHandler:
     Notes
     -----
     - Any exception that is raised while processing a message will result in the websocket connection to be closed.
+    - Each connection has its own outbound queue, which is drained by a writer task (see :type:`WebsocketWriter`).
+      Message handlers enqueue replies instead of writing to the websocket directly.
+    - Requests are scheduled fairly across connections (see :type:`RequestScheduler`). The read loop never waits
+      on a request. When a connection's request queue is full, the request is replied to with
+      :type:`RequestThrottled`.
     """
 
     # 1001 indicates the connection was closed (going away)
@@ -263,17 +1031,43 @@ class SecureMessageWebsocketHandler:
         self,
         handler: SecureMessageHandler,
         max_concurrent_requests: int = 1000,
+        max_outbound_queue_size: int = 1000,
+        coalesce_frames: bool = False,
+        max_concurrent_requests_per_connection: int = 100,
+        max_queued_requests_per_connection: int = 1000,
+        concurrency_limit: ConcurrencyLimit | None = None,
     ):
         """
         :param handler: SecureMessageHandler
-        :param max_concurrent_requests: used to limit the number of requests that are processed concurrently.
-            When the max limit is reached, then requests will be throttled.
+        :param max_concurrent_requests: used to limit the number of requests that are processed concurrently
+            across all connections. When the max limit is reached, then requests are queued.
+        :param max_outbound_queue_size: max number of replies that can be queued per connection.
+            When the queue is full, message handlers wait until the writer catches up.
+        :param coalesce_frames: if True, then replies that are queued together are written as a single
+            multi-message frame. Clients must support :attr:`FrameKind.MULTI` frames.
+        :param max_concurrent_requests_per_connection: max number of requests that are processed concurrently
+            per connection. This also caps the number of throttled replies that are in flight per connection.
+        :param max_queued_requests_per_connection: max number of requests that can wait per connection.
+            When the queue is full, requests are replied to with :type:`RequestThrottled`.
+        :param concurrency_limit: overrides `max_concurrent_requests`, e.g., use :type:`GradientLimit` to adapt the
+            limit to the observed handler latency and failures
         """
         self.__handler = handler
-        self.__max_concurrent_requests = max_concurrent_requests
+        self.__max_outbound_queue_size = max_outbound_queue_size
+        self.__coalesce_frames = coalesce_frames
+        self.__max_concurrent_requests_per_connection = (
+            max_concurrent_requests_per_connection
+        )
+        self.__metrics = SecureMessageWebsocketHandlerMetrics()
+        self.__scheduler = RequestScheduler(
+            max_concurrent_requests=max_concurrent_requests,
+            max_concurrent_requests_per_connection=max_concurrent_requests_per_connection,
+            max_queued_requests_per_connection=max_queued_requests_per_connection,
+            concurrency_limit=concurrency_limit,
+            metrics=self.__metrics.scheduler,
+        )
         self.__tasks: set[Task] = set()
 
-        self.__metrics = SecureMessageWebsocketHandlerMetrics()
         self.__logger = get_logger(self)
 
     async def __call__(self, websocket: WebSocketServerProtocol):
@@ -305,76 +1099,99 @@ class SecureMessageWebsocketHandler:
                 self.__metrics.throttle_count,
             )
 
-        async for msg in websocket:
-            if isinstance(msg, bytes):
-                log_msg_recv()
+        def close_on_failure(task: Task, reason: str) -> bool:
+            """
+            :return: True if the task failed, in which case the websocket is closed
+            """
+            task_err = task.exception()
+            if task_err is None:
+                return False
+            close_task = asyncio.create_task(
+                writer.close(code=self.MSG_HANDLER_ERR_CODE, reason=reason)
+            )
+            self.__tasks.add(close_task)
+            close_task.add_done_callback(self.__tasks.discard)
+            log_msg_failure(SecureMessageHandlerError(f"{type(task_err)} : {task_err}"))
+            return True
 
-                try:
-                    secure_msg = SignedEncryptedMessage.unpack(msg)
-                except BaseException as err:
-                    await websocket.close(
-                        code=self.MSG_HANDLER_ERR_CODE, reason="invalid message"
-                    )
-                    err.add_note("SignedEncryptedMessage.unpack(msg) failed")
-                    log_msg_failure(err)
-                    return
+        def on_done(task: Task):
+            if not close_on_failure(task, "message handler failed"):
+                log_msg_success()
 
-                if self.request_task_count < self.__max_concurrent_requests:
-                    # process task concurrently
-                    task = asyncio.create_task(self.__handler(secure_msg, websocket))
-                    self.__tasks.add(task)
+        # throttled replies that are in flight for the connection
+        throttle_tasks: set[Task] = set()
+
+        def on_throttle_done(task: Task):
+            throttle_tasks.discard(task)
+            self.__tasks.discard(task)
+            close_on_failure(task, "throttled reply failed")
+
+        def throttle(msg: bytes):
+            if len(throttle_tasks) >= self.__max_concurrent_requests_per_connection:
+                self.__metrics.dropped_count += 1
+                self.__logger.warning(
+                    "too many throttled replies in flight - dropping request - dropped count = %s",
+                    self.__metrics.dropped_count,
+                )
+                return
+            log_throttled()
+            throttle_task = asyncio.create_task(self.__handler.throttle(msg, writer))
+            throttle_tasks.add(throttle_task)
+            self.__tasks.add(throttle_task)
+            throttle_task.add_done_callback(on_throttle_done)
+
+        writer = WebsocketWriter(
+            websocket,
+            max_queue_size=self.__max_outbound_queue_size,
+            coalesce_frames=self.__coalesce_frames,
+            metrics=self.__metrics.outbound,
+        )
+        writer.start()
+        try:
+            async for msg in websocket:
+                if isinstance(msg, bytes):
+                    log_msg_recv()
 
-                    def on_done(task: Task):
-                        self.__tasks.remove(task)
-                        task_err = task.exception()
-                        if task_err is None:
-                            log_msg_success()
-                        else:
-                            close_task = asyncio.create_task(
-                                websocket.close(
-                                    code=self.MSG_HANDLER_ERR_CODE,
-                                    reason="message handler failed",
-                                )
-                            )
-                            self.__tasks.add(close_task)
-                            close_task.add_done_callback(self.__tasks.remove)
-                            log_msg_failure(
-                                SecureMessageHandlerError(
-                                    f"{type(task_err)} : {task_err}"
-                                )
-                            )
-
-                    task.add_done_callback(on_done)
-                else:
-                    # throttle
-                    log_throttled()
                     try:
-                        await self.__handler(secure_msg, websocket)
-                        log_msg_success()
+                        if frame_kind(msg) == FrameKind.SESSION:
+                            handle = self.__handler.handle_session_frame(msg, writer)
+                        else:
+                            handle = self.__handler(parse_secure_message(msg), writer)
                     except BaseException as err:
-                        await websocket.close(
-                            code=self.MSG_HANDLER_ERR_CODE,
-                            reason="message handler failed",
+                        await writer.close(
+                            code=self.MSG_HANDLER_ERR_CODE, reason="invalid message"
                         )
-                        err.add_note("message handler task failed")
+                        err.add_note("failed to unpack frame")
                         log_msg_failure(err)
                         return
-            else:
-                await websocket.close(
-                    code=self.MSG_HANDLER_ERR_CODE, reason="invalid message"
-                )
-                log_msg_failure(
-                    SecureMessageHandlerError(f"unsupported msg type: {type(msg)}")
-                )
-                return
+
+                    if not self.__scheduler.submit(writer, handle, on_done):
+                        handle.close()
+                        throttle(msg)
+                else:
+                    await writer.close(
+                        code=self.MSG_HANDLER_ERR_CODE, reason="invalid message"
+                    )
+                    log_msg_failure(
+                        SecureMessageHandlerError(f"unsupported msg type: {type(msg)}")
+                    )
+                    return
+        finally:
+            self.__scheduler.close_connection(writer)
+            self.__handler.close_session(writer)
+            await writer.stop()
 
     @property
     def max_concurrent_requests(self) -> int:
-        return self.__max_concurrent_requests
+        return self.__scheduler.max_concurrent_requests
 
     @property
     def request_task_count(self) -> int:
-        return len(self.__tasks)
+        return self.__scheduler.running_count
+
+    @property
+    def queued_request_count(self) -> int:
+        return self.__scheduler.queued_count
 
     @property
     def metrics(self) -> SecureMessageWebsocketHandlerMetrics:
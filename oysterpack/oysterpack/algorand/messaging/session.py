@@ -0,0 +1,428 @@
+"""
+Session key fast path for secure messaging
+
+Every :type:`SignedEncryptedMessage` is signed (Ed25519) and box encrypted (Curve25519), i.e., asymmetric crypto is
+used per message. For chatty connections, the client can negotiate a symmetric session key for the connection:
+
+1. client sends :type:`SessionKeyRequest` as a :type:`SignedEncryptedMessage`
+2. server generates a random session key and replies with :type:`SessionKeyAccepted` as a
+   :type:`SignedEncryptedMessage`, i.e., the session key is signed by the server and encrypted for the client.
+3. both sides then exchange session frames, which are encrypted using :type:`nacl.secret.SecretBox`
+
+Session frame layout: FRAME_MARKER | FrameKind.SESSION | epoch (4 bytes) | counter (8 bytes) | ciphertext
+
+Notes
+-----
+- Each direction uses its own key, which is derived from the session key.
+- Nonces are derived from the (epoch, counter) frame header. Counters are never reused for the same key.
+- Keys are rotated after N messages or T seconds, whichever comes first. The next key is derived from the current key
+  via a one-way hash, i.e., compromising the current key does not expose prior keys. The receiver ratchets forward
+  when it sees a frame for a newer epoch.
+- Replayed frames are rejected via a sliding window per epoch.
+- Clients that do not negotiate a session key continue to use :type:`SignedEncryptedMessage`.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import ClassVar, Self
+
+import msgpack  # type: ignore
+from nacl import utils
+from nacl.encoding import RawEncoder
+from nacl.exceptions import CryptoError
+from nacl.hash import blake2b
+from nacl.secret import SecretBox
+
+from oysterpack.algorand.client.accounts.private_key import (
+    EncryptionAddress,
+    SigningAddress,
+)
+from oysterpack.algorand.messaging.frame import FRAME_MARKER, FrameKind
+from oysterpack.algorand.messaging.secure_message import (
+    InvalidSecureMessage,
+    DecryptionFailed,
+)
+from oysterpack.core.compression import Compression
+from oysterpack.core.message import Serializable, MessageType, Message
+
+_HEADER = bytes((FRAME_MARKER, FrameKind.SESSION))
+_HEADER_SIZE = len(_HEADER) + 4 + 8
+_NONCE_PADDING = bytes(SecretBox.NONCE_SIZE - 12)
+
+# max number of epochs the receiver will ratchet forward for a single frame
+_MAX_EPOCH_SKIP = 16
+# number of counters tracked by the replay window
+_REPLAY_WINDOW_SIZE = 1024
+
+
+class InvalidSessionFrame(InvalidSecureMessage):
+    """
+    Session frame is malformed, stale, or has been replayed
+    """
+
+
+@dataclass(slots=True)
+class SessionKeyRequest(Serializable):
+    """
+    Client request to establish a session key for the connection
+
+    Notes
+    -----
+    - The server decides the key rotation policy.
+    """
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M53524WZCDX9GJDG6WXFPPPA"),
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        """
+        Unpacks the packed bytes into a new instance of Self
+        """
+        return cls()
+
+    def pack(self) -> bytes:
+        """
+        Packs the object into bytes
+        """
+        return msgpack.packb(())
+
+
+@dataclass(slots=True)
+class SessionKeyAccepted(Serializable):
+    """
+    Server reply to :type:`SessionKeyRequest`
+    """
+
+    # 32 byte symmetric key
+    session_key: bytes
+    # key rotation policy
+    rotate_after_msgs: int
+    rotate_after: timedelta
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M53524X1PWMF7EDRESJCTTVH"),
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self):
+        if len(self.session_key) != SecretBox.KEY_SIZE:
+            raise ValueError(f"session key must be {SecretBox.KEY_SIZE} bytes")
+        if self.rotate_after_msgs < 1:
+            raise ValueError("rotate_after_msgs must be >= 1")
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> Self:
+        """
+        Unpacks the packed bytes into a new instance of Self
+        """
+        (session_key, rotate_after_msgs, rotate_after_seconds) = msgpack.unpackb(packed)
+        return cls(
+            session_key=session_key,
+            rotate_after_msgs=rotate_after_msgs,
+            rotate_after=timedelta(seconds=rotate_after_seconds),
+        )
+
+    def pack(self) -> bytes:
+        """
+        Packs the object into bytes
+        """
+        return msgpack.packb(
+            (
+                self.session_key,
+                self.rotate_after_msgs,
+                self.rotate_after.total_seconds(),
+            )
+        )
+
+
+@dataclass(slots=True)
+class SessionConfig:
+    """
+    Session key rotation policy
+    """
+
+    # the key is rotated after this many messages have been sent
+    rotate_after_msgs: int = 100_000
+    # the key is rotated after the key has been used for this long
+    rotate_after: timedelta = timedelta(minutes=10)
+
+    def create_session_key(self) -> SessionKeyAccepted:
+        """
+        Generates a new random session key
+        """
+        return SessionKeyAccepted(
+            session_key=utils.random(SecretBox.KEY_SIZE),
+            rotate_after_msgs=self.rotate_after_msgs,
+            rotate_after=self.rotate_after,
+        )
+
+
+def _derive_key(key: bytes, person: bytes) -> bytes:
+    return blake2b(
+        b"",
+        digest_size=SecretBox.KEY_SIZE,
+        key=key,
+        person=person,
+        encoder=RawEncoder,
+    )
+
+
+def _next_key(key: bytes) -> bytes:
+    return _derive_key(key, b"op.session.next")
+
+
+def _nonce(epoch: int, counter: int) -> bytes:
+    return epoch.to_bytes(4, "big") + counter.to_bytes(8, "big") + _NONCE_PADDING
+
+
+class _SendChannel:
+    """
+    Encrypts outbound frames for one direction
+    """
+
+    def __init__(self, key: bytes, rotate_after_msgs: int, rotate_after: float):
+        self.__key = key
+        self.__box = SecretBox(key)
+        self.__rotate_after_msgs = rotate_after_msgs
+        self.__rotate_after = rotate_after
+        self.__epoch = 0
+        self.__counter = 0
+        self.__epoch_start = time.monotonic()
+
+    @property
+    def epoch(self) -> int:
+        return self.__epoch
+
+    def seal(self, plaintext: bytes) -> bytes:
+        if (
+            self.__counter >= self.__rotate_after_msgs
+            or time.monotonic() - self.__epoch_start >= self.__rotate_after
+        ):
+            self.__rotate()
+
+        header = _HEADER + self.__epoch.to_bytes(4, "big")
+        header += self.__counter.to_bytes(8, "big")
+        ciphertext = self.__box.encrypt(
+            plaintext, _nonce(self.__epoch, self.__counter)
+        ).ciphertext
+        self.__counter += 1
+        return header + ciphertext
+
+    def __rotate(self):
+        self.__key = _next_key(self.__key)
+        self.__box = SecretBox(self.__key)
+        self.__epoch += 1
+        self.__counter = 0
+        self.__epoch_start = time.monotonic()
+
+
+class _ReplayWindow:
+    """
+    Sliding window of counters that have been received, i.e., the same approach used by IPsec
+
+    - bit i of the bitmap corresponds to counter (max_counter - i)
+    """
+
+    __slots__ = ("max_counter", "bitmap")
+
+    def __init__(self):
+        self.max_counter = -1
+        self.bitmap = 0
+
+    def check(self, counter: int) -> bool:
+        """
+        :return: True if the counter has not been seen and is within the window
+        """
+        if counter > self.max_counter:
+            return True
+        offset = self.max_counter - counter
+        if offset >= _REPLAY_WINDOW_SIZE:
+            return False
+        return not (self.bitmap >> offset) & 1
+
+    def update(self, counter: int):
+        if counter > self.max_counter:
+            shift = counter - self.max_counter
+            self.bitmap = ((self.bitmap << shift) | 1) & (
+                (1 << _REPLAY_WINDOW_SIZE) - 1
+            )
+            self.max_counter = counter
+        else:
+            self.bitmap |= 1 << (self.max_counter - counter)
+
+
+class _RecvChannel:
+    """
+    Decrypts inbound frames for one direction
+
+    Frames for the previous epoch are still accepted in order to tolerate frames that were in flight when the sender
+    rotated the key.
+    """
+
+    def __init__(self, key: bytes):
+        self.__key = key
+        self.__box = SecretBox(key)
+        self.__epoch = 0
+        self.__window = _ReplayWindow()
+        self.__prev_box: SecretBox | None = None
+        self.__prev_window: _ReplayWindow | None = None
+
+    @property
+    def epoch(self) -> int:
+        return self.__epoch
+
+    def open(self, frame: bytes) -> bytes:
+        if len(frame) < _HEADER_SIZE or frame[:2] != _HEADER:
+            raise InvalidSessionFrame("invalid session frame header")
+        epoch = int.from_bytes(frame[2:6], "big")
+        counter = int.from_bytes(frame[6:_HEADER_SIZE], "big")
+        ciphertext = frame[_HEADER_SIZE:]
+
+        if epoch == self.__epoch:
+            return self.__open(self.__box, self.__window, epoch, counter, ciphertext)
+
+        if epoch == self.__epoch - 1 and self.__prev_box is not None:
+            return self.__open(
+                self.__prev_box,
+                self.__prev_window,  # type: ignore
+                epoch,
+                counter,
+                ciphertext,
+            )
+
+        if self.__epoch < epoch <= self.__epoch + _MAX_EPOCH_SKIP:
+            prev_key, key = self.__key, self.__key
+            for _ in range(epoch - self.__epoch):
+                prev_key, key = key, _next_key(key)
+            box = SecretBox(key)
+            window = _ReplayWindow()
+            plaintext = self.__open(box, window, epoch, counter, ciphertext)
+
+            # ratchet forward only after the frame has been authenticated
+            if epoch == self.__epoch + 1:
+                self.__prev_box, self.__prev_window = self.__box, self.__window
+            else:
+                self.__prev_box, self.__prev_window = (
+                    SecretBox(prev_key),
+                    _ReplayWindow(),
+                )
+            self.__key, self.__box, self.__window = key, box, window
+            self.__epoch = epoch
+            return plaintext
+
+        raise InvalidSessionFrame(f"invalid session frame epoch: {epoch}")
+
+    @staticmethod
+    def __open(
+        box: SecretBox,
+        window: _ReplayWindow,
+        epoch: int,
+        counter: int,
+        ciphertext: bytes,
+    ) -> bytes:
+        if not window.check(counter):
+            raise InvalidSessionFrame("session frame has been replayed")
+        try:
+            plaintext = box.decrypt(ciphertext, _nonce(epoch, counter))
+        except CryptoError as err:
+            raise DecryptionFailed() from err
+        window.update(counter)
+        return plaintext
+
+
+class Session:
+    """
+    Symmetric session established between a client and server for a single connection.
+
+    Notes
+    -----
+    - Sessions are not thread safe, i.e., they are designed to be used from the event loop.
+    - Encryption and decryption are fast enough to be run on the event loop, i.e., no executor round trip.
+    """
+
+    def __init__(
+        self,
+        session_key: SessionKeyAccepted,
+        is_server: bool,
+        peer_encryption_address: EncryptionAddress,
+        peer_signing_address: SigningAddress,
+    ):
+        """
+        :param session_key: negotiated session key and key rotation policy
+        :param is_server: each direction uses its own key
+        :param peer_encryption_address: the other side of the session
+        :param peer_signing_address: the other side of the session
+        """
+        client_key = _derive_key(session_key.session_key, b"op.session.c2s")
+        server_key = _derive_key(session_key.session_key, b"op.session.s2c")
+        send_key, recv_key = (
+            (server_key, client_key) if is_server else (client_key, server_key)
+        )
+        self.__send = _SendChannel(
+            send_key,
+            session_key.rotate_after_msgs,
+            session_key.rotate_after.total_seconds(),
+        )
+        self.__recv = _RecvChannel(recv_key)
+        self.__peer_encryption_address = peer_encryption_address
+        self.__peer_signing_address = peer_signing_address
+
+    @property
+    def peer_encryption_address(self) -> EncryptionAddress:
+        return self.__peer_encryption_address
+
+    @property
+    def peer_signing_address(self) -> SigningAddress:
+        return self.__peer_signing_address
+
+    @property
+    def send_epoch(self) -> int:
+        """
+        :return: number of times the send key has been rotated
+        """
+        return self.__send.epoch
+
+    @property
+    def recv_epoch(self) -> int:
+        """
+        :return: number of times the receive key has been rotated
+        """
+        return self.__recv.epoch
+
+    def seal(self, msg: Message, compression: Compression | None = None) -> bytes:
+        """
+        :param compression: if specified, then the message is compressed before it is encrypted
+        :return: session frame
+        """
+        if compression is not None:
+            msg = msg.compress(compression)
+        return self.__send.seal(msg.pack())
+
+    def open(self, frame: bytes) -> Message:
+        """
+        :exception InvalidSecureMessage: if the frame fails to be decrypted, unpacked, or decompressed
+        """
+        plaintext = self.__recv.open(frame)
+        try:
+            msg = Message.unpack(plaintext)
+        except Exception as err:
+            raise InvalidSecureMessage("failed to unpack Message") from err
+        try:
+            return msg.decompress()
+        except ValueError as err:
+            raise InvalidSecureMessage(
+                "failed to decompress Message", msg_id=msg.msg_id
+            ) from err
@@ -0,0 +1,269 @@
+"""
+Per-connection outbound queue for websocket writes
+"""
+import asyncio
+import time
+from asyncio import Task
+from dataclasses import dataclass
+from typing import Iterable, AsyncIterable, Final, TypeGuard
+
+from oysterpack.algorand.messaging.frame import pack_multi_frame
+from oysterpack.algorand.messaging.websocket import Websocket, Data
+from oysterpack.core.logging import get_logger
+
+_Message = Data | bytearray | Iterable[Data] | AsyncIterable[Data]
+
+# signals the writer task to stop once the queue has been drained
+_STOP: Final = object()
+
+
+@dataclass(slots=True)
+class OutboundMetrics:
+    """
+    Outbound websocket write metrics
+
+    Notes
+    -----
+    - queue latency is measured from when the frame was enqueued to when the frame is written
+    - write latency is measured per websocket write, i.e., a coalesced frame counts as a single write
+    """
+
+    frames_enqueued: int = 0
+    frames_sent: int = 0
+    # number of frames that failed to be written
+    frames_dropped: int = 0
+    # number of websocket writes
+    writes: int = 0
+    # number of times a producer had to wait because the queue was full
+    backpressure_count: int = 0
+
+    total_write_latency: float = 0.0
+    max_write_latency: float = 0.0
+    total_queue_latency: float = 0.0
+    max_queue_latency: float = 0.0
+
+    @property
+    def avg_write_latency(self) -> float:
+        """
+        :return: average write latency in seconds
+        """
+        return self.total_write_latency / self.writes if self.writes else 0.0
+
+    @property
+    def avg_queue_latency(self) -> float:
+        """
+        :return: average time in seconds that frames spent queued
+        """
+        sent = self.frames_sent + self.frames_dropped
+        return self.total_queue_latency / sent if sent else 0.0
+
+
+class WebsocketWriter(Websocket):
+    """
+    Wraps a websocket connection with an outbound queue that is drained by a single writer task.
+
+    Concurrent message handlers on the same connection enqueue frames instead of writing to the websocket directly.
+    If coalescing is enabled, then binary frames that are queued together are written as a single
+    :attr:`FrameKind.MULTI` frame, i.e., fewer websocket writes and drain waits.
+
+    Notes
+    -----
+    - When the queue is full, :meth:`send` blocks until the writer catches up, i.e., backpressure is applied to the
+      producers.
+    - Frames are written in the order they were enqueued.
+    - Write failures are logged and the frames are dropped. Producers are not notified because the write happens
+      after :meth:`send` returns.
+    - Once the writer is stopping, :meth:`send` no longer enqueues frames. It writes to the websocket directly once
+      the queued frames have been written, i.e., frames are not lost and are written in order.
+    - Peers must support :attr:`FrameKind.MULTI` frames when coalescing is enabled.
+    """
+
+    def __init__(
+        self,
+        websocket: Websocket,
+        max_queue_size: int = 1000,
+        coalesce_frames: bool = False,
+        max_coalesced_frames: int = 64,
+        max_coalesced_bytes: int = 1024 * 1024,
+        metrics: OutboundMetrics | None = None,
+    ):
+        """
+        :param websocket: underlying websocket connection
+        :param max_queue_size: max number of frames that can be queued before producers are blocked
+        :param coalesce_frames: if True, then queued binary frames are coalesced into a single MULTI frame
+        :param max_coalesced_frames: max number of frames per MULTI frame
+        :param max_coalesced_bytes: max number of payload bytes per MULTI frame.
+            A single frame that exceeds the limit is written on its own.
+        :param metrics: may be shared across connections
+        """
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be >= 1")
+        if max_coalesced_frames < 1:
+            raise ValueError("max_coalesced_frames must be >= 1")
+
+        self.__websocket = websocket
+        self.__coalesce_frames = coalesce_frames
+        self.__max_coalesced_frames = max_coalesced_frames
+        self.__max_coalesced_bytes = max_coalesced_bytes
+        self.__metrics = metrics if metrics is not None else OutboundMetrics()
+        # (message, enqueued timestamp)
+        self.__queue: asyncio.Queue[tuple[_Message, float] | object] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self.__writer: Task | None = None
+        # set once stop has begun, i.e., new frames are no longer enqueued
+        self.__stopping = False
+        self.__logger = get_logger(self)
+
+    @property
+    def websocket(self) -> Websocket:
+        """
+        :return: underlying websocket connection
+        """
+        return self.__websocket
+
+    @property
+    def metrics(self) -> OutboundMetrics:
+        """
+        :return: OutboundMetrics
+        """
+        return self.__metrics
+
+    @property
+    def queue_size(self) -> int:
+        """
+        :return: number of frames that are waiting to be written
+        """
+        return self.__queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        """
+        :return: True if the writer task is running
+        """
+        return self.__writer is not None and not self.__writer.done()
+
+    def start(self):
+        """
+        Starts the writer task
+        """
+        if self.__writer is None:
+            self.__writer = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """
+        Stops the writer task once the queued frames have been written
+        """
+        if not self.running or self.__stopping:
+            return
+        self.__stopping = True
+        await self.__queue.put(_STOP)
+        await asyncio.wait({self.__writer})  # type: ignore
+        # frames from producers that were waiting for room in the queue when stop began
+        await self.__drain()
+
+    async def recv(self) -> Data:
+        return await self.__websocket.recv()
+
+    async def send(self, message: _Message) -> None:  # type: ignore[override]
+        """
+        Enqueues the message to be written by the writer task.
+
+        If the queue is full, then the caller waits until there is room in the queue.
+
+        Once stop has begun, the message is written directly, after the queued frames have been written.
+        """
+        if self.__stopping and self.__writer is not None:
+            await asyncio.wait({self.__writer})
+        if self.__stopping or not self.running:
+            await self.__websocket.send(message)  # type: ignore
+            return
+
+        if self.__queue.full():
+            self.__metrics.backpressure_count += 1
+        await self.__queue.put((message, time.perf_counter()))
+        self.__metrics.frames_enqueued += 1
+        if not self.running:
+            # the writer stopped while the caller was waiting for room in the queue
+            await self.__drain()
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """
+        Writes the queued frames and then closes the websocket
+        """
+        await self.stop()
+        await self.__websocket.close(code=code, reason=reason)
+
+    async def __drain(self):
+        """
+        Writes the frames that were enqueued after the writer task stopped
+        """
+        while not self.__queue.empty():
+            item = self.__queue.get_nowait()
+            if item is not _STOP:
+                await self.__write([item])  # type: ignore
+
+    def __coalescable(self, message: _Message) -> TypeGuard[bytes | bytearray]:
+        return self.__coalesce_frames and isinstance(message, (bytes, bytearray))
+
+    async def __run(self):
+        # item that was dequeued, but could not be coalesced into the previous batch
+        carry: tuple[_Message, float] | object | None = None
+        while True:
+            item = carry if carry is not None else await self.__queue.get()
+            carry = None
+            if item is _STOP:
+                return
+
+            batch = [item]
+            message, _enqueued = item  # type: ignore
+            if self.__coalescable(message):
+                size = len(message)
+                while (
+                    len(batch) < self.__max_coalesced_frames
+                    and not self.__queue.empty()
+                ):
+                    next_item = self.__queue.get_nowait()
+                    if next_item is _STOP:
+                        carry = next_item
+                        break
+                    next_message, _enqueued = next_item  # type: ignore
+                    if (
+                        not self.__coalescable(next_message)
+                        or size + len(next_message) > self.__max_coalesced_bytes
+                    ):
+                        carry = next_item
+                        break
+                    batch.append(next_item)
+                    size += len(next_message)
+
+            await self.__write(batch)  # type: ignore
+
+    async def __write(self, batch: list[tuple[_Message, float]]):
+        if len(batch) == 1:
+            message = batch[0][0]
+        else:
+            message = pack_multi_frame([frame for frame, _enqueued in batch])  # type: ignore
+
+        start = time.perf_counter()
+        try:
+            await self.__websocket.send(message)  # type: ignore
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            self.__metrics.frames_dropped += len(batch)
+            self.__logger.error("failed to write %s frame(s): %s", len(batch), err)
+        else:
+            self.__metrics.frames_sent += len(batch)
+        finally:
+            end = time.perf_counter()
+            write_latency = end - start
+            self.__metrics.writes += 1
+            self.__metrics.total_write_latency += write_latency
+            self.__metrics.max_write_latency = max(
+                self.__metrics.max_write_latency, write_latency
+            )
+            for _message, enqueued in batch:
+                queue_latency = start - enqueued
+                self.__metrics.total_queue_latency += queue_latency
+                self.__metrics.max_queue_latency = max(
+                    self.__metrics.max_queue_latency, queue_latency
+                )
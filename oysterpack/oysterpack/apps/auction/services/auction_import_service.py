@@ -1,9 +1,14 @@
 """
 Provides service that polls Algorand to discover new Auctions to import into the database
 """
+import asyncio
+from concurrent.futures import Executor
 from datetime import timedelta
-from threading import Thread
+from functools import partial
+from logging import Logger
+from threading import Thread, Event
 from time import sleep
+from typing import Callable
 
 from reactivex import Observable, Subject
 from reactivex.operators import observe_on
@@ -16,6 +21,7 @@ from oysterpack.apps.auction.commands.data.queries.get_auction_managers import (
     GetRegisteredAuctionManagers,
 )
 from oysterpack.apps.auction.domain.auction import Auction
+from oysterpack.core.async_service import AsyncService
 from oysterpack.core.logging import get_logger
 from oysterpack.core.rx import default_scheduler
 from oysterpack.core.service import Service, ServiceCommand
@@ -59,25 +65,15 @@ class AuctionImportService(Service):
         def run():
             logger.info("running")
             while not self._stopped_event.is_set():
-                auction_managers = self._get_auction_managers()
-
-                for auction_manager in auction_managers:
-                    request = ImportAuctionsRequest(
-                        auction_manager_app_id=auction_manager.app_id
-                    )
-                    auctions = self._import_auctions(request)
-                    logger.info(
-                        "[%s] auction import count = %s",
-                        auction_manager.app_id,
-                        len(auctions),
-                    )
-                    if len(auctions) > 0:
-                        self._subject.on_next(auctions)
-                    else:
-                        if self._stopped_event.is_set():
-                            logger.info("stop signalled - exiting")
-                            return
-                sleep(self._poll_interval.seconds)
+                _import_new_auctions(
+                    import_auctions=self._import_auctions,
+                    get_auction_managers=self._get_auction_managers,
+                    subject=self._subject,
+                    stopped=self._stopped_event.is_set,
+                    logger=logger,
+                )
+                if not self._stopped_event.is_set():
+                    sleep(self._poll_interval.seconds)
 
             logger.info("stop signalled - exiting")
 
@@ -91,3 +87,100 @@ class AuctionImportService(Service):
         # no additional shutdown work is required
         # the background worker thread created during startup is monitoring the `_stopped_event` to exit
         pass
+
+
+class AsyncAuctionImportService(AsyncService):
+    """
+    Asyncio variant of :type:`AuctionImportService`, which polls on the event loop instead of a dedicated thread.
+
+    Notes
+    -----
+    - The blocking import is run on the executor, i.e., the service only holds a thread while it is importing.
+      If no executor is specified, then the event loop default executor is used.
+    - If an import fails, then the error is logged and the import is retried after `poll_interval`.
+    """
+
+    def __init__(
+        self,
+        import_auctions: ImportAuctions,
+        get_auction_managers: GetRegisteredAuctionManagers,
+        poll_interval: timedelta = timedelta(seconds=3),
+        executor: Executor | None = None,
+    ):
+        super().__init__()
+
+        self.__import_auctions = import_auctions
+        self.__get_auction_managers = get_auction_managers
+        self.__poll_interval = poll_interval
+        self.__executor = executor
+        self.__stop_event = Event()
+        self.__poll_task: asyncio.Task | None = None
+
+        self.__subject: Subject[list[Auction]] = Subject()
+        self.__observable: Observable[list[Auction]] = self.__subject.pipe(
+            observe_on(default_scheduler)
+        )
+
+    @property
+    def imported_auctions_observable(self) -> Observable[list[Auction]]:
+        """
+        Imported auctions are published to this stream
+        """
+        return self.__observable
+
+    async def __run(self):
+        logger = get_logger(self)
+        logger.info("running")
+        loop = asyncio.get_running_loop()
+        while not self.__stop_event.is_set():
+            try:
+                await loop.run_in_executor(
+                    self.__executor,
+                    partial(
+                        _import_new_auctions,
+                        import_auctions=self.__import_auctions,
+                        get_auction_managers=self.__get_auction_managers,
+                        subject=self.__subject,
+                        stopped=self.__stop_event.is_set,
+                        logger=logger,
+                    ),
+                )
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                logger.error("auction import failed: %s", err)
+            await asyncio.sleep(self.__poll_interval.total_seconds())
+
+    async def _start(self):
+        self.__stop_event.clear()
+        self.__poll_task = asyncio.create_task(self.__run())
+
+    async def _stop(self):
+        # signals an import that is running on the executor to exit early
+        self.__stop_event.set()
+        if self.__poll_task is not None:
+            self.__poll_task.cancel()
+            self.__poll_task = None
+
+
+def _import_new_auctions(
+    import_auctions: ImportAuctions,
+    get_auction_managers: GetRegisteredAuctionManagers,
+    subject: Subject[list[Auction]],
+    stopped: Callable[[], bool],
+    logger: Logger,
+):
+    """
+    Imports new auctions for each registered AuctionManager, and publishes the imported auctions.
+    """
+    for auction_manager in get_auction_managers():
+        request = ImportAuctionsRequest(auction_manager_app_id=auction_manager.app_id)
+        auctions = import_auctions(request)
+        logger.info(
+            "[%s] auction import count = %s",
+            auction_manager.app_id,
+            len(auctions),
+        )
+        if len(auctions) > 0:
+            subject.on_next(auctions)
+        elif stopped():
+            logger.info("stop signalled - exiting")
+            return
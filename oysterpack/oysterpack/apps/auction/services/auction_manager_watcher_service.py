@@ -1,11 +1,14 @@
 """
 Polls Algorand for AuctionManager related transactions that create and delete auctions.
 """
+import asyncio
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import timedelta
-from threading import Thread
+from logging import Logger
+from threading import Thread, Event
 from time import sleep
-from typing import Iterable, Tuple
+from typing import Iterable, Tuple, Callable
 
 from reactivex import Observable, Subject
 from reactivex.operators import observe_on
@@ -17,7 +20,6 @@ from oysterpack.apps.auction.commands.auction_algorand_search.search_auction_man
     AuctionManagerEvent,
     SearchAuctionManagerEventsRequest,
     Transaction,
-    SearchAuctionManagerEventsResult,
 )
 from oysterpack.apps.auction.commands.data.algorand_sync.refresh_auctions import (
     RefreshAuctions,
@@ -30,6 +32,7 @@ from oysterpack.apps.auction.domain.auction import AuctionManagerAppId, AuctionA
 from oysterpack.apps.auction.domain.service_state import (
     SearchAuctionManagerEventsServiceState,
 )
+from oysterpack.core.async_service import AsyncService
 from oysterpack.core.logging import get_logger
 from oysterpack.core.rx import default_scheduler
 from oysterpack.core.service import Service, ServiceCommand
@@ -49,6 +52,148 @@ class AuctionManagerWatcherServiceEvent:
     auction_txns: dict[AuctionAppId, Transaction]
 
 
+class _AuctionManagerWatcher:
+    """
+    Runs the AuctionManager event searches, which are shared by the threaded and asyncio watcher services.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        service_name: str,
+        session_factory: sessionmaker,
+        get_registered_auction_managers: GetRegisteredAuctionManagers,
+        search_auction_manager_events: SearchAuctionManagerEvents,
+        refresh_auctions: RefreshAuctions,
+        events_watched: Iterable[AuctionManagerEvent],
+        batch_size: int,
+        subject: Subject[AuctionManagerWatcherServiceEvent],
+    ):
+        self.service_name = service_name
+        self.session_factory = session_factory
+        self.get_registered_auction_managers = get_registered_auction_managers
+        self.search_auction_manager_events = search_auction_manager_events
+        self.refresh_auctions = refresh_auctions
+        self.events_watched = set(events_watched)
+        self.batch_size = batch_size
+        self.subject = subject
+
+        if len(self.events_watched) == 0:
+            raise ValueError("at least 1 AuctionManagerEvent is required")
+
+    def poll(self, stopped: Callable[[], bool], logger: Logger) -> bool:
+        """
+        For each registered AuctionManager:
+        1. Search for Auctions that have been created and deleted since the last search.
+        2. Retrieve SearchAuctionManagerEvents request params from the database to continue from the last search.
+        3. Process each Auction create/delete event by importing/deleting the auctions in the database.
+        4. Save the search result next-token and the confirmed round for the event transaction.
+        5. Publish events (AuctionManagerWatcherServiceEvent) on the Observable stream
+
+        :param stopped: checked before each search, i.e., used to exit early when the service is stopped
+        :return: True if there are more search results, i.e., the next poll should run without waiting
+        """
+        has_more_results = False
+        for registered_auction_manager in self.get_registered_auction_managers():
+            for event in self.events_watched:
+                if stopped():
+                    logger.info("stop signalled - exiting")
+                    return False
+
+                min_round, next_token = self.get_request_params(
+                    registered_auction_manager.app_id, event
+                )
+                result = self.search_auction_manager_events(
+                    SearchAuctionManagerEventsRequest(
+                        auction_manager_app_id=registered_auction_manager.app_id,
+                        event=event,
+                        min_round=min_round,
+                        next_token=next_token,
+                        limit=self.batch_size,
+                    )
+                )
+
+                if not has_more_results:
+                    has_more_results = result.next_token is not None
+
+                logger.debug(
+                    "has_more_results=%s, request(event=%s, min_round=%s, next_token=%s), "
+                    "result(next_token=%s, max_confirmed_round=%s)",
+                    has_more_results,
+                    event.name,
+                    min_round,
+                    next_token,
+                    result.next_token,
+                    result.max_confirmed_round,
+                )
+
+                if result.auction_txns and len(result.auction_txns) > 0:
+                    self.refresh_auctions(list(result.auction_txns.keys()))
+                    self.subject.on_next(
+                        AuctionManagerWatcherServiceEvent(
+                            registered_auction_manager.app_id,
+                            event,
+                            result.auction_txns,
+                        )
+                    )
+                    self.save_state(
+                        SearchAuctionManagerEventsServiceState(
+                            service_name=self.service_name,
+                            auction_manager_app_id=registered_auction_manager.app_id,
+                            event=result.event,
+                            min_round=result.max_confirmed_round,
+                            next_token=result.next_token,
+                        )
+                    )
+        return has_more_results
+
+    def get_request_params(
+        self,
+        auction_manager_app_id: AuctionManagerAppId,
+        event: AuctionManagerEvent,
+    ) -> Tuple[MinRound, NextToken]:
+        """
+        :return: search params to continue from the last search
+        """
+        state = self.get_state(auction_manager_app_id)
+        return (
+            (state[event].min_round, state[event].next_token)
+            if event in state
+            else (None, None)
+        )
+
+    def get_state(
+        self,
+        auction_manager_app_id: AuctionManagerAppId,
+    ) -> dict[AuctionManagerEvent, SearchAuctionManagerEventsServiceState]:
+        """
+        Looks up service state in the database
+        """
+        query = select(TSearchAuctionManagerEvents).where(
+            TSearchAuctionManagerEvents.auction_manager_app_id == auction_manager_app_id
+        )
+        with self.session_factory() as session:
+            query_results = session.scalars(query)
+            return {state.event: state.to_domain_object() for state in query_results}
+
+    def save_state(self, state: SearchAuctionManagerEventsServiceState):
+        """
+        Store service state in the database
+        """
+        with self.session_factory.begin() as session:
+            existing_state: TSearchAuctionManagerEvents | None = session.get(
+                TSearchAuctionManagerEvents,
+                (self.service_name, state.auction_manager_app_id, state.event),
+            )
+
+            if existing_state:
+                existing_state.next_token = state.next_token
+                existing_state.min_round = state.min_round
+            else:
+                session.add(TSearchAuctionManagerEvents.create(state))
+
+
 class AuctionManagerWatcherService(Service):
     """
     Monitors Algorand for auctions that are created or deleted for registered auction managers, and then:
@@ -63,8 +208,6 @@ class AuctionManagerWatcherService(Service):
       can be configured to only monitor Algorand for transactions that delete auctions.
     """
 
-    # pylint: disable=too-many-instance-attributes
-
     def __init__(  # pylint: disable=too-many-arguments
         self,
         session_factory: sessionmaker,
@@ -81,16 +224,7 @@ class AuctionManagerWatcherService(Service):
     ):
         super().__init__(commands)
 
-        self._session_factory = session_factory
-        self._get_registered_auction_managers = get_registered_auction_managers
-        self._search_auction_manager_events = search_auction_manager_events
-        self._refresh_auctions = refresh_auctions
         self._poll_interval = poll_interval
-        self._events_watched = set(events_watched)
-        self._batch_size = batch_size
-
-        if len(self._events_watched) == 0:
-            raise ValueError("at least 1 AuctionManagerEvent is required")
 
         # init observable
         self._subject: Subject[AuctionManagerWatcherServiceEvent] = Subject()
@@ -98,12 +232,23 @@ class AuctionManagerWatcherService(Service):
             AuctionManagerWatcherServiceEvent
         ] = self._subject.pipe(observe_on(default_scheduler))
 
+        self._watcher = _AuctionManagerWatcher(
+            service_name=self.name,
+            session_factory=session_factory,
+            get_registered_auction_managers=get_registered_auction_managers,
+            search_auction_manager_events=search_auction_manager_events,
+            refresh_auctions=refresh_auctions,
+            events_watched=events_watched,
+            batch_size=batch_size,
+            subject=self._subject,
+        )
+
     @property
     def events_watched(self) -> list[AuctionManagerEvent]:
         """
         :return: list[AuctionManagerEvent] that are being watched for`
         """
-        return list(self._events_watched)
+        return list(self._watcher.events_watched)
 
     @property
     def observable(self) -> Observable[AuctionManagerWatcherServiceEvent]:
@@ -113,122 +258,14 @@ class AuctionManagerWatcherService(Service):
         return self._observable
 
     def _start(self):
-        """
-        For each registered AuctionManager:
-        1. Search for Auctions that have been created and deleted since the last search.
-        2. Retrieve SearchAuctionManagerEvents request params from the database to continue from the last search.
-        3. Process each Auction create/delete event by importing/deleting the auctions in the database.
-        4. Save the search result next-token and the confirmed round for the event transaction.
-        5. Publish events (AuctionManagerWatcherServiceEvent) on the Observable stream
-        """
-
         logger = get_logger(self)
 
-        def get_request_params(
-            auction_manager_app_id: AuctionManagerAppId,
-            event: AuctionManagerEvent,
-        ) -> Tuple[MinRound, NextToken]:
-            state = self.get_state(auction_manager_app_id)
-            return (
-                (state[event].min_round, state[event].next_token)
-                if event in state
-                else (None, None)
-            )
-
-        def search_auction_manager_events(
-            auction_manager_app_id: AuctionManagerAppId,
-            event: AuctionManagerEvent,
-            min_round: MinRound,
-            next_token: NextToken,
-        ) -> SearchAuctionManagerEventsResult:
-            return self._search_auction_manager_events(
-                SearchAuctionManagerEventsRequest(
-                    auction_manager_app_id=auction_manager_app_id,
-                    event=event,
-                    min_round=min_round,
-                    next_token=next_token,
-                    limit=self._batch_size,
-                )
-            )
-
-        def publish_event(
-            auction_manager_app_id: AuctionManagerAppId,
-            event: AuctionManagerEvent,
-            auction_txns: dict[AuctionAppId, Transaction],
-        ):
-            self._subject.on_next(
-                AuctionManagerWatcherServiceEvent(
-                    auction_manager_app_id,
-                    event,
-                    auction_txns,
-                )
-            )
-
-        def save_search_params(
-            auction_manager_app_id: AuctionManagerAppId,
-            search_result: SearchAuctionManagerEventsResult,
-        ):
-            self._save_state(
-                SearchAuctionManagerEventsServiceState(
-                    service_name=self.name,
-                    auction_manager_app_id=auction_manager_app_id,
-                    event=search_result.event,
-                    min_round=search_result.max_confirmed_round,
-                    next_token=search_result.next_token,
-                )
-            )
-
         def run() -> None:
             logger.info("running")
             while not self._stopped_event.is_set():
-                has_more_results = False
-                for (
-                    registered_auction_manager
-                ) in self._get_registered_auction_managers():
-                    for event in self._events_watched:
-                        if self._stopped_event.is_set():
-                            logger.info("stop signalled - exiting")
-                            return
-
-                        min_round, next_token = get_request_params(
-                            registered_auction_manager.app_id, event
-                        )
-                        result = search_auction_manager_events(
-                            auction_manager_app_id=registered_auction_manager.app_id,
-                            event=event,
-                            min_round=min_round,
-                            next_token=next_token,
-                        )
-
-                        if not has_more_results:
-                            has_more_results = result.next_token is not None
-
-                        logger.debug(
-                            "has_more_results=%s, request(event=%s, min_round=%s, next_token=%s), "
-                            "result(next_token=%s, max_confirmed_round=%s)",
-                            has_more_results,
-                            event.name,
-                            min_round,
-                            next_token,
-                            result.next_token,
-                            result.max_confirmed_round,
-                        )
-
-                        if result.auction_txns and len(result.auction_txns) > 0:
-                            self._refresh_auctions(list(result.auction_txns.keys()))
-                            publish_event(
-                                registered_auction_manager.app_id,
-                                event,
-                                result.auction_txns,
-                            )
-                            save_search_params(
-                                auction_manager_app_id=registered_auction_manager.app_id,
-                                search_result=result,
-                            )
-
-                    if not has_more_results:
-                        logger.debug("sleeping")
-                        sleep(self._poll_interval.seconds)
+                if not self._watcher.poll(self._stopped_event.is_set, logger):
+                    logger.debug("sleeping")
+                    sleep(self._poll_interval.seconds)
 
             logger.info("stop signalled - exiting")
 
@@ -241,30 +278,120 @@ class AuctionManagerWatcherService(Service):
         """
         Looks up service state in the database
         """
-        query = select(TSearchAuctionManagerEvents).where(
-            TSearchAuctionManagerEvents.auction_manager_app_id == auction_manager_app_id
-        )
-        with self._session_factory() as session:
-            query_results = session.scalars(query)
-            return {state.event: state.to_domain_object() for state in query_results}
+        return self._watcher.get_state(auction_manager_app_id)
 
     def _save_state(self, state: SearchAuctionManagerEventsServiceState):
         """
         Store service state in the database
         """
-        with self._session_factory.begin() as session:
-            existing_state: TSearchAuctionManagerEvents | None = session.get(
-                TSearchAuctionManagerEvents,
-                (self.name, state.auction_manager_app_id, state.event),
-            )
-
-            if existing_state:
-                existing_state.next_token = state.next_token
-                existing_state.min_round = state.min_round
-            else:
-                session.add(TSearchAuctionManagerEvents.create(state))
+        self._watcher.save_state(state)
 
     def _stop(self):
         # no additional shutdown work is required
         # the background worker thread created during startup is monitoring the `_stopped_event` to exit
         pass
+
+
+class AsyncAuctionManagerWatcherService(AsyncService):
+    """
+    Asyncio variant of :type:`AuctionManagerWatcherService`, which polls on the event loop instead of a dedicated
+    thread.
+
+    Notes
+    -----
+    - Each polling round is run on the executor, i.e., the service only holds a thread while it is searching.
+      If no executor is specified, then the event loop default executor is used.
+    - If a polling round fails, then the error is logged and the round is retried after `poll_interval`.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        session_factory: sessionmaker,
+        get_registered_auction_managers: GetRegisteredAuctionManagers,
+        search_auction_manager_events: SearchAuctionManagerEvents,
+        refresh_auctions: RefreshAuctions,
+        poll_interval: timedelta = timedelta(seconds=3),
+        events_watched: Iterable[AuctionManagerEvent] = (
+            AuctionManagerEvent.AUCTION_DELETED,
+            AuctionManagerEvent.AUCTION_CREATED,
+        ),
+        batch_size: int = 100,
+        executor: Executor | None = None,
+    ):
+        super().__init__()
+
+        self.__poll_interval = poll_interval
+        self.__executor = executor
+        self.__stop_event = Event()
+        self.__poll_task: asyncio.Task | None = None
+
+        self.__subject: Subject[AuctionManagerWatcherServiceEvent] = Subject()
+        self.__observable: Observable[
+            AuctionManagerWatcherServiceEvent
+        ] = self.__subject.pipe(observe_on(default_scheduler))
+
+        self.__watcher = _AuctionManagerWatcher(
+            service_name=self.name,
+            session_factory=session_factory,
+            get_registered_auction_managers=get_registered_auction_managers,
+            search_auction_manager_events=search_auction_manager_events,
+            refresh_auctions=refresh_auctions,
+            events_watched=events_watched,
+            batch_size=batch_size,
+            subject=self.__subject,
+        )
+
+    @property
+    def events_watched(self) -> list[AuctionManagerEvent]:
+        """
+        :return: list[AuctionManagerEvent] that are being watched for`
+        """
+        return list(self.__watcher.events_watched)
+
+    @property
+    def observable(self) -> Observable[AuctionManagerWatcherServiceEvent]:
+        """
+        :return: Observable[AuctionManagerWatcherServiceEvent]
+        """
+        return self.__observable
+
+    async def get_state(
+        self,
+        auction_manager_app_id: AuctionManagerAppId,
+    ) -> dict[AuctionManagerEvent, SearchAuctionManagerEventsServiceState]:
+        """
+        Looks up service state in the database
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, self.__watcher.get_state, auction_manager_app_id
+        )
+
+    async def __run(self):
+        logger = get_logger(self)
+        logger.info("running")
+        loop = asyncio.get_running_loop()
+        while not self.__stop_event.is_set():
+            try:
+                has_more_results = await loop.run_in_executor(
+                    self.__executor,
+                    self.__watcher.poll,
+                    self.__stop_event.is_set,
+                    logger,
+                )
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                logger.error("AuctionManager event search failed: %s", err)
+                has_more_results = False
+            if not has_more_results:
+                logger.debug("sleeping")
+                await asyncio.sleep(self.__poll_interval.total_seconds())
+
+    async def _start(self):
+        self.__stop_event.clear()
+        self.__poll_task = asyncio.create_task(self.__run())
+
+    async def _stop(self):
+        # signals a polling round that is running on the executor to exit early
+        self.__stop_event.set()
+        if self.__poll_task is not None:
+            self.__poll_task.cancel()
+            self.__poll_task = None
@@ -235,7 +235,7 @@ class AuthorizeTransactionsHandler(MessageHandler):
             )
 
         try:
-            await app_activity_spec.validate(request.transactions)
+            await app_activity_spec.validate(request.decoded_transactions)
         except Exception as err:
             raise AuthorizeTransactionsError(
                 code=AuthorizeTransactionsErrCode.InvalidAppActivity,
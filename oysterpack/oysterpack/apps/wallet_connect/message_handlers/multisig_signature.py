@@ -0,0 +1,72 @@
+"""
+MultisigSignature message handler
+"""
+import asyncio
+
+from oysterpack.algorand.messaging.secure_message_handler import (
+    MessageContext,
+    MessageHandler,
+)
+from oysterpack.apps.wallet_connect.messsages.multisig_signature import (
+    MultisigSignature,
+    MultisigSignatureResult,
+    MultisigSignatureStatus,
+)
+from oysterpack.apps.wallet_connect.services.multisig_signature_service import (
+    MultisigSignatureService,
+)
+from oysterpack.core.message import MessageType
+
+
+class MultisigSignatureHandler(MessageHandler):
+    """
+    Feeds signatures from remote signers into the :type:`MultisigSignatureService`.
+
+    Message Structures
+    ------------------
+    SignedEncryptedMessage
+        EncryptedMessage
+            Message
+                MultisigSignature
+
+    SignedEncryptedMessage
+        EncryptedMessage
+            Message
+                MultisigSignatureResult
+
+    Notes
+    -----
+    - Signatures are verified against the subsig public key, i.e., the signer does not need to be the websocket
+      client.
+    """
+
+    def __init__(self, service: MultisigSignatureService):
+        self.__service = service
+
+    def supported_msg_types(self) -> set[MessageType]:
+        return {MultisigSignature.message_type()}
+
+    async def __call__(self, ctx: MessageContext):
+        try:
+            signature = await asyncio.get_event_loop().run_in_executor(
+                ctx.executor, MultisigSignature.unpack, ctx.msg_data
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            result = MultisigSignatureResult(
+                msg_hash=b"", status=MultisigSignatureStatus.InvalidMessage
+            )
+        else:
+            result = MultisigSignatureResult(
+                msg_hash=signature.msg_hash,
+                status=await self.__service.add_signature(
+                    msg_hash=signature.msg_hash,
+                    public_key=signature.public_key,
+                    signature=signature.signature,
+                ),
+            )
+
+        msg = await ctx.pack_secure_message(
+            ctx.msg_id,  # correlate back to request message
+            result,
+        )
+        await ctx.websocket.send(msg)
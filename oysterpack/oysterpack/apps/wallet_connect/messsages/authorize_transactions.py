@@ -6,7 +6,7 @@ from enum import auto, StrEnum
 from typing import ClassVar, Self
 
 import msgpack  # type: ignore
-from algosdk import transaction, constants
+from algosdk import constants
 from algosdk.encoding import is_valid_address
 from algosdk.transaction import Transaction
 
@@ -14,16 +14,37 @@ from oysterpack.algorand.client.accounts.private_key import (
     SigningAddress,
 )
 from oysterpack.algorand.client.model import AppId, TxnId
+from oysterpack.algorand.client.transactions.encoded import (
+    EncodedTransaction,
+    calculate_group_id,
+)
 from oysterpack.apps.wallet_connect.domain.activity import (
     AppActivityId,
 )
+from oysterpack.core.codec import codec
 from oysterpack.core.message import Serializable, MessageType
 
 
+def _invalid_message(err: Exception) -> Exception:
+    if isinstance(err, AuthorizeTransactionsError):
+        return err
+    return AuthorizeTransactionsError(
+        code=AuthorizeTransactionsErrCode.InvalidMessage,
+        message=f"failed to unpack message: {err}",
+    )
+
+
+@codec(unpack_error=_invalid_message)
 @dataclass(slots=True)
 class AuthorizeTransactionsRequest(Serializable):
     """
     App is requesting transactions to be signed.
+
+    Notes
+    -----
+    - Transactions are carried in their canonical msgpack encoding and are decoded lazily, i.e., unpacking the
+      request does not decode the transactions. The transaction group ID is validated using the encoded
+      transactions.
     """
 
     # app that has submitted the request
@@ -40,7 +61,8 @@ class AuthorizeTransactionsRequest(Serializable):
     # - all transactions must be contained within a single atomic transaction group
     # - the max transaction group size is 15 - the transaction group validated via a smart contract, which consumes
     #   1 transaction
-    transactions: list[Transaction]
+    # - Transaction objects are encoded when the request is constructed
+    transactions: list[EncodedTransaction]
 
     # Activity that is assigned to the set of transactions
     # AppActivity is used to validate the transaction group
@@ -72,6 +94,12 @@ class AuthorizeTransactionsRequest(Serializable):
                         message=f"{name} is required",
                     )
 
+        def encode_transactions():
+            self.transactions = [
+                EncodedTransaction.encode(txn) if isinstance(txn, Transaction) else txn
+                for txn in self.transactions
+            ]
+
         def check_authorizer_address():
             if not is_valid_address(self.authorizer):
                 raise AuthorizeTransactionsError(
@@ -91,35 +119,27 @@ class AuthorizeTransactionsRequest(Serializable):
                 # if there is only 1 transaction, then a group ID is not required
                 return
 
-            for tx in self.transactions:
-                if tx.group is None:
-                    raise AuthorizeTransactionsError(
-                        code=AuthorizeTransactionsErrCode.InvalidMessage,
-                        message="all transactions must have a group ID",
-                    )
-
             group_ids = {txn.group for txn in self.transactions}
+            if None in group_ids:
+                raise AuthorizeTransactionsError(
+                    code=AuthorizeTransactionsErrCode.InvalidMessage,
+                    message="all transactions must have a group ID",
+                )
             if len(group_ids) > 1:
                 raise AuthorizeTransactionsError(
                     code=AuthorizeTransactionsErrCode.InvalidMessage,
                     message="all transactions must have the same group ID, i.e., executed atomically",
                 )
 
-            txns = [txn for txn in self.transactions]
-            # strip group ID in order to recalculate it
-            for txn in txns:
-                txn.group = None
-            group_id = transaction.calculate_group_id(txns)
-            if group_id not in group_ids:
+            # the group ID is computed from the encoded transactions with the group ID omitted
+            if calculate_group_id(self.transactions) not in group_ids:
                 raise AuthorizeTransactionsError(
                     code=AuthorizeTransactionsErrCode.InvalidMessage,
                     message="computed group ID does not match assigned group ID",
                 )
-            # reassign the group ID
-            for txn in txns:
-                txn.group = group_id
 
         check_required_fields()
+        encode_transactions()
         check_authorizer_address()
         check_transaction_count()
         check_transaction_group_id()
@@ -128,40 +148,12 @@ class AuthorizeTransactionsRequest(Serializable):
     def message_type(cls) -> MessageType:
         return cls.MSG_TYPE
 
-    @classmethod
-    def unpack(cls, packed: bytes) -> Self:
+    @property
+    def decoded_transactions(self) -> list[Transaction]:
         """
-        :raise SignTransactionsError: with code=ErrCode.InvalidMessage if unpacking the message fails
+        Transactions are decoded on first access
         """
-        (
-            app_id,
-            authorizer,
-            txns,
-            app_activity_id,
-        ) = msgpack.unpackb(packed)
-
-        try:
-            return cls(
-                app_id=app_id,
-                authorizer=authorizer,
-                transactions=[Transaction.undictify(txn) for txn in txns],
-                app_activity_id=AppActivityId(app_activity_id),
-            )
-        except Exception as err:
-            raise AuthorizeTransactionsError(
-                code=AuthorizeTransactionsErrCode.InvalidMessage,
-                message=f"failed to unpack message: {err}",
-            )
-
-    def pack(self) -> bytes:
-        return msgpack.packb(
-            (
-                self.app_id,
-                self.authorizer,
-                [txn.dictify() for txn in self.transactions],
-                self.app_activity_id,
-            )
-        )
+        return [txn.transaction for txn in self.transactions]
 
 
 @dataclass(slots=True)
@@ -190,6 +182,7 @@ class AuthorizeTransactionsRequestAccepted(Serializable):
         return msgpack.packb(None)
 
 
+@codec
 @dataclass(slots=True)
 class AuthorizeTransactionsSuccess(Serializable):
     """
@@ -208,14 +201,6 @@ class AuthorizeTransactionsSuccess(Serializable):
     def message_type(cls) -> MessageType:
         return cls.MSG_TYPE
 
-    @classmethod
-    def unpack(cls, packed: bytes) -> Self:
-        transaction_ids = msgpack.unpackb(packed)
-        return cls(transaction_ids)
-
-    def pack(self) -> bytes:
-        return msgpack.packb(self.transaction_ids)
-
 
 class AuthorizeTransactionsErrCode(StrEnum):
     """
@@ -260,6 +245,7 @@ class AuthorizeTransactionsErrCode(StrEnum):
     Failure = auto()
 
 
+@codec
 @dataclass(slots=True)
 class AuthorizeTransactionsFailure(Serializable):
     """
@@ -285,24 +271,6 @@ class AuthorizeTransactionsFailure(Serializable):
     def message_type(cls) -> MessageType:
         return cls.MSG_TYPE
 
-    @classmethod
-    def unpack(cls, packed: bytes) -> Self:
-        (code, message) = msgpack.unpackb(packed)
-
-        return cls(code=code, message=message)
-
-    def pack(self) -> bytes:
-        """
-        serialize the message
-        """
-
-        return msgpack.packb(
-            (
-                self.code,
-                self.message,
-            )
-        )
-
     def __str__(self):
         return f"SignTransactionFailure [{self.code}] {self.message}"
 
@@ -0,0 +1,99 @@
+"""
+Messages for collecting multisig signatures from remote signers
+"""
+import hashlib
+from dataclasses import dataclass, field
+from enum import auto, StrEnum
+from typing import ClassVar
+
+import msgpack  # type: ignore
+
+from oysterpack.core.codec import codec
+from oysterpack.core.message import Serializable, MessageType, MultisigMessage
+
+
+def multisig_message_hash(msg: MultisigMessage) -> bytes:
+    """
+    Identifies a multisig message independently of which signatures it carries.
+
+    :return: BLAKE2b-256 digest over the message type, multisig account, and data
+    """
+    return hashlib.blake2b(
+        msgpack.packb(
+            (
+                msg.msg_type.bytes,
+                msg.multisig.version,
+                msg.multisig.threshold,
+                [subsig.public_key for subsig in msg.multisig.subsigs],
+                msg.data,
+            )
+        ),
+        digest_size=32,
+    ).digest()
+
+
+class MultisigSignatureStatus(StrEnum):
+    """
+    Outcome of submitting a multisig signature
+    """
+
+    # signature is valid and was added, but the threshold has not been met yet
+    Accepted = auto()
+    # signature is valid and the threshold has been met, i.e., the multisig message is fully signed
+    Complete = auto()
+    # signature failed verification
+    InvalidSignature = auto()
+    # public key is not a multisig subsig key
+    InvalidSigner = auto()
+    # a signature was already added for the public key
+    Duplicate = auto()
+    # message is not pending, i.e., it was never submitted, it has expired, or it is already fully signed
+    UnknownMessage = auto()
+    # message failed to unpack
+    InvalidMessage = auto()
+
+
+@codec
+@dataclass(slots=True)
+class MultisigSignature(Serializable):
+    """
+    Partial signature for a pending :type:`MultisigMessage`, which is sent by a remote signer.
+    """
+
+    # identifies the pending multisig message (see :func:`multisig_message_hash`)
+    msg_hash: bytes
+    # raw 32 byte signer public key
+    public_key: bytes
+    # signature over the multisig message data
+    signature: bytes
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M5384KB2W4HT7KY069VN4J1D"),
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+
+@codec
+@dataclass(slots=True)
+class MultisigSignatureResult(Serializable):
+    """
+    Reply to :type:`MultisigSignature`
+    """
+
+    msg_hash: bytes
+    status: MultisigSignatureStatus
+
+    MSG_TYPE: ClassVar[MessageType] = field(
+        default=MessageType.from_str("01M5384KB2FGCJ1MNFKWF8Z36H"),
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
@@ -2,15 +2,15 @@
 Messages used by the signer client to register with the Multisig Service
 """
 from dataclasses import dataclass
-from typing import Self, ClassVar
-
-import msgpack  # type: ignore
+from typing import ClassVar
 
 from oysterpack.algorand.client.accounts.private_key import SigningAddress
 from oysterpack.algorand.client.model import Address
+from oysterpack.core.codec import codec
 from oysterpack.core.message import Serializable, MessageType
 
 
+@codec
 @dataclass(slots=True)
 class RegisterSignerClient(Serializable):
     """
@@ -27,25 +27,3 @@ class RegisterSignerClient(Serializable):
     @classmethod
     def message_type(cls) -> MessageType:
         return cls.MSG_TYPE
-
-    @classmethod
-    def unpack(cls, packed: bytes) -> Self:
-        """
-        Unpacks the packed bytes into a new instance of Self
-        """
-        (account, multisig_signer) = msgpack.unpackb(packed)
-        return cls(
-            account=account,
-            multisig_signer=multisig_signer,
-        )
-
-    def pack(self) -> bytes:
-        """
-        Packs the object into bytes
-        """
-        return msgpack.packb(
-            (
-                self.account,
-                self.multisig_signer,
-            )
-        )
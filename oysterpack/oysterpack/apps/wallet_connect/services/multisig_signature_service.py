@@ -0,0 +1,214 @@
+"""
+Collects multisig signatures from remote signers
+"""
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from oysterpack.algorand.client.accounts.private_key import verify_signature
+from oysterpack.apps.wallet_connect.messsages.multisig_signature import (
+    MultisigSignatureStatus,
+    multisig_message_hash,
+)
+from oysterpack.core.async_service import AsyncService
+from oysterpack.core.message import MultisigMessage
+
+
+class MultisigSignatureRequestExpired(Exception):
+    """
+    The multisig message expired before the signature threshold was met
+    """
+
+
+class MultisigSignatureServiceFull(Exception):
+    """
+    The max number of pending multisig messages has been reached
+    """
+
+
+@dataclass(slots=True)
+class _PendingMultisigMessage:
+    msg: MultisigMessage
+    future: asyncio.Future[MultisigMessage]
+    # time.monotonic() deadline
+    expires_at: float
+    signature_count: int = 0
+
+
+class MultisigSignatureService(AsyncService):
+    """
+    Aggregates signatures for :type:`MultisigMessage`s, which are collected from remote signers concurrently.
+
+    1. A multisig message is submitted, which returns a future that completes when the signature threshold is met.
+    2. Signers submit their signatures keyed by the multisig message hash (see :func:`multisig_message_hash`), e.g.,
+       via :type:`MultisigSignatureHandler`. Each signature is verified as it arrives.
+
+    Notes
+    -----
+    - Pending messages expire after `ttl`. When a message expires, its future is failed with
+      :type:`MultisigSignatureRequestExpired`.
+    - Memory is bounded by `max_pending`. When the limit is reached, then submitting a new message fails with
+      :type:`MultisigSignatureServiceFull`.
+    - If an executor is specified, then signatures are verified on the executor, i.e., off the event loop.
+    - Not thread safe, i.e., it is designed to be used from the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = timedelta(minutes=5),
+        max_pending: int = 1024,
+        executor: Executor | None = None,
+    ):
+        """
+        :param ttl: max time to wait for the signature threshold to be met
+        :param max_pending: max number of pending multisig messages
+        :param executor: used to verify signatures
+        """
+        if ttl <= timedelta(0):
+            raise ValueError("ttl must be > 0")
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+
+        super().__init__()
+        self.__ttl = ttl.total_seconds()
+        self.__max_pending = max_pending
+        self.__executor = executor
+        # ordered by expiration, i.e., entries are inserted with the same ttl
+        self.__pending: dict[bytes, _PendingMultisigMessage] = {}
+        self.__expiration_task: asyncio.Task | None = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.__pending)
+
+    def submit(self, msg: MultisigMessage) -> asyncio.Future[MultisigMessage]:
+        """
+        Registers the multisig message for signature collection.
+
+        Notes
+        -----
+        - Signatures that the message already carries are verified. Invalid signatures are dropped.
+        - Submitting a message that is already pending returns the pending future.
+
+        :return: future that completes with the fully signed message when the signature threshold is met
+        :exception MultisigSignatureServiceFull: if `max_pending` messages are pending
+        """
+        self.__expire()
+        msg_hash = multisig_message_hash(msg)
+        pending = self.__pending.get(msg_hash)
+        if pending is not None:
+            return pending.future
+
+        if len(self.__pending) >= self.__max_pending:
+            raise MultisigSignatureServiceFull
+
+        pending = _PendingMultisigMessage(
+            msg=msg,
+            future=asyncio.get_running_loop().create_future(),
+            expires_at=time.monotonic() + self.__ttl,
+        )
+        for subsig in msg.multisig.subsigs:
+            if subsig.signature is None:
+                continue
+            if verify_signature(msg.data, subsig.signature, subsig.public_key):
+                pending.signature_count += 1
+            else:
+                subsig.signature = None
+        if pending.signature_count >= msg.multisig.threshold:
+            pending.future.set_result(msg)
+        else:
+            self.__pending[msg_hash] = pending
+        return pending.future
+
+    async def add_signature(
+        self,
+        msg_hash: bytes,
+        public_key: bytes,
+        signature: bytes,
+    ) -> MultisigSignatureStatus:
+        """
+        Verifies the signature and adds it to the pending multisig message.
+
+        :param msg_hash: see :func:`multisig_message_hash`
+        :param public_key: raw 32 byte signer public key
+        """
+        pending = self.__pending_message(msg_hash)
+        if pending is None:
+            return MultisigSignatureStatus.UnknownMessage
+        for i, subsig in enumerate(pending.msg.multisig.subsigs):
+            if subsig.public_key == public_key:
+                index = i
+                break
+        else:
+            return MultisigSignatureStatus.InvalidSigner
+        if pending.msg.multisig.subsigs[index].signature is not None:
+            return MultisigSignatureStatus.Duplicate
+
+        if self.__executor is None:
+            valid = verify_signature(pending.msg.data, signature, public_key)
+        else:
+            valid = await asyncio.get_running_loop().run_in_executor(
+                self.__executor,
+                verify_signature,
+                pending.msg.data,
+                signature,
+                public_key,
+            )
+        if not valid:
+            return MultisigSignatureStatus.InvalidSignature
+
+        # the message may have completed or expired while the signature was being verified
+        if self.__pending_message(msg_hash) is not pending:
+            return MultisigSignatureStatus.UnknownMessage
+        subsig = pending.msg.multisig.subsigs[index]
+        if subsig.signature is not None:
+            return MultisigSignatureStatus.Duplicate
+
+        subsig.signature = signature
+        pending.signature_count += 1
+        if pending.signature_count < pending.msg.multisig.threshold:
+            return MultisigSignatureStatus.Accepted
+        del self.__pending[msg_hash]
+        pending.future.set_result(pending.msg)
+        return MultisigSignatureStatus.Complete
+
+    def __pending_message(self, msg_hash: bytes) -> _PendingMultisigMessage | None:
+        pending = self.__pending.get(msg_hash)
+        if pending is None:
+            return None
+        if pending.future.done():
+            # the caller stopped waiting, e.g., the future was cancelled
+            del self.__pending[msg_hash]
+            return None
+        if pending.expires_at <= time.monotonic():
+            self.__expire()
+            return None
+        return pending
+
+    def __expire(self):
+        now = time.monotonic()
+        while self.__pending:
+            msg_hash, pending = next(iter(self.__pending.items()))
+            if pending.expires_at > now:
+                return
+            del self.__pending[msg_hash]
+            if not pending.future.done():
+                pending.future.set_exception(MultisigSignatureRequestExpired())
+
+    async def __run_expiration(self):
+        while True:
+            await asyncio.sleep(min(self.__ttl, 1.0))
+            self.__expire()
+
+    async def _start(self):
+        self.__expiration_task = asyncio.create_task(self.__run_expiration())
+
+    async def _stop(self):
+        if self.__expiration_task is not None:
+            self.__expiration_task.cancel()
+            self.__expiration_task = None
+        for pending in self.__pending.values():
+            pending.future.cancel()
+        self.__pending.clear()
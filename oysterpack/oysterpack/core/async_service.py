@@ -5,12 +5,15 @@ import asyncio
 import logging
 from abc import ABC, abstractmethod
 from datetime import timedelta
+from typing import Self
 
 from oysterpack.core.service import (
     ServiceLifecycleState,
     ServiceStartError,
     ServiceStopError,
     ServiceExceptionGroup,
+    ServiceKey,
+    Service,
 )
 
 
@@ -26,6 +29,8 @@ class AsyncService(ABC):
         self.__running = asyncio.Event()
         self.__stopped = asyncio.Event()
 
+        self.__dependencies: set[ServiceKey] = set()
+
     @property
     def state(self) -> ServiceLifecycleState:
         """
@@ -54,6 +59,33 @@ class AsyncService(ABC):
         """
         return self.__class__.__name__
 
+    @property
+    def key(self) -> ServiceKey:
+        """
+        :return: ServiceKey
+        """
+        return (type(self), self.name)
+
+    @property
+    def dependencies(self) -> set[ServiceKey]:
+        """
+        :return: keys of the services that must be running before this service is started
+        """
+        return self.__dependencies
+
+    def depends_on(self, *services: "Service | AsyncService | ServiceKey") -> Self:
+        """
+        Declares services that must be running before this service is started, and that must be stopped after this
+        service is stopped.
+
+        :param services: services or service keys, where a service is either a `Service` or an `AsyncService`
+        """
+        for service in services:
+            self.__dependencies.add(
+                service if isinstance(service, tuple) else service.key
+            )
+        return self
+
     async def await_running(self, timeout: timedelta | None = None):
         """
         Used to await the service is running
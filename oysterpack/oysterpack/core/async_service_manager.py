@@ -0,0 +1,239 @@
+"""
+Asyncio based ServiceManager, which manages both :type:`Service` and :type:`AsyncService`
+"""
+import asyncio
+import itertools
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Awaitable, cast
+
+from oysterpack.core.async_service import AsyncService
+from oysterpack.core.service import Service, ServiceKey, ServiceExceptionGroup
+from oysterpack.core.service_manager import dependency_levels
+
+
+class AsyncServiceManager:
+    """
+    Runs the lifecycle of both blocking :type:`Service` and :type:`AsyncService` instances on a single event loop.
+
+    Notes
+    -----
+    - Blocking `Service.start()` and `Service.stop()` calls are run on an executor that is managed by the
+      ServiceManager, i.e., the executor is created on startup and shutdown after the services are stopped.
+    - Services are started and stopped by dependency level, the same as :type:`ServiceManager`, i.e., services within
+      the same level are started concurrently, and levels are stopped in reverse order.
+    - If a service fails to start, or the startup deadline is exceeded, then the services that were started are
+      stopped. Blocking services that are still starting on the executor are stopped as soon as their startup
+      completes.
+    - Lifecycle operations are serialized, i.e., :meth:`stop` waits for a pending :meth:`start` to complete.
+    """
+
+    def __init__(self, services: list[Service | AsyncService], max_workers: int = 4):
+        """
+        :param max_workers: max number of threads used to run blocking service lifecycle calls
+
+        Asserts
+        -------
+        1.At least one service must be specified
+        2.Services must be unique. The unique key: (type(service), Service.name)
+        3.Service dependencies must be managed services, and must not contain cycles
+        """
+        if len(services) == 0:
+            raise AssertionError("At least 1 service must be specified")
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+
+        self.__services = {service.key: service for service in services}
+        if len(self.__services) != len(services):
+            dups = [
+                key
+                for key, _group in itertools.groupby(
+                    services, lambda service: service.key
+                )
+                if len(list(_group)) > 1
+            ]
+            raise AssertionError(f"Duplicate service keys were found: {dups}")
+
+        self.__levels = dependency_levels(self.__services)
+        self.__max_workers = max_workers
+        self.__executor: ThreadPoolExecutor | None = None
+        self.__lifecycle_lock = asyncio.Lock()
+        self.__startup_times: dict[ServiceKey, timedelta] = {}
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def services(self) -> dict[ServiceKey, Service | AsyncService]:
+        """
+        Returns managed services
+        """
+        return self.__services
+
+    @property
+    def levels(self) -> list[list[ServiceKey]]:
+        """
+        :return: services grouped into startup levels, where each service only depends on services in earlier levels
+        """
+        return self.__levels
+
+    @property
+    def startup_times(self) -> dict[ServiceKey, timedelta]:
+        """
+        :return: how long each service took to start during the last startup
+        """
+        return dict(self.__startup_times)
+
+    async def start(self, timeout: timedelta | None = None):
+        """
+        Starts all services, and returns when all services are running.
+
+        :param timeout: deadline for all services to start
+        :exception TimeoutError: if the deadline is exceeded
+        :exception ServiceStartError: if a service failed to start
+        """
+        async with self.__lifecycle_lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=self.__max_workers,
+                    thread_name_prefix=self.__class__.__name__,
+                )
+            self.__startup_times.clear()
+            started: list[list[ServiceKey]] = []
+            # blocking service startups, which keep running on the executor when they are cancelled
+            startups: dict[ServiceKey, Future] = {}
+
+            async def start_service(service: Service | AsyncService):
+                await self.__start_service(service, startups)
+
+            try:
+                async with asyncio.timeout(
+                    timeout.total_seconds() if timeout else None
+                ):
+                    for level in self.__levels:
+                        # services in the level that started need to be stopped if the level fails
+                        started.append(level)
+                        errors = await self.__run_level(level, start_service)
+                        if errors:
+                            raise errors[0]
+            except BaseException as err:
+                self.__logger.error("service startup failed: %r", err)
+                await self.__rollback(started, startups)
+                raise
+
+    async def __rollback(
+        self,
+        levels: list[list[ServiceKey]],
+        startups: dict[ServiceKey, Future],
+    ):
+        """
+        Stops the services that were started, level by level in reverse order.
+
+        Blocking services that are still starting on the executor, i.e., services that missed the deadline, are stopped
+        as soon as their startup completes.
+        """
+
+        def stop_when_started(service: Service):
+            def stop(_startup: Future):
+                try:
+                    service.stop()
+                    self.__logger.info(
+                        "service is stopped after late startup: %s", service.name
+                    )
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    self.__logger.error(
+                        "failed to stop service after late startup: %s : %s",
+                        service.name,
+                        err,
+                    )
+
+            return stop
+
+        errors: list[Exception] = []
+        for level in reversed(levels):
+            stop_level = []
+            for key in level:
+                startup = startups.get(key)
+                if startup is not None and not startup.done():
+                    # only blocking service startups are tracked
+                    service = cast(Service, self.__services[key])
+                    startup.add_done_callback(stop_when_started(service))
+                else:
+                    stop_level.append(key)
+            errors += await self.__run_level(stop_level, self.__stop_service)
+        if errors:
+            self.__logger.error(
+                "failed to stop services: %s",
+                ServiceExceptionGroup("services failed to stop", errors),
+            )
+
+    async def stop(self, timeout: timedelta | None = None):
+        """
+        Stops all services, and returns when all services are stopped.
+
+        :param timeout: deadline for all services to stop
+        :exception TimeoutError: if the deadline is exceeded
+        :exception ServiceExceptionGroup: if services failed to stop
+        """
+        async with self.__lifecycle_lock:
+            try:
+                errors: list[Exception] = []
+                async with asyncio.timeout(
+                    timeout.total_seconds() if timeout else None
+                ):
+                    for level in reversed(self.__levels):
+                        errors += await self.__run_level(level, self.__stop_service)
+                if errors:
+                    raise ServiceExceptionGroup("services failed to stop", errors)
+            finally:
+                if self.__executor is not None:
+                    # blocking calls that missed the deadline are not waited on
+                    self.__executor.shutdown(wait=False)
+                    self.__executor = None
+
+    async def __run_level(
+        self,
+        level: list[ServiceKey],
+        func: Callable[[Service | AsyncService], Awaitable[None]],
+    ) -> list[Exception]:
+        """
+        Runs the function concurrently on each service in the level.
+
+        :return: errors
+        """
+        results = await asyncio.gather(
+            *(func(self.__services[key]) for key in level),
+            return_exceptions=True,
+        )
+        return [result for result in results if isinstance(result, Exception)]
+
+    async def __start_service(
+        self,
+        service: Service | AsyncService,
+        startups: dict[ServiceKey, Future],
+    ):
+        start = time.perf_counter()
+        if isinstance(service, AsyncService):
+            await service.start()
+        else:
+            assert self.__executor is not None
+            startup = self.__executor.submit(service.start)
+            startups[service.key] = startup
+            await asyncio.wrap_future(startup)
+        self.__startup_times[service.key] = timedelta(
+            seconds=time.perf_counter() - start
+        )
+        self.__logger.info(
+            "service is running: %s [%s]",
+            service.name,
+            self.__startup_times[service.key],
+        )
+
+    async def __stop_service(self, service: Service | AsyncService):
+        if isinstance(service, AsyncService):
+            await service.stop()
+        else:
+            await asyncio.get_running_loop().run_in_executor(
+                self.__executor, service.stop
+            )
+        self.__logger.info("service is stopped: %s", service.name)
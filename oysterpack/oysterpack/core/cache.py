@@ -0,0 +1,147 @@
+"""
+Provides in-memory caching support
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Generic, TypeVar, Callable, Hashable
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """
+    Cache stats
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        :return: hits / (hits + misses), or 0.0 if the cache has not been accessed
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded, thread safe, least recently used (LRU) cache.
+
+    Notes
+    -----
+    - When the cache is full, the least recently used entry is evicted.
+    - When the cache is pickled, only the max size is retained, i.e., cache entries and stats are not pickled.
+      This enables objects that hold a cache to be sent to other processes, e.g., via a `ProcessPoolExecutor`.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        :param max_size: max number of cache entries
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+
+        self.__max_size = max_size
+        self.__init_state()
+
+    def __init_state(self):
+        self.__entries: OrderedDict[K, V] = OrderedDict()
+        self.__stats = CacheStats()
+        self.__lock = Lock()
+
+    def __getstate__(self) -> int:
+        return self.__max_size
+
+    def __setstate__(self, max_size: int):
+        self.__max_size = max_size
+        self.__init_state()
+
+    @property
+    def max_size(self) -> int:
+        """
+        :return: max number of cache entries
+        """
+        return self.__max_size
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        :return: snapshot of the cache stats
+        """
+        with self.__lock:
+            return CacheStats(
+                hits=self.__stats.hits,
+                misses=self.__stats.misses,
+                evictions=self.__stats.evictions,
+            )
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__entries
+
+    def get(self, key: K) -> V | None:
+        """
+        :return: None if the key is not cached
+        """
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is None:
+                self.__stats.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__stats.hits += 1
+            return value
+
+    def put(self, key: K, value: V):
+        """
+        Adds the value to the cache, evicting the least recently used entry if the cache is full.
+        """
+        with self.__lock:
+            self.__put(key, value)
+
+    def get_or_create(self, key: K, create: Callable[[K], V]) -> V:
+        """
+        Returns the cached value. On a cache miss, the value is created and cached.
+
+        Notes
+        -----
+        - `create` is invoked outside the lock. Thus, concurrent misses for the same key may create the value
+          more than once, but only the first one is retained.
+        """
+        with self.__lock:
+            value = self.__entries.get(key)
+            if value is not None:
+                self.__entries.move_to_end(key)
+                self.__stats.hits += 1
+                return value
+            self.__stats.misses += 1
+
+        value = create(key)
+        with self.__lock:
+            existing = self.__entries.get(key)
+            if existing is not None:
+                return existing
+            self.__put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Removes all cache entries. Stats are retained.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def __put(self, key: K, value: V):
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+            self.__stats.evictions += 1
@@ -0,0 +1,306 @@
+"""
+Generated MessagePack codecs for :type:`Serializable` dataclasses
+
+https://msgpack.org/
+"""
+import dataclasses
+import threading
+import types
+import typing
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, TypeVar, Union
+
+import msgpack  # type: ignore
+from algosdk.transaction import Transaction
+from ulid import ULID
+
+_T = TypeVar("_T")
+
+# msgpack Packers are not thread safe, i.e., each thread reuses its own Packer
+_local = threading.local()
+
+
+def _packer() -> msgpack.Packer:
+    try:
+        return _local.packer
+    except AttributeError:
+        packer = msgpack.Packer(autoreset=False)
+        _local.packer = packer
+        return packer
+
+
+@dataclass(slots=True, frozen=True)
+class Codec:
+    """
+    Codec that was generated for a dataclass by :func:`codec`
+
+    :field:`to_tuple` - converts an instance into its msgpack representation, i.e., without the version byte
+    :field:`from_tuple` - reverses `to_tuple`
+    :field:`pack` - generated `pack` method
+    :field:`unpack` - generated `unpack` method, which takes the class as its first argument
+    """
+
+    version: int
+    to_tuple: Callable[[Any], tuple]
+    from_tuple: Callable[[Any], Any]
+    pack: Callable[[Any], bytes]
+    unpack: Callable[[Any, bytes], Any]
+
+
+def get_codec(cls: type) -> Codec:
+    """
+    :return: codec that was generated for the class by :func:`codec`
+    :exception TypeError: if the class is not decorated with `@codec`
+    """
+    codec_ = _find_codec(cls)
+    if codec_ is None:
+        raise TypeError(f"{cls.__name__} is not decorated with `@codec`")
+    return codec_
+
+
+def _find_codec(cls: type) -> Codec | None:
+    codec_ = getattr(cls, "__codec__", None)
+    return codec_ if isinstance(codec_, Codec) else None
+
+
+class _CodeGen:
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.globals: dict[str, Any] = {"_packer": _packer, "_unpackb": msgpack.unpackb}
+        self.__depth = 0
+
+    def name(self, obj: Any) -> str:
+        """
+        :return: name that the object is bound to in the generated code
+        """
+        name = f"_g{len(self.globals)}"
+        self.globals[name] = obj
+        return name
+
+    def pack(self, tp: Any, expr: str) -> str:
+        """
+        :return: expression that converts `expr` into a msgpack supported type
+        """
+        tp = _resolve_new_type(tp)
+        if tp in (str, bytes, int, float, bool):
+            return expr
+        if (optional := _optional_type(tp)) is not None:
+            inner = self.pack(optional, expr)
+            return expr if inner == expr else f"(None if {expr} is None else {inner})"
+        if typing.get_origin(tp) is list:
+            (item_type,) = typing.get_args(tp)
+            var = self.__var()
+            item = self.pack(item_type, var)
+            return expr if item == var else f"[{item} for {var} in {expr}]"
+        if not isinstance(tp, type):
+            raise TypeError(f"{self.cls.__name__}: unsupported field type: {tp}")
+        if issubclass(tp, (str, int, bytes)):
+            # msgpack packs str, int, and bytes subclasses, e.g. StrEnum and AppId, as the base type
+            return expr
+        if issubclass(tp, ULID):
+            return f"{expr}.bytes"
+        if issubclass(tp, Transaction):
+            return f"{expr}.dictify()"
+        if (nested := _find_codec(tp)) is not None:
+            return f"{self.name(nested.to_tuple)}({expr})"
+        if hasattr(tp, "pack") and hasattr(tp, "unpack"):
+            return f"{expr}.pack()"
+        raise TypeError(f"{self.cls.__name__}: unsupported field type: {tp}")
+
+    def unpack(self, tp: Any, expr: str) -> str:
+        """
+        :return: expression that converts the unpacked msgpack value `expr` into the field type
+        """
+        tp = _resolve_new_type(tp)
+        if tp in (str, bytes, int, float, bool):
+            return expr
+        if (optional := _optional_type(tp)) is not None:
+            inner = self.unpack(optional, expr)
+            return expr if inner == expr else f"(None if {expr} is None else {inner})"
+        if typing.get_origin(tp) is list:
+            (item_type,) = typing.get_args(tp)
+            var = self.__var()
+            item = self.unpack(item_type, var)
+            return expr if item == var else f"[{item} for {var} in {expr}]"
+        if not isinstance(tp, type):
+            raise TypeError(f"{self.cls.__name__}: unsupported field type: {tp}")
+        if issubclass(tp, Enum):
+            # a dict lookup is much cheaper than calling the enum class
+            return f"{self.name(tp._value2member_map_)}[{expr}]"  # pylint: disable=protected-access
+        if issubclass(tp, (str, int, bytes)):
+            return f"{self.name(tp)}({expr})"
+        if issubclass(tp, ULID):
+            return f"{self.name(tp)}.from_bytes({expr})"
+        if issubclass(tp, Transaction):
+            return f"{self.name(Transaction.undictify)}({expr})"
+        if (nested := _find_codec(tp)) is not None:
+            return f"{self.name(nested.from_tuple)}({expr})"
+        if hasattr(tp, "pack") and hasattr(tp, "unpack"):
+            return f"{self.name(tp.unpack)}({expr})"
+        raise TypeError(f"{self.cls.__name__}: unsupported field type: {tp}")
+
+    def __var(self) -> str:
+        self.__depth += 1
+        return f"_v{self.__depth}"
+
+
+def _resolve_new_type(tp: Any) -> Any:
+    while hasattr(tp, "__supertype__"):
+        tp = tp.__supertype__
+    return tp
+
+
+def _optional_type(tp: Any) -> Any | None:
+    """
+    :return: T if the type is `T | None`
+    """
+    if typing.get_origin(tp) not in (Union, types.UnionType):
+        return None
+    args = [arg for arg in typing.get_args(tp) if arg is not type(None)]
+    if len(args) != 1 or len(args) == len(typing.get_args(tp)):
+        return None
+    return args[0]
+
+
+def codec(
+    cls: type[_T] | None = None,
+    *,
+    version: int = 0,
+    unpack_error: Callable[[Exception], Exception] | None = None,
+) -> Any:
+    """
+    Class decorator that generates the :type:`Serializable` `pack` and `unpack` methods for a dataclass from its
+    field annotations.
+
+    Packed format: version (1 byte) | msgpack array of the field values in field definition order
+
+    Supported field types:
+    - str, bytes, int, float, bool, and their subclasses, e.g., AppId, StrEnum
+    - NewType aliases of supported types, e.g., Address, SigningAddress, TxnId
+    - ULID, e.g., MessageType, MessageId - packed as bytes
+    - Transaction - packed as a dict via `dictify()`
+    - dataclasses decorated with `@codec` - nested as msgpack arrays
+    - classes that implement `pack` and `unpack`, i.e., :type:`Serializable` - nested as bytes
+    - list[T] and T | None, where T is a supported type
+
+    Notes
+    -----
+    - The codec is generated when the class is defined, i.e., the per field type dispatch is resolved up front and
+      the generated methods contain only the conversions that each field needs.
+    - Messages are packed using a per-thread reusable `msgpack.Packer`.
+    - The version byte is checked when unpacking, i.e., it should be incremented when the fields change.
+    - The decorator must be applied to the dataclass, i.e., it must be listed above `@dataclass`.
+    - The generated methods are set on the class. :type:`Serializable` subclasses inherit `pack` and `unpack`
+      implementations that delegate to the generated codec, which is what makes the methods visible to type checkers.
+
+    :param version: schema version: [0, 127]
+    :param unpack_error: maps exceptions that are raised while unpacking, e.g., into a domain specific error
+    :exception TypeError: if the class is not a dataclass, defines its own `pack` or `unpack`, or a field type is
+        not supported
+    """
+
+    def wrap(cls: type[_T]) -> type[_T]:
+        return _generate_codec(cls, version, unpack_error)
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
+
+
+def _generate_codec(
+    cls: type[_T],
+    version: int,
+    unpack_error: Callable[[Exception], Exception] | None,
+) -> type[_T]:
+    if not dataclasses.is_dataclass(cls):
+        raise TypeError(f"{cls.__name__} is not a dataclass")
+    if not 0 <= version <= 127:
+        raise ValueError("version must be in the range [0, 127]")
+    for method in ("pack", "unpack"):
+        if method in cls.__dict__:
+            raise TypeError(f"{cls.__name__} defines `{method}`")
+
+    fields = dataclasses.fields(cls)
+    for f in fields:
+        if not f.init:
+            raise TypeError(f"{cls.__name__}: field is not an init field: {f.name}")
+    type_hints = typing.get_type_hints(cls)
+
+    gen = _CodeGen(cls)
+    gen.globals["_cls"] = cls
+    gen.globals["_unpack_error"] = unpack_error
+    names = [f"_f{i}" for i in range(len(fields))]
+    # the trailing comma makes single field tuples valid
+    packed_fields = "".join(
+        f"{gen.pack(type_hints[f.name], f'self.{f.name}')}, " for f in fields
+    )
+    unpacked_fields = ", ".join(
+        gen.unpack(type_hints[f.name], name) for f, name in zip(fields, names)
+    )
+    # the trailing comma makes single field targets valid, and "() = _t" checks that no fields were packed
+    unpack_target = f"({', '.join(names)},) = _t" if fields else "() = _t"
+
+    source = f"""
+def to_tuple(self):
+    return ({packed_fields})
+
+def from_tuple(_t):
+    {unpack_target}
+    return _cls({unpacked_fields})
+
+def pack(self):
+    # fields are converted before writing to the packer, i.e., nested Serializables may reuse the packer
+    _fields = ({packed_fields})
+    _p = _packer()
+    try:
+        _p.pack({version})
+        _p.pack(_fields)
+        return _p.bytes()
+    finally:
+        _p.reset()
+
+def unpack(cls, packed):
+    if not packed or packed[0] != {version}:
+        raise ValueError("invalid {cls.__name__} schema version")
+    _t = _unpackb(packed[1:])
+    {unpack_target}
+    return cls({unpacked_fields})
+
+def unpack_mapped_error(cls, packed):
+    try:
+        return unpack(cls, packed)
+    except Exception as err:
+        error = _unpack_error(err)
+        if error is err:
+            raise
+        raise error from err
+"""
+    namespace = gen.globals
+    exec(source, namespace)  # pylint: disable=exec-used
+
+    pack = namespace["pack"]
+    unpack = (
+        namespace["unpack"]
+        if unpack_error is None
+        else namespace["unpack_mapped_error"]
+    )
+    for name, func in (("pack", pack), ("unpack", unpack)):
+        func.__name__ = name
+        func.__qualname__ = f"{cls.__qualname__}.{name}"
+        func.__module__ = cls.__module__
+
+    setattr(cls, "pack", pack)
+    setattr(cls, "unpack", classmethod(unpack))
+    setattr(
+        cls,
+        "__codec__",
+        Codec(
+            version=version,
+            to_tuple=namespace["to_tuple"],
+            from_tuple=namespace["from_tuple"],
+            pack=pack,
+            unpack=unpack,
+        ),
+    )
+    return cls
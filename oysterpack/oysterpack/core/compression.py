@@ -0,0 +1,120 @@
+"""
+Pluggable payload compression for :type:`Message` data
+
+Compressors are identified on the wire by a 4-bit codec ID, which is carried in the :type:`Message` flags.
+"""
+import zlib
+from dataclasses import dataclass, field
+from typing import Protocol
+
+# decompressed payloads larger than this are rejected, i.e., protects against decompression bombs
+DEFAULT_MAX_DECOMPRESSED_SIZE = 4 * 1024 * 1024
+
+MAX_CODEC_ID = 0x0F
+
+
+class Compressor(Protocol):
+    """
+    Compressor protocol
+
+    :field:`codec_id` - identifies the compressor on the wire: [1, 15]
+    """
+
+    codec_id: int
+
+    def compress(self, data: bytes | memoryview) -> bytes:
+        ...
+
+    def decompress(self, data: bytes | memoryview, max_size: int) -> bytes:
+        """
+        :exception ValueError: if the data is invalid or decompresses to more than `max_size` bytes
+        """
+        ...
+
+
+class ZlibCompressor:
+    """
+    zlib compressor from the standard library
+    """
+
+    codec_id = 1
+
+    def __init__(self, level: int = 6):
+        """
+        :param level: compression level: [0, 9]
+        """
+        if not 0 <= level <= 9:
+            raise ValueError("level must be in the range [0, 9]")
+        self.__level = level
+
+    @property
+    def level(self) -> int:
+        return self.__level
+
+    def compress(self, data: bytes | memoryview) -> bytes:
+        return zlib.compress(data, self.__level)
+
+    def decompress(self, data: bytes | memoryview, max_size: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        try:
+            decompressed = decompressor.decompress(data, max_size)
+        except zlib.error as err:
+            raise ValueError("invalid zlib data") from err
+        if not decompressor.eof:
+            if decompressor.unconsumed_tail or len(decompressed) >= max_size:
+                raise ValueError(f"decompressed data exceeds max size: {max_size}")
+            raise ValueError("truncated zlib data")
+        return decompressed
+
+
+_compressors: dict[int, Compressor] = {}
+
+
+def register_compressor(compressor: Compressor, replace: bool = False):
+    """
+    Registers the compressor, which is required to decompress messages that were compressed using its codec ID.
+
+    :param replace: if True, then a compressor that is registered with the same codec ID is replaced
+    :exception ValueError: if the codec ID is invalid or is already registered
+    """
+    if not 1 <= compressor.codec_id <= MAX_CODEC_ID:
+        raise ValueError(f"codec_id must be in the range [1, {MAX_CODEC_ID}]")
+    if not replace and compressor.codec_id in _compressors:
+        raise ValueError(f"codec_id is already registered: {compressor.codec_id}")
+    _compressors[compressor.codec_id] = compressor
+
+
+def get_compressor(codec_id: int) -> Compressor:
+    """
+    :exception ValueError: if no compressor is registered for the codec ID
+    """
+    try:
+        return _compressors[codec_id]
+    except KeyError:
+        raise ValueError(f"unsupported compression codec: {codec_id}") from None
+
+
+register_compressor(ZlibCompressor())
+
+
+@dataclass(slots=True, frozen=True)
+class Compression:
+    """
+    Compression settings used when sending messages
+
+    Notes
+    -----
+    - Payloads that are smaller than the threshold are sent uncompressed, i.e., small messages do not pay for
+      compression that does not pay for itself.
+    - Payloads that do not shrink when compressed are sent uncompressed.
+    """
+
+    compressor: Compressor = field(default_factory=ZlibCompressor)
+    # min payload size in bytes that is compressed
+    threshold: int = 512
+
+    def __post_init__(self):
+        if not 1 <= self.compressor.codec_id <= MAX_CODEC_ID:
+            raise ValueError(f"codec_id must be in the range [1, {MAX_CODEC_ID}]")
+        if self.threshold < 0:
+            raise ValueError("threshold must be >= 0")
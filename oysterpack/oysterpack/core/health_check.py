@@ -1,7 +1,11 @@
 """
 Health Checks
 """
+import threading
+import time
 from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
 from enum import IntEnum, auto
@@ -61,6 +65,12 @@ class RedHealthCheck(HealthCheckException):
     """
 
 
+class HealthCheckTimeout(RedHealthCheck):
+    """
+    HealthCheck did not complete within its timeout
+    """
+
+
 @dataclass(slots=True)
 class HealthCheckResult:
     """
@@ -80,10 +90,185 @@ class HealthCheckResult:
     error: Exception | None = None
 
 
+@dataclass(slots=True, frozen=True)
+class HealthCheckStats:
+    """
+    Point in time view of a :type:`HealthCheckHistory`
+
+    Durations are in seconds.
+    """
+
+    # HealthCheck.name
+    name: str
+    # number of results in the history
+    count: int = 0
+    last_status: HealthCheckStatus | None = None
+    # number of results per status
+    green: int = 0
+    yellow: int = 0
+    red: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    # median duration of the newer half of the history divided by the median duration of the older half,
+    # i.e., > 1.0 means the health check is slowing down
+    duration_trend: float = 1.0
+    # number of times the status changed between consecutive results
+    status_changes: int = 0
+    flapping: bool = False
+
+
+class HealthCheckHistory:
+    """
+    Fixed size ring buffer of health check results.
+
+    Notes
+    -----
+    - Each result is stored as (status, timestamp, duration) in preallocated arrays, i.e., recording a result is O(1)
+      and does not allocate. The error is not retained.
+    - The history is flapping when the number of status changes between consecutive results, e.g.,
+      GREEN -> RED -> GREEN -> RED, is at least `flap_threshold` of the history size. The threshold is relative to the
+      history size, and not to the number of results, i.e., a few status changes right after startup are not
+      reported as flapping.
+    - Not thread safe, i.e., access is synchronized by the :type:`HealthCheck`.
+    """
+
+    __slots__ = (
+        "__statuses",
+        "__timestamps",
+        "__durations",
+        "__next",
+        "__count",
+        "__flap_threshold",
+    )
+
+    def __init__(self, size: int = 64, flap_threshold: float = 0.3):
+        """
+        :param size: max number of results that are retained
+        :param flap_threshold: (0.0, 1.0] fraction of the history that must change status to be flapping
+        """
+        if size < 2:
+            raise ValueError("size must be >= 2")
+        if not 0 < flap_threshold <= 1:
+            raise ValueError("flap_threshold must be in the range (0, 1]")
+        self.__statuses = array("B", bytes(size))
+        # POSIX timestamps in seconds
+        self.__timestamps = array("d", bytes(8 * size))
+        # seconds
+        self.__durations = array("d", bytes(8 * size))
+        self.__next = 0
+        self.__count = 0
+        self.__flap_threshold = flap_threshold
+
+    @property
+    def size(self) -> int:
+        return len(self.__statuses)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def append(self, result: HealthCheckResult):
+        i = self.__next
+        self.__statuses[i] = result.status
+        self.__timestamps[i] = result.timestamp.timestamp()
+        self.__durations[i] = result.duration.total_seconds()
+        self.__next = (i + 1) % self.size
+        self.__count = min(self.__count + 1, self.size)
+
+    def replace_last(self, result: HealthCheckResult):
+        """
+        Replaces the newest result in place, e.g., a timeout result with the late result of the same run.
+        """
+        if self.__count == 0:
+            self.append(result)
+            return
+        i = (self.__next - 1) % self.size
+        self.__statuses[i] = result.status
+        self.__timestamps[i] = result.timestamp.timestamp()
+        self.__durations[i] = result.duration.total_seconds()
+
+    def __indexes(self) -> range:
+        # oldest to newest
+        start = (self.__next - self.__count) % self.size
+        return range(start, start + self.__count)
+
+    def statuses(self) -> list[HealthCheckStatus]:
+        """
+        :return: statuses ordered from oldest to newest
+        """
+        size = self.size
+        return [HealthCheckStatus(self.__statuses[i % size]) for i in self.__indexes()]
+
+    def timestamps(self) -> list[datetime]:
+        """
+        :return: timestamps ordered from oldest to newest
+        """
+        size = self.size
+        return [
+            datetime.fromtimestamp(self.__timestamps[i % size], UTC)
+            for i in self.__indexes()
+        ]
+
+    def durations(self) -> list[float]:
+        """
+        :return: durations in seconds ordered from oldest to newest
+        """
+        size = self.size
+        return [self.__durations[i % size] for i in self.__indexes()]
+
+    def stats(self, name: str) -> HealthCheckStats:
+        if self.__count == 0:
+            return HealthCheckStats(name=name)
+
+        statuses = self.statuses()
+        durations = self.durations()
+        sorted_durations = sorted(durations)
+
+        def percentile(percentile: float) -> float:
+            rank = max(1, round(len(sorted_durations) * percentile / 100))
+            return sorted_durations[rank - 1]
+
+        def median(values: list[float]) -> float:
+            return sorted(values)[len(values) // 2]
+
+        duration_trend = 1.0
+        if len(durations) >= 4:
+            older = median(durations[: len(durations) // 2])
+            newer = median(durations[len(durations) // 2 :])
+            if older > 0:
+                duration_trend = newer / older
+
+        status_changes = sum(
+            1 for previous, status in zip(statuses, statuses[1:]) if previous != status
+        )
+        return HealthCheckStats(
+            name=name,
+            count=self.__count,
+            last_status=statuses[-1],
+            green=statuses.count(HealthCheckStatus.GREEN),
+            yellow=statuses.count(HealthCheckStatus.YELLOW),
+            red=statuses.count(HealthCheckStatus.RED),
+            p50=percentile(50),
+            p95=percentile(95),
+            p99=percentile(99),
+            duration_trend=duration_trend,
+            status_changes=status_changes,
+            flapping=status_changes >= self.__flap_threshold * (self.size - 1),
+        )
+
+
 @dataclass(slots=True)
 class HealthCheck(ABC):
     """
     HealthCheck
+
+    Notes
+    -----
+    - Executions are single flight, i.e., callers that run the health check while it is already running wait for the
+      in-flight execution instead of running it again.
+    - If callers wait longer than `timeout`, then the health check is reported as RED with a
+      :type:`HealthCheckTimeout` error. The in-flight execution is not interrupted, i.e., when it completes, its result
+      replaces the timeout result, both as `last_result` and in the `history`. Thus, each run is recorded once.
     """
 
     name: str
@@ -97,20 +282,133 @@ class HealthCheck(ABC):
     # how often to run the healthcheck
     run_interval: timedelta = timedelta(seconds=30)
 
+    # max time to wait for the healthcheck to complete
+    timeout: timedelta | None = timedelta(seconds=10)
+
     last_result: HealthCheckResult | None = field(default=None, init=False)
+    # recent results, which are used to track latency and flapping
+    history: HealthCheckHistory = field(
+        default_factory=HealthCheckHistory, init=False, repr=False, compare=False
+    )
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    # in-flight execution, which concurrent callers join
+    _in_flight: Future[HealthCheckResult] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # time.monotonic() when the last execution started
+    _last_started: float | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # True if the newest history entry is a timeout result that is waiting to be replaced by the late result
+    _timeout_recorded: bool = field(
+        default=False, init=False, repr=False, compare=False
+    )
 
     def __call__(self) -> HealthCheckResult:
+        """
+        Runs the health check, or joins the in-flight execution.
+        """
+        return self.__run(max_age=None)
+
+    def run(self) -> HealthCheckResult:
+        """
+        Runs the health check at most once per interval, i.e., when several services share the same health check,
+        then it is not run once per service.
+
+        Notes
+        -----
+        - If the last execution started within the past half `run_interval`, then the last result is returned.
+          Services schedule the health check every `run_interval`, i.e., each scheduled run after the first one within
+          the same interval is deduped.
+        """
+        return self.__run(max_age=self.run_interval.total_seconds() / 2)
+
+    def stats(self) -> HealthCheckStats:
+        """
+        :return: latency and status stats over the result history
+        """
+        with self._lock:
+            return self.history.stats(self.name)
+
+    def record_timeout(self, start: datetime) -> HealthCheckResult:
+        """
+        Records a RED :type:`HealthCheckTimeout` result for a run that started at `start`, unless a newer result was
+        recorded in the meantime.
+        """
+        with self._lock:
+            return self.__record_timeout(start)
+
+    def __record_timeout(self, start: datetime) -> HealthCheckResult:
+        # must be called while holding the lock
+        if self.last_result is not None and (
+            self._timeout_recorded or self.last_result.timestamp >= start
+        ):
+            return self.last_result
+        self.last_result = HealthCheckResult(
+            name=self.name,
+            status=HealthCheckStatus.RED,
+            timestamp=start,
+            duration=datetime.now(UTC) - start,
+            error=HealthCheckTimeout(f"timed out after {self.timeout}"),
+        )
+        self.history.append(self.last_result)
+        self._timeout_recorded = True
+        return self.last_result
+
+    def __run(self, max_age: float | None) -> HealthCheckResult:
         start = datetime.now(UTC)
+        with self._lock:
+            in_flight = self._in_flight
+            if in_flight is None:
+                if (
+                    max_age is not None
+                    and self.last_result is not None
+                    and self._last_started is not None
+                    and time.monotonic() - self._last_started < max_age
+                ):
+                    return self.last_result
+                self._in_flight = Future()
+                self._last_started = time.monotonic()
+
+        if in_flight is not None:
+            try:
+                return in_flight.result(
+                    self.timeout.total_seconds() if self.timeout else None
+                )
+            except TimeoutError:
+                with self._lock:
+                    if in_flight.done():
+                        return in_flight.result()
+                    return self.__record_timeout(start)
+
+        result = self.__execute(start)
+        with self._lock:
+            self.last_result = result
+            if self._timeout_recorded:
+                # the timeout result was recorded for this run, i.e., the run is only recorded once
+                self.history.replace_last(result)
+                self._timeout_recorded = False
+            else:
+                self.history.append(result)
+            in_flight, self._in_flight = self._in_flight, None
+            if in_flight is not None:
+                in_flight.set_result(result)
+        return result
+
+    def __execute(self, start: datetime) -> HealthCheckResult:
         try:
             self.execute()
-            self.last_result = HealthCheckResult(
+            return HealthCheckResult(
                 name=self.name,
                 status=HealthCheckStatus.GREEN,
                 timestamp=start,
                 duration=datetime.now(UTC) - start,
             )
         except YellowHealthCheck as err:
-            self.last_result = HealthCheckResult(
+            return HealthCheckResult(
                 name=self.name,
                 status=HealthCheckStatus.YELLOW,
                 timestamp=start,
@@ -118,14 +416,13 @@ class HealthCheck(ABC):
                 error=err,
             )
         except Exception as err:  # pylint: disable=broad-exception-caught
-            self.last_result = HealthCheckResult(
+            return HealthCheckResult(
                 name=self.name,
                 status=HealthCheckStatus.RED,
                 timestamp=start,
                 duration=datetime.now(UTC) - start,
                 error=err,
             )
-        return self.last_result
 
     @abstractmethod
     def execute(self):
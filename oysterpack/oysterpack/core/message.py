@@ -3,17 +3,26 @@ Standardized messaging format using MessagePack as the binary serialization form
 
 https://msgpack.org/
 """
-from dataclasses import dataclass, field
-from typing import Self, Protocol, ClassVar, cast
+from dataclasses import dataclass, field, replace
+from concurrent.futures import Executor
+from functools import partial
+from typing import Self, Protocol, ClassVar, Sequence, Callable
 
 import msgpack  # type: ignore
-from algosdk import encoding
-from algosdk.transaction import Multisig
+from algosdk.transaction import Multisig, MultisigSubsig
+from nacl.bindings import crypto_sign_BYTES, crypto_sign_PUBLICKEYBYTES
 
 from oysterpack.algorand.client.accounts.private_key import (
     SigningAddress,
     AlgoPrivateKey,
     verify_message,
+    verify_signature,
+)
+from oysterpack.core.codec import codec, get_codec
+from oysterpack.core.compression import (
+    Compression,
+    DEFAULT_MAX_DECOMPRESSED_SIZE,
+    get_compressor,
 )
 from oysterpack.core.ulid import HashableULID
 
@@ -27,8 +36,33 @@ class MessageId(HashableULID):
 class MessageType(HashableULID):
     """
     Message type ID
+
+    Notes
+    -----
+    - Message type constants, which are defined via :meth:`from_str`, are interned. :meth:`from_bytes` returns the
+      interned instance if the message type is known, i.e., message types that are unpacked from the wire share
+      the constant's cached hash. Unknown message types are not interned, which keeps the intern table bounded by
+      the message types that are defined in code.
     """
 
+    _interned: ClassVar[dict[bytes, "MessageType"]] = {}
+
+    @classmethod
+    def from_str(cls, string: str) -> Self:
+        msg_type = super().from_str(string)
+        return cls._interned.setdefault(msg_type.bytes, msg_type)  # type: ignore
+
+    @classmethod
+    def from_bytes(cls, bytes_: bytes) -> Self:
+        msg_type = cls._interned.get(bytes_)
+        if msg_type is None:
+            return cls(bytes_)
+        return msg_type  # type: ignore
+
+    def __reduce__(self) -> tuple[Callable[[bytes], HashableULID], tuple[bytes]]:
+        # unpickled message types are interned
+        return self.__class__.from_bytes, (self.bytes,)
+
 
 MessageData = bytes
 Signature = bytes
@@ -46,15 +80,19 @@ class Serializable(Protocol):
     def pack(self) -> bytes:
         """
         Packs the object into bytes
+
+        Defaults to the codec that was generated by `@codec`
         """
-        ...
+        return get_codec(type(self)).pack(self)
 
     @classmethod
     def unpack(cls, packed: bytes) -> Self:
         """
         Unpacks the packed bytes into a new instance of Self
+
+        Defaults to the codec that was generated by `@codec`
         """
-        ...
+        return get_codec(cls).unpack(cls, packed)
 
 
 @dataclass(slots=True)
@@ -65,11 +103,33 @@ class Message:
     :field:`id` - unique message ID
     :field:`type` - data message type
     :field:`data` - msgpack serialized data
+    :field:`flags` - message flags, see below
+
+    Flags layout:
+    - bits 0-3: compression codec ID that `data` is compressed with - 0 means `data` is not compressed
+    - bits 4-7: compression codec ID that the sender accepts for replies - 0 means compression is not accepted
+
+    Notes
+    -----
+    - When unpacked from a binary frame via :meth:`unpack_from`, `data` is a `memoryview` into the frame buffer,
+      i.e., the payload is not copied.
+    - Compression is negotiated per request: the sender advertises the codec that it accepts, and the recipient
+      may compress its replies using the same codec. Compression is applied before the message is encrypted.
+    - Flags are only set when the sender opts into compression (see :meth:`accept_compression`) or when replying
+      to a sender that accepts compression. Thus, peers that do not support flags are never sent flags unless the
+      sender is explicitly configured to use compression.
     """
 
     msg_id: MessageId
     msg_type: MessageType
-    data: MessageData
+    data: MessageData | memoryview
+    flags: int = 0
+
+    # binary layout header: msg_type (16 bytes) | msg_id (16 bytes) | flags (1 byte)
+    BINARY_HEADER_SIZE: ClassVar[int] = 33
+
+    COMPRESSION_MASK: ClassVar[int] = 0x0F
+    ACCEPT_COMPRESSION_SHIFT: ClassVar[int] = 4
 
     @classmethod
     def create(cls, msg_type: MessageType, data: bytes) -> Self:
@@ -86,12 +146,22 @@ class Message:
     def unpack(cls, packed: bytes) -> Self:
         """
         deserializes the message
+
+        Notes
+        -----
+        - Messages without flags are packed as a 3-tuple, i.e., both the 3-tuple and 4-tuple formats are supported.
         """
-        (msg_type, msg_id, data) = msgpack.unpackb(packed, use_list=False)
+        fields = msgpack.unpackb(packed, use_list=False)
+        if len(fields) == 3:
+            (msg_type, msg_id, data) = fields
+            flags = 0
+        else:
+            (msg_type, msg_id, data, flags) = fields
         return cls(
             msg_id=MessageId.from_bytes(msg_id),
             msg_type=MessageType.from_bytes(msg_type),
             data=data,
+            flags=flags,
         )
 
     def pack(self) -> bytes:
@@ -100,17 +170,145 @@ class Message:
 
         Notes
         -----
-        - serialized message format: (MessageId, MessageType, MessageData)
+        - serialized message format: (MessageType, MessageId, MessageData[, flags])
+        - flags are only packed when they are set, i.e., messages that do not use compression are packed in the
+          format that is supported by peers that do not support flags
         """
+        if self.flags == 0:
+            return msgpack.packb(
+                (
+                    self.msg_type.bytes,
+                    self.msg_id.bytes,
+                    self.data,
+                )
+            )
         return msgpack.packb(
             (
                 self.msg_type.bytes,
                 self.msg_id.bytes,
                 self.data,
+                self.flags,
+            )
+        )
+
+    def __reduce__(self):
+        # memoryview cannot be pickled, i.e., the data is copied when the message is sent to another process
+        return self.__class__, (
+            self.msg_id,
+            self.msg_type,
+            bytes(self.data),
+            self.flags,
+        )
+
+    @property
+    def compression_codec_id(self) -> int:
+        """
+        :return: compression codec ID that the data is compressed with, or 0 if the data is not compressed
+        """
+        return self.flags & self.COMPRESSION_MASK
+
+    @property
+    def accepted_compression_codec_id(self) -> int:
+        """
+        :return: compression codec ID that the sender accepts for replies, or 0 if compression is not accepted
+        """
+        return (self.flags >> self.ACCEPT_COMPRESSION_SHIFT) & self.COMPRESSION_MASK
+
+    def accept_compression(self, compression: Compression) -> Self:
+        """
+        Advertises that the sender accepts the compression codec for replies.
+
+        Notes
+        -----
+        - The message is packed with flags, i.e., the recipient must support flags.
+
+        :return: new Message
+        """
+        return replace(
+            self,
+            flags=(
+                self.flags & ~(self.COMPRESSION_MASK << self.ACCEPT_COMPRESSION_SHIFT)
             )
+            | (compression.compressor.codec_id << self.ACCEPT_COMPRESSION_SHIFT),
         )
 
+    def compress(self, compression: Compression) -> Self:
+        """
+        Compresses the data if it is at least the compression threshold size and it shrinks when compressed.
+
+        :return: self if the data is not compressed, otherwise a new Message with compressed data
+        """
+        if self.compression_codec_id == 0 and len(self.data) >= compression.threshold:
+            compressed = compression.compressor.compress(self.data)
+            if len(compressed) < len(self.data):
+                return replace(
+                    self,
+                    data=compressed,
+                    flags=self.flags | compression.compressor.codec_id,
+                )
+        return self
+
+    def decompress(self, max_size: int = DEFAULT_MAX_DECOMPRESSED_SIZE) -> Self:
+        """
+        The accepted compression codec is retained, i.e., the recipient can use it to compress replies.
+
+        :param max_size: max decompressed data size in bytes
+        :return: self if the data is not compressed, otherwise a new Message with decompressed data
+        :exception ValueError: if the compression codec is not supported, or the data fails to be decompressed
+        """
+        codec_id = self.compression_codec_id
+        if codec_id == 0:
+            return self
+        return replace(
+            self,
+            data=get_compressor(codec_id).decompress(self.data, max_size),
+            flags=self.flags & ~self.COMPRESSION_MASK,
+        )
+
+    @property
+    def binary_size(self) -> int:
+        """
+        :return: number of bytes required to write the message using the binary layout
+        """
+        return self.BINARY_HEADER_SIZE + len(self.data)
+
+    def pack_into(self, buffer: bytearray | memoryview, offset: int = 0):
+        """
+        Writes the message into the buffer using the binary layout:
+        msg_type (16 bytes) | msg_id (16 bytes) | flags (1 byte) | data
+
+        :param buffer: must have at least `offset + binary_size` bytes
+        :param offset: where to start writing the message in the buffer
+        """
+        view = memoryview(buffer)
+        view[offset : offset + 16] = self.msg_type.bytes
+        view[offset + 16 : offset + 32] = self.msg_id.bytes
+        view[offset + 32] = self.flags
+        view[offset + 33 : offset + 33 + len(self.data)] = self.data
 
+    @classmethod
+    def unpack_from(cls, buffer: bytes | bytearray | memoryview) -> Self:
+        """
+        Reads a message that was written using :meth:`pack_into`.
+
+        Notes
+        -----
+        - `data` is a `memoryview` into the buffer, i.e., the payload is not copied.
+
+        :exception ValueError: if the buffer is too small
+        """
+        view = memoryview(buffer)
+        if len(view) < cls.BINARY_HEADER_SIZE:
+            raise ValueError("buffer is too small")
+        return cls(
+            msg_id=MessageId.from_bytes(bytes(view[16:32])),
+            msg_type=MessageType.from_bytes(bytes(view[:16])),
+            data=view[cls.BINARY_HEADER_SIZE :],
+            flags=view[32],
+        )
+
+
+@codec
 @dataclass(slots=True)
 class SignedMessage(Serializable):
     """
@@ -160,37 +358,18 @@ class SignedMessage(Serializable):
             signer=self.signer,
         )
 
-    @classmethod
-    def unpack(cls, msg: bytes) -> Self:
-        """
-        Deserialize the msg
-        """
-        (
-            msg_type,
-            signer,
-            signature,
-            data,
-        ) = msgpack.unpackb(msg, use_list=False)
 
-        return cls(
-            signer=signer,
-            signature=signature,
-            data=data,
-            msg_type=MessageType.from_bytes(msg_type),
-        )
-
-    def pack(self) -> bytes:
-        """
-        Serialized the message into bytes
-        """
-        return msgpack.packb(
-            (
-                self.msg_type.bytes,
-                self.signer,
-                self.signature,
-                self.data,
-            )
-        )
+def _multisig_subsig(public_key: bytes, signature: bytes | None) -> MultisigSubsig:
+    if (
+        not isinstance(public_key, bytes)
+        or len(public_key) != crypto_sign_PUBLICKEYBYTES
+    ):
+        raise ValueError("invalid multisig subsig public key")
+    if signature is not None and (
+        not isinstance(signature, bytes) or len(signature) != crypto_sign_BYTES
+    ):
+        raise ValueError("invalid multisig subsig signature")
+    return MultisigSubsig(public_key, signature)
 
 
 class MultisigSignaturesBelowThreshold(Exception):
@@ -235,6 +414,8 @@ class MultisigMessage(Serializable):
     def unpack(cls, msg: bytes) -> Self:
         """
         Deserialize the msg
+
+        :exception ValueError: if a subsig public key or signature is malformed
         """
         (
             msg_type,
@@ -243,16 +424,14 @@ class MultisigMessage(Serializable):
             multisig_subsigs,
             data,
         ) = msgpack.unpackb(msg, use_list=False)
+        # subsigs carry raw public keys, i.e., skip the base32 address encode/decode round trip
         multisig = Multisig(
-            version=multisig_version,
-            threshold=multisig_threshold,
-            addresses=[
-                encoding.encode_address(public_key)
-                for (public_key, _signature) in multisig_subsigs
-            ],
+            version=multisig_version, threshold=multisig_threshold, addresses=[]
         )
-        for i, subsig in enumerate(multisig.subsigs):
-            subsig.signature = multisig_subsigs[i][1]
+        multisig.subsigs = [
+            _multisig_subsig(public_key, signature)
+            for (public_key, signature) in multisig_subsigs
+        ]
         return cls(
             multisig=multisig,
             data=data,
@@ -285,9 +464,21 @@ class MultisigMessage(Serializable):
                 return
         raise ValueError("invalid private key")
 
-    def verify(self) -> bool:
+    def verify(self, verify_all: bool = False) -> bool:
         """
+        Verifies the subsig signatures against the raw subsig public keys.
+
+        Notes
+        -----
+        - By default, verification stops as soon as `threshold` valid signatures are verified, i.e., extra signatures
+          are not checked.
+        - If `verify_all` is True, then every present signature must be valid, which matches how Algorand verifies
+          multisig transactions.
+        - In either mode, an invalid signature that is checked fails verification.
+
+        :param verify_all: if True, then all present signatures are verified
         :return: True if the message signature passed verification
+        :exception MultisigSignaturesBelowThreshold: if fewer than `threshold` signatures are present
         """
         subsigs = [
             subsig for subsig in self.multisig.subsigs if subsig.signature is not None
@@ -295,11 +486,13 @@ class MultisigMessage(Serializable):
         if len(subsigs) < self.multisig.threshold:
             raise MultisigSignaturesBelowThreshold
 
+        if not verify_all:
+            subsigs = subsigs[: self.multisig.threshold]
         for subsig in subsigs:
-            if not verify_message(
+            if not verify_signature(
                 message=self.data,
                 signature=subsig.signature,
-                signer=cast(SigningAddress, encoding.encode_address(subsig.public_key)),
+                public_key=subsig.public_key,
             ):
                 return False
 
@@ -334,3 +527,51 @@ class MultisigMessage(Serializable):
 
     def __repr__(self):
         return f"MultisigMessageData(multisig={self.multisig.dictify()}, msg_type={self.msg_type}, data={self.data})"
+
+
+def _verify_multisig_messages(
+    msgs: Sequence[MultisigMessage], verify_all: bool
+) -> list[bool]:
+    results = []
+    for msg in msgs:
+        try:
+            results.append(msg.verify(verify_all))
+        except MultisigSignaturesBelowThreshold:
+            results.append(False)
+    return results
+
+
+def verify_multisig_messages(
+    msgs: Sequence[MultisigMessage],
+    verify_all: bool = False,
+    executor: Executor | None = None,
+    chunk_size: int = 64,
+) -> list[bool]:
+    """
+    Verifies a batch of multisig messages.
+
+    Notes
+    -----
+    - Messages with fewer than `threshold` signatures fail verification, i.e., one bad message does not abort the batch.
+    - If an executor is specified and the batch is larger than `chunk_size`, then the batch is split into chunks,
+      which are verified in parallel on the executor (see :func:`verify_messages`).
+
+    :param verify_all: see :meth:`MultisigMessage.verify`
+    :param executor: used to verify large batches in parallel
+    :param chunk_size: max number of messages that are verified per executor task
+    :return: verification results in the same order as the batch
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    if executor is None or len(msgs) <= chunk_size:
+        return _verify_multisig_messages(msgs, verify_all)
+
+    chunks = [msgs[i : i + chunk_size] for i in range(0, len(msgs), chunk_size)]
+    return [
+        result
+        for chunk_results in executor.map(
+            partial(_verify_multisig_messages, verify_all=verify_all), chunks
+        )
+        for result in chunk_results
+    ]
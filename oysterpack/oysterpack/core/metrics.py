@@ -0,0 +1,161 @@
+"""
+Lightweight metrics that are cheap enough to leave enabled in production
+"""
+from dataclasses import dataclass
+
+# each power of 2 range is split into 2**_SUB_BUCKET_BITS linear sub-buckets, i.e., values are recorded with
+# a relative error of at most 1 / 2**_SUB_BUCKET_BITS (~3%)
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    exponent = value.bit_length() - _SUB_BUCKET_BITS - 1
+    return exponent * _SUB_BUCKET_COUNT + (value >> exponent)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    exponent = index // _SUB_BUCKET_COUNT - 1
+    mantissa = index - exponent * _SUB_BUCKET_COUNT
+    return ((mantissa + 1) << exponent) - 1
+
+
+@dataclass(slots=True, frozen=True)
+class HistogramSnapshot:
+    """
+    Point in time view of a :type:`LatencyHistogram`
+
+    Latencies are in seconds.
+    """
+
+    count: int = 0
+    min: float = 0.0
+    max: float = 0.0
+    mean: float = 0.0
+    p50: float = 0.0
+    p90: float = 0.0
+    p99: float = 0.0
+    p999: float = 0.0
+
+
+class LatencyHistogram:
+    """
+    HDR style histogram, where latencies are recorded into logarithmic buckets, which are subdivided into linear
+    sub-buckets.
+
+    Notes
+    -----
+    - Latencies are recorded with microsecond resolution and ~3% relative precision.
+    - Latencies above `max_latency` are recorded as `max_latency`.
+    - Recording a latency is O(1) and does not allocate, i.e., the histogram memory is fixed.
+    - Not thread safe, i.e., it is designed to be updated from the event loop.
+    """
+
+    __slots__ = ("__max_value", "__counts", "__count", "__total", "__min", "__max")
+
+    def __init__(self, max_latency: float = 3600.0):
+        """
+        :param max_latency: in seconds
+        """
+        if max_latency <= 0:
+            raise ValueError("max_latency must be > 0")
+        self.__max_value = int(max_latency * 1_000_000)
+        self.__counts = [0] * (_bucket_index(self.__max_value) + 1)
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all recorded latencies
+        """
+        for i in range(len(self.__counts)):
+            self.__counts[i] = 0
+        self.__count = 0
+        self.__total = 0
+        self.__min = 0
+        self.__max = 0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    def record(self, latency: float):
+        """
+        :param latency: in seconds
+        """
+        value = min(max(int(latency * 1_000_000), 0), self.__max_value)
+        self.__counts[_bucket_index(value)] += 1
+        if self.__count == 0 or value < self.__min:
+            self.__min = value
+        if value > self.__max:
+            self.__max = value
+        self.__count += 1
+        self.__total += value
+
+    def percentile(self, percentile: float) -> float:
+        """
+        :param percentile: [0.0, 100.0]
+        :return: latency in seconds, i.e., the upper bound of the bucket that contains the percentile
+        """
+        if self.__count == 0:
+            return 0.0
+        rank = max(1, round(self.__count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.__counts):
+            seen += count
+            if seen >= rank:
+                return min(_bucket_upper_bound(index), self.__max) / 1_000_000
+        return self.__max / 1_000_000
+
+    def snapshot(self) -> HistogramSnapshot:
+        if self.__count == 0:
+            return HistogramSnapshot()
+        return HistogramSnapshot(
+            count=self.__count,
+            min=self.__min / 1_000_000,
+            max=self.__max / 1_000_000,
+            mean=self.__total / self.__count / 1_000_000,
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+            p999=self.percentile(99.9),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class GaugeSnapshot:
+    value: int = 0
+    # high watermark since the gauge was last reset
+    max: int = 0
+
+
+class Gauge:
+    """
+    Tracks a current value, e.g., the number of requests in flight, and its high watermark.
+    """
+
+    __slots__ = ("value", "max")
+
+    def __init__(self):
+        self.value = 0
+        self.max = 0
+
+    def inc(self):
+        self.value += 1
+        if self.value > self.max:
+            self.max = self.value
+
+    def dec(self):
+        self.value -= 1
+
+    def reset(self):
+        """
+        Resets the high watermark to the current value
+        """
+        self.max = self.value
+
+    def snapshot(self) -> GaugeSnapshot:
+        return GaugeSnapshot(value=self.value, max=self.max)
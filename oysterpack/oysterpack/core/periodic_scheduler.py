@@ -0,0 +1,310 @@
+"""
+Process wide scheduler for periodic background tasks, e.g., service health checks
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from queue import SimpleQueue
+from typing import Callable, Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+class ScheduledTask:
+    """
+    Handle to a periodic task that was scheduled via :meth:`PeriodicScheduler.schedule`
+    """
+
+    def __init__(
+        self,
+        func: Callable[[], Any],
+        interval: timedelta,
+        jitter: float,
+        name: str,
+    ):
+        self.__func = func
+        self.__interval = interval.total_seconds()
+        self.__jitter = jitter
+        self.__name = name
+        self.__cancelled = False
+        self.__running = False
+        self.__run_count = 0
+        self.__skip_count = 0
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancelled
+
+    @property
+    def running(self) -> bool:
+        """
+        :return: True if the task is currently running on a worker thread
+        """
+        return self.__running
+
+    @property
+    def run_count(self) -> int:
+        return self.__run_count
+
+    @property
+    def skip_count(self) -> int:
+        """
+        :return: number of runs that were skipped because the previous run was still running
+        """
+        return self.__skip_count
+
+    def cancel(self):
+        """
+        Cancels future runs. A run that is in progress is not interrupted.
+        """
+        self.__cancelled = True
+
+    def _next_delay(self) -> float:
+        return self.__interval * (1 + random.uniform(0, self.__jitter))
+
+    def _try_acquire(self) -> bool:
+        # only called from the scheduler thread
+        if self.__running:
+            self.__skip_count += 1
+            return False
+        self.__running = True
+        return True
+
+    def _run(self):
+        # only called from a worker thread
+        try:
+            self.__func()
+        finally:
+            self.__run_count += 1
+            self.__running = False
+
+    def _release(self):
+        # only called from a worker thread, when the task was cancelled before it ran
+        self.__running = False
+
+    def __repr__(self):
+        return f"ScheduledTask(name={self.__name}, interval={self.__interval}s)"
+
+
+class PeriodicScheduler:
+    """
+    Runs periodic tasks, as well as one-off tasks (see :meth:`submit`), on a bounded pool of worker threads.
+
+    Notes
+    -----
+    - A single scheduler thread keeps the tasks in a heap ordered by their next run time, i.e., there is no thread per
+      task and no thread is created per run.
+    - Each run is delayed by a random jitter of up to `jitter * interval`, which spreads out tasks that were scheduled
+      at the same time.
+    - If the previous run of a task is still in progress when the task is due, then the run is skipped, i.e., a slow
+      task never piles up runs on the worker pool.
+    - Cancelled tasks are dropped when they come due.
+    - All threads are daemon threads, i.e., a hung task does not block the process from exiting.
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "PeriodicScheduler"):
+        """
+        :param max_workers: max number of tasks that run concurrently
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+
+        self.__max_workers = max_workers
+        self.__name = name
+        self.__logger = logging.getLogger(name)
+
+        # (next run time, seq, task) - seq breaks ties, i.e., tasks are never compared
+        self.__heap: list[tuple[float, int, ScheduledTask]] = []
+        self.__seq = itertools.count()
+        self.__condition = threading.Condition()
+        self.__work: SimpleQueue[
+            ScheduledTask | Callable[[], None] | None
+        ] = SimpleQueue()
+        self.__threads: list[threading.Thread] = []
+        self.__shutdown = False
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @property
+    def task_count(self) -> int:
+        """
+        :return: number of scheduled tasks, which may include cancelled tasks that have not come due yet
+        """
+        with self.__condition:
+            return len(self.__heap)
+
+    def schedule(
+        self,
+        func: Callable[[], Any],
+        interval: timedelta,
+        jitter: float = 0.1,
+        name: str | None = None,
+    ) -> ScheduledTask:
+        """
+        Schedules the function to run every `interval`. The first run is after `interval`.
+
+        :param jitter: max random delay that is added to each run, as a fraction of the interval
+        :return: handle that is used to cancel the task
+        """
+        if interval <= timedelta(0):
+            raise ValueError("interval must be > 0")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be in the range [0, 1]")
+
+        task = ScheduledTask(
+            func=func,
+            interval=interval,
+            jitter=jitter,
+            name=name if name else getattr(func, "__name__", repr(func)),
+        )
+        with self.__condition:
+            if self.__shutdown:
+                raise RuntimeError("scheduler is shutdown")
+            self.__start_threads()
+            delay = task._next_delay()  # pylint: disable=protected-access
+            self.__push(task, time.monotonic() + delay)
+            self.__condition.notify()
+        return task
+
+    def submit(self, func: Callable[[], _T]) -> Future[_T]:
+        """
+        Runs the function once on the worker pool.
+
+        :return: future that completes with the function result
+        """
+        future: Future[_T] = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func())
+            except BaseException as err:  # pylint: disable=broad-exception-caught
+                future.set_exception(err)
+
+        with self.__condition:
+            if self.__shutdown:
+                raise RuntimeError("scheduler is shutdown")
+            self.__start_threads()
+        self.__work.put(run)
+        return future
+
+    def shutdown(self):
+        """
+        Stops the scheduler. Runs that are in progress are not interrupted.
+        """
+        with self.__condition:
+            if self.__shutdown:
+                return
+            self.__shutdown = True
+            self.__heap.clear()
+            self.__condition.notify()
+        for _ in range(self.__max_workers):
+            self.__work.put(None)
+
+    def __push(self, task: ScheduledTask, run_at: float):
+        heapq.heappush(self.__heap, (run_at, next(self.__seq), task))
+
+    def __start_threads(self):
+        if self.__threads:
+            return
+        self.__threads.append(
+            threading.Thread(target=self.__run_scheduler, name=self.__name, daemon=True)
+        )
+        for i in range(self.__max_workers):
+            self.__threads.append(
+                threading.Thread(
+                    target=self.__run_worker,
+                    name=f"{self.__name}-worker-{i}",
+                    daemon=True,
+                )
+            )
+        for thread in self.__threads:
+            thread.start()
+
+    def __run_scheduler(self):
+        with self.__condition:
+            while not self.__shutdown:
+                if not self.__heap:
+                    self.__condition.wait()
+                    continue
+                run_at, _seq, task = self.__heap[0]
+                delay = run_at - time.monotonic()
+                if delay > 0:
+                    self.__condition.wait(delay)
+                    continue
+                heapq.heappop(self.__heap)
+                if task.cancelled:
+                    continue
+                if task._try_acquire():  # pylint: disable=protected-access
+                    self.__work.put(task)
+                else:
+                    self.__logger.warning(
+                        "skipped run - previous run is still running: %s", task
+                    )
+                # if the scheduler fell behind, e.g., the host was suspended, then missed runs are not caught up
+                next_delay = task._next_delay()  # pylint: disable=protected-access
+                self.__push(task, max(run_at + next_delay, time.monotonic()))
+
+    def __run_worker(self):
+        while True:
+            task = self.__work.get()
+            if task is None:
+                return
+            if not isinstance(task, ScheduledTask):
+                task()
+                continue
+            if task.cancelled:
+                task._release()  # pylint: disable=protected-access
+                continue
+            try:
+                task._run()  # pylint: disable=protected-access
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                self.__logger.error("task failed: %s : %s", task, err)
+
+
+_default_scheduler: PeriodicScheduler | None = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_periodic_scheduler() -> PeriodicScheduler:
+    """
+    :return: process wide scheduler, which is created on first use
+    """
+    global _default_scheduler  # pylint: disable=global-statement
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PeriodicScheduler()
+        return _default_scheduler
+
+
+_default_healthcheck_executor: PeriodicScheduler | None = None
+
+
+def default_healthcheck_executor() -> PeriodicScheduler:
+    """
+    Health checks are executed on their own worker pool, apart from the scheduler workers that wait on them with a
+    timeout, i.e., a hung health check does not stall the scheduler. Health check executions are single flight, i.e.,
+    each hung health check holds at most 1 worker.
+
+    :return: process wide pool that health checks are executed on via :meth:`PeriodicScheduler.submit`, which is
+             created on first use
+    """
+    global _default_healthcheck_executor  # pylint: disable=global-statement
+    with _default_scheduler_lock:
+        if _default_healthcheck_executor is None:
+            _default_healthcheck_executor = PeriodicScheduler(
+                max_workers=16, name="HealthCheckExecutor"
+            )
+        return _default_healthcheck_executor
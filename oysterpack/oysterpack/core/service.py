@@ -5,18 +5,27 @@ Provides standard for building services
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import timedelta, datetime, UTC
 from enum import IntEnum, auto
-from threading import Timer, Event
-from typing import Tuple
+from threading import Event
+from typing import Tuple, Self, TYPE_CHECKING
 
 from reactivex import Observable, Subject
 from reactivex.operators import observe_on
 from reactivex.subject import BehaviorSubject
 
 from oysterpack.core.health_check import HealthCheck, HealthCheckResult
+from oysterpack.core.periodic_scheduler import (
+    PeriodicScheduler,
+    ScheduledTask,
+    default_periodic_scheduler,
+    default_healthcheck_executor,
+)
 from oysterpack.core.rx import default_scheduler
 
+if TYPE_CHECKING:
+    from oysterpack.core.async_service import AsyncService
+
 ServiceKey = Tuple[type, str]
 
 
@@ -102,8 +111,15 @@ class Service(ABC):
     - Services have a defined lifecycle. The service lifecycle states are defined by `ServiceState`.
     - Services can be signalled to start and stop async. Services subscribe to an `Observable[ServiceCommand]`
     - Service lifecycle events are published on an Observable[ServiceStateEvent]
+    - Services can declare dependencies on other services (see :meth:`depends_on`), which the ServiceManager uses
+      to order service startup and shutdown.
     - Services define and schedule their own health checks. Healthcheck results are published on an
       Observable[HealthCheckResult].
+      - Health checks are scheduled by a :type:`PeriodicScheduler`, which is shared process wide by default.
+      - Each scheduled run is executed on the process wide health check executor (see
+        :func:`default_healthcheck_executor`), and waited on with the health check timeout. A run that does not
+        complete in time is published as RED with a :type:`HealthCheckTimeout` error, i.e., a hung health check
+        does not stall the scheduler.
     """
 
     # pylint: disable=too-many-instance-attributes
@@ -111,11 +127,16 @@ class Service(ABC):
     # subclasses should override to register health checks
     _healthchecks: list[HealthCheck] = []
 
-    def __init__(self, commands: Observable[ServiceCommand] | None = None):
+    def __init__(
+        self,
+        commands: Observable[ServiceCommand] | None = None,
+        healthcheck_scheduler: PeriodicScheduler | None = None,
+    ):
         """
 
         :param commands: service subscribes to commands. This provides a mechanism to manage services by publishing
                          commands through the Observable
+        :param healthcheck_scheduler: used to run the service health checks. Defaults to the process wide scheduler.
         """
 
         self._state = ServiceLifecycleState.NEW
@@ -124,12 +145,15 @@ class Service(ABC):
         self._init_lifecycle_state_observable()
         self._subscribe_commands(commands)
 
-        self._healthcheck_timer: Timer | None = None
+        self._healthcheck_scheduler = healthcheck_scheduler
+        self._healthcheck_tasks: list[ScheduledTask] = []
         self._init_healthcheck_observable()
 
         self._running_event = Event()
         self._stopped_event = Event()
 
+        self._dependencies: set[ServiceKey] = set()
+
     def _init_lifecycle_state_observable(self) -> None:
         self._state_subject: BehaviorSubject[ServiceLifecycleEvent] = BehaviorSubject(
             ServiceLifecycleEvent(self.name, self._state)
@@ -192,6 +216,26 @@ class Service(ABC):
         """
         return self._state == ServiceLifecycleState.STOPPED
 
+    @property
+    def dependencies(self) -> set[ServiceKey]:
+        """
+        :return: keys of the services that must be running before this service is started
+        """
+        return self._dependencies
+
+    def depends_on(self, *services: "Service | AsyncService | ServiceKey") -> Self:
+        """
+        Declares services that must be running before this service is started, and that must be stopped after this
+        service is stopped.
+
+        :param services: services or service keys, where a service is either a `Service` or an `AsyncService`
+        """
+        for service in services:
+            self._dependencies.add(
+                service if isinstance(service, tuple) else service.key
+            )
+        return self
+
     @property
     def healthchecks(self) -> list[HealthCheck]:
         """
@@ -199,6 +243,15 @@ class Service(ABC):
         """
         return self._healthchecks
 
+    @property
+    def healthcheck_scheduler(self) -> PeriodicScheduler:
+        """
+        :return: scheduler that runs the service health checks
+        """
+        if self._healthcheck_scheduler is None:
+            self._healthcheck_scheduler = default_periodic_scheduler()
+        return self._healthcheck_scheduler
+
     @property
     def lifecycle_state_observable(self) -> Observable[ServiceLifecycleEvent]:
         """
@@ -245,23 +298,27 @@ class Service(ABC):
         """
 
         def schedule_healthcheck(healthcheck: HealthCheck):
-            def run_healthcheck(healthcheck: HealthCheck):
-                self._healthchecks_subject.on_next(healthcheck())
-                self._healthcheck_timer = Timer(
-                    healthcheck.run_interval.total_seconds(),
+            def run_healthcheck():
+                # health checks that are shared by several services are run once per interval
+                start = datetime.now(UTC)
+                future = default_healthcheck_executor().submit(healthcheck.run)
+                try:
+                    result = future.result(
+                        healthcheck.timeout.total_seconds()
+                        if healthcheck.timeout
+                        else None
+                    )
+                except TimeoutError:
+                    result = healthcheck.record_timeout(start)
+                self._healthchecks_subject.on_next(result)
+
+            self._healthcheck_tasks.append(
+                self.healthcheck_scheduler.schedule(
                     run_healthcheck,
-                    (healthcheck,),
+                    healthcheck.run_interval,
+                    name=f"{self.name}.{healthcheck.name}",
                 )
-                self._healthcheck_timer.daemon = True
-                self._healthcheck_timer.start()
-
-            self._healthcheck_timer = Timer(
-                healthcheck.run_interval.total_seconds(),
-                run_healthcheck,
-                (healthcheck,),
             )
-            self._healthcheck_timer.daemon = True
-            self._healthcheck_timer.start()
             self._logger.info("scheduled healthcheck: %s", healthcheck)
 
         if self._state in (
@@ -348,8 +405,7 @@ class Service(ABC):
                     self.name, "error occurred while stopping"
                 ) from err
             finally:
-                if self._healthcheck_timer:
-                    self._healthcheck_timer.cancel()
+                self._cancel_healthchecks()
         elif self._state == ServiceLifecycleState.NEW:
             self._state_subject.on_next(self._set_state(ServiceLifecycleState.STOPPED))
         elif self._state == ServiceLifecycleState.STARTING:
@@ -375,6 +431,11 @@ class Service(ABC):
         self.await_stopped()
         self.start()
 
+    def _cancel_healthchecks(self):
+        for task in self._healthcheck_tasks:
+            task.cancel()
+        self._healthcheck_tasks.clear()
+
     def _set_state(self, state: ServiceLifecycleState) -> ServiceLifecycleEvent:
         self._logger.info("state transition: %s -> %s", self._state.name, state.name)
 
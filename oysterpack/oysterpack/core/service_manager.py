@@ -3,23 +3,80 @@ ServiceManager
 """
 import itertools
 import logging
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    Future,
+    wait,
+    ALL_COMPLETED,
+    FIRST_EXCEPTION,
+)
 from datetime import timedelta
+from typing import Mapping
 
 from reactivex import Observable, Subject
 from reactivex.operators import observe_on
 
+from oysterpack.core.async_service import AsyncService
 from oysterpack.core.rx import default_scheduler
 from oysterpack.core.service import (
     Service,
-    ServiceCommand,
     ServiceLifecycleEvent,
     ServiceKey,
+    ServiceExceptionGroup,
+    ServiceStartError,
+    ServiceStopError,
 )
 
 
+def dependency_levels(
+    services: Mapping[ServiceKey, Service | AsyncService]
+) -> list[list[ServiceKey]]:
+    """
+    Groups the services into levels, where each service only depends on services in earlier levels.
+    Services are listed within each level in the order they were specified.
+
+    :exception AssertionError: if a dependency is not managed, or if the dependencies contain a cycle
+    """
+    for service in services.values():
+        missing = service.dependencies - services.keys()
+        if missing:
+            raise AssertionError(
+                f"[{service.name}] depends on services that are not managed: {missing}"
+            )
+
+    levels: list[list[ServiceKey]] = []
+    leveled: set[ServiceKey] = set()
+    remaining = list(services)
+    while remaining:
+        level = [
+            key for key in remaining if services[key].dependencies.issubset(leveled)
+        ]
+        if not level:
+            raise AssertionError(
+                f"Service dependencies contain a cycle: {[services[key].name for key in remaining]}"
+            )
+        levels.append(level)
+        leveled.update(level)
+        remaining = [key for key in remaining if key not in leveled]
+    return levels
+
+
 class ServiceManager:
     """
     ServiceManager
+
+    Notes
+    -----
+    - Services are grouped into levels by their dependencies (see :meth:`Service.depends_on`). Services within the
+      same level are started in parallel, and each level is started after the previous level is running, i.e., the
+      total startup time is bounded by the critical path through the dependency graph.
+    - Services are stopped level by level in reverse order.
+    - If a service fails to start, then the services that were already started are stopped, including the other
+      services in the failed level. Services that are still starting in the background are stopped as soon as their
+      startup completes.
+    - Lifecycle operations run in the background in the order they were initiated, e.g., :meth:`stop` waits for a
+      pending :meth:`start` to complete.
     """
 
     def __init__(self, services: list[Service]):
@@ -29,6 +86,7 @@ class ServiceManager:
         -------
         1.At least one service must be specified
         2.Services must be unique. The unique key: (type(service), Service.name)
+        3.Service dependencies must be managed services, and must not contain cycles
         """
 
         if len(services) == 0:
@@ -45,6 +103,8 @@ class ServiceManager:
             ]
             raise AssertionError(f"Duplicate service keys were found: {dups}")
 
+        self._levels = dependency_levels(self._services)
+
         self._logger = logging.getLogger(self.__class__.__name__)
 
         # initialize Observable[ServiceLifeCycleState]
@@ -57,11 +117,13 @@ class ServiceManager:
             ServiceLifecycleEvent
         ] = self._service_lifecycle_subject.pipe(observe_on(default_scheduler))
 
-        # initialize Observable[ServiceCommand]
-        self._command_subject: Subject[ServiceCommand] = Subject()  # type: ignore
-        self._command_observable: Observable[  # type: ignore
-            ServiceCommand
-        ] = self._command_subject.pipe(observe_on(default_scheduler))
+        # runs lifecycle operations one at a time, in the order they were initiated
+        self._lifecycle_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=self.__class__.__name__
+        )
+        self._startup: Future[None] | None = None
+        self._shutdown: Future[None] | None = None
+        self._startup_times: dict[ServiceKey, timedelta] = {}
 
     @property
     def services(self) -> dict[ServiceKey, Service]:
@@ -71,6 +133,20 @@ class ServiceManager:
         """
         return self._services
 
+    @property
+    def levels(self) -> list[list[ServiceKey]]:
+        """
+        :return: services grouped into startup levels, where each service only depends on services in earlier levels
+        """
+        return self._levels
+
+    @property
+    def startup_times(self) -> dict[ServiceKey, timedelta]:
+        """
+        :return: how long each service took to start during the last startup
+        """
+        return dict(self._startup_times)
+
     @property
     def service_lifecycle_event_observable(self) -> Observable[ServiceLifecycleEvent]:
         """
@@ -80,47 +156,182 @@ class ServiceManager:
         """
         return self._service_lifecycle_event_observable
 
-    def start(self):
+    def start(self, timeout: timedelta | None = None):
         """
         Initiates service startup on all the services being managed.
-        """
-        for service in self._services.values():
-            service._subscribe_commands(  # pylint: disable=protected-access
-                self._command_observable
-            )
 
-        self._command_subject.on_next(ServiceCommand.START)
+        :param timeout: deadline for all services to start. If the deadline is exceeded, then services in the
+                        remaining levels are not started.
+        """
+        self._startup = self._lifecycle_executor.submit(self.__start_services, timeout)
 
-    def stop(self):
+    def stop(self, timeout: timedelta | None = None):
         """
         Initiates service shutdown on all the services being managed
 
-        :return:
+        :param timeout: deadline for all services to stop
         """
-        self._command_subject.on_next(ServiceCommand.STOP)
+        self._shutdown = self._lifecycle_executor.submit(self.__stop_services, timeout)
 
     def await_running(self, timeout: timedelta | None = None):
         """
         Used to await for all services to start
-        :param timeout: timeout is applied to each service
+
+        :param timeout: timeout is applied to the entire startup
+        :exception TimeoutError: if startup did not complete in time
+        :exception ServiceStartError: if a service failed to start
         """
-        for service in self._services.values():
-            try:
-                service.await_running(timeout)
-                self._logger.info("service is running: %s", service.name)
-            except TimeoutError as err:
-                self._logger.error("service startup timed out: %s", service.name)
-                raise err
+        if self._startup is None:
+            raise ServiceStartError(
+                self.__class__.__name__, "services were not started"
+            )
+        self._startup.result(timeout.total_seconds() if timeout else None)
 
     def await_stopped(self, timeout: timedelta | None = None):
         """
         Used to await for all services to stop
-        :param timeout: timeout is applied to each service
+
+        :param timeout: timeout is applied to the entire shutdown
+        :exception TimeoutError: if shutdown did not complete in time
+        :exception ServiceExceptionGroup: if services failed to stop
         """
-        for service in self._services.values():
+        if self._shutdown is None:
+            raise ServiceStopError(self.__class__.__name__, "services were not stopped")
+        self._shutdown.result(timeout.total_seconds() if timeout else None)
+
+    def __start_services(self, timeout: timedelta | None):
+        deadline = time.monotonic() + timeout.total_seconds() if timeout else None
+        self._startup_times.clear()
+        started: list[list[ServiceKey]] = []
+        startups: dict[ServiceKey, Future] = {}
+
+        def start_service(service: Service):
+            start = time.perf_counter()
+            service.start()
+            self._startup_times[service.key] = timedelta(
+                seconds=time.perf_counter() - start
+            )
+            self._logger.info(
+                "service is running: %s [%s]",
+                service.name,
+                self._startup_times[service.key],
+            )
+
+        try:
+            for level in self._levels:
+                # services in the level that started need to be stopped if the level fails
+                started.append(level)
+                self.__run_level(
+                    level, start_service, deadline, FIRST_EXCEPTION, startups
+                )
+        except BaseException as err:
+            self._logger.error("service startup failed: %s", err)
+            self.__rollback(started, startups)
+            raise
+
+    def __rollback(
+        self,
+        levels: list[list[ServiceKey]],
+        startups: dict[ServiceKey, Future],
+    ):
+        """
+        Stops the services that were started, level by level in reverse order.
+
+        Services that are still starting in the background, i.e., failed level siblings or services that missed the
+        deadline, are stopped as soon as their startup completes.
+        """
+
+        def stop_when_started(service: Service):
+            def stop(_startup: Future):
+                try:
+                    service.stop()
+                    self._logger.info(
+                        "service is stopped after late startup: %s", service.name
+                    )
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    self._logger.error(
+                        "failed to stop service after late startup: %s : %s",
+                        service.name,
+                        err,
+                    )
+
+            return stop
+
+        stop_levels: list[list[ServiceKey]] = []
+        for level in reversed(levels):
+            stop_level = []
+            for key in level:
+                startup = startups.get(key)
+                if startup is not None and not startup.done():
+                    startup.add_done_callback(stop_when_started(self._services[key]))
+                else:
+                    stop_level.append(key)
+            if stop_level:
+                stop_levels.append(stop_level)
+        try:
+            self.__stop_levels(stop_levels, None)
+        except ServiceExceptionGroup as stop_err:
+            self._logger.error("failed to stop services: %s", stop_err)
+
+    def __stop_services(self, timeout: timedelta | None):
+        deadline = time.monotonic() + timeout.total_seconds() if timeout else None
+        self.__stop_levels(list(reversed(self._levels)), deadline)
+
+    def __stop_levels(self, levels: list[list[ServiceKey]], deadline: float | None):
+        errors: list[Exception] = []
+
+        def stop_service(service: Service):
+            service.stop()
+            self._logger.info("service is stopped: %s", service.name)
+
+        for level in levels:
             try:
-                service.await_stopped(timeout)
-                self._logger.info("service is stopped: %s", service.name)
-            except TimeoutError as err:
-                self._logger.error("service shutdown timed out: %s", service.name)
-                raise err
+                self.__run_level(level, stop_service, deadline)
+            except TimeoutError:
+                raise
+            except ExceptionGroup as err:
+                errors += err.exceptions
+        if errors:
+            raise ServiceExceptionGroup("services failed to stop", errors)
+
+    def __run_level(
+        self,
+        level: list[ServiceKey],
+        func,
+        deadline: float | None,
+        return_when: str = ALL_COMPLETED,
+        futures_by_key: dict[ServiceKey, Future] | None = None,
+    ):
+        """
+        Runs the function on each service in the level in parallel.
+
+        :param futures_by_key: if specified, then the future for each service is recorded
+
+        :exception TimeoutError: if the deadline is exceeded
+        :exception Exception: the first error, if `return_when` is FIRST_EXCEPTION
+        :exception ExceptionGroup: if services failed
+        """
+        services = [self._services[key] for key in level]
+        executor = ThreadPoolExecutor(max_workers=len(services))
+        futures = [executor.submit(func, service) for service in services]
+        if futures_by_key is not None:
+            futures_by_key.update(zip(level, futures))
+        # services that miss the deadline are left running in the background
+        executor.shutdown(wait=False)
+
+        timeout = max(deadline - time.monotonic(), 0) if deadline else None
+        done, not_done = wait(futures, timeout, return_when)
+        errors = [
+            future.exception() for future in done if future.exception() is not None
+        ]
+        if return_when == FIRST_EXCEPTION and errors:
+            raise errors[0]  # type: ignore
+        if not_done:
+            names = [
+                service.name
+                for service, future in zip(services, futures)
+                if future in not_done
+            ]
+            raise TimeoutError(f"services did not complete in time: {names}")
+        if errors:
+            raise ExceptionGroup("service errors", errors)  # type: ignore
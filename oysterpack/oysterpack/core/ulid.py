@@ -1,13 +1,27 @@
 """
 ULID support
 """
+from typing import Callable
+
 from ulid import ULID
 
 
 class HashableULID(ULID):
     """
     Enhances ULID to be hashable.
+
+    Notes
+    -----
+    - The hash is computed once, when the ULID is constructed, i.e., ULIDs are cheap to use as dict keys.
     """
 
+    def __init__(self, value: bytes | None = None) -> None:
+        super().__init__(value)
+        self.__hash = hash(self.bytes)
+
     def __hash__(self):
-        return self.bytes.__hash__()
+        return self.__hash
+
+    def __reduce__(self) -> tuple[Callable[[bytes], "HashableULID"], tuple[bytes]]:
+        # bytes hashes are randomized per process, i.e., the cached hash must be recomputed when unpickled
+        return self.__class__, (self.bytes,)
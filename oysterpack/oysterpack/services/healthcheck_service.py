@@ -2,6 +2,8 @@
 HealthCheck Service
 """
 import itertools
+import time
+from datetime import datetime, UTC
 from threading import Thread
 
 from reactivex import Observable
@@ -10,6 +12,11 @@ from oysterpack.core.health_check import (
     HealthCheck,
     HealthCheckResult,
     HealthCheckStatus,
+    HealthCheckStats,
+)
+from oysterpack.core.periodic_scheduler import (
+    PeriodicScheduler,
+    default_healthcheck_executor,
 )
 from oysterpack.core.service import Service, ServiceCommand
 
@@ -21,14 +28,20 @@ class HealthCheckService(Service):
     service to register the same healthcheck.
 
     The purpose of this service is to enable application wide health checks to be registered.
+
+    Notes
+    -----
+    - Health checks are run concurrently on the health check scheduler worker pool, i.e., the number of health checks
+      that run concurrently is bounded by the scheduler's max workers.
     """
 
     def __init__(
         self,
         healthchecks: list[HealthCheck],
         commands: Observable[ServiceCommand] | None = None,
+        healthcheck_scheduler: PeriodicScheduler | None = None,
     ):
-        super().__init__(commands)
+        super().__init__(commands, healthcheck_scheduler)
         self._healthchecks = healthchecks[:]
 
     @property
@@ -71,21 +84,63 @@ class HealthCheckService(Service):
 
         return grouped_results
 
+    @property
+    def healthcheck_stats(self) -> list[HealthCheckStats]:
+        """
+        Aggregate view over the health check histories, which is used to spot degrading dependencies, e.g., health
+        checks that are slowing down or flapping.
+
+        :return: stats ordered by p95 duration, slowest first
+        """
+        return sorted(
+            (healthcheck.stats() for healthcheck in self._healthchecks),
+            key=lambda stats: stats.p95,
+            reverse=True,
+        )
+
+    @property
+    def flapping_healthchecks(self) -> list[str]:
+        """
+        :return: names of the health checks that are flapping
+        """
+        return [stats.name for stats in self.healthcheck_stats if stats.flapping]
+
     def run_healthchecks(self):
         """
         Runs all registered health checks. Results are published on the health check Observable stream
 
         Notes
         -----
-        - Healthchecks are run in the background on a separate thread
+        - Healthchecks are run concurrently in the background
+        - A health check that does not complete within its timeout is published as RED with a
+          :type:`HealthCheckTimeout` error
         """
+        start = datetime.now(UTC)
+        started = time.monotonic()
+        futures = [
+            (healthcheck, default_healthcheck_executor().submit(healthcheck))
+            for healthcheck in self._healthchecks
+        ]
 
-        def _run_healthchecks():
-            for healthcheck in self._healthchecks:
-                result = healthcheck()
+        def publish_results():
+            for healthcheck, future in futures:
+                timeout = (
+                    max(
+                        started
+                        + healthcheck.timeout.total_seconds()
+                        - time.monotonic(),
+                        0,
+                    )
+                    if healthcheck.timeout
+                    else None
+                )
+                try:
+                    result = future.result(timeout)
+                except TimeoutError:
+                    result = healthcheck.record_timeout(start)
                 self._healthchecks_subject.on_next(result)
 
-        Thread(target=_run_healthchecks, daemon=True).start()
+        Thread(target=publish_results, daemon=True).start()
 
     def _start(self):
         # no additional startup work is required
@@ -1,10 +1,17 @@
+import pickle
 import unittest
-from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from base64 import b64decode, b64encode
 from typing import cast
 
+from algosdk import constants
 from algosdk.account import generate_account
-from algosdk.encoding import decode_address
-from algosdk.transaction import wait_for_confirmation, SignedTransaction
+from algosdk.encoding import decode_address, msgpack_encode
+from algosdk.transaction import (
+    wait_for_confirmation,
+    SignedTransaction,
+    SuggestedParams,
+)
 from beaker import sandbox
 from beaker.consts import algo
 from nacl.exceptions import CryptoError
@@ -14,6 +21,10 @@ from oysterpack.algorand.client.accounts.private_key import (
     signing_address_to_verify_key,
     encryption_address_to_public_key,
     verify_message,
+    verify_messages,
+    verify_key_cache_stats,
+    verify_signature,
+    public_key_to_verify_key,
 )
 from oysterpack.algorand.client.model import Address, MicroAlgos
 from oysterpack.algorand.client.transactions.payment import transfer_algo
@@ -111,6 +122,97 @@ class AlgoPrivateKeyTestCase(unittest.TestCase):
             with self.assertRaises(CryptoError):
                 recipient.decrypt(encrypted_msg)
 
+    def test_box_cache(self):
+        sender = AlgoPrivateKey(box_cache_size=2)
+        recipients = [AlgoPrivateKey() for _ in range(3)]
+
+        msg = b"Algorand is the future of finance"
+        for _ in range(3):
+            encrypted_msg = sender.encrypt(msg, recipients[0].encryption_address)
+            self.assertEqual(
+                msg, recipients[0].decrypt(encrypted_msg, sender.encryption_address)
+            )
+        stats = sender.box_cache_stats
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(2, stats.hits)
+
+        with self.subTest("least recently used Box is evicted when cache is full"):
+            for recipient in recipients:
+                sender.encrypt(msg, recipient.encryption_address)
+            self.assertEqual(1, sender.box_cache_stats.evictions)
+
+        with self.subTest("box cache is not pickled"):
+            sender_2 = pickle.loads(pickle.dumps(sender))
+            self.assertEqual(sender.signing_address, sender_2.signing_address)
+            self.assertEqual(0, sender_2.box_cache_stats.misses)
+            encrypted_msg = sender_2.encrypt(msg, recipients[0].encryption_address)
+            self.assertEqual(
+                msg, recipients[0].decrypt(encrypted_msg, sender.encryption_address)
+            )
+
+    def test_derived_keys_are_cached(self):
+        private_key = AlgoPrivateKey()
+
+        self.assertIs(private_key.signing_key, private_key.signing_key)
+        self.assertIs(private_key.signing_address, private_key.signing_address)
+        self.assertIs(private_key.encryption_address, private_key.encryption_address)
+        self.assertIs(private_key.public_keys, private_key.public_keys)
+
+        with self.subTest("derived keys are not pickled"):
+            private_key_2 = pickle.loads(pickle.dumps(private_key))
+            self.assertNotIn("signing_key", private_key_2.__dict__)
+            self.assertEqual(private_key.public_keys, private_key_2.public_keys)
+            self.assertEqual(
+                bytes(private_key.signing_key), bytes(private_key_2.signing_key)
+            )
+
+    def test_sign_transaction(self):
+        signer = AlgoPrivateKey()
+        suggested_params = SuggestedParams(
+            fee=1000,
+            first=1,
+            last=1000,
+            gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+            flat_fee=True,
+        )
+        txn = transfer_algo(
+            sender=signer.signing_address,
+            receiver=AlgoPrivateKey().signing_address,
+            amount=MicroAlgos(1000),
+            suggested_params=suggested_params,
+        )
+
+        signed_txn = signer.sign_transaction(txn)
+        self.assertEqual(
+            signed_txn.dictify(),
+            txn.sign(b64encode(bytes(signer)).decode()).dictify(),
+        )
+        self.assertIsNone(signed_txn.authorizing_address)
+        self.assertTrue(
+            verify_message(
+                constants.txid_prefix + b64decode(msgpack_encode(txn)),
+                b64decode(signed_txn.signature),
+                signer.signing_address,
+            )
+        )
+
+        with self.subTest("signing for a rekeyed account sets the authorizing address"):
+            txn = transfer_algo(
+                sender=AlgoPrivateKey().signing_address,
+                receiver=signer.signing_address,
+                amount=MicroAlgos(1000),
+                suggested_params=suggested_params,
+            )
+            signed_txn = signer.sign_transaction(txn)
+            self.assertEqual(signer.signing_address, signed_txn.authorizing_address)
+
+        with self.subTest("sign_transactions"):
+            signed_txns = signer.sign_transactions([txn, txn], [1])
+            self.assertEqual(1, len(signed_txns))
+            self.assertEqual(
+                signed_txn.dictify(), cast(SignedTransaction, signed_txns[0]).dictify()
+            )
+
     def test_sign_verify(self):
         signer = AlgoPrivateKey()
 
@@ -135,6 +237,54 @@ class AlgoPrivateKeyTestCase(unittest.TestCase):
                 )
             )
 
+        with self.subTest("verify using the raw public key"):
+            public_key = bytes(signer.signing_key.verify_key)
+            self.assertIs(
+                public_key_to_verify_key(public_key),
+                public_key_to_verify_key(public_key),
+            )
+            self.assertTrue(
+                verify_signature(signed_msg.message, signed_msg.signature, public_key)
+            )
+            self.assertFalse(
+                verify_signature(
+                    signed_msg.message,
+                    signed_msg.signature,
+                    bytes(other_signer.signing_key.verify_key),
+                )
+            )
+
+    def test_verify_messages(self):
+        signers = [AlgoPrivateKey() for _ in range(3)]
+        batch = []
+        for i in range(30):
+            signer = signers[i % len(signers)]
+            msg = f"message-{i}".encode()
+            batch.append((msg, signer.sign(msg).signature, signer.signing_address))
+        # invalid signature
+        batch.append((b"message", batch[0][1], signers[0].signing_address))
+
+        expected = [True] * 30 + [False]
+
+        hits = verify_key_cache_stats().hits
+        self.assertEqual(expected, verify_messages(batch))
+        self.assertGreaterEqual(verify_key_cache_stats().hits - hits, 28)
+
+        with self.subTest("verify batch in parallel using ThreadPoolExecutor"):
+            with ThreadPoolExecutor() as executor:
+                self.assertEqual(
+                    expected, verify_messages(batch, executor, chunk_size=4)
+                )
+
+        with self.subTest("verify batch in parallel using ProcessPoolExecutor"):
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                self.assertEqual(
+                    expected, verify_messages(batch, executor, chunk_size=8)
+                )
+
+        with self.subTest("empty batch"):
+            self.assertEqual([], verify_messages([]))
+
     def test_transaction_signer(self):
         funding_account = get_sandbox_accounts().pop()
         sender = AlgoPrivateKey()
@@ -0,0 +1,88 @@
+import unittest
+
+import msgpack  # type: ignore
+from algosdk import transaction
+from algosdk.error import TransactionGroupSizeError
+from algosdk.transaction import PaymentTxn, SuggestedParams
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.client.transactions.encoded import (
+    EncodedTransaction,
+    calculate_group_id,
+)
+
+
+def create_txns(count: int) -> list[PaymentTxn]:
+    account = AlgoPrivateKey().signing_address
+    suggested_params = SuggestedParams(
+        fee=1000,
+        first=1,
+        last=1000,
+        gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+        flat_fee=True,
+    )
+    return [
+        PaymentTxn(account, suggested_params, account, amt=i + 1, note=bytes(i))
+        for i in range(count)
+    ]
+
+
+class EncodedTransactionTestCase(unittest.TestCase):
+    def test_encode_decode(self):
+        (txn,) = create_txns(1)
+        encoded = EncodedTransaction.encode(txn)
+        self.assertEqual(txn.get_txid(), encoded.transaction.get_txid())
+        self.assertIsNone(encoded.group)
+
+        decoded = EncodedTransaction.unpack(encoded.pack())
+        self.assertEqual(encoded, decoded)
+        self.assertEqual(hash(encoded), hash(decoded))
+        self.assertEqual(txn.dictify(), decoded.transaction.dictify())
+        # the decoded transaction is cached
+        self.assertIs(decoded.transaction, decoded.transaction)
+
+    def test_invalid_encoding(self):
+        with self.assertRaises(ValueError):
+            EncodedTransaction(b"\x01")
+
+        (txn,) = create_txns(1)
+        fields = msgpack.unpackb(EncodedTransaction.encode(txn).encoded)
+        with self.subTest("keys are not sorted"):
+            with self.assertRaises(ValueError):
+                EncodedTransaction.unpack(
+                    msgpack.packb(dict(reversed(fields.items())), use_bin_type=True)
+                )
+        with self.subTest("zero value is not omitted"):
+            with self.assertRaises(ValueError):
+                EncodedTransaction.unpack(
+                    msgpack.packb(fields | {"lx": b""}, use_bin_type=True)
+                )
+        with self.subTest("trailing bytes"):
+            with self.assertRaises(ValueError):
+                EncodedTransaction(EncodedTransaction.encode(txn).encoded + b"\x00")
+
+    def test_calculate_group_id(self):
+        txns = create_txns(16)
+        group_id = transaction.calculate_group_id(txns)
+        self.assertEqual(
+            group_id,
+            calculate_group_id([EncodedTransaction.encode(txn) for txn in txns]),
+        )
+
+        with self.subTest("group ID is omitted when computing the group ID"):
+            transaction.assign_group_id(txns)
+            encoded_txns = [
+                EncodedTransaction(EncodedTransaction.encode(txn).encoded)
+                for txn in txns
+            ]
+            self.assertEqual(group_id, calculate_group_id(encoded_txns))
+            for encoded in encoded_txns:
+                self.assertEqual(group_id, encoded.group)
+
+        with self.subTest("group size limit"):
+            with self.assertRaises(TransactionGroupSizeError):
+                calculate_group_id(encoded_txns + encoded_txns[:1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import unittest
+from datetime import timedelta
+from typing import AsyncIterator
+
+from oysterpack.algorand.messaging.chunked import (
+    ChunkedMessageError,
+    ChunkedMessageReader,
+    ChunkVerifier,
+    MessageChunk,
+    chunk_message,
+)
+from oysterpack.core.message import MessageId, MessageType
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+MSG_TYPE = MessageType.from_str("01M538F1V2Y5N3QYQ2Q0W7ZK9H")
+
+
+async def chunks(
+    payload: bytes, chunk_size: int, msg_id: MessageId | None = None
+) -> list[MessageChunk]:
+    return [
+        MessageChunk.unpack(msg.data)
+        async for msg in chunk_message(
+            MessageId() if msg_id is None else msg_id, MSG_TYPE, payload, chunk_size
+        )
+    ]
+
+
+async def read_all(reader: ChunkedMessageReader) -> bytes:
+    return b"".join([data async for data in reader])
+
+
+class ChunkMessageTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_chunk_message(self):
+        msg_id = MessageId()
+        payload = os.urandom(1000)
+        msgs = [msg async for msg in chunk_message(msg_id, MSG_TYPE, payload, 300)]
+        self.assertEqual(4, len(msgs))
+        for msg in msgs:
+            self.assertEqual(msg_id, msg.msg_id)
+            self.assertEqual(MessageChunk.message_type(), msg.msg_type)
+
+        message_chunks = [MessageChunk.unpack(msg.data) for msg in msgs]
+        self.assertEqual([0, 1, 2, 3], [chunk.seq for chunk in message_chunks])
+        self.assertEqual(payload, b"".join(chunk.data for chunk in message_chunks))
+        # only the final chunk carries the authentication tag
+        self.assertEqual(
+            [False, False, False, True], [chunk.final for chunk in message_chunks]
+        )
+
+        verifier = ChunkVerifier(msg_id, MSG_TYPE)
+        for chunk in message_chunks:
+            verifier.verify(chunk)
+        self.assertTrue(verifier.complete)
+
+    async def test_async_iterable_payload(self):
+        payload = os.urandom(1000)
+
+        async def blocks() -> AsyncIterator[bytes]:
+            for offset in range(0, len(payload), 70):
+                yield payload[offset : offset + 70]
+
+        message_chunks = [
+            MessageChunk.unpack(msg.data)
+            async for msg in chunk_message(MessageId(), MSG_TYPE, blocks(), 300)
+        ]
+        self.assertEqual(
+            [300, 300, 300, 100], [len(chunk.data) for chunk in message_chunks]
+        )
+        self.assertEqual(payload, b"".join(chunk.data for chunk in message_chunks))
+
+    async def test_empty_payload(self):
+        message_chunks = await chunks(b"", 300)
+        self.assertEqual(1, len(message_chunks))
+        self.assertTrue(message_chunks[0].final)
+        self.assertEqual(b"", message_chunks[0].data)
+
+    async def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            await chunks(b"data", 0)
+
+
+class ChunkVerifierTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_verify(self):
+        msg_id = MessageId()
+        message_chunks = await chunks(os.urandom(1000), 300, msg_id)
+
+        with self.subTest("out of sequence"):
+            verifier = ChunkVerifier(msg_id, MSG_TYPE)
+            with self.assertRaises(ChunkedMessageError):
+                verifier.verify(message_chunks[1])
+
+        with self.subTest("truncated"):
+            verifier = ChunkVerifier(msg_id, MSG_TYPE)
+            verifier.verify(message_chunks[0])
+            with self.assertRaises(ChunkedMessageError):
+                verifier.verify(MessageChunk(MSG_TYPE, 1, b"", message_chunks[-1].tag))
+
+        with self.subTest("tag is bound to the message ID"):
+            verifier = ChunkVerifier(MessageId(), MSG_TYPE)
+            for chunk in message_chunks[:-1]:
+                verifier.verify(chunk)
+            with self.assertRaises(ChunkedMessageError):
+                verifier.verify(message_chunks[-1])
+
+        with self.subTest("message type mismatch"):
+            verifier = ChunkVerifier(msg_id, MessageType())
+            with self.assertRaises(ChunkedMessageError):
+                verifier.verify(message_chunks[0])
+
+
+class ChunkedMessageReaderTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_read(self):
+        msg_id = MessageId()
+        payload = os.urandom(1000)
+        reader = ChunkedMessageReader(msg_id, MSG_TYPE)
+        for chunk in await chunks(payload, 100, msg_id):
+            await reader.put(chunk)
+        self.assertTrue(reader.complete)
+        self.assertEqual(payload, await read_all(reader))
+
+    async def test_chunks_out_of_order(self):
+        msg_id = MessageId()
+        payload = os.urandom(1000)
+        message_chunks = await chunks(payload, 100, msg_id)
+        reader = ChunkedMessageReader(msg_id, MSG_TYPE)
+        for chunk in reversed(message_chunks):
+            await reader.put(chunk)
+        self.assertEqual(payload, await read_all(reader))
+
+        with self.subTest("too many chunks out of order"):
+            reader = ChunkedMessageReader(msg_id, MSG_TYPE, max_buffered_chunks=2)
+            for chunk in reversed(message_chunks):
+                await reader.put(chunk)
+            self.assertTrue(reader.failed)
+            with self.assertRaises(ChunkedMessageError):
+                await read_all(reader)
+
+    async def test_duplicate_chunk(self):
+        msg_id = MessageId()
+        message_chunks = await chunks(os.urandom(1000), 100, msg_id)
+        reader = ChunkedMessageReader(msg_id, MSG_TYPE)
+        await reader.put(message_chunks[0])
+        await reader.put(message_chunks[0])
+        with self.assertRaises(ChunkedMessageError):
+            await read_all(reader)
+
+    async def test_chunks_are_consumed_incrementally(self):
+        msg_id = MessageId()
+        payload = os.urandom(1000)
+        reader = ChunkedMessageReader(msg_id, MSG_TYPE, max_buffered_chunks=2)
+
+        async def produce():
+            for chunk in await chunks(payload, 100, msg_id):
+                await reader.put(chunk)
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0.01)
+        # the producer waits for the consumer when the buffer is full
+        self.assertFalse(producer.done())
+
+        received = bytearray()
+        async for data in reader:
+            received += data
+        await producer
+        self.assertEqual(payload, bytes(received))
+
+    async def test_timeout(self):
+        msg_id = MessageId()
+        message_chunks = await chunks(os.urandom(1000), 100, msg_id)
+        reader = ChunkedMessageReader(
+            msg_id, MSG_TYPE, timeout=timedelta(milliseconds=10)
+        )
+        await reader.put(message_chunks[0])
+        with self.assertRaises(ChunkedMessageError):
+            await read_all(reader)
+        self.assertTrue(reader.failed)
+
+    async def test_close(self):
+        msg_id = MessageId()
+        message_chunks = await chunks(os.urandom(1000), 100, msg_id)
+        reader = ChunkedMessageReader(msg_id, MSG_TYPE, max_buffered_chunks=1)
+
+        async def produce():
+            for chunk in message_chunks:
+                await reader.put(chunk)
+
+        producer = asyncio.create_task(produce())
+        await asyncio.sleep(0)
+        # closing the reader before the message is complete unblocks the producer
+        reader.close()
+        await asyncio.wait_for(producer, 1)
+        self.assertTrue(reader.failed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.crypto_worker_pool import CryptoWorkerPool
+from oysterpack.algorand.messaging.secure_message import (
+    SignedEncryptedMessage,
+    create_secure_message,
+    unpack_secure_message,
+    pack_secure_message_frame,
+    MessageSignatureVerificationFailed,
+    DecryptionFailed,
+    InvalidSecureMessage,
+    seal_message,
+)
+from oysterpack.core.compression import Compression
+from oysterpack.core.message import Message, MessageId
+from tests.algorand.messaging.test_secure_message import Data
+
+
+class CryptoWorkerPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.private_key = AlgoPrivateKey()
+        self.crypto_workers = CryptoWorkerPool(self.private_key, max_workers=2)
+
+    def tearDown(self) -> None:
+        self.crypto_workers.shutdown()
+
+    async def test_pack_secure_message(self):
+        recipient = AlgoPrivateKey()
+        data = Data("message")
+        msg = Message(
+            msg_id=MessageId(), msg_type=data.message_type(), data=data.pack()
+        )
+
+        packed = await self.crypto_workers.pack_secure_message(
+            msg, recipient.encryption_address
+        )
+        secure_msg = SignedEncryptedMessage.unpack(packed)
+        self.assertEqual(self.private_key.signing_address, secure_msg.sender)
+        self.assertEqual(msg, unpack_secure_message(recipient, secure_msg))
+
+        with self.subTest("binary frame"):
+            frame = await self.crypto_workers.pack_secure_message(
+                msg, recipient.encryption_address, binary_frame=True
+            )
+            self.assertEqual(msg, unpack_secure_message(recipient, bytes(frame)))
+            self.assertEqual(
+                msg,
+                await self.crypto_workers.unpack_secure_message(
+                    pack_secure_message_frame(
+                        recipient, msg, self.private_key.encryption_address
+                    )
+                ),
+            )
+
+        metrics = self.crypto_workers.metrics
+        self.assertEqual(0, metrics.queue_depth)
+        self.assertEqual(3, metrics.task_count)
+        self.assertEqual(0, metrics.failure_count)
+        self.assertGreater(metrics.avg_task_latency, 0)
+
+    async def test_pack_compressed_secure_message(self):
+        recipient = AlgoPrivateKey()
+        msg = Message(
+            msg_id=MessageId(), msg_type=Data.message_type(), data=b"data" * 1000
+        )
+
+        with self.assertRaises(ValueError):
+            await self.crypto_workers.pack_secure_message(
+                msg, recipient.encryption_address, compress=True
+            )
+
+        # compression is sent to the workers once, when they are initialized
+        crypto_workers = CryptoWorkerPool(
+            self.private_key, max_workers=1, compression=Compression()
+        )
+        try:
+            for binary_frame in (False, True):
+                with self.subTest(binary_frame=binary_frame):
+                    packed = await crypto_workers.pack_secure_message(
+                        msg,
+                        recipient.encryption_address,
+                        binary_frame=binary_frame,
+                        compress=True,
+                    )
+                    self.assertLess(len(packed), len(msg.data))
+                    self.assertEqual(
+                        msg, unpack_secure_message(recipient, bytes(packed))
+                    )
+        finally:
+            crypto_workers.shutdown()
+
+    async def test_unpack_secure_messages(self):
+        sender = AlgoPrivateKey()
+        secure_msgs = [
+            create_secure_message(
+                private_key=sender,
+                data=Data(f"message-{i}", i),
+                recipient=self.private_key.encryption_address,
+            )
+            for i in range(5)
+        ]
+        # invalid signature
+        invalid_signature = SignedEncryptedMessage(
+            sender=AlgoPrivateKey().signing_address,
+            signature=secure_msgs[0].signature,
+            encrypted_msg=secure_msgs[0].encrypted_msg,
+        )
+        # encrypted for a different recipient
+        wrong_recipient = create_secure_message(
+            private_key=sender,
+            data=Data("message"),
+            recipient=AlgoPrivateKey().encryption_address,
+        )
+
+        results = await self.crypto_workers.unpack_secure_messages(
+            secure_msgs + [invalid_signature, wrong_recipient]
+        )
+        self.assertEqual(7, len(results))
+        for i, result in enumerate(results[:5]):
+            self.assertIsInstance(result, Message)
+            self.assertEqual(Data(f"message-{i}", i), Data.unpack(result.data))
+        self.assertIsInstance(results[5], MessageSignatureVerificationFailed)
+        self.assertIsInstance(results[6], DecryptionFailed)
+        self.assertEqual(1, self.crypto_workers.metrics.task_count)
+
+        with self.subTest("decrypted message that fails to be decompressed"):
+            msg = Message(
+                msg_id=MessageId(),
+                msg_type=Data.message_type(),
+                data=b"data",
+                # unsupported compression codec
+                flags=0x0E,
+            )
+            (result,) = await self.crypto_workers.unpack_secure_messages(
+                [seal_message(sender, msg, self.private_key.encryption_address)]
+            )
+            self.assertIsInstance(result, InvalidSecureMessage)
+            self.assertEqual(msg.msg_id, result.msg_id)
+
+        with self.subTest("unpack_secure_message"):
+            msg = await self.crypto_workers.unpack_secure_message(secure_msgs[0].pack())
+            self.assertEqual(Data("message-0", 0), Data.unpack(msg.data))
+
+            with self.assertRaises(MessageSignatureVerificationFailed):
+                await self.crypto_workers.unpack_secure_message(invalid_signature)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import time
+import unittest
+from datetime import timedelta
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.replay_filter import ReplayFilter
+from oysterpack.core.message import MessageId
+
+
+class ReplayFilterTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signer = AlgoPrivateKey().signing_address
+        self.signature = AlgoPrivateKey().sign(b"data").signature
+
+    def test_duplicates(self):
+        replay_filter = ReplayFilter()
+        self.assertTrue(replay_filter.check(self.signer, self.signature))
+        self.assertFalse(replay_filter.check(self.signer, self.signature))
+        self.assertEqual(1, replay_filter.duplicate_count)
+        self.assertEqual(1, replay_filter.size)
+
+        with self.subTest("keys are per signer"):
+            other_signer = AlgoPrivateKey().signing_address
+            self.assertTrue(replay_filter.check(other_signer, self.signature))
+
+        with self.subTest("message IDs"):
+            msg_id = MessageId()
+            self.assertTrue(replay_filter.check_message_id(self.signer, msg_id))
+            self.assertFalse(replay_filter.check_message_id(self.signer, msg_id))
+            self.assertEqual(2, replay_filter.duplicate_count)
+
+    def test_seen_does_not_record(self):
+        replay_filter = ReplayFilter()
+        self.assertFalse(replay_filter.seen(self.signer, self.signature))
+        self.assertEqual(0, replay_filter.size)
+        self.assertTrue(replay_filter.check(self.signer, self.signature))
+        self.assertTrue(replay_filter.seen(self.signer, self.signature))
+        self.assertEqual(1, replay_filter.duplicate_count)
+        self.assertEqual(1, replay_filter.size)
+
+    def test_keys_expire(self):
+        replay_filter = ReplayFilter(
+            window=timedelta(milliseconds=50),
+            max_clock_skew=timedelta(0),
+            bucket_count=2,
+        )
+        self.assertTrue(replay_filter.check(self.signer, self.signature))
+        time.sleep(0.1)
+        self.assertTrue(replay_filter.check(self.signer, self.signature))
+        self.assertEqual(1, replay_filter.size)
+        self.assertEqual(0, replay_filter.duplicate_count)
+
+    def test_stale(self):
+        replay_filter = ReplayFilter(
+            window=timedelta(minutes=5), max_clock_skew=timedelta(seconds=30)
+        )
+        self.assertFalse(replay_filter.is_stale(MessageId()))
+        self.assertTrue(
+            replay_filter.is_stale(MessageId.from_timestamp(time.time() - 600))
+        )
+        with self.subTest("message timestamp is too far in the future"):
+            self.assertFalse(
+                replay_filter.is_stale(MessageId.from_timestamp(time.time() + 10))
+            )
+            self.assertTrue(
+                replay_filter.is_stale(MessageId.from_timestamp(time.time() + 60))
+            )
+        self.assertEqual(2, replay_filter.stale_count)
+
+    def test_memory_is_bounded(self):
+        replay_filter = ReplayFilter(max_entries=100)
+        for i in range(1000):
+            replay_filter.check(self.signer, i.to_bytes(64, "little"))
+            self.assertLessEqual(replay_filter.size, 100)
+        self.assertGreater(replay_filter.overflow_count, 0)
+
+    def test_invalid_params(self):
+        for kwargs in (
+            {"window": timedelta(0)},
+            {"max_clock_skew": timedelta(seconds=-1)},
+            {"bucket_count": 0},
+            {"max_entries": 0},
+            {"signature_prefix_size": 0},
+        ):
+            with self.subTest(**{k: str(v) for k, v in kwargs.items()}):
+                with self.assertRaises(ValueError):
+                    ReplayFilter(**kwargs)  # type: ignore
+
+
+if __name__ == "__main__":
+    unittest.main()
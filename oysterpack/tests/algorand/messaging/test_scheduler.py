@@ -0,0 +1,221 @@
+import asyncio
+import unittest
+from asyncio import Task
+from datetime import timedelta
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.scheduler import (
+    FixedLimit,
+    GradientLimit,
+    RateLimit,
+    RateLimiter,
+    RequestScheduler,
+    RequestThrottled,
+    TokenBucket,
+)
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(RateLimit(rate=1, burst=3))
+        for _ in range(3):
+            self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        retry_after = bucket.retry_after()
+        self.assertGreater(retry_after, timedelta(0))
+        self.assertLessEqual(retry_after, timedelta(seconds=1))
+
+        bucket = TokenBucket(RateLimit(rate=1000, burst=1))
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        # the bucket is refilled continuously
+        while not bucket.try_acquire():
+            pass
+
+    def test_rate_limit_per_client(self):
+        rate_limiter = RateLimiter(RateLimit(rate=0.001, burst=2))
+        client_1 = AlgoPrivateKey().signing_address
+        client_2 = AlgoPrivateKey().signing_address
+
+        self.assertIsNone(rate_limiter.try_acquire(client_1))
+        self.assertIsNone(rate_limiter.try_acquire(client_1))
+        self.assertIsNotNone(rate_limiter.try_acquire(client_1))
+        self.assertEqual(1, rate_limiter.limited_count)
+        # each client has its own bucket
+        self.assertIsNone(rate_limiter.try_acquire(client_2))
+
+        with self.subTest("retry_after does not acquire tokens"):
+            self.assertIsNone(rate_limiter.retry_after(client_2))
+            self.assertIsNone(rate_limiter.try_acquire(client_2))
+            self.assertIsNotNone(rate_limiter.retry_after(client_2))
+            self.assertIsNotNone(rate_limiter.retry_after(client_2))
+            self.assertEqual(3, rate_limiter.limited_count)
+
+    def test_invalid_rate_limit(self):
+        with self.assertRaises(ValueError):
+            RateLimit(rate=0, burst=1)
+        with self.assertRaises(ValueError):
+            RateLimit(rate=1, burst=0)
+
+    def test_request_throttled(self):
+        msg = RequestThrottled(retry_after=timedelta(milliseconds=1500))
+        self.assertEqual(msg, RequestThrottled.unpack(msg.pack()))
+
+
+class ConcurrencyLimitTestCase(unittest.TestCase):
+    def test_fixed_limit(self):
+        limit = FixedLimit(10)
+        limit.on_sample(latency=10.0, in_flight=10, failed=True)
+        self.assertEqual(10, limit.limit)
+        with self.assertRaises(ValueError):
+            FixedLimit(0)
+
+    def test_gradient_limit_grows_when_latency_is_stable(self):
+        limit = GradientLimit(initial_limit=10, max_limit=100)
+        for _ in range(200):
+            limit.on_sample(latency=0.01, in_flight=limit.limit, failed=False)
+        self.assertEqual(100, limit.limit)
+
+    def test_gradient_limit_does_not_grow_when_underutilized(self):
+        limit = GradientLimit(initial_limit=10)
+        for _ in range(200):
+            limit.on_sample(latency=0.01, in_flight=1, failed=False)
+        self.assertEqual(10, limit.limit)
+
+    def test_gradient_limit_shrinks_when_latency_rises(self):
+        limit = GradientLimit(initial_limit=100, max_limit=100, long_window=1000)
+        for _ in range(100):
+            limit.on_sample(latency=0.01, in_flight=limit.limit, failed=False)
+        self.assertEqual(100, limit.limit)
+
+        # the backend is saturated, i.e., latency is 10x
+        for _ in range(50):
+            limit.on_sample(latency=0.1, in_flight=limit.limit, failed=False)
+        self.assertLess(limit.limit, 50)
+
+    def test_gradient_limit_backs_off_on_failure(self):
+        limit = GradientLimit(initial_limit=100, min_limit=5, backoff_ratio=0.5)
+        limit.on_sample(latency=0.01, in_flight=100, failed=True)
+        self.assertEqual(50, limit.limit)
+        for _ in range(10):
+            limit.on_sample(latency=0.01, in_flight=100, failed=True)
+        self.assertEqual(5, limit.limit)
+
+    def test_invalid_gradient_limit(self):
+        with self.assertRaises(ValueError):
+            GradientLimit(initial_limit=10, max_limit=5)
+        with self.assertRaises(ValueError):
+            GradientLimit(smoothing=0)
+        with self.assertRaises(ValueError):
+            GradientLimit(backoff_ratio=1)
+
+
+class RequestSchedulerTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_round_robin(self):
+        scheduler = RequestScheduler(
+            max_concurrent_requests=1,
+            max_concurrent_requests_per_connection=1,
+            max_queued_requests_per_connection=10,
+        )
+        started: list[tuple[str, int]] = []
+        done = asyncio.Event()
+
+        async def request(connection: str, i: int):
+            started.append((connection, i))
+            await asyncio.sleep(0)
+
+        def on_done(_task: Task):
+            if scheduler.running_count == 0 and scheduler.queued_count == 0:
+                done.set()
+
+        # connection "a" submits a burst before "b" and "c" submit
+        for i in range(5):
+            self.assertTrue(scheduler.submit("a", request("a", i), on_done))
+        for i in range(2):
+            self.assertTrue(scheduler.submit("b", request("b", i), on_done))
+            self.assertTrue(scheduler.submit("c", request("c", i), on_done))
+        self.assertEqual(1, scheduler.running_count)
+        self.assertEqual(8, scheduler.queued_count)
+
+        await done.wait()
+        self.assertEqual(
+            [
+                ("a", 0),
+                ("b", 0),
+                ("c", 0),
+                ("a", 1),
+                ("b", 1),
+                ("c", 1),
+                ("a", 2),
+                ("a", 3),
+                ("a", 4),
+            ],
+            started,
+        )
+
+    async def test_connection_cap_and_rejection(self):
+        scheduler = RequestScheduler(
+            max_concurrent_requests=10,
+            max_concurrent_requests_per_connection=2,
+            max_queued_requests_per_connection=1,
+        )
+        release = asyncio.Event()
+
+        async def request():
+            await release.wait()
+
+        requests = [request() for _ in range(4)]
+        results = [scheduler.submit("a", coro, lambda task: None) for coro in requests]
+        # 2 are running, 1 is queued, and 1 is rejected
+        self.assertEqual([True, True, True, False], results)
+        # the caller owns rejected requests
+        requests[3].close()
+        self.assertEqual(2, scheduler.running_count)
+        self.assertEqual(1, scheduler.queued_count)
+
+        # other connections are not affected
+        self.assertTrue(scheduler.submit("b", request(), lambda task: None))
+        self.assertEqual(3, scheduler.running_count)
+
+        with self.subTest(
+            "queued requests are discarded when the connection is closed"
+        ):
+            scheduler.close_connection("a")
+            self.assertEqual(0, scheduler.queued_count)
+
+        release.set()
+        while scheduler.running_count:
+            await asyncio.sleep(0)
+
+    async def test_adaptive_concurrency_limit(self):
+        concurrency_limit = GradientLimit(initial_limit=2, max_limit=8)
+        scheduler = RequestScheduler(
+            max_concurrent_requests_per_connection=100,
+            concurrency_limit=concurrency_limit,
+        )
+        self.assertEqual(2, scheduler.max_concurrent_requests)
+
+        async def request():
+            await asyncio.sleep(0.001)
+
+        for _ in range(200):
+            self.assertTrue(scheduler.submit("a", request(), lambda task: None))
+        self.assertEqual(2, scheduler.running_count)
+        while scheduler.running_count:
+            await asyncio.sleep(0.001)
+
+        # latency is stable and the limit is fully used, i.e., the limit grows
+        self.assertEqual(8, scheduler.max_concurrent_requests)
+        metrics = scheduler.metrics
+        self.assertEqual(8, metrics.concurrency_limit)
+        self.assertEqual(200, metrics.scheduled_count)
+        self.assertEqual(200, metrics.completed_count)
+        self.assertEqual(0, metrics.queued)
+        self.assertEqual(0, metrics.running)
+        self.assertGreater(metrics.max_queueing_delay, 0)
+        self.assertGreater(metrics.avg_request_latency, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
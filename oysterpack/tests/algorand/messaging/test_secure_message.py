@@ -1,3 +1,4 @@
+import pickle
 import unittest
 from dataclasses import dataclass
 from typing import Self
@@ -16,8 +17,11 @@ from oysterpack.algorand.messaging.secure_message import (
     create_secure_message,
     MessageSignatureVerificationFailed,
     DecryptionFailed,
+    SecureMessageFrame,
+    pack_secure_message_frame,
+    unpack_secure_messages,
 )
-from oysterpack.core.message import Serializable, MessageType
+from oysterpack.core.message import Serializable, MessageType, Message
 
 
 @dataclass(slots=True)
@@ -178,6 +182,66 @@ class SecureMessageTestCase(unittest.TestCase):
             with self.assertRaises(InvalidSecureMessage):
                 unpack_secure_message(recipient_private_key, secure_message)
 
+    def test_secure_message_frame(self):
+        sender_private_key = AlgoPrivateKey()
+        recipient_private_key = AlgoPrivateKey()
+        data = Data("data" * 1000)
+        msg = Message.create(data.message_type(), data.pack())
+
+        frame = pack_secure_message_frame(
+            sender_private_key, msg, recipient_private_key.encryption_address
+        )
+        # frames are sent as is over the websocket
+        self.assertIs(bytes, type(frame))
+        secure_msg = SecureMessageFrame(frame)
+        self.assertEqual(sender_private_key.signing_address, secure_msg.sender)
+        self.assertEqual(
+            sender_private_key.encryption_address, secure_msg.encryption_sender
+        )
+        self.assertEqual(recipient_private_key.encryption_address, secure_msg.recipient)
+        # ciphertext is a view into the frame
+        self.assertIs(frame, secure_msg.ciphertext.obj)
+        self.assertTrue(secure_msg.verify())
+
+        msg_2 = unpack_secure_message(recipient_private_key, frame)
+        self.assertEqual(msg, msg_2)
+        self.assertEqual(data, Data.unpack(msg_2.data))
+
+        with self.subTest("pickle"):
+            secure_msg_2 = pickle.loads(pickle.dumps(secure_msg))
+            self.assertEqual(msg, secure_msg_2.decrypt(recipient_private_key))
+
+        with self.subTest("batch unpack SecureMessageFrame and SignedEncryptedMessage"):
+            results = unpack_secure_messages(
+                recipient_private_key,
+                [
+                    secure_msg,
+                    create_secure_message(
+                        sender_private_key,
+                        data,
+                        recipient_private_key.encryption_address,
+                    ),
+                ],
+            )
+            self.assertEqual(msg, results[0])
+            self.assertEqual(data, Data.unpack(results[1].data))
+
+        with self.subTest("with invalid signature"):
+            tampered_frame = bytearray(frame)
+            tampered_frame[-1] ^= 1
+            with self.assertRaises(MessageSignatureVerificationFailed):
+                unpack_secure_message(recipient_private_key, bytes(tampered_frame))
+
+        with self.subTest("with wrong recipient"):
+            with self.assertRaises(DecryptionFailed):
+                unpack_secure_message(AlgoPrivateKey(), bytes(frame))
+
+        with self.subTest("with invalid frame header"):
+            with self.assertRaises(InvalidSecureMessage):
+                SecureMessageFrame(frame[:100])
+            with self.assertRaises(InvalidSecureMessage):
+                unpack_secure_message(recipient_private_key, bytes((0xC1, 99)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,291 @@
+import asyncio
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from websockets.exceptions import ConnectionClosedOK
+from websockets.legacy.client import connect
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.scheduler import GradientLimit
+from oysterpack.algorand.messaging.secure_message import InvalidSecureMessage
+from oysterpack.algorand.messaging.secure_message_client import SecureMessageClient
+from oysterpack.algorand.messaging.secure_message_handler import (
+    SecureMessageHandler,
+    SecureMessageWebsocketHandler,
+    MessageHandler,
+    MessageContext,
+)
+from oysterpack.core.message import MessageId, MessageType, Message
+from tests.algorand.messaging import server_ssl_context, client_ssl_context
+from tests.algorand.messaging.test_secure_message_handler import (
+    Request,
+    EchoMessageHandler,
+)
+from tests.support.websockets import create_websocket_server
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+class MultiReplyMessageHandler(MessageHandler):
+    """
+    Replies 3 times to each request
+    """
+
+    MSG_TYPE = MessageType.from_str("01GVH1J2JQ4A8SR03MTXG3VMZZ")
+
+    async def __call__(self, ctx: MessageContext):
+        request = Request.unpack(ctx.msg_data)
+        for _ in range(3):
+            await ctx.websocket.send(await ctx.pack_secure_message(ctx.msg_id, request))
+
+    def supported_msg_types(self) -> set[MessageType]:
+        return {self.MSG_TYPE}
+
+
+class InvalidReplyMessageHandler(MessageHandler):
+    """
+    Replies with a message that fails to be decompressed, followed by a valid reply
+    """
+
+    MSG_TYPE = MessageType.from_str("01HB3N4Z3S8PZT1G3QXQ2W6M5K")
+
+    async def __call__(self, ctx: MessageContext):
+        request = Request.unpack(ctx.msg_data)
+        # compressed with an unsupported codec
+        invalid_reply = Message(
+            msg_id=ctx.msg_id,
+            msg_type=request.message_type(),
+            data=b"data",
+            flags=0x0E,
+        )
+        await ctx.websocket.send(await ctx.pack_message(invalid_reply))
+        await ctx.websocket.send(await ctx.pack_secure_message(ctx.msg_id, request))
+
+    def supported_msg_types(self) -> set[MessageType]:
+        return {self.MSG_TYPE}
+
+
+class InvalidReplyRequest(Request):
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return InvalidReplyMessageHandler.MSG_TYPE
+
+
+class MultiReplyRequest(Request):
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return MultiReplyMessageHandler.MSG_TYPE
+
+
+class SecureMessageClientTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client_private_key = AlgoPrivateKey()
+        self.server_private_key = AlgoPrivateKey()
+        self.executor = ThreadPoolExecutor()
+
+        self.ws_handler = SecureMessageWebsocketHandler(
+            handler=SecureMessageHandler(
+                private_key=self.server_private_key,
+                message_handlers=[
+                    EchoMessageHandler(),
+                    MultiReplyMessageHandler(),
+                    InvalidReplyMessageHandler(),
+                ],
+                executor=self.executor,
+            ),
+            # replies that are queued together are sent as a single multi-message frame
+            coalesce_frames=True,
+            concurrency_limit=GradientLimit(initial_limit=10, max_limit=100),
+        )
+        self.ws_server = create_websocket_server(
+            handler=self.ws_handler,
+            ssl_context=server_ssl_context(),
+        )
+        await self.ws_server.start()
+        await self.ws_server.await_running()
+
+    async def asyncTearDown(self) -> None:
+        await self.ws_server.stop()
+        await self.ws_server.await_stopped()
+        self.executor.shutdown()
+
+    async def test_concurrent_requests(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            requests = [
+                Request(
+                    request_id=MessageId(),
+                    txns=[],
+                    # replies are sent out of order
+                    sleep=timedelta(milliseconds=random.randint(1, 20)),
+                )
+                for _ in range(200)
+            ]
+            handles = await asyncio.gather(
+                *[
+                    client.send(
+                        request,
+                        self.server_private_key.encryption_address,
+                        timeout=timedelta(seconds=10),
+                    )
+                    for request in requests
+                ]
+            )
+            self.assertEqual(200, client.pending_request_count)
+            responses = await asyncio.gather(*handles)
+            for request, handle, response in zip(requests, handles, responses):
+                self.assertEqual(handle.msg_id, response.msg_id)
+                self.assertEqual(request, Request.unpack(response.data))
+
+            with self.subTest("concurrency limit adapts to the handler latency"):
+                metrics = self.ws_handler.metrics.scheduler
+                self.assertEqual(200, metrics.completed_count)
+                self.assertEqual(
+                    self.ws_handler.max_concurrent_requests, metrics.concurrency_limit
+                )
+                self.assertNotEqual(10, metrics.concurrency_limit)
+                self.assertGreater(metrics.max_queueing_delay, 0)
+
+            with self.subTest("replies are routed to handles only while referenced"):
+                del handles, responses
+                request = Request(request_id=MessageId(), txns=[])
+                await client.send(request, self.server_private_key.encryption_address)
+                self.assertEqual(request, Request.unpack((await client.recv()).data))
+
+            await client.close()
+
+    async def test_multiple_replies(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            request = MultiReplyRequest(request_id=MessageId(), txns=[])
+            handle = await client.send(
+                request, self.server_private_key.encryption_address
+            )
+            replies = []
+            async for reply in handle:
+                replies.append(MultiReplyRequest.unpack(reply.data))
+                if len(replies) == 3:
+                    await client.close()
+            self.assertEqual([request] * 3, replies)
+
+    async def test_multiple_replies_without_reader(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            requests = [
+                MultiReplyRequest(request_id=MessageId(), txns=[]) for _ in range(10)
+            ]
+            for request in requests:
+                await client.send(request, self.server_private_key.encryption_address)
+            replies = [
+                MultiReplyRequest.unpack((await client.recv()).data)
+                for _ in range(len(requests) * 3)
+            ]
+            self.assertCountEqual(requests * 3, replies)
+            await client.close()
+
+        metrics = self.ws_handler.metrics.outbound
+        self.assertEqual(len(requests) * 3, metrics.frames_sent)
+        self.assertEqual(metrics.frames_enqueued, metrics.frames_sent)
+        self.assertLessEqual(metrics.writes, metrics.frames_sent)
+        self.assertEqual(0, metrics.frames_dropped)
+
+    async def test_timeout(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            handle = await client.send(
+                Request(
+                    request_id=MessageId(),
+                    txns=[],
+                    sleep=timedelta(milliseconds=500),
+                ),
+                self.server_private_key.encryption_address,
+                timeout=timedelta(milliseconds=10),
+            )
+            with self.assertRaises(TimeoutError):
+                await handle
+
+            # the timeout can be overridden
+            await handle.recv(timeout=timedelta(seconds=10))
+            await client.close()
+
+    async def test_closed_connection_fails_handles(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            request = Request(request_id=MessageId(), txns=[])
+            handle = await client.send(
+                request, self.server_private_key.encryption_address
+            )
+            await handle
+            await client.close()
+
+            # the failure is sticky, i.e., later receives do not wait forever
+            for _ in range(2):
+                with self.assertRaises(ConnectionClosedOK):
+                    await asyncio.wait_for(handle.recv(), 5)
+                with self.assertRaises(ConnectionClosedOK):
+                    await asyncio.wait_for(client.recv(), 5)
+            self.assertEqual(0, client.pending_request_count)
+
+    async def test_invalid_reply_fails_handle(self):
+        async with connect(
+            f"wss://localhost:{self.ws_server.port}",
+            ssl=client_ssl_context(),
+        ) as websocket:
+            client = SecureMessageClient(
+                websocket=websocket,
+                private_key=self.client_private_key,
+                executor=self.executor,
+            )
+            request = InvalidReplyRequest(request_id=MessageId(), txns=[])
+            handle = await client.send(
+                request,
+                self.server_private_key.encryption_address,
+                timeout=timedelta(seconds=5),
+            )
+            # the reply was decrypted, i.e., the error is routed to the handle by message ID
+            with self.assertRaises(InvalidSecureMessage) as err:
+                await handle
+            self.assertEqual(handle.msg_id, err.exception.msg_id)
+            # the error is not sticky
+            self.assertEqual(request, InvalidReplyRequest.unpack((await handle).data))
+            await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import unittest
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
@@ -9,7 +10,7 @@ from typing import Self, ClassVar
 
 import msgpack  # type: ignore
 from algosdk.account import generate_account
-from algosdk.transaction import Transaction
+from algosdk.transaction import Transaction, PaymentTxn, SuggestedParams
 from beaker import sandbox
 from beaker.consts import algo
 from websockets.exceptions import ConnectionClosedOK
@@ -18,22 +19,36 @@ from websockets.legacy.client import connect
 from oysterpack.algorand.client.accounts.private_key import (
     AlgoPrivateKey,
     EncryptionAddress,
+    SigningAddress,
 )
-from oysterpack.algorand.client.model import MicroAlgos
+from oysterpack.algorand.client.model import MicroAlgos, Address
 from oysterpack.algorand.client.transactions import payment
+from oysterpack.algorand.messaging.metrics import PipelineStage
+from oysterpack.algorand.messaging.scheduler import RequestThrottled, RateLimit
 from oysterpack.algorand.messaging.secure_message import (
     SignedEncryptedMessage,
     create_secure_message,
     EncryptedMessage,
+    MessageSignatureVerificationFailed,
+    InvalidSecureMessage,
+    unpack_secure_message,
+    parse_secure_message,
+    seal_message,
 )
+from oysterpack.algorand.messaging.chunked import MessageChunk
+from oysterpack.algorand.messaging.crypto_worker_pool import CryptoWorkerPool
 from oysterpack.algorand.messaging.secure_message_client import SecureMessageClient
+from oysterpack.algorand.messaging.session import SessionConfig
+from oysterpack.algorand.messaging.replay_filter import ReplayFilter
 from oysterpack.algorand.messaging.secure_message_handler import (
     SecureMessageHandler,
     MessageContext,
     SecureMessageWebsocketHandler,
     MessageHandler,
+    SecureMessageUnpacker,
 )
 from oysterpack.algorand.messaging.websocket import CloseCode
+from oysterpack.core.compression import Compression, ZlibCompressor
 from oysterpack.core.message import (
     Message,
     MessageType,
@@ -110,6 +125,18 @@ class EchoMessageHandler(MessageHandler):
         return {self._supported_msg_type}
 
 
+class ChunkedEchoMessageHandler(MessageHandler):
+    MSG_TYPE: ClassVar[MessageType] = MessageType.from_str("01M539QKZ0D8A2C6JX3VTS4WQE")
+
+    async def __call__(self, ctx: MessageContext):
+        assert ctx.chunks is not None
+        # chunks are echoed back as they are received
+        await ctx.send_chunked(ctx.msg_id, self.MSG_TYPE, ctx.chunks, chunk_size=1000)
+
+    def supported_msg_types(self) -> set[MessageType]:
+        return {self.MSG_TYPE}
+
+
 class SecureMessageHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
     executor: ProcessPoolExecutor
 
@@ -182,6 +209,22 @@ class SecureMessageHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
         request_2 = Request.unpack(decrypted_response_msg.data)
         self.assertEqual(request, request_2)
 
+        with self.subTest("pipeline metrics are recorded"):
+            metrics = handle_message.metrics.snapshot()
+            for stage in PipelineStage:
+                self.assertEqual(1, metrics.stages[stage].count, stage)
+            self.assertEqual(1, metrics.handlers[Request.message_type()].count)
+            self.assertEqual(0, metrics.unpacking.value)
+            self.assertEqual(1, metrics.unpacking.max)
+            self.assertEqual(0, metrics.handling.value)
+            self.assertEqual(1, metrics.handling.max)
+
+            handle_message.metrics.reset()
+            metrics = handle_message.metrics.snapshot()
+            self.assertEqual(0, metrics.stages[PipelineStage.HANDLE].count)
+            self.assertEqual(0, metrics.handlers[Request.message_type()].count)
+            self.assertEqual(0, metrics.handling.max)
+
     async def test_invalid_message(self):
         # SETUP
         request = Request(
@@ -345,6 +388,55 @@ class SecureMessageHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
                     executor=self.executor,
                 )
 
+        with self.subTest("crypto workers private key does not match"):
+            crypto_workers = CryptoWorkerPool(AlgoPrivateKey(), max_workers=1)
+            try:
+                with self.assertRaises(ValueError):
+                    SecureMessageHandler(
+                        private_key=self.recipient_private_key,
+                        message_handlers=[EchoMessageHandler()],
+                        executor=self.executor,
+                        crypto_workers=crypto_workers,
+                    )
+            finally:
+                crypto_workers.shutdown()
+
+    async def test_register_handler(self):
+        handle_message = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+        )
+        handler = handle_message.get_handler(Request.message_type())
+        msg_type = MessageType()
+        self.assertNotIn(msg_type, handle_message.supported_msg_types)
+
+        new_handler = EchoMessageHandler(supported_msg_type=msg_type)
+        handle_message.register_handler(new_handler)
+        self.assertIs(new_handler, handle_message.get_handler(msg_type))
+        self.assertIs(handler, handle_message.get_handler(Request.message_type()))
+        self.assertEqual(
+            {msg_type, Request.message_type()}, handle_message.supported_msg_types
+        )
+
+        with self.subTest("message types must be unique"):
+            with self.assertRaises(ValueError):
+                handle_message.register_handler(EchoMessageHandler())
+            self.assertIs(handler, handle_message.get_handler(Request.message_type()))
+
+        with self.subTest("replace handler"):
+            replacement = EchoMessageHandler()
+            handle_message.register_handler(replacement, replace=True)
+            self.assertIs(
+                replacement, handle_message.get_handler(Request.message_type())
+            )
+
+        with self.subTest("MessageChunk message type is reserved"):
+            with self.assertRaises(ValueError):
+                handle_message.register_handler(
+                    EchoMessageHandler(supported_msg_type=MessageChunk.message_type())
+                )
+
     async def test_unsupported_message(self):
         # SETUP
         request = Request(
@@ -388,6 +480,131 @@ class SecureMessageHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
         self.assertEqual("unsupported msg type", ws.close_reason)
 
 
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__()
+        self.submit_count = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submit_count += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class SecureMessageUnpackerTestCase(OysterPackIsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.sender_private_key = AlgoPrivateKey()
+        self.recipient_private_key = AlgoPrivateKey()
+
+    def create_secure_message(self) -> SignedEncryptedMessage:
+        return create_secure_message(
+            private_key=self.sender_private_key,
+            data=Request(request_id=MessageId(), txns=[]),
+            recipient=self.recipient_private_key.encryption_address,
+        )
+
+    async def test_messages_are_unpacked_in_batches(self):
+        with CountingExecutor() as executor:
+            unpack = SecureMessageUnpacker(
+                private_key=self.recipient_private_key,
+                executor=executor,
+            )
+            secure_msgs = [self.create_secure_message() for _ in range(10)]
+            msgs = await asyncio.gather(
+                *[unpack(secure_msg) for secure_msg in secure_msgs]
+            )
+            self.assertEqual(1, executor.submit_count)
+            for msg in msgs:
+                self.assertEqual(Request.message_type(), msg.msg_type)
+
+        with self.subTest("batches are capped at max_batch_size"):
+            with CountingExecutor() as executor:
+                unpack = SecureMessageUnpacker(
+                    private_key=self.recipient_private_key,
+                    executor=executor,
+                    max_batch_size=4,
+                )
+                await asyncio.gather(
+                    *[unpack(secure_msg) for secure_msg in secure_msgs]
+                )
+                self.assertEqual(3, executor.submit_count)
+
+        with self.subTest("using batch window"):
+            with CountingExecutor() as executor:
+                unpack = SecureMessageUnpacker(
+                    private_key=self.recipient_private_key,
+                    executor=executor,
+                    batch_window=timedelta(milliseconds=10),
+                )
+
+                async def delayed_unpack(secure_msg: SignedEncryptedMessage):
+                    await asyncio.sleep(0.001)
+                    return await unpack(secure_msg)
+
+                await asyncio.gather(
+                    unpack(secure_msgs[0]),
+                    *[delayed_unpack(secure_msg) for secure_msg in secure_msgs[1:]],
+                )
+                self.assertEqual(1, executor.submit_count)
+
+    async def test_invalid_message_does_not_fail_batch(self):
+        valid_msg = self.create_secure_message()
+        invalid_msg = self.create_secure_message()
+        invalid_msg.sender = AlgoPrivateKey().signing_address
+        # malformed messages make nacl and algosdk raise errors
+        short_signature_msg = self.create_secure_message()
+        short_signature_msg.signature = short_signature_msg.signature[:10]
+        bad_checksum_msg = self.create_secure_message()
+        bad_checksum_msg.sender = SigningAddress(
+            Address(bad_checksum_msg.sender[:-1] + "A")
+            if bad_checksum_msg.sender[-1] != "A"
+            else Address(bad_checksum_msg.sender[:-1] + "B")
+        )
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            unpack = SecureMessageUnpacker(
+                private_key=self.recipient_private_key,
+                executor=executor,
+            )
+            results = await asyncio.gather(
+                unpack(valid_msg),
+                unpack(invalid_msg),
+                unpack(short_signature_msg),
+                unpack(bad_checksum_msg),
+                unpack(valid_msg),
+                return_exceptions=True,
+            )
+        self.assertIsInstance(results[0], Message)
+        self.assertIsInstance(results[1], MessageSignatureVerificationFailed)
+        self.assertIsInstance(results[2], InvalidSecureMessage)
+        self.assertIsInstance(results[3], InvalidSecureMessage)
+        self.assertIsInstance(results[4], Message)
+
+    async def test_unpack_using_crypto_workers(self):
+        valid_msg = self.create_secure_message()
+        invalid_msg = self.create_secure_message()
+        invalid_msg.sender = AlgoPrivateKey().signing_address
+
+        crypto_workers = CryptoWorkerPool(self.recipient_private_key, max_workers=1)
+        try:
+            with CountingExecutor() as executor:
+                unpack = SecureMessageUnpacker(
+                    private_key=self.recipient_private_key,
+                    executor=executor,
+                    crypto_workers=crypto_workers,
+                )
+                results = await asyncio.gather(
+                    unpack(valid_msg),
+                    unpack(invalid_msg),
+                    return_exceptions=True,
+                )
+                self.assertEqual(0, executor.submit_count)
+        finally:
+            crypto_workers.shutdown()
+        self.assertIsInstance(results[0], Message)
+        self.assertIsInstance(results[1], MessageSignatureVerificationFailed)
+        self.assertEqual(1, crypto_workers.metrics.task_count)
+
+
 class SecureMessageWebsocketHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
     executor: ProcessPoolExecutor
 
@@ -489,19 +706,199 @@ class SecureMessageWebsocketHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
         await ws_server.stop()
         await ws_server.await_stopped()
 
+    async def test_session_key(self):
+        # SETUP
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+            session_config=SessionConfig(rotate_after_msgs=3),
+        )
+        websocket_handler = SecureMessageWebsocketHandler(
+            handler=secure_message_handler
+        )
+        ws_server = create_websocket_server(
+            handler=websocket_handler,
+            ssl_context=server_ssl_context(),
+        )
+        await ws_server.start()
+        await ws_server.await_running()
+        await asyncio.sleep(0)
+
+        try:
+            with self.subTest("negotiate session key"):
+                async with connect(
+                    f"wss://localhost:{ws_server.port}",
+                    ssl=client_ssl_context(),
+                ) as websocket:
+                    with ThreadPoolExecutor() as executor:
+                        client = SecureMessageClient(
+                            websocket=websocket,
+                            private_key=self.sender_private_key,
+                            executor=executor,
+                        )
+                        session = await client.negotiate_session(
+                            self.recipient_private_key.encryption_address
+                        )
+                        self.assertEqual(
+                            self.recipient_private_key.signing_address,
+                            session.peer_signing_address,
+                        )
+
+                        for _ in range(10):
+                            request = Request(request_id=MessageId(), txns=[])
+                            await client.send(
+                                request, self.recipient_private_key.encryption_address
+                            )
+                            response = await client.recv()
+                            self.assertEqual(request, Request.unpack(response.data))
+                        # keys were rotated on both sides
+                        self.assertEqual(3, session.send_epoch)
+                        self.assertEqual(3, session.recv_epoch)
+                        await client.close()
+
+            with self.subTest("clients that do not negotiate a session key"):
+                async with connect(
+                    f"wss://localhost:{ws_server.port}",
+                    ssl=client_ssl_context(),
+                ) as websocket:
+                    with ThreadPoolExecutor() as executor:
+                        client = SecureMessageClient(
+                            websocket=websocket,
+                            private_key=self.sender_private_key,
+                            executor=executor,
+                        )
+                        request = Request(request_id=MessageId(), txns=[])
+                        await client.send(
+                            request, self.recipient_private_key.encryption_address
+                        )
+                        response = await client.recv()
+                        self.assertEqual(request, Request.unpack(response.data))
+                        self.assertIsNone(client.session)
+                        await client.close()
+        finally:
+            await ws_server.stop()
+            await ws_server.await_stopped()
+
+    async def test_binary_frames(self):
+        # SETUP
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+        )
+        websocket_handler = SecureMessageWebsocketHandler(
+            handler=secure_message_handler
+        )
+        ws_server = create_websocket_server(
+            handler=websocket_handler,
+            ssl_context=server_ssl_context(),
+        )
+        await ws_server.start()
+        await ws_server.await_running()
+        await asyncio.sleep(0)
+
+        try:
+            async with connect(
+                f"wss://localhost:{ws_server.port}",
+                ssl=client_ssl_context(),
+            ) as websocket:
+                with ThreadPoolExecutor() as executor:
+                    client = SecureMessageClient(
+                        websocket=websocket,
+                        private_key=self.sender_private_key,
+                        executor=executor,
+                        binary_frames=True,
+                    )
+                    request = Request(request_id=MessageId(), txns=[])
+                    await client.send(
+                        request, self.recipient_private_key.encryption_address
+                    )
+                    response = await client.recv()
+                    self.assertEqual(request, Request.unpack(response.data))
+                    # the server replies using the same frame format
+                    self.assertIsInstance(response.data, memoryview)
+                    await client.close()
+        finally:
+            await ws_server.stop()
+            await ws_server.await_stopped()
+
+    async def test_chunked_message(self):
+        # SETUP
+        chunked_echo_handler = ChunkedEchoMessageHandler()
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler(), chunked_echo_handler],
+            executor=self.executor,
+            session_config=SessionConfig(),
+        )
+        websocket_handler = SecureMessageWebsocketHandler(
+            handler=secure_message_handler
+        )
+        ws_server = create_websocket_server(
+            handler=websocket_handler,
+            ssl_context=server_ssl_context(),
+        )
+        await ws_server.start()
+        await ws_server.await_running()
+        await asyncio.sleep(0)
+
+        payload = os.urandom(100_000)
+        try:
+            for negotiate_session in (False, True):
+                with self.subTest(negotiate_session=negotiate_session):
+                    async with connect(
+                        f"wss://localhost:{ws_server.port}",
+                        ssl=client_ssl_context(),
+                    ) as websocket:
+                        with ThreadPoolExecutor() as executor:
+                            client = SecureMessageClient(
+                                websocket=websocket,
+                                private_key=self.sender_private_key,
+                                executor=executor,
+                            )
+                            if negotiate_session:
+                                await client.negotiate_session(
+                                    self.recipient_private_key.encryption_address
+                                )
+                            handle = await client.send_chunked(
+                                ChunkedEchoMessageHandler.MSG_TYPE,
+                                payload,
+                                self.recipient_private_key.encryption_address,
+                                chunk_size=4096,
+                                timeout=timedelta(seconds=10),
+                            )
+                            received = bytearray()
+                            async for data in handle.recv_chunks():
+                                # the server re-chunks the payload
+                                self.assertLessEqual(len(data), 1000)
+                                received += data
+                            self.assertEqual(payload, bytes(received))
+                            await client.close()
+        finally:
+            await ws_server.stop()
+            await ws_server.await_stopped()
+
+    async def test_session_frame_without_session(self):
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+            session_config=SessionConfig(),
+        )
+        websocket = WebsocketMock()
+        await secure_message_handler.handle_session_frame(
+            bytes((0xC1, 1)) + bytes(32), websocket
+        )
+        self.assertTrue(websocket.closed)
+        self.assertEqual("invalid message", websocket.close_reason)
+
     async def test_throttling(self):
         # SETUP
         request = Request(
             request_id=MessageId(),
-            txns=[
-                payment.transfer_algo(
-                    sender=self.sender_private_key.signing_address,
-                    receiver=self.recipient_private_key.signing_address,
-                    amount=MicroAlgos(1 * algo),
-                    suggested_params=sandbox.get_algod_client().suggested_params(),
-                ),
-            ],
-            sleep=timedelta(milliseconds=10),
+            txns=[],
+            sleep=timedelta(milliseconds=100),
         )
 
         secure_message_handler = SecureMessageHandler(
@@ -513,6 +910,7 @@ class SecureMessageWebsocketHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
         websocket_handler = SecureMessageWebsocketHandler(
             handler=secure_message_handler,
             max_concurrent_requests=1,
+            max_queued_requests_per_connection=1,
         )
         self.assertEqual(1, websocket_handler.max_concurrent_requests)
 
@@ -533,25 +931,190 @@ class SecureMessageWebsocketHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
                     private_key=self.sender_private_key,
                     executor=executor,
                 )
-                tasks = []
-                for _ in range(10):
-                    task = asyncio.create_task(
+                await asyncio.gather(
+                    *[
                         client.send(
                             request,
                             self.recipient_private_key.encryption_address,
                         )
-                    )
-                    tasks.append(task)
-                for _ in range(10):
-                    response = await client.recv()
-                    data = Request.unpack(response.data)
-                    self.assertEqual(request, data)
+                        for _ in range(10)
+                    ]
+                )
+                replies = [await client.recv() for _ in range(10)]
                 logger.info(websocket_handler.metrics)
-                self.assertTrue(websocket_handler.metrics.throttle_count > 0)
+
+                throttled = [
+                    reply
+                    for reply in replies
+                    if reply.msg_type == RequestThrottled.message_type()
+                ]
+                echoed = [
+                    Request.unpack(reply.data)
+                    for reply in replies
+                    if reply.msg_type == Request.message_type()
+                ]
+                # the read loop does not wait on requests, i.e., requests that do not fit in the connection queue
+                # are replied to with RequestThrottled
+                self.assertGreater(len(throttled), 0)
+                self.assertGreaterEqual(len(echoed), 2)
+                self.assertEqual(10, len(throttled) + len(echoed))
+                self.assertEqual([request] * len(echoed), echoed)
+                self.assertEqual(
+                    len(throttled), websocket_handler.metrics.throttle_count
+                )
 
         await ws_server.stop()
         await ws_server.await_stopped()
 
+    async def test_rate_limit(self):
+        request = Request(request_id=MessageId(), txns=[])
+        secure_message = create_secure_message(
+            private_key=self.sender_private_key,
+            data=request,
+            recipient=self.recipient_private_key.encryption_address,
+        )
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+            rate_limit=RateLimit(rate=0.001, burst=2),
+        )
+        ws = WebsocketMock()
+
+        for _ in range(3):
+            await secure_message_handler(secure_message, ws)
+
+        replies = [
+            unpack_secure_message(
+                self.sender_private_key, ws.response_queue.get_nowait()
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(
+            [Request.message_type()] * 2 + [RequestThrottled.message_type()],
+            [reply.msg_type for reply in replies],
+        )
+        self.assertGreater(
+            RequestThrottled.unpack(replies[2].data).retry_after, timedelta(0)
+        )
+        self.assertEqual(1, secure_message_handler.rate_limiter.limited_count)  # type: ignore
+        self.assertFalse(ws.closed)
+
+        with self.subTest("throttled messages must pass signature verification"):
+            spoofed_message = create_secure_message(
+                private_key=AlgoPrivateKey(),
+                data=request,
+                recipient=self.recipient_private_key.encryption_address,
+            )
+            # sent on behalf of the throttled client
+            spoofed_message.sender = self.sender_private_key.signing_address
+            await secure_message_handler(spoofed_message, ws)
+            self.assertTrue(ws.response_queue.empty())
+            self.assertTrue(ws.closed)
+            self.assertEqual(2, secure_message_handler.rate_limiter.limited_count)  # type: ignore
+
+    async def test_unsupported_message_type_metrics(self):
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+        )
+        for _ in range(10):
+            secure_message = seal_message(
+                self.sender_private_key,
+                Message.create(MessageType(), b""),
+                self.recipient_private_key.encryption_address,
+            )
+            await secure_message_handler(secure_message, WebsocketMock())
+
+        # unsupported message types are recorded in a single histogram
+        metrics = secure_message_handler.metrics.snapshot()
+        self.assertEqual({}, metrics.handlers)
+        self.assertEqual(10, metrics.unsupported.count)
+        self.assertEqual(10, metrics.stages[PipelineStage.HANDLE].count)
+
+    async def test_replay_filter(self):
+        request = Request(request_id=MessageId(), txns=[])
+        secure_message = create_secure_message(
+            private_key=self.sender_private_key,
+            data=request,
+            recipient=self.recipient_private_key.encryption_address,
+        )
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+            replay_filter=ReplayFilter(),
+        )
+        ws = WebsocketMock()
+
+        for _ in range(3):
+            await secure_message_handler(secure_message, ws)
+
+        reply = unpack_secure_message(
+            self.sender_private_key, ws.response_queue.get_nowait()
+        )
+        self.assertEqual(Request.message_type(), reply.msg_type)
+        # replays are dropped
+        self.assertTrue(ws.response_queue.empty())
+        self.assertEqual(2, secure_message_handler.replay_filter.duplicate_count)  # type: ignore
+        self.assertFalse(ws.closed)
+
+    async def test_compression(self):
+        request = Request(
+            request_id=MessageId(),
+            txns=[
+                PaymentTxn(
+                    sender=self.sender_private_key.signing_address,
+                    sp=SuggestedParams(
+                        fee=1000,
+                        first=1,
+                        last=1000,
+                        gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+                        flat_fee=True,
+                    ),
+                    receiver=self.recipient_private_key.signing_address,
+                    amt=i,
+                )
+                for i in range(8)
+            ],
+        )
+        secure_message_handler = SecureMessageHandler(
+            private_key=self.recipient_private_key,
+            message_handlers=[EchoMessageHandler()],
+            executor=self.executor,
+            compression=Compression(),
+        )
+
+        def decrypt_reply(reply: bytes) -> Message:
+            secure_msg = parse_secure_message(reply)
+            assert isinstance(secure_msg, SignedEncryptedMessage)
+            return Message.unpack(
+                secure_msg.encrypted_msg.decrypt(self.sender_private_key)
+            )
+
+        for compression in (Compression(), None):
+            with self.subTest(compression=compression):
+                ws = WebsocketMock()
+                secure_message = create_secure_message(
+                    private_key=self.sender_private_key,
+                    data=request,
+                    recipient=self.recipient_private_key.encryption_address,
+                    compression=compression,
+                )
+                await secure_message_handler(secure_message, ws)
+
+                reply = ws.response_queue.get_nowait()
+                # replies are only compressed if the client accepts the compression codec
+                self.assertEqual(
+                    0 if compression is None else ZlibCompressor.codec_id,
+                    decrypt_reply(reply).compression_codec_id,
+                )
+                # messages are decompressed when they are unpacked
+                msg = unpack_secure_message(self.sender_private_key, reply)
+                self.assertEqual(request.pack(), msg.data)
+                self.assertFalse(ws.closed)
+
     async def test_handler_failure_with_throttling(self):
         # SETUP
         request = Request(
@@ -0,0 +1,134 @@
+import unittest
+from datetime import timedelta
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.frame import frame_kind, FrameKind
+from oysterpack.algorand.messaging.secure_message import DecryptionFailed
+from oysterpack.algorand.messaging.session import (
+    Session,
+    SessionConfig,
+    SessionKeyAccepted,
+    InvalidSessionFrame,
+    SessionKeyRequest,
+)
+from oysterpack.core.message import Message, MessageType
+
+MSG_TYPE = MessageType.from_str("01GW27XJ8KKSBYPWJEY481G4FN")
+
+
+def create_sessions(
+    config: SessionConfig = SessionConfig(),
+) -> tuple[Session, Session]:
+    client_private_key = AlgoPrivateKey()
+    server_private_key = AlgoPrivateKey()
+    session_key = config.create_session_key()
+    client = Session(
+        session_key=session_key,
+        is_server=False,
+        peer_encryption_address=server_private_key.encryption_address,
+        peer_signing_address=server_private_key.signing_address,
+    )
+    server = Session(
+        session_key=session_key,
+        is_server=True,
+        peer_encryption_address=client_private_key.encryption_address,
+        peer_signing_address=client_private_key.signing_address,
+    )
+    return client, server
+
+
+class SessionTestCase(unittest.TestCase):
+    def test_seal_open(self):
+        client, server = create_sessions()
+
+        msg = Message.create(MSG_TYPE, b"request")
+        frame = client.seal(msg)
+        self.assertEqual(FrameKind.SESSION, frame_kind(frame))
+        self.assertEqual(msg, server.open(frame))
+
+        reply = Message.create(MSG_TYPE, b"reply")
+        self.assertEqual(reply, client.open(server.seal(reply)))
+
+        with self.subTest("each direction uses its own key"):
+            with self.assertRaises(DecryptionFailed):
+                client.open(client.seal(msg))
+
+        with self.subTest("frames from another session fail to decrypt"):
+            other_client, _other_server = create_sessions()
+            other_client.seal(msg)
+            with self.assertRaises(DecryptionFailed):
+                # counter 0 has already been received by the server
+                server.open(other_client.seal(msg))
+
+        with self.subTest("tampered frame fails to decrypt"):
+            frame = bytearray(client.seal(msg))
+            frame[-1] ^= 1
+            with self.assertRaises(DecryptionFailed):
+                server.open(bytes(frame))
+
+        with self.subTest("truncated frame"):
+            with self.assertRaises(InvalidSessionFrame):
+                server.open(client.seal(msg)[:10])
+
+    def test_replay_protection(self):
+        client, server = create_sessions()
+        frames = [client.seal(Message.create(MSG_TYPE, b"%d" % i)) for i in range(5)]
+
+        # frames received out of order are accepted
+        for i in (1, 0, 4, 2, 3):
+            server.open(frames[i])
+
+        for frame in frames:
+            with self.assertRaises(InvalidSessionFrame):
+                server.open(frame)
+
+    def test_key_rotation_after_msgs(self):
+        client, server = create_sessions(SessionConfig(rotate_after_msgs=3))
+
+        frames = [client.seal(Message.create(MSG_TYPE, b"%d" % i)) for i in range(7)]
+        self.assertEqual(2, client.send_epoch)
+
+        for frame in frames[:3]:
+            server.open(frame)
+        self.assertEqual(0, server.recv_epoch)
+        server.open(frames[6])
+        self.assertEqual(2, server.recv_epoch)
+
+        with self.subTest("frames for the previous epoch are still accepted"):
+            server.open(frames[3])
+            server.open(frames[4])
+            server.open(frames[5])
+
+        with self.subTest("frames older than the previous epoch are rejected"):
+            for _ in range(3):
+                frame = client.seal(Message.create(MSG_TYPE, b""))
+            server.open(frame)
+            self.assertEqual(3, server.recv_epoch)
+            with self.assertRaises(InvalidSessionFrame):
+                server.open(frames[0])
+
+    def test_key_rotation_after_time(self):
+        client, server = create_sessions(SessionConfig(rotate_after=timedelta(0)))
+        for _ in range(3):
+            server.open(client.seal(Message.create(MSG_TYPE, b"")))
+        self.assertEqual(3, client.send_epoch)
+        self.assertEqual(3, server.recv_epoch)
+
+    def test_session_key_messages(self):
+        self.assertEqual(
+            SessionKeyRequest(), SessionKeyRequest.unpack(SessionKeyRequest().pack())
+        )
+
+        session_key = SessionConfig().create_session_key()
+        self.assertEqual(session_key, SessionKeyAccepted.unpack(session_key.pack()))
+
+        with self.assertRaises(ValueError):
+            SessionKeyAccepted(
+                session_key=b"too short",
+                rotate_after_msgs=1,
+                rotate_after=timedelta(minutes=1),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
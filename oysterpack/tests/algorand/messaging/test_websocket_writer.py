@@ -0,0 +1,211 @@
+import asyncio
+import unittest
+from typing import Iterable, AsyncIterable
+
+from oysterpack.algorand.messaging.frame import (
+    frame_kind,
+    FrameKind,
+    pack_multi_frame,
+    unpack_multi_frame,
+)
+from oysterpack.algorand.messaging.websocket import Data
+from oysterpack.algorand.messaging.websocket_writer import WebsocketWriter
+from tests.support.websockets import WebsocketMock
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+class BlockingWebsocketMock(WebsocketMock):
+    """
+    Writes block until they are released
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.released = asyncio.Event()
+
+    async def send(
+        self,
+        message: Data | Iterable[Data] | AsyncIterable[Data],
+    ) -> None:
+        await self.released.wait()
+        await super().send(message)
+
+
+class FailingWebsocketMock(WebsocketMock):
+    async def send(
+        self,
+        message: Data | Iterable[Data] | AsyncIterable[Data],
+    ) -> None:
+        raise ConnectionError()
+
+
+class MultiFrameTestCase(unittest.TestCase):
+    def test_pack_unpack(self):
+        frames = [b"", b"1", b"22" * 1000, bytearray(b"333")]
+        multi_frame = pack_multi_frame(frames)
+        self.assertEqual(FrameKind.MULTI, frame_kind(multi_frame))
+        self.assertEqual(
+            frames, [bytes(frame) for frame in unpack_multi_frame(multi_frame)]
+        )
+
+        self.assertEqual([], unpack_multi_frame(pack_multi_frame([])))
+
+        with self.subTest("truncated"):
+            with self.assertRaises(ValueError):
+                unpack_multi_frame(multi_frame[:-1])
+            with self.assertRaises(ValueError):
+                unpack_multi_frame(multi_frame[:4])
+
+        with self.subTest("invalid header"):
+            with self.assertRaises(ValueError):
+                unpack_multi_frame(b"1" + multi_frame[1:])
+
+
+class WebsocketWriterTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_send_without_coalescing(self):
+        websocket = WebsocketMock()
+        writer = WebsocketWriter(websocket)
+        writer.start()
+        for i in range(10):
+            await writer.send(bytes([i]))
+        await writer.send("text")
+        await writer.stop()
+        self.assertFalse(writer.running)
+
+        for i in range(10):
+            self.assertEqual(bytes([i]), websocket.response_queue.get_nowait())
+        self.assertEqual("text", websocket.response_queue.get_nowait())
+        self.assertEqual(11, writer.metrics.frames_sent)
+        self.assertEqual(11, writer.metrics.writes)
+
+        with self.subTest("once stopped, messages are sent directly"):
+            await writer.send(b"direct")
+            self.assertEqual(b"direct", websocket.response_queue.get_nowait())
+
+    async def test_coalescing(self):
+        websocket = BlockingWebsocketMock()
+        writer = WebsocketWriter(
+            websocket,
+            coalesce_frames=True,
+            max_coalesced_frames=4,
+        )
+        writer.start()
+        # the 1st frame is dequeued by the writer, which is then blocked writing it
+        await writer.send(b"0")
+        await asyncio.sleep(0)
+        for i in range(1, 10):
+            await writer.send(bytes([i]))
+        await writer.send("text")
+        await writer.send(b"10")
+        websocket.released.set()
+        await writer.stop()
+
+        messages = []
+        while not websocket.response_queue.empty():
+            messages.append(websocket.response_queue.get_nowait())
+        self.assertEqual(b"0", messages[0])
+        self.assertEqual(
+            [bytes([i]) for i in range(1, 5)],
+            [bytes(frame) for frame in unpack_multi_frame(messages[1])],
+        )
+        self.assertEqual(
+            [bytes([i]) for i in range(5, 9)],
+            [bytes(frame) for frame in unpack_multi_frame(messages[2])],
+        )
+        # a single frame is not wrapped
+        self.assertEqual(bytes([9]), messages[3])
+        # text frames are never coalesced
+        self.assertEqual("text", messages[4])
+        self.assertEqual(b"10", messages[5])
+        self.assertEqual(6, len(messages))
+
+        self.assertEqual(12, writer.metrics.frames_enqueued)
+        self.assertEqual(12, writer.metrics.frames_sent)
+        self.assertEqual(6, writer.metrics.writes)
+        self.assertGreater(writer.metrics.max_write_latency, 0)
+        self.assertGreater(writer.metrics.avg_queue_latency, 0)
+
+    async def test_max_coalesced_bytes(self):
+        websocket = BlockingWebsocketMock()
+        writer = WebsocketWriter(
+            websocket, coalesce_frames=True, max_coalesced_bytes=10
+        )
+        writer.start()
+        await writer.send(b"0")
+        await asyncio.sleep(0)
+        for frame in (b"12345", b"67890", b"x"):
+            await writer.send(frame)
+        websocket.released.set()
+        await writer.stop()
+
+        self.assertEqual(b"0", websocket.response_queue.get_nowait())
+        self.assertEqual(
+            [b"12345", b"67890"],
+            [
+                bytes(frame)
+                for frame in unpack_multi_frame(websocket.response_queue.get_nowait())
+            ],
+        )
+        self.assertEqual(b"x", websocket.response_queue.get_nowait())
+
+    async def test_backpressure(self):
+        websocket = BlockingWebsocketMock()
+        writer = WebsocketWriter(websocket, max_queue_size=2)
+        writer.start()
+        await writer.send(b"0")
+        await asyncio.sleep(0)
+        await writer.send(b"1")
+        await writer.send(b"2")
+        self.assertEqual(2, writer.queue_size)
+
+        blocked_send = asyncio.create_task(writer.send(b"3"))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked_send.done())
+        self.assertEqual(1, writer.metrics.backpressure_count)
+
+        websocket.released.set()
+        await blocked_send
+        await writer.close()
+        self.assertTrue(websocket.closed)
+        self.assertEqual(4, websocket.response_queue.qsize())
+
+    async def test_send_while_stopping(self):
+        websocket = BlockingWebsocketMock()
+        writer = WebsocketWriter(websocket, max_queue_size=2)
+        writer.start()
+        await writer.send(b"0")
+        await asyncio.sleep(0)
+        await writer.send(b"1")
+        await writer.send(b"2")
+        blocked_send = asyncio.create_task(writer.send(b"3"))
+        await asyncio.sleep(0)
+
+        stop = asyncio.create_task(writer.stop())
+        await asyncio.sleep(0)
+        # stop has begun, i.e., the frame is not enqueued behind the stop signal
+        send_while_stopping = asyncio.create_task(writer.send(b"4"))
+        await asyncio.sleep(0)
+
+        websocket.released.set()
+        await asyncio.wait_for(
+            asyncio.gather(blocked_send, stop, send_while_stopping), 5
+        )
+        self.assertFalse(writer.running)
+        frames = [
+            websocket.response_queue.get_nowait()
+            for _ in range(websocket.response_queue.qsize())
+        ]
+        self.assertEqual([b"0", b"1", b"2", b"3", b"4"], frames)
+
+    async def test_write_failure(self):
+        writer = WebsocketWriter(FailingWebsocketMock())
+        writer.start()
+        await writer.send(b"0")
+        await writer.send(b"1")
+        await writer.stop()
+        self.assertEqual(0, writer.metrics.frames_sent)
+        self.assertEqual(2, writer.metrics.frames_dropped)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from pathlib import Path
 from time import sleep
@@ -30,6 +31,7 @@ from oysterpack.apps.auction.data import Base
 from oysterpack.apps.auction.domain.auction import AuctionManagerAppId, Auction
 from oysterpack.apps.auction.services.auction_import_service import (
     AuctionImportService,
+    AsyncAuctionImportService,
 )
 from oysterpack.core.service import ServiceCommand
 from tests.algorand.test_support import AlgorandTestCase
@@ -42,7 +44,7 @@ class AuctionImportServiceTestCase(AlgorandTestCase):
 
         commands_subject: Subject[ServiceCommand] = Subject()
 
-        import_auctions = ImportAuctions(
+        self.import_auctions = ImportAuctions(
             search=SearchAuctions(
                 indexer_client=self.indexer,
                 algod_client=self.algod_client,
@@ -51,7 +53,7 @@ class AuctionImportServiceTestCase(AlgorandTestCase):
             get_max_auction_app_id=self.get_max_auction_app_id,
         )
         self.auction_import_service = AuctionImportService(
-            import_auctions=import_auctions,
+            import_auctions=self.import_auctions,
             get_auction_managers=GetRegisteredAuctionManagers(self.session_factory),
             commands=commands_subject,
         )
@@ -115,6 +117,29 @@ class AuctionImportServiceTestCase(AlgorandTestCase):
 
         self.assertEqual(len(self.app_ids), len(imported_auctions))
 
+    def test_async_import(self) -> None:
+        imported_auctions: list[Auction] = []
+
+        def on_next(auctions: list[Auction]):
+            nonlocal imported_auctions
+            imported_auctions += auctions
+
+        auction_import_service = AsyncAuctionImportService(
+            import_auctions=self.import_auctions,
+            get_auction_managers=GetRegisteredAuctionManagers(self.session_factory),
+        )
+        auction_import_service.imported_auctions_observable.subscribe(on_next)
+
+        async def run():
+            await auction_import_service.start()
+            # give some time for the import process to run
+            await asyncio.sleep(5)
+            await auction_import_service.stop()
+
+        asyncio.run(run())
+
+        self.assertEqual(len(self.app_ids), len(imported_auctions))
+
 
 if __name__ == "__main__":
     unittest.main()
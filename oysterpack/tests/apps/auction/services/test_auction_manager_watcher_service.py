@@ -1,3 +1,4 @@
+import asyncio
 import pprint
 import unittest
 from datetime import timedelta
@@ -45,6 +46,7 @@ from oysterpack.apps.auction.domain.service_state import (
     SearchAuctionManagerEventsServiceState,
 )
 from oysterpack.apps.auction.services.auction_manager_watcher_service import (
+    AsyncAuctionManagerWatcherService,
     AuctionManagerWatcherService,
     AuctionManagerWatcherServiceEvent,
 )
@@ -248,6 +250,37 @@ class AuctionManagerWatcherServiceTestCase(AlgorandTestCase):
                 get_auction_event_count(AuctionManagerEvent.AUCTION_DELETED),
             )
 
+    def test_async_service(self) -> None:
+        events: list[AuctionManagerWatcherServiceEvent] = []
+        service = AsyncAuctionManagerWatcherService(
+            session_factory=self.session_factory,
+            get_registered_auction_managers=GetRegisteredAuctionManagers(
+                self.session_factory
+            ),
+            search_auction_manager_events=SearchAuctionManagerEvents(self.indexer),
+            refresh_auctions=RefreshAuctions(self.import_auction),
+            poll_interval=timedelta(seconds=1),
+        )
+        service.observable.subscribe(events.append)
+
+        async def run():
+            await service.start()
+            try:
+                for _ in range(5):
+                    self.seller_auction_manager_client.create_auction()
+                await asyncio.sleep(1.5)  # give indexer time to index
+            finally:
+                await service.stop()
+
+            state = await service.get_state(
+                AuctionManagerAppId(self.creator_auction_manager_client.app_id)
+            )
+            self.assertIn(AuctionManagerEvent.AUCTION_CREATED, state)
+
+        asyncio.run(run())
+
+        self.assertEqual(5, sum([len(event.auction_txns) for event in events]))
+
     def test_service_watch_deletes_only(self) -> None:
         self.service = AuctionManagerWatcherService(
             session_factory=self.session_factory,
@@ -1,6 +1,7 @@
 import unittest
 from datetime import timedelta
 from pathlib import Path
+from threading import Event
 from time import sleep
 
 from sqlalchemy import create_engine
@@ -15,6 +16,7 @@ from oysterpack.core.health_check import (
     HealthCheckImpact,
     HealthCheck,
     HealthCheckStatus,
+    HealthCheckTimeout,
 )
 from oysterpack.core.logging import get_logger
 from oysterpack.services.healthcheck_service import HealthCheckService
@@ -38,6 +40,21 @@ class FooHealthCheck(HealthCheck):
             raise self.error
 
 
+class HungHealthCheck(HealthCheck):
+    def __init__(self):
+        super().__init__(
+            name="hung",
+            impact=HealthCheckImpact.HIGH,
+            description="Hung health check",
+            tags={"indexer"},
+            timeout=timedelta(milliseconds=100),
+        )
+        self.release = Event()
+
+    def execute(self):
+        self.release.wait(5)
+
+
 class HealthCheckServiceTestCase(OysterPackTestCase):
     def setUp(self) -> None:
         # in-memory database canot be used here because the import process runs in a separate thread
@@ -94,6 +111,52 @@ class HealthCheckServiceTestCase(OysterPackTestCase):
         self.assertEqual(2, len(results_grouped_by_status[HealthCheckStatus.GREEN]))
         self.assertEqual(1, len(results_grouped_by_status[HealthCheckStatus.RED]))
 
+        with self.subTest("healthcheck stats"):
+            stats = healthcheck_service.healthcheck_stats
+            self.assertEqual(3, len(stats))
+            self.assertEqual(
+                sorted(stats, key=lambda stat: stat.p95, reverse=True), stats
+            )
+            foo_stats = next(stat for stat in stats if stat.name == foo.name)
+            self.assertEqual(HealthCheckStatus.RED, foo_stats.last_status)
+            self.assertEqual(1, foo_stats.status_changes)
+            self.assertEqual([], healthcheck_service.flapping_healthchecks)
+
+    def test_healthcheck_timeout(self) -> None:
+        hung = HungHealthCheck()
+        foo = FooHealthCheck()
+        bar = FooHealthCheck("bar")
+        healthcheck_service = HealthCheckService(healthchecks=[hung, foo, bar])
+        healthcheck_service.start()
+        try:
+            results: list[HealthCheckResult] = []
+            healthcheck_service.healthchecks_observable.subscribe(results.append)
+            healthcheck_service.run_healthchecks()
+
+            with self.subTest(
+                "hung health check does not block the other health checks"
+            ):
+                while foo.last_result is None or bar.last_result is None:
+                    sleep(0.01)
+                self.assertIsNone(hung.last_result)
+
+            while len(results) < 3:
+                sleep(0.01)
+            assert hung.last_result is not None
+            self.assertEqual(HealthCheckStatus.RED, hung.last_result.status)
+            self.assertIsInstance(hung.last_result.error, HealthCheckTimeout)
+            self.assertEqual(
+                {
+                    "hung": HealthCheckStatus.RED,
+                    "foo": HealthCheckStatus.GREEN,
+                    "bar": HealthCheckStatus.GREEN,
+                },
+                {result.name: result.status for result in results},
+            )
+        finally:
+            hung.release.set()
+            healthcheck_service.stop()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from algosdk.transaction import Multisig
+from ulid import ULID
+from websockets.legacy.client import connect
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.messaging.secure_message_client import SecureMessageClient
+from oysterpack.algorand.messaging.secure_message_handler import (
+    SecureMessageHandler,
+    SecureMessageWebsocketHandler,
+)
+from oysterpack.apps.wallet_connect.message_handlers.multisig_signature import (
+    MultisigSignatureHandler,
+)
+from oysterpack.apps.wallet_connect.messsages.multisig_signature import (
+    MultisigSignature,
+    MultisigSignatureResult,
+    MultisigSignatureStatus,
+    multisig_message_hash,
+)
+from oysterpack.apps.wallet_connect.services.multisig_signature_service import (
+    MultisigSignatureService,
+)
+from oysterpack.core.message import MultisigMessage, MessageType
+from tests.algorand.messaging import server_ssl_context, client_ssl_context
+from tests.support.websockets import create_websocket_server
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+class MultisigSignatureHandlerTestCase(OysterPackIsolatedAsyncioTestCase):
+    executor: ProcessPoolExecutor
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.executor = ProcessPoolExecutor()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.executor.shutdown(wait=True)
+
+    async def test_collect_signatures(self):
+        server_private_key = AlgoPrivateKey()
+        keys = [AlgoPrivateKey() for _ in range(3)]
+        service = MultisigSignatureService()
+        await service.start()
+
+        msg = MultisigMessage(
+            multisig=Multisig(
+                version=1,
+                threshold=3,
+                addresses=[key.signing_address for key in keys],
+            ),
+            msg_type=MessageType(),
+            data=ULID().bytes,
+        )
+        msg_hash = multisig_message_hash(msg)
+        signed = service.submit(msg)
+
+        secure_message_handler = SecureMessageHandler(
+            private_key=server_private_key,
+            message_handlers=[MultisigSignatureHandler(service)],
+            executor=self.executor,
+        )
+        server = create_websocket_server(
+            handler=SecureMessageWebsocketHandler(handler=secure_message_handler),
+            ssl_context=server_ssl_context(),
+        )
+
+        async def sign(key: AlgoPrivateKey) -> MultisigSignatureStatus:
+            # each signer submits its signature over its own connection
+            async with connect(
+                f"wss://localhost:{server.port}",
+                ssl=client_ssl_context(),
+            ) as websocket:
+                async with SecureMessageClient(
+                    websocket=websocket,
+                    private_key=key,
+                    executor=self.executor,
+                ).context() as client:
+                    handle = await client.send(
+                        MultisigSignature(
+                            msg_hash=msg_hash,
+                            public_key=bytes(key.signing_key.verify_key),
+                            signature=key.sign(msg.data).signature,
+                        ),
+                        server_private_key.encryption_address,
+                    )
+                    response = await handle.recv(timeout=timedelta(seconds=5))
+                    self.assertEqual(
+                        MultisigSignatureResult.message_type(), response.msg_type
+                    )
+                    result = MultisigSignatureResult.unpack(response.data)
+                    self.assertEqual(msg_hash, result.msg_hash)
+                    return result.status
+
+        try:
+            async with server.start_server():
+                statuses = await asyncio.gather(*[sign(key) for key in keys])
+        finally:
+            await service.stop()
+
+        self.assertEqual(
+            [MultisigSignatureStatus.Accepted] * 2 + [MultisigSignatureStatus.Complete],
+            sorted(statuses),
+        )
+        self.assertTrue((await signed).verify(verify_all=True))
+
+    async def test_malformed_signature(self):
+        server_private_key = AlgoPrivateKey()
+        keys = [AlgoPrivateKey() for _ in range(2)]
+        service = MultisigSignatureService()
+        await service.start()
+
+        msg = MultisigMessage(
+            multisig=Multisig(
+                version=1,
+                threshold=2,
+                addresses=[key.signing_address for key in keys],
+            ),
+            msg_type=MessageType(),
+            data=ULID().bytes,
+        )
+        msg_hash = multisig_message_hash(msg)
+        service.submit(msg)
+
+        secure_message_handler = SecureMessageHandler(
+            private_key=server_private_key,
+            message_handlers=[MultisigSignatureHandler(service)],
+            executor=self.executor,
+        )
+        server = create_websocket_server(
+            handler=SecureMessageWebsocketHandler(handler=secure_message_handler),
+            ssl_context=server_ssl_context(),
+        )
+
+        try:
+            async with server.start_server():
+                async with connect(
+                    f"wss://localhost:{server.port}",
+                    ssl=client_ssl_context(),
+                ) as websocket:
+                    async with SecureMessageClient(
+                        websocket=websocket,
+                        private_key=keys[0],
+                        executor=self.executor,
+                    ).context() as client:
+                        handle = await client.send(
+                            MultisigSignature(
+                                msg_hash=msg_hash,
+                                public_key=bytes(keys[0].signing_key.verify_key),
+                                # signatures are 64 bytes
+                                signature=keys[0].sign(msg.data).signature[:63],
+                            ),
+                            server_private_key.encryption_address,
+                        )
+                        response = await handle.recv(timeout=timedelta(seconds=5))
+        finally:
+            await service.stop()
+
+        result = MultisigSignatureResult.unpack(response.data)
+        self.assertEqual(msg_hash, result.msg_hash)
+        self.assertEqual(MultisigSignatureStatus.InvalidSignature, result.status)
+
+
+if __name__ == "__main__":
+    unittest.main()
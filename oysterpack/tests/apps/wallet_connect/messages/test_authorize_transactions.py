@@ -45,6 +45,11 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
             logger.info(f"message length = {len(packed)}")
             request_2 = AuthorizeTransactionsRequest.unpack(packed)
             self.assertEqual(request, request_2)
+            # transactions are carried encoded, and decoded on demand
+            self.assertEqual(
+                [txn1.dictify()],
+                [txn.dictify() for txn in request_2.decoded_transactions],
+            )
 
         with self.subTest("multiple transactions"):
             txn2 = transfer_algo(
@@ -167,10 +172,13 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
             authorizer,
             txns,
             app_activity_id,
-        ) = msgpack.unpackb(request.pack())
+        ) = msgpack.unpackb(request.pack()[1:])
+        # packed format: version (1 byte) | msgpack array of the fields
+        version = request.pack()[:1]
         with self.assertRaises(AuthorizeTransactionsError) as err:
             AuthorizeTransactionsRequest.unpack(
-                msgpack.packb(
+                version
+                + msgpack.packb(
                     (
                         None,
                         authorizer,
@@ -184,7 +192,8 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
         )
         with self.assertRaises(AuthorizeTransactionsError) as err:
             AuthorizeTransactionsRequest.unpack(
-                msgpack.packb(
+                version
+                + msgpack.packb(
                     (
                         app_id,
                         None,
@@ -198,7 +207,8 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
         )
         with self.assertRaises(AuthorizeTransactionsError) as err:
             AuthorizeTransactionsRequest.unpack(
-                msgpack.packb(
+                version
+                + msgpack.packb(
                     (
                         app_id,
                         authorizer,
@@ -212,7 +222,8 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
         )
         with self.assertRaises(AuthorizeTransactionsError) as err:
             AuthorizeTransactionsRequest.unpack(
-                msgpack.packb(
+                version
+                + msgpack.packb(
                     (
                         app_id,
                         authorizer,
@@ -226,7 +237,8 @@ class AuthorizeTransactionsTestCase(AlgorandTestCase):
         )
         with self.assertRaises(AuthorizeTransactionsError) as err:
             AuthorizeTransactionsRequest.unpack(
-                msgpack.packb(
+                version
+                + msgpack.packb(
                     (
                         app_id,
                         "invalid_address",
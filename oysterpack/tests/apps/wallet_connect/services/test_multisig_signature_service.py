@@ -0,0 +1,232 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from algosdk.transaction import Multisig
+from ulid import ULID
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.apps.wallet_connect.messsages.multisig_signature import (
+    MultisigSignatureStatus,
+    multisig_message_hash,
+)
+from oysterpack.apps.wallet_connect.services.multisig_signature_service import (
+    MultisigSignatureService,
+    MultisigSignatureRequestExpired,
+    MultisigSignatureServiceFull,
+)
+from oysterpack.core.message import MultisigMessage, MessageType
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+def multisig_message(keys: list[AlgoPrivateKey], threshold: int = 2) -> MultisigMessage:
+    return MultisigMessage(
+        multisig=Multisig(
+            version=1,
+            threshold=threshold,
+            addresses=[key.signing_address for key in keys],
+        ),
+        msg_type=MessageType(),
+        data=ULID().bytes,
+    )
+
+
+def public_key(key: AlgoPrivateKey) -> bytes:
+    return bytes(key.signing_key.verify_key)
+
+
+class MultisigSignatureServiceTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.keys = [AlgoPrivateKey() for _ in range(3)]
+
+    async def test_collect_signatures(self):
+        for executor in (None, ThreadPoolExecutor()):
+            with self.subTest(executor=executor):
+                service = MultisigSignatureService(executor=executor)
+                await service.start()
+                try:
+                    msg = multisig_message(self.keys)
+                    msg_hash = multisig_message_hash(msg)
+                    signed = service.submit(msg)
+                    self.assertIs(signed, service.submit(msg))
+                    self.assertEqual(1, service.pending_count)
+
+                    # signatures are submitted concurrently
+                    results = await asyncio.gather(
+                        *[
+                            service.add_signature(
+                                msg_hash,
+                                public_key(key),
+                                key.sign(msg.data).signature,
+                            )
+                            for key in self.keys[:2]
+                        ]
+                    )
+                    self.assertEqual(
+                        sorted(
+                            [
+                                MultisigSignatureStatus.Accepted,
+                                MultisigSignatureStatus.Complete,
+                            ]
+                        ),
+                        sorted(results),
+                    )
+                    signed_msg = await asyncio.wait_for(signed, 1)
+                    self.assertTrue(signed_msg.verify())
+                    self.assertEqual(0, service.pending_count)
+
+                    self.assertEqual(
+                        MultisigSignatureStatus.UnknownMessage,
+                        await service.add_signature(
+                            msg_hash,
+                            public_key(self.keys[2]),
+                            self.keys[2].sign(msg.data).signature,
+                        ),
+                    )
+                finally:
+                    await service.stop()
+                    if executor:
+                        executor.shutdown()
+
+    async def test_rejected_signatures(self):
+        service = MultisigSignatureService()
+        await service.start()
+        try:
+            msg = multisig_message(self.keys)
+            msg_hash = multisig_message_hash(msg)
+            signed = service.submit(msg)
+
+            with self.subTest("invalid signature"):
+                self.assertEqual(
+                    MultisigSignatureStatus.InvalidSignature,
+                    await service.add_signature(
+                        msg_hash,
+                        public_key(self.keys[0]),
+                        self.keys[0].sign(b"other").signature,
+                    ),
+                )
+
+            with self.subTest("malformed signature"):
+                self.assertEqual(
+                    MultisigSignatureStatus.InvalidSignature,
+                    await service.add_signature(
+                        msg_hash,
+                        public_key(self.keys[0]),
+                        self.keys[0].sign(msg.data).signature[:63],
+                    ),
+                )
+
+            with self.subTest("invalid signer"):
+                other = AlgoPrivateKey()
+                self.assertEqual(
+                    MultisigSignatureStatus.InvalidSigner,
+                    await service.add_signature(
+                        msg_hash, public_key(other), other.sign(msg.data).signature
+                    ),
+                )
+
+            with self.subTest("duplicate signature"):
+                signature = self.keys[0].sign(msg.data).signature
+                self.assertEqual(
+                    MultisigSignatureStatus.Accepted,
+                    await service.add_signature(
+                        msg_hash, public_key(self.keys[0]), signature
+                    ),
+                )
+                self.assertEqual(
+                    MultisigSignatureStatus.Duplicate,
+                    await service.add_signature(
+                        msg_hash, public_key(self.keys[0]), signature
+                    ),
+                )
+
+            with self.subTest("unknown message"):
+                self.assertEqual(
+                    MultisigSignatureStatus.UnknownMessage,
+                    await service.add_signature(
+                        b"unknown", public_key(self.keys[0]), signature
+                    ),
+                )
+
+            self.assertFalse(signed.done())
+        finally:
+            await service.stop()
+        self.assertTrue(signed.cancelled())
+        self.assertEqual(0, service.pending_count)
+
+    async def test_submit_signed_message(self):
+        service = MultisigSignatureService()
+        msg = multisig_message(self.keys)
+        msg.sign(self.keys[0])
+        msg.multisig.subsigs[1].signature = self.keys[1].sign(b"other").signature
+        signed = service.submit(msg)
+        with self.subTest("invalid signatures are dropped"):
+            self.assertFalse(signed.done())
+            self.assertIsNone(msg.multisig.subsigs[1].signature)
+
+        msg = multisig_message(self.keys)
+        msg.sign(self.keys[0])
+        msg.sign(self.keys[1])
+        signed = service.submit(msg)
+        with self.subTest("message that meets the threshold completes immediately"):
+            self.assertIs(msg, signed.result())
+            self.assertEqual(1, service.pending_count)
+
+    async def test_expiration(self):
+        service = MultisigSignatureService(ttl=timedelta(milliseconds=50))
+        await service.start()
+        try:
+            msg = multisig_message(self.keys)
+            signed = service.submit(msg)
+            with self.assertRaises(MultisigSignatureRequestExpired):
+                await asyncio.wait_for(signed, 1)
+            self.assertEqual(0, service.pending_count)
+            self.assertEqual(
+                MultisigSignatureStatus.UnknownMessage,
+                await service.add_signature(
+                    multisig_message_hash(msg),
+                    public_key(self.keys[0]),
+                    self.keys[0].sign(msg.data).signature,
+                ),
+            )
+        finally:
+            await service.stop()
+
+    async def test_max_pending(self):
+        service = MultisigSignatureService(
+            ttl=timedelta(milliseconds=50), max_pending=2
+        )
+        futures = [
+            service.submit(multisig_message(self.keys)),
+            service.submit(multisig_message(self.keys)),
+        ]
+        with self.assertRaises(MultisigSignatureServiceFull):
+            service.submit(multisig_message(self.keys))
+
+        with self.subTest("expired messages free up capacity"):
+            await asyncio.sleep(0.06)
+            service.submit(multisig_message(self.keys))
+            self.assertEqual(1, service.pending_count)
+            for future in futures:
+                self.assertIsInstance(
+                    future.exception(), MultisigSignatureRequestExpired
+                )
+
+        with self.subTest("cancelled messages are removed"):
+            msg = multisig_message(self.keys)
+            service.submit(msg).cancel()
+            self.assertEqual(
+                MultisigSignatureStatus.UnknownMessage,
+                await service.add_signature(
+                    multisig_message_hash(msg),
+                    public_key(self.keys[0]),
+                    self.keys[0].sign(msg.data).signature,
+                ),
+            )
+            self.assertEqual(1, service.pending_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import timedelta
+
+from oysterpack.core.async_service import AsyncService
+from oysterpack.core.async_service_manager import AsyncServiceManager
+from oysterpack.core.service import Service, ServiceStartError
+from tests.test_support import OysterPackIsolatedAsyncioTestCase
+
+
+async def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+class BlockingService(Service):
+    def __init__(
+        self,
+        name: str,
+        events: list[tuple[str, str]],
+        start_delay: float = 0,
+    ):
+        self.__name = name
+        self.__events = events
+        self.__start_delay = start_delay
+        self.start_thread: str | None = None
+        super().__init__()
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def _start(self):
+        self.start_thread = threading.current_thread().name
+        time.sleep(self.__start_delay)
+        self.__events.append(("start", self.name))
+
+    def _stop(self):
+        self.__events.append(("stop", self.name))
+
+
+class Foo(AsyncService):
+    def __init__(
+        self,
+        name: str,
+        events: list[tuple[str, str]],
+        start_delay: float = 0,
+        start_err: Exception | None = None,
+    ):
+        self.__name = name
+        self.__events = events
+        self.__start_delay = start_delay
+        self.__start_err = start_err
+        super().__init__()
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    async def _start(self):
+        await asyncio.sleep(self.__start_delay)
+        if self.__start_err:
+            raise self.__start_err
+        self.__events.append(("start", self.name))
+
+    async def _stop(self):
+        self.__events.append(("stop", self.name))
+
+
+class AsyncServiceManagerTestCase(OysterPackIsolatedAsyncioTestCase):
+    async def test_service_lifecycle(self):
+        events: list[tuple[str, str]] = []
+        db = BlockingService("db", events)
+        algod = Foo("algod", events)
+        api = Foo("api", events).depends_on(db, algod)
+        worker = BlockingService("worker", events).depends_on(db)
+        service_manager = AsyncServiceManager([api, worker, algod, db])
+        self.assertEqual(
+            [[algod.key, db.key], [api.key, worker.key]], service_manager.levels
+        )
+
+        await service_manager.start(timeout=timedelta(seconds=5))
+        for service in service_manager.services.values():
+            self.assertTrue(service.running)
+        self.assertEqual({"db", "algod"}, {name for _, name in events[:2]})
+        self.assertEqual({"api", "worker"}, {name for _, name in events[2:]})
+        self.assertEqual(
+            service_manager.services.keys(), service_manager.startup_times.keys()
+        )
+        with self.subTest("blocking services are started on the managed executor"):
+            self.assertTrue(db.start_thread.startswith(AsyncServiceManager.__name__))
+
+        events.clear()
+        await service_manager.stop(timeout=timedelta(seconds=5))
+        for service in service_manager.services.values():
+            self.assertTrue(service.stopped)
+        self.assertEqual({"api", "worker"}, {name for _, name in events[:2]})
+        self.assertEqual({"db", "algod"}, {name for _, name in events[2:]})
+
+        with self.subTest("services can be started back up after being stopped"):
+            await service_manager.start(timeout=timedelta(seconds=5))
+            for service in service_manager.services.values():
+                self.assertTrue(service.running)
+            await service_manager.stop()
+
+    async def test_services_within_level_start_concurrently(self):
+        events: list[tuple[str, str]] = []
+        services: list[Service | AsyncService] = [
+            BlockingService(f"blocking-{i}", events, start_delay=0.2) for i in range(2)
+        ]
+        services += [Foo(f"async-{i}", events, start_delay=0.2) for i in range(5)]
+        service_manager = AsyncServiceManager(services, max_workers=2)
+
+        start = time.perf_counter()
+        await service_manager.start()
+        self.assertLess(time.perf_counter() - start, 0.2 * 3)
+        await service_manager.stop()
+
+    async def test_start_failure_stops_started_services(self):
+        events: list[tuple[str, str]] = []
+        db = BlockingService("db", events)
+        api = Foo("api", events, start_err=Exception("BOOM!")).depends_on(db)
+        web = BlockingService("web", events).depends_on(api)
+        service_manager = AsyncServiceManager([db, api, web])
+
+        with self.assertRaises(ServiceStartError):
+            await service_manager.start()
+        self.assertEqual([("start", "db"), ("stop", "api"), ("stop", "db")], events)
+        self.assertTrue(db.stopped)
+        self.assertTrue(api.stopped)
+        self.assertFalse(web.running)
+
+    async def test_startup_deadline(self):
+        events: list[tuple[str, str]] = []
+        db = Foo("db", events, start_delay=1)
+        api = BlockingService("api", events).depends_on(db)
+        service_manager = AsyncServiceManager([db, api])
+
+        with self.assertRaises(TimeoutError):
+            await service_manager.start(timeout=timedelta(seconds=0.1))
+        self.assertFalse(api.running)
+
+    async def test_startup_deadline_stops_late_blocking_service(self):
+        events: list[tuple[str, str]] = []
+        db = BlockingService("db", events, start_delay=0.5)
+        api = BlockingService("api", events).depends_on(db)
+        service_manager = AsyncServiceManager([db, api])
+
+        with self.assertRaises(TimeoutError):
+            await service_manager.start(timeout=timedelta(seconds=0.1))
+        self.assertFalse(api.running)
+        # the service that missed the deadline is stopped when its startup completes
+        self.assertTrue(await wait_until(lambda: db.stopped))
+        self.assertEqual([("start", "db"), ("stop", "db")], events)
+
+        with self.subTest("services can be started after the failed startup"):
+            await service_manager.start(timeout=timedelta(seconds=5))
+            self.assertTrue(db.running)
+            self.assertTrue(api.running)
+            await service_manager.stop()
+
+    async def test_assertions(self):
+        with self.subTest("at least 1 service must be specified"):
+            with self.assertRaises(AssertionError):
+                AsyncServiceManager([])
+
+        with self.subTest("service keys must be unique"):
+            with self.assertRaises(AssertionError):
+                AsyncServiceManager([Foo("foo", []), Foo("foo", [])])
+
+        with self.subTest("dependencies must be managed"):
+            db = BlockingService("db", [])
+            with self.assertRaises(AssertionError):
+                AsyncServiceManager([Foo("api", []).depends_on(db)])
+
+
+if __name__ == "__main__":
+    unittest.main()
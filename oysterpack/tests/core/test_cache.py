@@ -0,0 +1,70 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from oysterpack.core.cache import LRUCache
+from tests.test_support import OysterPackTestCase
+
+
+class LRUCacheTestCase(OysterPackTestCase):
+    def test_lru_eviction(self):
+        cache: LRUCache[str, int] = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # touch "a" so that "b" becomes the least recently used entry
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertIn("a", cache)
+        self.assertIn("c", cache)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+
+        stats = cache.stats
+        self.assertEqual(1, stats.hits)
+        self.assertEqual(1, stats.misses)
+        self.assertEqual(1, stats.evictions)
+        self.assertEqual(0.5, stats.hit_ratio)
+
+    def test_get_or_create(self):
+        cache: LRUCache[int, str] = LRUCache(max_size=10)
+        created: list[int] = []
+
+        def create(key: int) -> str:
+            created.append(key)
+            return str(key)
+
+        for _ in range(3):
+            self.assertEqual("1", cache.get_or_create(1, create))
+        self.assertEqual([1], created)
+        self.assertEqual(2, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+
+        with self.subTest("concurrent access"):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(
+                    executor.map(
+                        lambda i: cache.get_or_create(i % 20, str), range(1000)
+                    )
+                )
+            self.assertEqual([str(i % 20) for i in range(1000)], results)
+            self.assertEqual(10, len(cache))
+
+    def test_pickle(self):
+        cache: LRUCache[str, int] = LRUCache(max_size=5)
+        cache.put("a", 1)
+        cache.get("a")
+
+        cache_2 = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(5, cache_2.max_size)
+        self.assertEqual(0, len(cache_2))
+        self.assertEqual(0, cache_2.stats.hits)
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(max_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+import threading
+import unittest
+from dataclasses import dataclass, field
+from enum import StrEnum, auto
+from typing import ClassVar, NewType
+
+import msgpack  # type: ignore
+from algosdk.transaction import PaymentTxn, SuggestedParams
+
+from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.algorand.client.model import AppId, Address
+from oysterpack.core.codec import codec, get_codec
+from oysterpack.core.message import (
+    MessageType,
+    MessageId,
+    SignedMessage,
+    Serializable,
+)
+
+Name = NewType("Name", str)
+
+
+class Data(Serializable):
+    """
+    Base class for the test dataclasses, which defaults their message type
+    """
+
+    MSG_TYPE: ClassVar[MessageType] = MessageType()
+
+    @classmethod
+    def message_type(cls) -> MessageType:
+        return cls.MSG_TYPE
+
+
+class Color(StrEnum):
+    RED = auto()
+    GREEN = auto()
+
+
+@codec
+@dataclass(slots=True)
+class Point(Data):
+    x: int
+    y: int
+
+
+@codec(version=2)
+@dataclass(slots=True)
+class Shape(Data):
+    MSG_TYPE: ClassVar[MessageType] = MessageType.from_str("01GXR2K8XW3B1T7J9Q6S5D4F3A")
+
+    app_id: AppId
+    owner: Address
+    name: Name
+    color: Color
+    msg_type: MessageType
+    msg_id: MessageId | None
+    origin: Point
+    points: list[Point]
+    tags: list[str]
+    signed: SignedMessage | None = None
+    scale: float = 1.0
+
+
+@codec
+@dataclass(slots=True)
+class Empty(Data):
+    pass
+
+
+class CodecTestCase(unittest.TestCase):
+    def shape(self) -> Shape:
+        return Shape(
+            app_id=AppId(10),
+            owner=Address(AlgoPrivateKey().signing_address),
+            name=Name("triangle"),
+            color=Color.GREEN,
+            msg_type=Shape.MSG_TYPE,
+            msg_id=MessageId(),
+            origin=Point(0, 0),
+            points=[Point(1, 2), Point(3, 4)],
+            tags=["a", "b"],
+            signed=SignedMessage.sign(AlgoPrivateKey(), SignedMessageData()),
+        )
+
+    def test_pack_unpack(self):
+        shape = self.shape()
+        packed = shape.pack()
+        self.assertEqual(2, packed[0])
+
+        shape_2 = Shape.unpack(packed)
+        self.assertEqual(shape, shape_2)
+        self.assertIs(AppId, type(shape_2.app_id))
+        self.assertIs(Color, type(shape_2.color))
+        self.assertIs(MessageId, type(shape_2.msg_id))
+        # message type constants are interned
+        self.assertIs(Shape.MSG_TYPE, shape_2.msg_type)
+        self.assertIsInstance(shape_2.points, list)
+
+        with self.subTest("unpack from a buffer view"):
+            self.assertEqual(shape, Shape.unpack(memoryview(bytearray(packed))))
+
+        with self.subTest("optional fields"):
+            shape.msg_id = None
+            shape.signed = None
+            self.assertEqual(shape, Shape.unpack(shape.pack()))
+
+        with self.subTest("no fields"):
+            self.assertEqual(Empty(), Empty.unpack(Empty().pack()))
+
+    def test_packed_format(self):
+        point = Point(1, 2)
+        self.assertEqual(b"\x00" + msgpack.packb((1, 2)), point.pack())
+        self.assertEqual(point, Point.unpack(b"\x00" + msgpack.packb((1, 2))))
+
+    def test_invalid_packed_bytes(self):
+        packed = Point(1, 2).pack()
+        with self.subTest("schema version mismatch"):
+            with self.assertRaises(ValueError):
+                Point.unpack(b"\x01" + packed[1:])
+        with self.subTest("empty"):
+            with self.assertRaises(ValueError):
+                Point.unpack(b"")
+        with self.subTest("field count mismatch"):
+            with self.assertRaises(ValueError):
+                Point.unpack(b"\x00" + msgpack.packb((1, 2, 3)))
+
+    def test_unpack_error(self):
+        class InvalidMessage(Exception):
+            pass
+
+        @codec(unpack_error=InvalidMessage)
+        @dataclass(slots=True)
+        class Foo(Data):
+            app_id: AppId
+
+        with self.assertRaises(InvalidMessage):
+            Foo.unpack(b"\x00" + msgpack.packb((None,)))
+
+    def test_transaction_field(self):
+        @codec
+        @dataclass(slots=True)
+        class Txns(Data):
+            txns: list[PaymentTxn]
+
+        account = AlgoPrivateKey().signing_address
+        txn = PaymentTxn(
+            sender=account,
+            sp=SuggestedParams(
+                fee=1000,
+                first=1,
+                last=1000,
+                gh="SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=",
+                flat_fee=True,
+            ),
+            receiver=account,
+            amt=1,
+        )
+        txns = Txns.unpack(Txns([txn]).pack())
+        self.assertEqual(txn.dictify(), txns.txns[0].dictify())
+
+    def test_invalid_definitions(self):
+        with self.assertRaises(TypeError):
+
+            @codec
+            class NotDataclass:
+                pass
+
+        with self.assertRaises(TypeError):
+
+            @codec
+            @dataclass
+            class UnsupportedField:
+                values: dict[str, int]
+
+        with self.assertRaises(TypeError):
+
+            @codec
+            @dataclass
+            class DefinesPack:
+                def pack(self) -> bytes:
+                    return b""
+
+        with self.assertRaises(TypeError):
+
+            @codec
+            @dataclass
+            class NonInitField:
+                x: int = field(init=False, default=0)
+
+        with self.assertRaises(ValueError):
+
+            @codec(version=128)
+            @dataclass
+            class InvalidVersion:
+                pass
+
+    def test_serializable_delegates_to_codec(self):
+        msg = SignedMessage.sign(AlgoPrivateKey(), SignedMessageData())
+        packed = Serializable.pack(msg)
+        self.assertEqual(msg.pack(), packed)
+        self.assertEqual(msg, Serializable.unpack.__func__(SignedMessage, packed))  # type: ignore
+        self.assertIs(get_codec(SignedMessage).pack, SignedMessage.pack)
+
+        with self.assertRaises(TypeError):
+            get_codec(Serializable)
+
+    def test_packer_is_thread_safe(self):
+        shape = self.shape()
+        expected = shape.pack()
+        results: list[bytes] = []
+
+        def pack():
+            for _ in range(100):
+                results.append(shape.pack())
+
+        threads = [threading.Thread(target=pack) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([expected] * 400, results)
+
+
+@codec
+@dataclass(slots=True)
+class SignedMessageData(Data):
+    text: str = "data"
+
+
+if __name__ == "__main__":
+    unittest.main()
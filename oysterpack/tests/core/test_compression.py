@@ -0,0 +1,84 @@
+import unittest
+import zlib
+
+from oysterpack.core.compression import (
+    Compression,
+    ZlibCompressor,
+    get_compressor,
+    register_compressor,
+)
+
+
+class ZlibCompressorTestCase(unittest.TestCase):
+    def test_compress_decompress(self):
+        compressor = ZlibCompressor()
+        data = b"data" * 1000
+        compressed = compressor.compress(data)
+        self.assertLess(len(compressed), len(data))
+        self.assertEqual(data, compressor.decompress(compressed, len(data)))
+        self.assertEqual(data, compressor.decompress(memoryview(compressed), 1 << 20))
+
+    def test_decompress_invalid_data(self):
+        compressor = ZlibCompressor()
+        data = b"data" * 1000
+        compressed = compressor.compress(data)
+        with self.subTest("exceeds max size"):
+            with self.assertRaises(ValueError):
+                compressor.decompress(compressed, len(data) - 1)
+        with self.subTest("truncated"):
+            with self.assertRaises(ValueError):
+                compressor.decompress(compressed[:-4], len(data))
+        with self.subTest("invalid"):
+            with self.assertRaises(ValueError):
+                compressor.decompress(b"invalid", len(data))
+
+    def test_level(self):
+        self.assertEqual(9, ZlibCompressor(level=9).level)
+        data = b"data" * 1000
+        self.assertEqual(data, zlib.decompress(ZlibCompressor(level=1).compress(data)))
+        with self.assertRaises(ValueError):
+            ZlibCompressor(level=10)
+
+
+class CompressorRegistryTestCase(unittest.TestCase):
+    def test_zlib_is_registered(self):
+        self.assertIsInstance(get_compressor(ZlibCompressor.codec_id), ZlibCompressor)
+
+    def test_register_compressor(self):
+        class IdentityCompressor:
+            codec_id = 15
+
+            def compress(self, data: bytes | memoryview) -> bytes:
+                return bytes(data)
+
+            def decompress(self, data: bytes | memoryview, max_size: int) -> bytes:
+                return bytes(data)
+
+        with self.assertRaises(ValueError):
+            get_compressor(IdentityCompressor.codec_id)
+
+        compressor = IdentityCompressor()
+        register_compressor(compressor)
+        self.assertIs(compressor, get_compressor(IdentityCompressor.codec_id))
+        with self.subTest("codec ID is already registered"):
+            with self.assertRaises(ValueError):
+                register_compressor(IdentityCompressor())
+            compressor_2 = IdentityCompressor()
+            register_compressor(compressor_2, replace=True)
+            self.assertIs(compressor_2, get_compressor(IdentityCompressor.codec_id))
+
+        with self.subTest("invalid codec ID"):
+            invalid = IdentityCompressor()
+            invalid.codec_id = 16
+            with self.assertRaises(ValueError):
+                register_compressor(invalid)
+            with self.assertRaises(ValueError):
+                Compression(compressor=invalid)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            Compression(threshold=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import logging
 import unittest
-from datetime import timedelta
-from threading import Timer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, datetime, UTC
+from threading import Timer, Event
 from time import sleep
 
 from oysterpack.core.health_check import (
@@ -10,6 +11,9 @@ from oysterpack.core.health_check import (
     HealthCheckStatus,
     YellowHealthCheck,
     RedHealthCheck,
+    HealthCheckTimeout,
+    HealthCheckHistory,
+    HealthCheckResult,
 )
 from tests.test_support import OysterPackTestCase
 
@@ -34,6 +38,26 @@ class FooHealthCheck(HealthCheck):
             raise self.error
 
 
+class BlockingHealthCheck(HealthCheck):
+    def __init__(self, timeout: timedelta | None = None):
+        super().__init__(
+            name="blocking",
+            impact=HealthCheckImpact.HIGH,
+            description="Blocks until released",
+            tags={"test"},
+            run_interval=timedelta(seconds=1),
+            timeout=timeout,
+        )
+        self.release = Event()
+        self.started = Event()
+        self.execution_count = 0
+
+    def execute(self):
+        self.execution_count += 1
+        self.started.set()
+        self.release.wait(2)
+
+
 class MyTestCase(OysterPackTestCase):
     def test_healthcheck(self):
         healthcheck = FooHealthCheck()
@@ -95,6 +119,163 @@ class MyTestCase(OysterPackTestCase):
         if timer:
             timer.cancel()
 
+    def test_single_flight(self):
+        healthcheck = BlockingHealthCheck()
+        with ThreadPoolExecutor() as executor:
+            owner = executor.submit(healthcheck)
+            healthcheck.started.wait(1)
+            joiners = [executor.submit(healthcheck) for _ in range(3)]
+            sleep(0.05)
+            healthcheck.release.set()
+            results = [owner.result()] + [joiner.result() for joiner in joiners]
+        self.assertEqual(1, healthcheck.execution_count)
+        for result in results:
+            self.assertIs(healthcheck.last_result, result)
+            self.assertEqual(HealthCheckStatus.GREEN, result.status)
+
+    def test_timeout(self):
+        healthcheck = BlockingHealthCheck(timeout=timedelta(milliseconds=50))
+        with ThreadPoolExecutor() as executor:
+            owner = executor.submit(healthcheck)
+            healthcheck.started.wait(1)
+            result = healthcheck()
+            with self.subTest("caller that waits longer than the timeout gets RED"):
+                self.assertEqual(HealthCheckStatus.RED, result.status)
+                self.assertIsInstance(result.error, HealthCheckTimeout)
+                self.assertIs(result, healthcheck.last_result)
+
+            with self.subTest("completed execution replaces the timeout result"):
+                healthcheck.release.set()
+                self.assertEqual(HealthCheckStatus.GREEN, owner.result().status)
+                self.assertIs(owner.result(), healthcheck.last_result)
+
+        with self.subTest("timeout is not recorded over a newer result"):
+            self.assertIs(
+                healthcheck.last_result,
+                healthcheck.record_timeout(datetime.now(UTC) - timedelta(seconds=1)),
+            )
+
+    def test_timed_out_runs_are_recorded_once(self):
+        healthcheck = BlockingHealthCheck(timeout=timedelta(milliseconds=20))
+        with ThreadPoolExecutor() as executor:
+            for _ in range(5):
+                healthcheck.release.clear()
+                healthcheck.started.clear()
+                owner = executor.submit(healthcheck)
+                healthcheck.started.wait(1)
+                # several callers time out on the same run
+                for _ in range(2):
+                    self.assertIsInstance(healthcheck().error, HealthCheckTimeout)
+                self.assertEqual(
+                    HealthCheckStatus.RED, healthcheck.history.statuses()[-1]
+                )
+                healthcheck.release.set()
+                owner.result()
+
+        stats = healthcheck.stats()
+        self.assertEqual(5, stats.count)
+        self.assertEqual(5, stats.green)
+        self.assertEqual(0, stats.status_changes)
+
+    def test_run_once_per_interval(self):
+        healthcheck = FooHealthCheck()
+        result = healthcheck.run()
+        self.assertIs(result, healthcheck.run())
+        with self.subTest("calling the health check always runs it"):
+            self.assertIsNot(result, healthcheck())
+
+
+class HealthCheckHistoryTestCase(OysterPackTestCase):
+    @staticmethod
+    def result(
+        status: HealthCheckStatus, duration_ms: int, timestamp: datetime | None = None
+    ) -> HealthCheckResult:
+        return HealthCheckResult(
+            name="foo",
+            status=status,
+            timestamp=timestamp if timestamp else datetime.now(UTC),
+            duration=timedelta(milliseconds=duration_ms),
+        )
+
+    def test_ring_buffer(self):
+        history = HealthCheckHistory(size=4)
+        self.assertEqual(0, len(history))
+        self.assertEqual(HealthCheckHistory(size=4).stats("foo").count, 0)
+
+        now = datetime.now(UTC).replace(microsecond=0)
+        for i in range(6):
+            history.append(
+                self.result(HealthCheckStatus.GREEN, i, now + timedelta(seconds=i))
+            )
+        self.assertEqual(4, len(history))
+        self.assertEqual([0.002, 0.003, 0.004, 0.005], history.durations())
+        self.assertEqual(
+            [now + timedelta(seconds=i) for i in range(2, 6)], history.timestamps()
+        )
+
+    def test_replace_last(self):
+        history = HealthCheckHistory(size=2)
+        history.replace_last(self.result(HealthCheckStatus.RED, 1))
+        self.assertEqual([HealthCheckStatus.RED], history.statuses())
+        history.append(self.result(HealthCheckStatus.RED, 2))
+        history.append(self.result(HealthCheckStatus.RED, 3))
+        history.replace_last(self.result(HealthCheckStatus.GREEN, 4))
+        self.assertEqual(
+            [HealthCheckStatus.RED, HealthCheckStatus.GREEN], history.statuses()
+        )
+        self.assertEqual([0.002, 0.004], history.durations())
+
+    def test_stats(self):
+        history = HealthCheckHistory(size=100)
+        for i in range(1, 101):
+            history.append(self.result(HealthCheckStatus.GREEN, i))
+        stats = history.stats("foo")
+        self.assertEqual(100, stats.count)
+        self.assertEqual(100, stats.green)
+        self.assertAlmostEqual(0.050, stats.p50)
+        self.assertAlmostEqual(0.095, stats.p95)
+        self.assertAlmostEqual(0.099, stats.p99)
+        with self.subTest("durations are trending up"):
+            self.assertGreater(stats.duration_trend, 1.5)
+        self.assertEqual(0, stats.status_changes)
+        self.assertFalse(stats.flapping)
+
+    def test_flapping(self):
+        history = HealthCheckHistory(size=10, flap_threshold=0.5)
+        for i in range(10):
+            history.append(
+                self.result(
+                    HealthCheckStatus.GREEN if i % 2 else HealthCheckStatus.RED, 1
+                )
+            )
+        stats = history.stats("foo")
+        self.assertEqual(9, stats.status_changes)
+        self.assertTrue(stats.flapping)
+        self.assertEqual(HealthCheckStatus.GREEN, stats.last_status)
+        self.assertEqual((5, 0, 5), (stats.green, stats.yellow, stats.red))
+
+        with self.subTest("status settles down"):
+            for _ in range(6):
+                history.append(self.result(HealthCheckStatus.GREEN, 1))
+            self.assertFalse(history.stats("foo").flapping)
+
+    def test_healthcheck_records_history(self):
+        healthcheck = FooHealthCheck()
+        healthcheck()
+        healthcheck.error = RedHealthCheck()
+        healthcheck()
+        stats = healthcheck.stats()
+        self.assertEqual("foo", stats.name)
+        self.assertEqual(2, stats.count)
+        self.assertEqual(1, stats.status_changes)
+        self.assertEqual(HealthCheckStatus.RED, stats.last_status)
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            HealthCheckHistory(size=1)
+        with self.assertRaises(ValueError):
+            HealthCheckHistory(flap_threshold=0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,7 @@
+import os
+import pickle
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import field, dataclass
 from typing import Self, ClassVar
 
@@ -7,12 +10,15 @@ from algosdk.transaction import Multisig
 from ulid import ULID
 
 from oysterpack.algorand.client.accounts.private_key import AlgoPrivateKey
+from oysterpack.core.compression import Compression, ZlibCompressor
 from oysterpack.core.message import (
     Message,
     MessageType,
     SignedMessage,
     MultisigMessage,
+    MultisigSignaturesBelowThreshold,
     Serializable,
+    verify_multisig_messages,
 )
 
 
@@ -24,6 +30,117 @@ class MessageTestCase(unittest.TestCase):
         msg_2 = Message.unpack(packed_msg)
         self.assertEqual(msg, msg_2)
 
+    def test_pack_into_unpack_from(self):
+        msg = Message.create(MessageType(), b"data")
+
+        buffer = bytearray(msg.binary_size + 2)
+        msg.pack_into(buffer, offset=2)
+        msg_2 = Message.unpack_from(memoryview(buffer)[2:])
+        self.assertEqual(msg, msg_2)
+        # data is a view into the buffer
+        self.assertIsInstance(msg_2.data, memoryview)
+        self.assertIs(buffer, msg_2.data.obj)
+
+        with self.subTest("data is copied when pickled"):
+            self.assertEqual(msg, pickle.loads(pickle.dumps(msg_2)))
+
+        with self.subTest("buffer is too small"):
+            with self.assertRaises(ValueError):
+                Message.unpack_from(bytes(Message.BINARY_HEADER_SIZE - 1))
+
+    def test_flags(self):
+        msg = Message.create(MessageType(), b"data")
+        with self.subTest("messages without flags are packed as a 3-tuple"):
+            self.assertEqual(3, len(msgpack.unpackb(msg.pack())))
+
+        msg.flags = 0x11
+        self.assertEqual(4, len(msgpack.unpackb(msg.pack())))
+        self.assertEqual(msg, Message.unpack(msg.pack()))
+
+        buffer = bytearray(msg.binary_size)
+        msg.pack_into(buffer)
+        self.assertEqual(msg, Message.unpack_from(buffer))
+        self.assertEqual(msg, pickle.loads(pickle.dumps(msg)))
+
+    def test_compression(self):
+        compression = Compression(threshold=100)
+        msg = Message.create(MessageType(), b"data" * 100)
+
+        compressed = msg.accept_compression(compression).compress(compression)
+        self.assertEqual(ZlibCompressor.codec_id, compressed.compression_codec_id)
+        self.assertEqual(
+            ZlibCompressor.codec_id, compressed.accepted_compression_codec_id
+        )
+        self.assertLess(len(compressed.data), len(msg.data))
+        self.assertEqual(msg.msg_id, compressed.msg_id)
+        # compressing is idempotent
+        self.assertEqual(compressed, compressed.compress(compression))
+
+        decompressed = Message.unpack(compressed.pack()).decompress()
+        self.assertEqual(msg.data, decompressed.data)
+        self.assertEqual(0, decompressed.compression_codec_id)
+        # the accepted codec is retained, i.e., the recipient may compress replies
+        self.assertEqual(
+            ZlibCompressor.codec_id, decompressed.accepted_compression_codec_id
+        )
+        self.assertIs(decompressed, decompressed.decompress())
+
+        with self.subTest("data is smaller than the threshold"):
+            small = Message.create(MessageType(), b"data")
+            self.assertIs(small, small.compress(compression))
+            # messages without flags are packed in the format that peers without flags support
+            self.assertEqual(3, len(msgpack.unpackb(small.pack())))
+
+        with self.subTest("compressed replies do not advertise compression"):
+            reply = Message.create(MessageType(), b"data" * 100).compress(compression)
+            self.assertEqual(ZlibCompressor.codec_id, reply.compression_codec_id)
+            self.assertEqual(0, reply.accepted_compression_codec_id)
+
+        with self.subTest("accept compression"):
+            small = Message.create(MessageType(), b"data").accept_compression(
+                compression
+            )
+            self.assertEqual(0, small.compression_codec_id)
+            self.assertEqual(
+                ZlibCompressor.codec_id, small.accepted_compression_codec_id
+            )
+            self.assertEqual(small.flags, Message.unpack(small.pack()).flags)
+
+        with self.subTest("data that does not shrink is not compressed"):
+            incompressible = Message.create(MessageType(), os.urandom(1000))
+            self.assertEqual(
+                incompressible.data,
+                incompressible.compress(Compression(threshold=0)).data,
+            )
+
+        with self.subTest("decompressed data exceeds max size"):
+            with self.assertRaises(ValueError):
+                compressed.decompress(max_size=len(msg.data) - 1)
+
+        with self.subTest("unsupported codec"):
+            compressed.flags = (compressed.flags & ~0x0F) | 0x0E
+            with self.assertRaises(ValueError):
+                compressed.decompress()
+
+
+class MessageTypeTestCase(unittest.TestCase):
+    def test_message_type_constants_are_interned(self):
+        msg_type = SignedMessage.message_type()
+        self.assertIs(msg_type, MessageType.from_str(str(msg_type)))
+        self.assertIs(msg_type, MessageType.from_bytes(msg_type.bytes))
+        self.assertIs(msg_type, pickle.loads(pickle.dumps(msg_type)))
+
+        with self.subTest("unknown message types are not interned"):
+            unknown = MessageType()
+            self.assertIsNot(unknown, MessageType.from_bytes(unknown.bytes))
+            self.assertEqual(unknown, MessageType.from_bytes(unknown.bytes))
+
+    def test_hash(self):
+        msg_type = MessageType()
+        self.assertEqual(hash(msg_type.bytes), hash(msg_type))
+        self.assertEqual(hash(msg_type), hash(MessageType.from_bytes(msg_type.bytes)))
+        self.assertEqual(hash(msg_type), hash(pickle.loads(pickle.dumps(msg_type))))
+
 
 @dataclass(slots=True)
 class FooMsg(Serializable):
@@ -86,6 +203,109 @@ class MultisigMessageDataTestCase(unittest.TestCase):
         msg_2 = MultisigMessage.unpack(packed_msg)
 
         self.assertEqual(msg, msg_2)
+        self.assertEqual(msg.multisig.address(), msg_2.multisig.address())
+        self.assertTrue(msg_2.verify())
+
+    def test_unpack_malformed_subsig(self):
+        keys = [AlgoPrivateKey() for _ in range(2)]
+        multisig = Multisig(
+            version=1,
+            threshold=2,
+            addresses=[key.signing_address for key in keys],
+        )
+        msg = MultisigMessage(multisig=multisig, msg_type=MessageType(), data=b"data")
+        msg.sign(keys[0])
+        msg.sign(keys[1])
+
+        def packed(subsigs: list) -> bytes:
+            return msgpack.packb((msg.msg_type.bytes, 1, 2, subsigs, msg.data))
+
+        public_keys = [subsig.public_key for subsig in msg.multisig.subsigs]
+        signature = msg.multisig.subsigs[0].signature
+        for name, subsigs in [
+            ("short public key", [(public_keys[0][:31], signature)]),
+            ("short signature", [(public_keys[0], signature[:63])]),
+            ("public key is not bytes", [("key", signature)]),
+        ]:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    MultisigMessage.unpack(packed(subsigs + [(public_keys[1], None)]))
+
+        with self.subTest("unsigned subsig"):
+            msg_2 = MultisigMessage.unpack(
+                packed([(public_keys[0], signature), (public_keys[1], None)])
+            )
+            self.assertIsNone(msg_2.multisig.subsigs[1].signature)
+
+    def test_verify(self):
+        keys = [AlgoPrivateKey() for _ in range(3)]
+        multisig = Multisig(
+            version=1,
+            threshold=2,
+            addresses=[key.signing_address for key in keys],
+        )
+        msg = MultisigMessage(multisig=multisig, msg_type=MessageType(), data=b"data")
+
+        with self.subTest("signatures below threshold"):
+            msg.sign(keys[0])
+            with self.assertRaises(MultisigSignaturesBelowThreshold):
+                msg.verify()
+
+        msg.sign(keys[1])
+        msg.sign(keys[2])
+        self.assertTrue(msg.verify())
+        self.assertTrue(msg.verify(verify_all=True))
+
+        with self.subTest("invalid signature beyond the threshold"):
+            msg.multisig.subsigs[2].signature = keys[2].sign(b"other").signature
+            self.assertTrue(msg.verify())
+            self.assertFalse(msg.verify(verify_all=True))
+
+        with self.subTest("invalid signature within the threshold"):
+            msg.multisig.subsigs[2].signature = None
+            msg.multisig.subsigs[0].signature = keys[0].sign(b"other").signature
+            self.assertFalse(msg.verify())
+            self.assertFalse(msg.verify(verify_all=True))
+
+    def test_verify_multisig_messages(self):
+        keys = [AlgoPrivateKey() for _ in range(3)]
+        multisig_address = Multisig(
+            version=1,
+            threshold=2,
+            addresses=[key.signing_address for key in keys],
+        )
+
+        msgs = []
+        expected = []
+        for i in range(20):
+            msg = MultisigMessage(
+                multisig=multisig_address.get_multisig_account(),
+                msg_type=MessageType(),
+                data=ULID().bytes,
+            )
+            msg.sign(keys[0])
+            match i % 3:
+                case 0:
+                    msg.sign(keys[1])
+                    expected.append(True)
+                case 1:
+                    msg.multisig.subsigs[1].signature = keys[1].sign(b"other").signature
+                    expected.append(False)
+                case _:
+                    # below threshold
+                    expected.append(False)
+            msgs.append(msg)
+
+        self.assertEqual(expected, verify_multisig_messages(msgs))
+        self.assertEqual(expected, verify_multisig_messages(msgs, verify_all=True))
+        with ThreadPoolExecutor() as executor:
+            self.assertEqual(
+                expected,
+                verify_multisig_messages(msgs, executor=executor, chunk_size=3),
+            )
+        self.assertEqual([], verify_multisig_messages([]))
+        with self.assertRaises(ValueError):
+            verify_multisig_messages(msgs, chunk_size=0)
 
 
 if __name__ == "__main__":
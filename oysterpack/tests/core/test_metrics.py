@@ -0,0 +1,72 @@
+import unittest
+
+from oysterpack.core.metrics import LatencyHistogram, Gauge, HistogramSnapshot
+from tests.test_support import OysterPackTestCase
+
+
+class LatencyHistogramTestCase(OysterPackTestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        # 1 ms .. 1000 ms
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(1000, snapshot.count)
+        self.assertEqual(0.001, snapshot.min)
+        self.assertEqual(1.0, snapshot.max)
+        self.assertAlmostEqual(0.5005, snapshot.mean, places=6)
+        # percentiles are recorded with ~3% relative precision
+        for expected, actual in (
+            (0.5, snapshot.p50),
+            (0.9, snapshot.p90),
+            (0.99, snapshot.p99),
+            (0.999, snapshot.p999),
+        ):
+            self.assertGreaterEqual(actual, expected)
+            self.assertLessEqual(actual, expected * 1.04)
+
+    def test_small_latencies_are_exact(self):
+        histogram = LatencyHistogram()
+        for _ in range(10):
+            histogram.record(0.000_005)
+        self.assertEqual(0.000_005, histogram.percentile(50))
+        self.assertEqual(0.000_005, histogram.percentile(100))
+
+    def test_max_latency(self):
+        histogram = LatencyHistogram(max_latency=1.0)
+        histogram.record(10.0)
+        histogram.record(-1.0)
+        snapshot = histogram.snapshot()
+        self.assertEqual(1.0, snapshot.max)
+        self.assertEqual(0.0, snapshot.min)
+
+        with self.assertRaises(ValueError):
+            LatencyHistogram(max_latency=0)
+
+    def test_reset(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.1)
+        histogram.reset()
+        self.assertEqual(0, histogram.count)
+        self.assertEqual(HistogramSnapshot(), histogram.snapshot())
+        self.assertEqual(0.0, histogram.percentile(99))
+
+
+class GaugeTestCase(OysterPackTestCase):
+    def test_gauge(self):
+        gauge = Gauge()
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        snapshot = gauge.snapshot()
+        self.assertEqual(1, snapshot.value)
+        self.assertEqual(2, snapshot.max)
+
+        # the high watermark is reset to the current value
+        gauge.reset()
+        self.assertEqual(1, gauge.snapshot().max)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import threading
+import time
+import unittest
+from datetime import timedelta
+
+from oysterpack.core.periodic_scheduler import (
+    PeriodicScheduler,
+    default_periodic_scheduler,
+)
+from tests.test_support import OysterPackTestCase
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class PeriodicSchedulerTestCase(OysterPackTestCase):
+    def setUp(self) -> None:
+        self.scheduler = PeriodicScheduler(max_workers=2, name="test-scheduler")
+
+    def tearDown(self) -> None:
+        self.scheduler.shutdown()
+
+    def test_schedule(self):
+        counter = []
+        task = self.scheduler.schedule(
+            lambda: counter.append(1), timedelta(milliseconds=10), name="counter"
+        )
+        self.assertEqual("counter", task.name)
+        self.assertTrue(wait_until(lambda: task.run_count >= 3))
+        self.assertGreaterEqual(len(counter), 3)
+
+        with self.subTest("cancelled task stops running"):
+            task.cancel()
+            self.assertTrue(wait_until(lambda: not task.running))
+            run_count = task.run_count
+            time.sleep(0.05)
+            self.assertEqual(run_count, task.run_count)
+            self.assertEqual(0, self.scheduler.task_count)
+
+    def test_skip_when_previous_run_is_still_running(self):
+        release = threading.Event()
+        task = self.scheduler.schedule(
+            lambda: release.wait(2), timedelta(milliseconds=10), jitter=0
+        )
+        self.assertTrue(wait_until(lambda: task.skip_count >= 3))
+        self.assertTrue(task.running)
+        release.set()
+        self.assertTrue(wait_until(lambda: task.run_count >= 2))
+        task.cancel()
+
+    def test_failed_run_is_rescheduled(self):
+        def fail():
+            raise Exception("BOOM!")
+
+        task = self.scheduler.schedule(fail, timedelta(milliseconds=10))
+        self.assertTrue(wait_until(lambda: task.run_count >= 2))
+        task.cancel()
+
+    def test_workers_are_bounded(self):
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def work():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        tasks = [
+            self.scheduler.schedule(work, timedelta(milliseconds=5)) for _ in range(10)
+        ]
+        self.assertTrue(wait_until(lambda: all(task.run_count for task in tasks)))
+        for task in tasks:
+            task.cancel()
+        self.assertLessEqual(max_running, self.scheduler.max_workers)
+
+    def test_submit(self):
+        self.assertEqual(2, self.scheduler.submit(lambda: 1 + 1).result(1))
+
+        def fail():
+            raise ValueError("BOOM!")
+
+        with self.assertRaises(ValueError):
+            self.scheduler.submit(fail).result(1)
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            PeriodicScheduler(max_workers=0)
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule(lambda: None, timedelta(0))
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule(lambda: None, timedelta(seconds=1), jitter=1.5)
+
+    def test_shutdown(self):
+        self.scheduler.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.scheduler.schedule(lambda: None, timedelta(seconds=1))
+        with self.assertRaises(RuntimeError):
+            self.scheduler.submit(lambda: None)
+
+    def test_default_periodic_scheduler(self):
+        self.assertIs(default_periodic_scheduler(), default_periodic_scheduler())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import logging
 import unittest
 from dataclasses import dataclass, field
 from datetime import timedelta
+from threading import Event
 from time import sleep
 
 from reactivex import Subject, Observer, Observable
@@ -11,7 +12,10 @@ from oysterpack.core.health_check import (
     HealthCheck,
     HealthCheckImpact,
     HealthCheckResult,
+    HealthCheckStatus,
+    HealthCheckTimeout,
 )
+from oysterpack.core.periodic_scheduler import PeriodicScheduler
 from oysterpack.core.rx import default_scheduler
 from oysterpack.core.service import (
     Service,
@@ -313,6 +317,69 @@ class ServiceTestCase(OysterPackTestCase):
 
         self.assertIsInstance(foo_state_observer.error, ServiceStopError)
 
+    def test_healthchecks_are_cancelled_on_stop(self):
+        scheduler = PeriodicScheduler(max_workers=1)
+        try:
+            foo = FooService(healthcheck_scheduler=scheduler)
+            foo.start()
+            tasks = foo._healthcheck_tasks[:]
+            self.assertEqual(len(foo.healthchecks), len(tasks))
+            self.assertEqual(len(tasks), scheduler.task_count)
+
+            foo.stop()
+            self.assertTrue(all(task.cancelled for task in tasks))
+
+            with self.subTest("restarting the service reschedules the healthchecks"):
+                foo.start()
+                self.assertEqual(len(tasks), len(foo._healthcheck_tasks))
+                foo.stop()
+        finally:
+            scheduler.shutdown()
+
+    def test_hung_healthcheck_is_published_as_timeout(self):
+        class HungHealthCheck(HealthCheck):
+            def __init__(self):
+                super().__init__(
+                    name="hung",
+                    impact=HealthCheckImpact.HIGH,
+                    description="never completes in time",
+                    tags={"test"},
+                    run_interval=timedelta(milliseconds=50),
+                    timeout=timedelta(milliseconds=20),
+                )
+                self.release = Event()
+
+            def execute(self):
+                self.release.wait(2)
+
+        class HungService(Service):
+            _healthchecks = [HungHealthCheck()]
+
+            def _start(self):
+                pass
+
+            def _stop(self):
+                pass
+
+        scheduler = PeriodicScheduler(max_workers=1)
+        healthcheck = HungService._healthchecks[0]
+        service = HungService(healthcheck_scheduler=scheduler)
+        results: list[HealthCheckResult] = []
+        service.healthchecks_observable.subscribe(results.append)
+        try:
+            service.start()
+            sleep(0.5)
+            service.stop()
+        finally:
+            healthcheck.release.set()  # type: ignore
+            scheduler.shutdown()
+
+        # scheduled runs are not skipped while the health check is hung
+        self.assertGreater(len(results), 1)
+        for result in results:
+            self.assertEqual(HealthCheckStatus.RED, result.status)
+            self.assertIsInstance(result.error, HealthCheckTimeout)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 import unittest
 from dataclasses import dataclass, field
 from datetime import timedelta
@@ -9,6 +11,7 @@ from oysterpack.core.health_check import HealthCheck, HealthCheckImpact
 from oysterpack.core.service import (
     Service,
     ServiceLifecycleEvent,
+    ServiceStartError,
 )
 from oysterpack.core.service_manager import ServiceManager
 from tests.test_support import OysterPackTestCase
@@ -16,6 +19,15 @@ from tests.test_support import OysterPackTestCase
 logger = logging.getLogger("ServiceTestCase")
 
 
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
 class FooHealthCheck(HealthCheck):
     def __init__(self, name: str = "foo"):
         super().__init__(
@@ -64,6 +76,40 @@ class BarService(Service):
             raise self.stop_error
 
 
+class RecordingService(Service):
+    """
+    Records the order in which services are started and stopped
+    """
+
+    def __init__(
+        self,
+        name: str,
+        events: list[tuple[str, str]],
+        start_delay: float = 0,
+        start_error: Exception | None = None,
+    ):
+        self.__name = name
+        super().__init__()
+        self.__events = events
+        self.__start_delay = start_delay
+        self.__start_error = start_error
+        self.start_thread: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def _start(self):
+        self.start_thread = threading.current_thread().name
+        time.sleep(self.__start_delay)
+        if self.__start_error is not None:
+            raise self.__start_error
+        self.__events.append(("start", self.name))
+
+    def _stop(self):
+        self.__events.append(("stop", self.name))
+
+
 @dataclass
 class ServiceStateSubscriber(Observer[ServiceLifecycleEvent]):
     events_received: list[ServiceLifecycleEvent] = field(default_factory=list)
@@ -129,5 +175,115 @@ class ServiceTestCase(OysterPackTestCase):
             self.assertIn(BarService().name, str(err.exception))
 
 
+class ServiceDependenciesTestCase(OysterPackTestCase):
+    def test_dependency_order(self):
+        events: list[tuple[str, str]] = []
+        db = RecordingService("db", events)
+        algod = RecordingService("algod", events)
+        api = RecordingService("api", events).depends_on(db, algod)
+        worker = RecordingService("worker", events).depends_on(db)
+        # services are listed in reverse dependency order
+        service_manager = ServiceManager([api, worker, algod, db])
+        self.assertEqual(
+            [[algod.key, db.key], [api.key, worker.key]], service_manager.levels
+        )
+
+        service_manager.start()
+        service_manager.await_running(timedelta(seconds=5))
+        self.assertEqual({"db", "algod"}, {name for _, name in events[:2]})
+        self.assertEqual({"api", "worker"}, {name for _, name in events[2:]})
+        self.assertEqual(
+            {db.key, algod.key, api.key, worker.key},
+            service_manager.startup_times.keys(),
+        )
+
+        events.clear()
+        service_manager.stop()
+        service_manager.await_stopped(timedelta(seconds=5))
+        self.assertEqual({"api", "worker"}, {name for _, name in events[:2]})
+        self.assertEqual({"db", "algod"}, {name for _, name in events[2:]})
+
+    def test_services_within_level_start_in_parallel(self):
+        events: list[tuple[str, str]] = []
+        services = [
+            RecordingService(f"service-{i}", events, start_delay=0.2) for i in range(5)
+        ]
+        service_manager = ServiceManager(services)
+        start = time.perf_counter()
+        service_manager.start()
+        service_manager.await_running(timedelta(seconds=5))
+        self.assertLess(time.perf_counter() - start, 0.2 * len(services))
+        self.assertEqual(len(services), len({s.start_thread for s in services}))
+        for startup_time in service_manager.startup_times.values():
+            self.assertGreaterEqual(startup_time, timedelta(seconds=0.2))
+
+    def test_start_failure_stops_started_services(self):
+        events: list[tuple[str, str]] = []
+        db = RecordingService("db", events)
+        api = RecordingService(
+            "api", events, start_error=Exception("BOOM!")
+        ).depends_on(db)
+        web = RecordingService("web", events).depends_on(api)
+        service_manager = ServiceManager([db, api, web])
+
+        service_manager.start()
+        with self.assertRaises(ServiceStartError):
+            service_manager.await_running(timedelta(seconds=5))
+        # the failed service stops itself, and then the services it depends on are stopped
+        self.assertEqual([("start", "db"), ("stop", "api"), ("stop", "db")], events)
+        self.assertTrue(db.stopped)
+        self.assertTrue(api.stopped)
+        self.assertFalse(web.running)
+
+    def test_start_failure_stops_level_siblings(self):
+        events: list[tuple[str, str]] = []
+        ok = RecordingService("ok", events)
+        slow = RecordingService("slow", events, start_delay=0.5)
+        bad = RecordingService(
+            "bad", events, start_delay=0.1, start_error=Exception("BOOM!")
+        )
+        service_manager = ServiceManager([ok, slow, bad])
+
+        service_manager.start()
+        with self.assertRaises(ServiceStartError):
+            service_manager.await_running(timedelta(seconds=5))
+        self.assertTrue(ok.stopped)
+        # the slow service is stopped as soon as its startup completes
+        self.assertTrue(wait_until(lambda: slow.stopped))
+        self.assertIn(("stop", "slow"), events)
+
+    def test_startup_deadline(self):
+        events: list[tuple[str, str]] = []
+        db = RecordingService("db", events, start_delay=0.5)
+        api = RecordingService("api", events).depends_on(db)
+        service_manager = ServiceManager([db, api])
+
+        service_manager.start(timeout=timedelta(seconds=0.1))
+        with self.assertRaises(TimeoutError):
+            service_manager.await_running(timedelta(seconds=5))
+        self.assertFalse(api.running)
+        # the service that missed the deadline is stopped when its startup completes
+        self.assertTrue(wait_until(lambda: db.stopped))
+
+    def test_dependency_assertions(self):
+        events: list[tuple[str, str]] = []
+        with self.subTest("dependencies must be managed"):
+            db = RecordingService("db", events)
+            api = RecordingService("api", events).depends_on(db)
+            with self.assertRaises(AssertionError) as err:
+                ServiceManager([api])
+            self.assertIn("not managed", str(err.exception))
+
+        with self.subTest("dependencies must not contain a cycle"):
+            a = RecordingService("a", events)
+            b = RecordingService("b", events).depends_on(a)
+            a.depends_on(b)
+            c = RecordingService("c", events)
+            with self.assertRaises(AssertionError) as err:
+                ServiceManager([a, b, c])
+            self.assertIn("cycle", str(err.exception))
+            self.assertNotIn("'c'", str(err.exception))
+
+
 if __name__ == "__main__":
     unittest.main()